@@ -0,0 +1,129 @@
+"""Microbenchmark: single-pass markdown optimizer vs the line-walking original.
+
+Usage:
+    python benchmarks/bench_markdown.py [--size-mb 8] [--repeat 5]
+
+The legacy implementation is kept here verbatim so the comparison stays
+meaningful after the production code has moved on. Both implementations
+are checked for identical output before timing.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from repo2context.optimize import MARKDOWN_STAGES, TextOptimizer  # noqa: E402
+
+PARAGRAPH = (
+    "repo2context turns a repository into Markdown files sized for LLM context "
+    "windows, skipping binary files and honouring ignore rules."
+)
+BADGE = "[![CI](https://example.com/badge.svg)](https://example.com/actions)"
+
+
+def legacy_optimize_markdown(content: str) -> str:
+    """Original nested-loop implementation of the markdown optimizer."""
+    lines = content.split("\n")
+    optimized_lines = []
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+
+        if line.strip().startswith("[!["):
+            badge_lines = [line]
+            j = i + 1
+            while j < len(lines) and lines[j].strip().startswith("[!["):
+                badge_lines.append(lines[j])
+                j += 1
+
+            if len(badge_lines) > 3:
+                optimized_lines.extend(badge_lines[:2])
+                optimized_lines.append(f"<!-- {len(badge_lines) - 2} more badges -->")
+            else:
+                optimized_lines.extend(badge_lines)
+
+            i = j
+            continue
+
+        if line.strip() == "":
+            blank_count = 1
+            j = i + 1
+            while j < len(lines) and lines[j].strip() == "":
+                blank_count += 1
+                j += 1
+
+            if blank_count > 1:
+                optimized_lines.append("")
+            else:
+                optimized_lines.append(line)
+
+            i = j
+            continue
+
+        optimized_lines.append(line)
+        i += 1
+
+    return "\n".join(optimized_lines)
+
+
+def generate_markdown(size_bytes: int, seed: int = 0) -> str:
+    """Generate deterministic markdown with badges, headings and blank runs."""
+    rng = random.Random(seed)
+    blocks: list[str] = []
+    total = 0
+
+    while total < size_bytes:
+        kind = rng.random()
+        if kind < 0.05:
+            block = "\n".join([BADGE] * rng.randint(1, 8))
+        elif kind < 0.15:
+            block = f"## Section {len(blocks)}"
+        elif kind < 0.30:
+            block = "\n" * rng.randint(1, 5)
+        elif kind < 0.40:
+            block = "   \n\t\n"
+        else:
+            block = PARAGRAPH
+
+        blocks.append(block)
+        total += len(block) + 1
+
+    return "\n".join(blocks)
+
+
+def main() -> None:
+    """Run the benchmark and print timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = generate_markdown(int(args.size_mb * 1024 * 1024))
+    optimizer = TextOptimizer(MARKDOWN_STAGES)
+
+    if legacy_optimize_markdown(content) != optimizer.optimize(content):
+        raise SystemExit("Implementations disagree on generated input")
+
+    legacy = min(
+        timeit.repeat(
+            lambda: legacy_optimize_markdown(content), number=1, repeat=args.repeat
+        )
+    )
+    current = min(
+        timeit.repeat(lambda: optimizer.optimize(content), number=1, repeat=args.repeat)
+    )
+
+    mb = len(content) / (1024 * 1024)
+    print(f"Input: {mb:.1f} MB of markdown")
+    print(f"  legacy:      {legacy * 1000:8.1f} ms  ({mb / legacy:7.1f} MB/s)")
+    print(f"  single-pass: {current * 1000:8.1f} ms  ({mb / current:7.1f} MB/s)")
+    print(f"  speedup:     {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Scaling benchmark: end-to-end runs over synthetic repositories.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scales 1000,10000,100000,1000000]
+        [--repeat 3] [--workdir /tmp/repo2context-bench] [--output results.json]
+
+Each scale gets a synthetic repository from synthetic_repo.py, generated
+once and reused from the work directory while its spec and seed match.
+Every run reports end-to-end and per-stage timings, so the JSON output
+can be plotted as files/sec and MB/sec scaling curves or compared across
+commits. The best of --repeat runs is reported, since the slower runs
+mostly measure interference from the rest of the machine. Peak RSS is
+the process high-water mark, so later scales include earlier ones.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from repo2context.core import ContextGenerationServiceFactory  # noqa: E402
+from synthetic_repo import RepoSpec, generate_repo  # noqa: E402
+
+DEFAULT_SCALES = "1000,10000,100000,1000000"
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "repo2context-bench"
+MEGABYTE = 1024 * 1024
+RESULTS_FORMAT_VERSION = 1
+PROC_STATUS = "/proc/self/status"
+
+
+def prepare_repo(spec: RepoSpec, seed: int, workdir: Path) -> tuple[Path, float]:
+    """
+    Generate the repository for spec, or reuse an identical earlier one.
+
+    Returns:
+        Repository root and seconds spent generating it (0 when reused)
+    """
+    key = {"spec": asdict(spec), "seed": seed}
+    base = workdir / f"files-{spec.files}-seed-{seed}"
+    root = base / "repo"
+    # Kept beside the repository so it is not part of the benchmarked tree
+    marker = base / "spec.json"
+
+    if marker.exists() and json.loads(marker.read_text()) == key:
+        return root, 0.0
+
+    shutil.rmtree(base, ignore_errors=True)
+    start = time.perf_counter()
+    generate_repo(spec, root, seed)
+    elapsed = time.perf_counter() - start
+    marker.write_text(json.dumps(key))
+    return root, elapsed
+
+
+def run_once(root: Path) -> dict[str, Any]:
+    """Run the pipeline over root and return its statistics."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        use_case, config = ContextGenerationServiceFactory.create_use_case(
+            repo_path=root, output_path=Path(output_dir)
+        )
+        # The pipeline reports progress on stdout; keep it out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = use_case.execute(config)
+    return result.to_dict()
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process so far.
+
+    Linux reports VmHWM, which starts afresh at exec. ru_maxrss would
+    inherit the high-water mark of a parent that forked this process, such
+    as the regression gate after generating a repository.
+    """
+    try:
+        with open(PROC_STATUS, encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024  # Reported in kB
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(root: Path, repeat: int) -> dict[str, Any]:
+    """Best of repeat runs, with throughput derived from its wall time."""
+    runs = [run_once(root) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run["wall_seconds"])
+    wall = best["wall_seconds"] or 1e-9
+    best["files_per_second"] = best["files"] / wall
+    best["mb_per_second"] = best["bytes"] / MEGABYTE / wall
+    best["tokens_per_second"] = best["tokens"] / wall
+    best["wall_seconds_all"] = [run["wall_seconds"] for run in runs]
+    # Cumulative over the process, so run one scale per process for exact values
+    best["peak_rss_bytes"] = peak_rss_bytes()
+    return best
+
+
+def main() -> None:
+    """Run the benchmark at each scale and emit JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default=DEFAULT_SCALES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--output", type=Path, help="Write JSON here, not stdout")
+    defaults = RepoSpec()
+    for name, value in asdict(defaults).items():
+        if name != "files":
+            parser.add_argument(
+                f"--{name.replace('_', '-')}", type=type(value), default=value
+            )
+    args = parser.parse_args()
+
+    spec_fields = {
+        name: getattr(args, name) for name in asdict(defaults) if name != "files"
+    }
+    results = []
+    for files in (int(scale) for scale in args.scales.split(",")):
+        spec = replace(defaults, files=files, **spec_fields)
+        root, generate_seconds = prepare_repo(spec, args.seed, args.workdir)
+        run = measure(root, args.repeat)
+        run["scale"] = files
+        run["generate_seconds"] = generate_seconds
+        results.append(run)
+        print(
+            f"{files:>9} files: {run['wall_seconds']:8.2f}s  "
+            f"{run['files_per_second']:9.0f} files/s  "
+            f"{run['mb_per_second']:7.1f} MB/s",
+            file=sys.stderr,
+        )
+
+    report = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "spec": {**asdict(defaults), **spec_fields, "files": None},
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Performance regression gate: compare benchmark metrics with a baseline.
+
+Usage:
+    python benchmarks/regression_gate.py [--baseline benchmarks/baseline.json]
+        [--files 10000] [--update] [--output results.json]
+
+Runs the pipeline benchmark on a synthetic repository, times importing
+the CLI and runs microbenchmarks of the hot utilities, then compares every
+metric with the committed baseline. A metric regresses when it is worse
+than the baseline by more than its tolerance; the gate then exits with 1.
+Tolerances live in the baseline file and can be tuned per metric.
+
+Absolute numbers depend on the machine, so regenerate the baseline with
+--update on the machine that runs the gate, such as the CI runner. Token
+counting depends on whether tiktoken is installed too, so its metrics are
+only compared with a baseline recorded the same way.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from bench_pipeline import DEFAULT_WORKDIR, MEGABYTE, prepare_repo  # noqa: E402
+from repo2context.core import (  # noqa: E402
+    ContextWriterServiceImpl,
+    IgnorePatternServiceImpl,
+)
+from repo2context.extractive import extract_summary  # noqa: E402
+from repo2context.utils import (  # noqa: E402
+    TIKTOKEN_AVAILABLE,
+    detect_binary,
+    estimate_tokens,
+)
+from synthetic_repo import (  # noqa: E402
+    RepoSpec,
+    code_corpus,
+    ignore_file_text,
+    markdown_corpus,
+)
+
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+DEFAULT_FILES = 10_000
+DEFAULT_REPEAT = 3
+BASELINE_FORMAT_VERSION = 1
+IMPORT_MODULE = "repo2context.cli"
+MICRO_TEXT_BYTES = 16 * 1024
+MICROSECONDS = 1_000_000
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+
+@dataclass(frozen=True)
+class Metric:
+    """A gated metric and its default tolerance."""
+
+    unit: str
+    higher_is_better: bool
+    tolerance: float  # Allowed relative change in the worse direction
+
+
+METRICS = {
+    "pipeline.files_per_second": Metric("files/s", True, 0.25),
+    "pipeline.tokens_per_second": Metric("tokens/s", True, 0.25),
+    "pipeline.mb_per_second": Metric("MB/s", True, 0.25),
+    "pipeline.peak_rss_mb": Metric("MB", False, 0.20),
+    "import.seconds": Metric("s", False, 0.50),
+    "micro.estimate_tokens_us": Metric("us", False, 0.30),
+    "micro.detect_binary_us": Metric("us", False, 0.30),
+    "micro.should_ignore_us": Metric("us", False, 0.30),
+    "micro.optimize_markdown_us": Metric("us", False, 0.30),
+    "micro.extract_summary_us": Metric("us", False, 0.30),
+}
+# Metrics timing token counting, which is a different algorithm with tiktoken
+TOKENIZER_METRICS = frozenset(
+    {"pipeline.tokens_per_second", "micro.estimate_tokens_us"}
+)
+
+
+def run_pipeline(files: int, repeat: int, workdir: Path) -> dict[str, float]:
+    """Pipeline throughput and peak RSS, from a fresh process for exact RSS."""
+    spec = RepoSpec(files=files)
+    prepare_repo(spec, 0, workdir)  # So the child only reuses the tree
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = Path(temp_dir) / "pipeline.json"
+        subprocess.run(
+            [
+                sys.executable,
+                str(BENCHMARKS_DIR / "bench_pipeline.py"),
+                f"--scales={files}",
+                f"--repeat={repeat}",
+                f"--workdir={workdir}",
+                f"--output={output}",
+            ],
+            check=True,
+        )
+        result = json.loads(output.read_text())["results"][0]
+    return {
+        "pipeline.files_per_second": result["files_per_second"],
+        "pipeline.tokens_per_second": result["tokens_per_second"],
+        "pipeline.mb_per_second": result["mb_per_second"],
+        "pipeline.peak_rss_mb": result["peak_rss_bytes"] / MEGABYTE,
+    }
+
+
+def run_import(repeat: int) -> dict[str, float]:
+    """Best time to import the CLI in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {IMPORT_MODULE}; print(time.perf_counter() - start)"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    times = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                check=True,
+                capture_output=True,
+                text=True,
+                env=env,
+            ).stdout
+        )
+        for _ in range(max(repeat, 5))
+    ]
+    return {"import.seconds": min(times)}
+
+
+def run_micro(repeat: int) -> dict[str, float]:
+    """Per-call microseconds of the hot utilities, best of repeat."""
+    code = code_corpus(random.Random(0))[:MICRO_TEXT_BYTES].decode()
+    markdown = markdown_corpus(random.Random(0))[:MICRO_TEXT_BYTES].decode()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / ".repo2contextignore").write_text(
+            ignore_file_text(RepoSpec(), random.Random(0))
+        )
+        source = root / "src" / "pkg1" / "pkg7" / "handlers.py"
+        source.parent.mkdir(parents=True)
+        source.write_text(code)
+        markdown_path = root / "README.md"
+
+        ignore_service = IgnorePatternServiceImpl(repo_root=root)
+        writer = ContextWriterServiceImpl(root / "out", max_tokens=100_000)
+
+        cases = {
+            "micro.estimate_tokens_us": (lambda: estimate_tokens(code), 2000),
+            "micro.detect_binary_us": (lambda: detect_binary(source), 2000),
+            "micro.should_ignore_us": (
+                lambda: ignore_service.should_ignore(source, root),
+                20_000,
+            ),
+            "micro.optimize_markdown_us": (
+                lambda: writer._optimize_markdown_content(markdown, markdown_path),
+                200,
+            ),
+            "micro.extract_summary_us": (
+                lambda: extract_summary(code, "python"),
+                50,
+            ),
+        }
+        return {
+            name: min(timeit.repeat(func, number=number, repeat=repeat))
+            / number
+            * MICROSECONDS
+            for name, (func, number) in cases.items()
+        }
+
+
+def compare(
+    current: dict[str, float],
+    baseline: dict[str, Any],
+    tiktoken: bool = TIKTOKEN_AVAILABLE,
+) -> list[tuple[str, float | None, float, float, bool]]:
+    """
+    Compare metrics with the baseline.
+
+    Metrics in TOKENIZER_METRICS are left without a baseline value unless
+    the baseline was recorded with tiktoken available or not as now.
+
+    Returns:
+        Rows of (metric, baseline value, current value, relative change,
+        regressed); the change is positive when the metric got worse
+    """
+    same_tokenizer = baseline.get("tiktoken") == tiktoken
+    rows: list[tuple[str, float | None, float, float, bool]] = []
+    for name, value in current.items():
+        entry = baseline.get("metrics", {}).get(name)
+        if entry is None or (name in TOKENIZER_METRICS and not same_tokenizer):
+            rows.append((name, None, value, 0.0, False))
+            continue
+        reference = entry["value"]
+        worse = (
+            (reference - value)
+            if METRICS[name].higher_is_better
+            else (value - reference)
+        )
+        change = worse / reference if reference else 0.0
+        rows.append((name, reference, value, change, change > entry["tolerance"]))
+    return rows
+
+
+def build_baseline(
+    current: dict[str, float], previous: dict[str, Any]
+) -> dict[str, Any]:
+    """Baseline from current values, keeping tolerances tuned in the old one."""
+    old_metrics = previous.get("metrics", {})
+    return {
+        "format_version": BASELINE_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "tiktoken": TIKTOKEN_AVAILABLE,
+        "metrics": {
+            name: {
+                "value": value,
+                "unit": METRICS[name].unit,
+                "higher_is_better": METRICS[name].higher_is_better,
+                "tolerance": old_metrics.get(name, {}).get(
+                    "tolerance", METRICS[name].tolerance
+                ),
+            }
+            for name, value in current.items()
+        },
+    }
+
+
+def main() -> None:
+    """Run the benchmarks and gate on the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument(
+        "--update", action="store_true", help="Write the results as the new baseline"
+    )
+    parser.add_argument("--output", type=Path, help="Also write results as JSON")
+    args = parser.parse_args()
+
+    current = {
+        **run_pipeline(args.files, args.repeat, args.workdir),
+        **run_import(args.repeat),
+        **run_micro(args.repeat),
+    }
+    baseline = (
+        json.loads(args.baseline.read_text(encoding="utf-8"))
+        if args.baseline.exists()
+        else {}
+    )
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+    if args.update:
+        args.baseline.write_text(
+            json.dumps(build_baseline(current, baseline), indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    rows = compare(current, baseline)
+    print(f"{'metric':<30} {'baseline':>12} {'current':>12} {'worse by':>9}")
+    for name, reference, value, change, regressed in rows:
+        shown = "-" if reference is None else f"{reference:12.4g}"
+        status = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:<30} {shown:>12} {value:12.4g} {change:+9.1%}"
+            f" {METRICS[name].unit}{status}"
+        )
+
+    if baseline and baseline.get("tiktoken") != TIKTOKEN_AVAILABLE:
+        print(
+            "\nToken counting metrics not compared: tiktoken is "
+            f"{'' if TIKTOKEN_AVAILABLE else 'not '}installed, unlike for the baseline"
+        )
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+        sys.exit(EXIT_REGRESSION)
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --update to create one")
+    sys.exit(EXIT_OK)
+
+
+if __name__ == "__main__":
+    main()
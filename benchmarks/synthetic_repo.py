@@ -0,0 +1,213 @@
+"""Deterministic synthetic repository generator for benchmarks.
+
+Usage:
+    python benchmarks/synthetic_repo.py OUTPUT_DIR [--files 10000] [--seed 0]
+
+The same spec and seed always produce the same tree, byte for byte, so
+benchmark runs on different machines or commits see identical input.
+File contents are slices of per-kind corpora generated once, which keeps
+generation fast enough for a million files.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+CORPUS_BYTES = 4 * 1024 * 1024  # Per kind; file contents are slices of it
+IGNORE_FILE_NAME = ".repo2contextignore"
+
+# Directories and extensions the generated ignore rules actually match
+IGNORED_DIRECTORIES = ("build", "dist", "node_modules", "__generated__")
+IGNORED_EXTENSIONS = (".log", ".tmp", ".cache")
+CODE_EXTENSIONS = (".py", ".py", ".py", ".js", ".ts", ".go", ".json", ".yaml")
+BINARY_EXTENSIONS = (".png", ".bin", ".woff2", ".sqlite")
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    """Shape of a synthetic repository."""
+
+    files: int = 10_000
+    median_bytes: int = 2048  # File sizes are log-normal around this median
+    size_sigma: float = 1.0  # Spread of the log-normal size distribution
+    max_bytes: int = 256 * 1024
+    max_depth: int = 5
+    files_per_dir: int = 20
+    binary_ratio: float = 0.05
+    markdown_share: float = 0.1
+    ignored_ratio: float = 0.1  # Share of files placed where ignore rules match
+    ignore_rules: int = 20  # Patterns in .repo2contextignore; extras match nothing
+
+
+def generate_repo(spec: RepoSpec, root: Path, seed: int = 0) -> dict[str, int]:
+    """
+    Write a synthetic repository under root.
+
+    Args:
+        spec: Repository shape
+        root: Directory to create the repository in
+        seed: Random seed; equal seeds give identical trees
+
+    Returns:
+        Counts of generated files and bytes by kind
+    """
+    rng = random.Random(seed)
+    corpora = {
+        "code": code_corpus(rng),
+        "markdown": markdown_corpus(rng),
+        "binary": rng.randbytes(CORPUS_BYTES),
+    }
+    directories = _directories(spec, rng)
+
+    root.mkdir(parents=True, exist_ok=True)
+    (root / IGNORE_FILE_NAME).write_text(ignore_file_text(spec, rng), encoding="utf-8")
+
+    counts = {"files": 0, "bytes": 0, "binary": 0, "markdown": 0, "ignored": 0}
+    created: set[Path] = set()
+    for index in range(spec.files):
+        size = _file_size(spec, rng)
+        directory = rng.choice(directories)
+        roll = rng.random()
+
+        if roll < spec.ignored_ratio:
+            kind = "code"
+            if rng.random() < 0.5:
+                directory = directory / rng.choice(IGNORED_DIRECTORIES)
+                extension = rng.choice(CODE_EXTENSIONS)
+            else:
+                extension = rng.choice(IGNORED_EXTENSIONS)
+            counts["ignored"] += 1
+        elif roll < spec.ignored_ratio + spec.binary_ratio:
+            kind = "binary"
+            extension = rng.choice(BINARY_EXTENSIONS)
+            counts["binary"] += 1
+        elif roll < spec.ignored_ratio + spec.binary_ratio + spec.markdown_share:
+            kind = "markdown"
+            extension = ".md"
+            counts["markdown"] += 1
+        else:
+            kind = "code"
+            extension = rng.choice(CODE_EXTENSIONS)
+
+        target = root / directory
+        if target not in created:
+            target.mkdir(parents=True, exist_ok=True)
+            created.add(target)
+
+        corpus = corpora[kind]
+        start = rng.randrange(0, len(corpus) - size)
+        content = corpus[start : start + size]
+        if kind == "binary":
+            # Even tiny binary files must look binary
+            content = b"\0" + content[1:]
+        (target / f"file{index}{extension}").write_bytes(content)
+        counts["files"] += 1
+        counts["bytes"] += size
+
+    return counts
+
+
+def _file_size(spec: RepoSpec, rng: random.Random) -> int:
+    """Draw a file size from the log-normal distribution."""
+    size = int(rng.lognormvariate(math.log(spec.median_bytes), spec.size_sigma))
+    return max(1, min(size, spec.max_bytes))
+
+
+def _directories(spec: RepoSpec, rng: random.Random) -> list[Path]:
+    """Create a directory tree with about files_per_dir files per directory."""
+    count = max(1, math.ceil(spec.files / spec.files_per_dir))
+    directories = [Path("src")]
+    while len(directories) < count:
+        parent = rng.choice(directories)
+        if len(parent.parts) >= spec.max_depth:
+            parent = Path(parent.parts[0])
+        directories.append(parent / f"pkg{len(directories)}")
+    return directories
+
+
+def ignore_file_text(spec: RepoSpec, rng: random.Random) -> str:
+    """Rules matching the ignored files, padded to ignore_rules with rules that do not."""
+    rules = [f"{name}/" for name in IGNORED_DIRECTORIES]
+    rules += [f"*{extension}" for extension in IGNORED_EXTENSIONS]
+    while len(rules) < spec.ignore_rules:
+        kind = rng.random()
+        if kind < 0.4:
+            rules.append(f"*.ext{len(rules)}")
+        elif kind < 0.7:
+            rules.append(f"vendor{len(rules)}/")
+        else:
+            rules.append(f"**/fixture{len(rules)}/**/*.snap")
+    return "\n".join(rules) + "\n"
+
+
+def code_corpus(rng: random.Random) -> bytes:
+    """Python-like source with docstrings, comments and blank lines."""
+    lines: list[str] = []
+    total = 0
+    while total < CORPUS_BYTES:
+        name = f"handler_{rng.randrange(100_000)}"
+        block = [
+            f"def {name}(request, retries={rng.randrange(5)}):",
+            f'    """Handle request {rng.randrange(1000)} with retries."""',
+            "    # Validate the payload before doing any work",
+            f"    value = request.get('field_{rng.randrange(50)}', {rng.random():.4f})",
+            f"    return [value * i for i in range({rng.randrange(1, 20)})]",
+            "",
+            "",
+        ]
+        lines.extend(block)
+        total += sum(len(line) + 1 for line in block)
+    return "\n".join(lines).encode("utf-8")
+
+
+def markdown_corpus(rng: random.Random) -> bytes:
+    """Markdown with headings, prose, badges, code blocks and blank runs."""
+    blocks: list[str] = []
+    total = 0
+    while total < CORPUS_BYTES:
+        kind = rng.random()
+        if kind < 0.1:
+            block = f"## Section {rng.randrange(1000)}"
+        elif kind < 0.15:
+            block = "[![CI](https://example.com/badge.svg)](https://example.com)"
+        elif kind < 0.25:
+            block = "```bash\nrepo2context --only py --max-tokens 50000\n```"
+        elif kind < 0.35:
+            block = "\n" * rng.randint(1, 4)
+        else:
+            block = (
+                "This project turns repositories into context files for language "
+                f"models, honouring ignore rules ({rng.randrange(10_000)})."
+            )
+        blocks.append(block)
+        total += len(block) + 1
+    return "\n".join(blocks).encode("utf-8")
+
+
+def main() -> None:
+    """Generate a repository from command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path, help="Directory to create")
+    parser.add_argument("--seed", type=int, default=0)
+    defaults = RepoSpec()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(value), default=value
+        )
+    args = parser.parse_args()
+
+    if args.output.exists() and any(args.output.iterdir()):
+        raise SystemExit(f"Output directory {args.output} is not empty")
+
+    spec = RepoSpec(**{name: getattr(args, name) for name in asdict(defaults)})
+    counts = generate_repo(spec, args.output, args.seed)
+    json.dump({"spec": asdict(spec), "seed": args.seed, **counts}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
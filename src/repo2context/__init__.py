@@ -2,7 +2,24 @@
 
 __version__ = "0.2.0"
 
-from .core import generate_context
+from .core import (
+    RenderedContext,
+    RenderedFile,
+    RenderedSection,
+    generate_context,
+    iter_context,
+    render_context,
+)
 from .utils import detect_binary, estimate_tokens, guess_language
 
-__all__ = ["generate_context", "detect_binary", "estimate_tokens", "guess_language"]
+__all__ = [
+    "generate_context",
+    "render_context",
+    "iter_context",
+    "RenderedContext",
+    "RenderedFile",
+    "RenderedSection",
+    "detect_binary",
+    "estimate_tokens",
+    "guess_language",
+]
@@ -0,0 +1,399 @@
+"""Context generation for many repositories on one shared worker pool."""
+
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from .core import (
+    DEFAULT_MAX_TOKENS,
+    EXIT_ERROR,
+    EXIT_SUCCESS,
+    ContextGenerationServiceFactory,
+    SummaryConfig,
+)
+from .options import OptionError, path_option, read_options
+from .utils import estimate_tokens, format_bytes
+
+# === CONSTANTS ===
+
+BATCH_STATS_FORMAT_VERSION = 1
+DEFAULT_OUTPUT_NAME = ".repo2context"
+SLOWEST_REPOSITORIES = 10  # Listed in the aggregate report
+MANIFEST_OPTIONS = {
+    "repo_path",
+    "output_path",
+    "rules_file",
+    "max_tokens",
+    "only_extensions",
+    "profile",
+    "skeleton_min_tokens",
+    "optimize_stages",
+    "token_budget",
+    "enable_summary",
+}
+
+
+class ManifestError(ValueError):
+    """Raised for manifests and repository lists that cannot be run."""
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """Value object describing the run for one repository."""
+
+    repo_path: Path
+    output_path: Path
+    rules_file: Path | None = None
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    only_extensions: list[str] | None = None
+    profile: str | None = None
+    skeleton_min_tokens: int | None = None
+    optimize_stages: list[str] | None = None
+    token_budget: int | None = None
+    enable_summary: bool = False
+
+
+@dataclass(frozen=True)
+class BatchRepositoryResult:
+    """Value object with the outcome of one repository's run."""
+
+    repo_path: str
+    output_path: str
+    exit_code: int
+    seconds: float
+    error: str | None = None
+    stats: dict[str, Any] | None = None  # ProcessingResult.to_dict()
+
+
+@dataclass(frozen=True)
+class BatchReport:
+    """Value object aggregating the runs of a batch."""
+
+    jobs: int
+    wall_seconds: float
+    results: list[BatchRepositoryResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> list[BatchRepositoryResult]:
+        """Results of repositories whose run failed."""
+        return [result for result in self.results if result.exit_code == EXIT_ERROR]
+
+    @property
+    def exit_code(self) -> int:
+        """Exit code of the batch: 0 if every repository succeeded, 2 otherwise."""
+        return EXIT_ERROR if self.failed else EXIT_SUCCESS
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return totals, summed stage timings and per-repository results."""
+        totals: Counter[str] = Counter()
+        stages: dict[str, Counter[str]] = defaultdict(Counter)
+        skipped: Counter[str] = Counter()
+        for result in self.results:
+            if not result.stats:
+                continue
+            for key in ("files", "bytes", "tokens", "parts"):
+                totals[key] += result.stats[key]
+            for name, stage in result.stats["stages"].items():
+                stages[name].update(stage)
+            skipped.update(result.stats["skipped"])
+
+        slowest = sorted(self.results, key=lambda result: -result.seconds)
+        return {
+            "format_version": BATCH_STATS_FORMAT_VERSION,
+            "exit_code": self.exit_code,
+            "jobs": self.jobs,
+            "wall_seconds": self.wall_seconds,
+            "repository_seconds": sum(result.seconds for result in self.results),
+            "repositories": len(self.results),
+            "failed": len(self.failed),
+            "files": totals["files"],
+            "bytes": totals["bytes"],
+            "tokens": totals["tokens"],
+            "parts": totals["parts"],
+            "stages": {name: dict(stage) for name, stage in stages.items()},
+            "skipped": dict(skipped),
+            "slowest": [
+                {"repo_path": result.repo_path, "seconds": result.seconds}
+                for result in slowest[:SLOWEST_REPOSITORIES]
+            ],
+            "results": [vars(result) for result in self.results],
+        }
+
+
+def read_manifest(manifest_path: Path) -> list[Any]:
+    """
+    Read the repository entries of a JSON manifest.
+
+    A manifest is a list, or an object with a "repositories" list, whose
+    entries are repository paths or objects with "repo_path" and any of
+    the per-repository options. Relative paths are resolved against the
+    manifest's directory.
+    """
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Could not read manifest {manifest_path}: {e}") from e
+
+    entries = data.get("repositories") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ManifestError(
+            f"Manifest {manifest_path} must be a list or have a 'repositories' list"
+        )
+
+    base_dir = manifest_path.parent
+    resolved = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry = dict(entry)
+            for name in ("repo_path", "output_path", "rules_file"):
+                if isinstance(entry.get(name), str):
+                    entry[name] = str(base_dir / entry[name])
+        elif isinstance(entry, str):
+            entry = str(base_dir / entry)
+        resolved.append(entry)
+    return resolved
+
+
+def create_jobs(
+    entries: Iterable[Any],
+    defaults: dict[str, Any] | None = None,
+    output_root: Path | None = None,
+) -> list[BatchJob]:
+    """
+    Create one job per entry, a repository path or a dict of options.
+
+    Options missing from an entry come from defaults. Output goes to
+    .repo2context inside each repository, or with output_root to a
+    directory named after the repository inside it.
+    """
+    jobs = []
+    outputs: dict[Path, Path] = {}
+    for index, entry in enumerate(entries, 1):
+        options = dict(defaults or {})
+        if isinstance(entry, dict):
+            # A repository choosing its extensions drops the default profile
+            # and the other way round, as the two cannot be combined
+            if "only_extensions" in entry:
+                options.pop("profile", None)
+            if "profile" in entry:
+                options.pop("only_extensions", None)
+            options.update(entry)
+        else:
+            options["repo_path"] = entry
+        try:
+            job = _create_job(options, output_root)
+        except ManifestError as e:
+            raise ManifestError(f"Repository {index}: {e}") from e
+
+        other = outputs.get(job.output_path)
+        if other is not None:
+            raise ManifestError(
+                f"Repositories {other} and {job.repo_path} would both write to "
+                f"{job.output_path}"
+            )
+        outputs[job.output_path] = job.repo_path
+        jobs.append(job)
+    return jobs
+
+
+def run_batch(
+    jobs: list[BatchJob],
+    workers: int,
+    cache_dir: Path | None = None,
+    summary_config: SummaryConfig | None = None,
+    verbose: bool = True,
+) -> BatchReport:
+    """
+    Run jobs on a pool of worker processes and aggregate their results.
+
+    Each worker imports the package and loads the tokenizer once, then
+    takes repositories until none are left, so the batch pays for
+    startup once per core rather than once per repository. Summary rate
+    limits are shared out between the workers.
+    """
+    started = time.perf_counter()
+    workers = max(1, min(workers, len(jobs)))
+    if summary_config is not None:
+        summary_config = replace(
+            summary_config,
+            requests_per_minute=max(1, summary_config.requests_per_minute // workers),
+            tokens_per_minute=max(1, summary_config.tokens_per_minute // workers),
+        )
+
+    results = []
+    if workers == 1:
+        _init_worker()
+        for job in jobs:
+            result = run_job(job, cache_dir, summary_config)
+            results.append(result)
+            if verbose:
+                _print_progress(result, len(results), len(jobs))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+            futures: dict[Future[BatchRepositoryResult], BatchJob] = {
+                pool.submit(run_job, job, cache_dir, summary_config): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:  # The worker itself died
+                    result = BatchRepositoryResult(
+                        str(job.repo_path),
+                        str(job.output_path),
+                        EXIT_ERROR,
+                        0.0,
+                        str(e),
+                    )
+                results.append(result)
+                if verbose:
+                    _print_progress(result, len(results), len(jobs))
+
+    # Report in job order, whatever order the workers finished in
+    order = {str(job.output_path): index for index, job in enumerate(jobs)}
+    results.sort(key=lambda result: order[result.output_path])
+    return BatchReport(workers, time.perf_counter() - started, results)
+
+
+def run_job(
+    job: BatchJob,
+    cache_dir: Path | None = None,
+    summary_config: SummaryConfig | None = None,
+) -> BatchRepositoryResult:
+    """Generate context for one repository, capturing any failure."""
+    started = time.perf_counter()
+
+    def failed(error: str) -> BatchRepositoryResult:
+        return BatchRepositoryResult(
+            str(job.repo_path),
+            str(job.output_path),
+            EXIT_ERROR,
+            time.perf_counter() - started,
+            error,
+        )
+
+    if not job.repo_path.is_dir():
+        return failed(f"Repository path '{job.repo_path}' is not a directory")
+    if job.rules_file and not job.rules_file.exists():
+        return failed(f"Rules file '{job.rules_file}' does not exist")
+
+    try:
+        use_case, config = ContextGenerationServiceFactory.create_use_case(
+            repo_path=job.repo_path,
+            rules_file=job.rules_file,
+            output_path=job.output_path,
+            max_tokens=job.max_tokens,
+            only_extensions=job.only_extensions,
+            enable_summary=job.enable_summary,
+            profile=job.profile,
+            skeleton_min_tokens=job.skeleton_min_tokens,
+            cache_dir=cache_dir,
+            optimize_stages=job.optimize_stages,
+            summary_config=summary_config,
+            token_budget=job.token_budget,
+            verbose=False,
+        )
+        result = use_case.execute(config)
+    except Exception as e:
+        return failed(str(e))
+
+    if result.exit_code == EXIT_ERROR:
+        return failed("Context generation failed; see the error output")
+    return BatchRepositoryResult(
+        str(job.repo_path),
+        str(job.output_path),
+        result.exit_code,
+        time.perf_counter() - started,
+        stats=result.to_dict(),
+    )
+
+
+def print_report(report: BatchReport) -> None:
+    """Print the totals of a batch and the repositories that failed."""
+    data = report.to_dict()
+    print("\nBatch complete:")
+    print(f"  Repositories: {data['repositories']} ({data['failed']} failed)")
+    print(f"  Files processed: {data['files']}")
+    print(f"  Total size: {format_bytes(data['bytes'])}")
+    print(f"  Estimated tokens: {data['tokens']:,}")
+    print(f"  Parts written: {data['parts']}")
+    print(
+        f"  Elapsed: {report.wall_seconds:.2f}s on {report.jobs} worker(s) "
+        f"({data['repository_seconds']:.2f}s of repository runs)"
+    )
+    for result in report.failed:
+        print(f"Error: {result.repo_path} failed: {result.error}", file=sys.stderr)
+
+
+def default_workers() -> int:
+    """Number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def write_report(report: BatchReport, stats_path: Path) -> None:
+    """Write the aggregate report as JSON, warning if it cannot be written."""
+    try:
+        stats_path.write_text(
+            json.dumps(report.to_dict(), indent=2) + "\n", encoding="utf-8"
+        )
+    except OSError as e:
+        print(
+            f"Warning: Could not write statistics to {stats_path}: {e}", file=sys.stderr
+        )
+
+
+def _init_worker() -> None:
+    """Load the tokenizer once per worker, before the first repository."""
+    estimate_tokens("warm up")
+
+
+def _print_progress(result: BatchRepositoryResult, done: int, total: int) -> None:
+    """Print one line for a finished repository."""
+    prefix = f"[{done}/{total}] {result.repo_path}"
+    if result.stats is None:
+        print(f"{prefix}: failed: {result.error}", flush=True)
+        return
+    print(
+        f"{prefix}: {result.stats['files']} files, {result.stats['tokens']:,} tokens, "
+        f"{result.stats['parts']} part(s) in {result.seconds:.2f}s",
+        flush=True,
+    )
+
+
+def _create_job(options: dict[str, Any], output_root: Path | None) -> BatchJob:
+    """Validate the options of one repository and create its job."""
+    try:
+        parsed = read_options(options, MANIFEST_OPTIONS)
+        output_path = path_option(options, "output_path")
+    except OptionError as e:
+        raise ManifestError(str(e)) from e
+
+    repo_path = parsed.repo_path.absolute()
+    if output_path is None:
+        output_path = (
+            output_root / repo_path.name
+            if output_root
+            else repo_path / DEFAULT_OUTPUT_NAME
+        )
+    return BatchJob(
+        repo_path=repo_path,
+        output_path=output_path.absolute(),
+        rules_file=parsed.rules_file,
+        max_tokens=parsed.max_tokens,
+        only_extensions=parsed.only_extensions,
+        profile=parsed.profile,
+        skeleton_min_tokens=parsed.skeleton_min_tokens,
+        optimize_stages=parsed.optimize_stages,
+        token_budget=parsed.token_budget,
+        enable_summary=parsed.enable_summary,
+    )
@@ -0,0 +1,105 @@
+"""Choose files to replace by their summaries so output fits a token budget."""
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+# === CONSTANTS ===
+
+# Relative value of a file's full content by kind; code is the baseline
+README_WEIGHT = 2.0
+DOCUMENTATION_WEIGHT = 0.8
+TEST_WEIGHT = 0.5
+DATA_WEIGHT = 0.3
+DEFAULT_WEIGHT = 1.0
+
+DOCUMENTATION_LANGUAGES = frozenset({"markdown", "rst", "text"})
+DATA_LANGUAGES = frozenset({"json", "yaml", "toml", "xml", "ini", "sql"})
+TEST_DIRECTORIES = frozenset({"test", "tests", "__tests__", "spec", "specs"})
+TEST_NAME_MARKERS = ("test_", "_test.", ".test.", ".spec.", "_spec.")
+
+
+@dataclass(frozen=True)
+class BudgetItem:
+    """Token cost of a file written in full and as a summary only."""
+
+    full_tokens: int
+    summary_tokens: int
+    weight: float = DEFAULT_WEIGHT
+
+    @property
+    def savings(self) -> int:
+        """Tokens saved by writing the summary instead of the content."""
+        return self.full_tokens - self.summary_tokens
+
+    @property
+    def lost_value(self) -> float:
+        """
+        Value lost by writing the summary instead of the content.
+
+        A file's value grows with the square root of its size, since long
+        files repeat themselves, and a summary keeps the value of its own
+        length.
+        """
+        return self.weight * (
+            math.sqrt(self.full_tokens) - math.sqrt(self.summary_tokens)
+        )
+
+
+def file_weight(relative_path: Path, language: str) -> float:
+    """Relative value of a file's full content, judged from its path and type."""
+    name = relative_path.name.lower()
+    if name.startswith("readme"):
+        return README_WEIGHT
+    if TEST_DIRECTORIES.intersection(
+        part.lower() for part in relative_path.parts[:-1]
+    ) or any(marker in name for marker in TEST_NAME_MARKERS):
+        return TEST_WEIGHT
+    if language in DATA_LANGUAGES:
+        return DATA_WEIGHT
+    if language in DOCUMENTATION_LANGUAGES:
+        return DOCUMENTATION_WEIGHT
+    return DEFAULT_WEIGHT
+
+
+def choose_substitutions(items: Sequence[BudgetItem], budget: int) -> set[int]:
+    """
+    Choose which files to write as summaries so the total fits the budget.
+
+    Files are taken greedily by value lost per token saved, which favours
+    large, low-value files, until the savings cover the excess. Chosen
+    files whose savings turn out not to be needed are then restored,
+    costliest first.
+
+    Args:
+        items: Costs and weights of every file, in output order
+        budget: Maximum total tokens
+
+    Returns:
+        Indices of the files to write as summaries; all files that save
+        tokens if even that does not fit the budget
+    """
+    excess = sum(item.full_tokens for item in items) - budget
+    if excess <= 0:
+        return set()
+
+    candidates = sorted(
+        (index for index, item in enumerate(items) if item.savings > 0),
+        key=lambda index: items[index].lost_value / items[index].savings,
+    )
+
+    chosen: list[int] = []
+    saved = 0
+    for index in candidates:
+        if saved >= excess:
+            break
+        chosen.append(index)
+        saved += items[index].savings
+
+    for index in reversed(chosen[:-1]):
+        if saved - items[index].savings >= excess:
+            chosen.remove(index)
+            saved -= items[index].savings
+
+    return set(chosen)
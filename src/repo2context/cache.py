@@ -0,0 +1,230 @@
+"""Persistent content-addressed cache for repo2context."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# === CONSTANTS ===
+
+CACHE_DIR_NAME = "repo2context"
+CACHE_DB_FILENAME = "cache.sqlite3"
+CACHE_CONNECT_TIMEOUT = 30.0  # Seconds to wait for a locked database
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+def default_cache_dir() -> Path:
+    """
+    Get the default cache directory.
+
+    Honours ``XDG_CACHE_HOME`` and falls back to ``~/.cache/repo2context``.
+
+    Returns:
+        Path to the default cache directory
+    """
+    base = os.getenv("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / CACHE_DIR_NAME
+
+
+@dataclass
+class CacheStats:
+    """Mutable counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+class ContentCache:
+    """
+    Key/value store for values derived from file content.
+
+    Keys are expected to be content hashes, so entries never need
+    invalidation: changed content simply produces a new key. Values are
+    JSON-serialisable and kept in a single SQLite database shared by all
+    namespaces, which makes the cache safe to use from several threads
+    and processes at once.
+
+    When ``max_bytes`` is set, ``prune`` evicts the least recently used
+    entries of the namespace until its stored values fit the budget.
+    """
+
+    def __init__(self, cache_dir: Path, namespace: str, max_bytes: int | None = None):
+        """Initialize cache, creating the database if needed."""
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            cache_dir / CACHE_DB_FILENAME,
+            timeout=CACHE_CONNECT_TIMEOUT,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            self.stats.hits += 1
+            if self.max_bytes is not None:
+                # Recency only matters when entries can be evicted
+                self._conn.execute(
+                    "UPDATE entries SET last_used = ? WHERE namespace = ? AND key = ?",
+                    (time.time(), self.namespace, key),
+                )
+            return json.loads(row[0])
+
+    def get_prefix(self, prefix: str) -> dict[str, Any]:
+        """
+        Return all entries whose key starts with prefix, in one query.
+
+        The returned keys have the prefix removed.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM entries "
+                "WHERE namespace = ? AND key >= ? AND key < ?",
+                # Keys sorting between prefix and prefix + U+FFFF share it
+                (self.namespace, prefix, prefix + "\uffff"),
+            ).fetchall()
+            self.stats.hits += len(rows)
+
+        # One parse of all values is several times faster than one per row
+        values = json.loads(f"[{','.join(value for _, value in rows)}]")
+        start = len(prefix)
+        return {
+            key[start:]: value for (key, _), value in zip(rows, values, strict=False)
+        }
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serialisable value under key."""
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, len(payload), time.time()),
+            )
+            self.stats.writes += 1
+
+    def set_many(self, items: Iterable[tuple[str, Any]]) -> None:
+        """Store many key/value pairs in a single transaction."""
+        now = time.time()
+        rows = [
+            (self.namespace, key, payload, len(payload), now)
+            for key, payload in ((key, json.dumps(value)) for key, value in items)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(namespace, key, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self.stats.writes += len(rows)
+
+    def prune(self) -> int:
+        """Evict least recently used entries beyond max_bytes; return count."""
+        if self.max_bytes is None:
+            return 0
+
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+            if total <= self.max_bytes:
+                return 0
+
+            evicted: list[tuple[str, str]] = []
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries WHERE namespace = ? "
+                "ORDER BY last_used ASC",
+                (self.namespace,),
+            ).fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((self.namespace, key))
+                total -= size
+
+            self._conn.executemany(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", evicted
+            )
+            self.stats.evictions += len(evicted)
+            return len(evicted)
+
+    def close(self) -> None:
+        """Prune to the size budget and close the database connection."""
+        self.prune()
+        with self._lock:
+            self._conn.close()
+
+
+class ContentCacheSet:
+    """
+    Caches of one cache directory, each namespace opened on first use.
+
+    Long-lived processes keep a set per repository so repeated runs reuse
+    its database connections, and close it when the repository is dropped.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """Initialize with no caches open."""
+        self.cache_dir = cache_dir
+        self._caches: dict[tuple[str, int | None], ContentCache] = {}
+        self._lock = threading.Lock()
+
+    def open(self, namespace: str, max_bytes: int | None = None) -> ContentCache:
+        """Return the cache of a namespace, opening it if needed."""
+        key = (namespace, max_bytes)
+        with self._lock:
+            cache = self._caches.get(key)
+            if cache is None:
+                cache = self._caches[key] = ContentCache(
+                    self.cache_dir, namespace, max_bytes
+                )
+            return cache
+
+    def close(self) -> None:
+        """Close every cache opened so far."""
+        with self._lock:
+            caches, self._caches = list(self._caches.values()), {}
+        for cache in caches:
+            cache.close()
@@ -0,0 +1,120 @@
+"""Files changed since a git revision, listed with git plumbing."""
+
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+from .focus import ImportGraph, ModuleIndex
+
+# === CONSTANTS ===
+
+# Added, copied, modified, renamed and type-changed files; deleted files
+# have nothing to show
+CHANGED_FILTER = "ACMRT"
+GIT_TIMEOUT = 60.0  # Seconds
+
+
+class GitError(RuntimeError):
+    """Raised when git cannot list the changes of a repository."""
+
+
+def changed_files(repo_root: Path, ref: str) -> list[str]:
+    """
+    List the files that differ from a revision, untracked files included.
+
+    Compares the working tree with ref, so both committed and uncommitted
+    changes count. The index is not refreshed, which keeps the repository
+    untouched, so files whose modification time changed without their
+    content may be listed too.
+
+    Args:
+        repo_root: Repository directory, or a directory inside one to limit
+            the changes to
+        ref: Any revision git understands, e.g. a branch, tag or commit
+
+    Returns:
+        Paths relative to repo_root with forward slashes, sorted
+    """
+    _git(
+        repo_root,
+        "rev-parse",
+        "--verify",
+        "--quiet",
+        f"{ref}^{{commit}}",
+        error=f"Unknown revision '{ref}'",
+    )
+    tracked = _git(
+        repo_root,
+        "diff-index",
+        "--name-only",
+        "-z",
+        "--relative",
+        f"--diff-filter={CHANGED_FILTER}",
+        ref,
+        "--",
+    )
+    untracked = _git(repo_root, "ls-files", "--others", "--exclude-standard", "-z")
+    paths = {path for path in (tracked + untracked).split("\0") if path}
+    return sorted(paths)
+
+
+def _git(repo_root: Path, *args: str, error: str | None = None) -> str:
+    """
+    Run a git command in repo_root and return its output.
+
+    Failures raise GitError with what git printed, or error if it printed
+    nothing.
+    """
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(repo_root), *args],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="surrogateescape",
+            timeout=GIT_TIMEOUT,
+            check=False,
+        )
+    except FileNotFoundError as e:
+        raise GitError("git is not installed") from e
+    except subprocess.TimeoutExpired as e:
+        raise GitError(f"git {args[0]} timed out after {GIT_TIMEOUT:.0f}s") from e
+
+    if completed.returncode != 0:
+        raise GitError(completed.stderr.strip() or error or f"git {args[0]} failed")
+    return completed.stdout
+
+
+def import_neighbours(
+    graph: ImportGraph, python_files: Iterable[str], changed: Iterable[str]
+) -> list[str]:
+    """
+    Return the Python files importing, or imported by, changed files.
+
+    Finding the importers reads every Python file, reusing imports parsed
+    before for content seen before.
+
+    Args:
+        graph: Import graph reading files of the repository
+        python_files: Every Python file of the repository, relative
+        changed: Changed files, relative; files other than Python are
+            left out
+
+    Returns:
+        Neighbours that did not change, in the order of python_files
+    """
+    files = list(python_files)
+    index = ModuleIndex(files)
+    changed_set = set(changed)
+    neighbours = set()
+    for path in files:
+        targets = {
+            target
+            for record in graph.imports(path)
+            for target in index.resolve(path, record)
+        }
+        if path in changed_set:
+            neighbours.update(targets)
+        elif not targets.isdisjoint(changed_set):
+            neighbours.add(path)
+    return [path for path in files if path in neighbours and path not in changed_set]
@@ -0,0 +1,173 @@
+"""Split large source files into chunks at syntactic boundaries."""
+
+import ast
+
+from .utils import CHARS_PER_TOKEN, content_hash, estimate_tokens
+
+# === CONSTANTS ===
+
+# Once a chunk holds half its budget, roughly one unit in this many starts a new one
+CHUNK_BOUNDARY_MODULUS = 4
+# Lines starting with these characters continue the previous block
+CONTINUATION_PREFIXES = ("}", ")", "]")
+
+
+def split_source(content: str, language: str, max_tokens: int) -> list[str]:
+    """
+    Split source code into chunks of about max_tokens at syntactic boundaries.
+
+    Python files are split between statements, descending into classes and
+    functions that are too large on their own. Other files are split before
+    top-level lines that follow a blank line. Anything still too large is
+    split by lines. Joining the chunks gives back the original content.
+
+    Chunk boundaries are content-defined: once a chunk holds half its budget,
+    a new one starts at any unit whose first line hashes to a cut point. An
+    edit therefore moves boundaries only up to the next such cut, and other
+    chunks keep their content, which keeps per-chunk caches effective.
+
+    Args:
+        content: Source code to split
+        language: Language name as returned by guess_language
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of non-empty chunks in file order
+    """
+    lines = content.splitlines(keepends=True)
+
+    units = None
+    if language == "python":
+        units = _python_units(content, lines, max_tokens)
+    if units is None:
+        units = _text_units(lines, max_tokens)
+
+    return _pack(units, max_tokens)
+
+
+def _python_units(content: str, lines: list[str], max_tokens: int) -> list[str] | None:
+    """Split Python source between statements; None on syntax errors."""
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return None
+
+    return _statement_units(lines, tree.body, 0, len(lines), max_tokens)
+
+
+def _statement_units(
+    lines: list[str], body: list[ast.stmt], start: int, end: int, max_tokens: int
+) -> list[str]:
+    """Split lines[start:end] before each statement in body."""
+    # Map first line to statement, keeping the first of several on one line
+    statements = {_first_line(node): node for node in reversed(body)}
+    boundaries = [start] + sorted(line for line in statements if line > start) + [end]
+
+    units: list[str] = []
+    for unit_start, unit_end in zip(boundaries, boundaries[1:], strict=False):
+        text = "".join(lines[unit_start:unit_end])
+        if estimate_tokens(text) <= max_tokens:
+            units.append(text)
+            continue
+
+        node = statements.get(unit_start)
+        nested = getattr(node, "body", None)
+        if nested and isinstance(nested, list):
+            units.extend(
+                _statement_units(lines, nested, unit_start, unit_end, max_tokens)
+            )
+        else:
+            units.extend(_line_units(lines[unit_start:unit_end], max_tokens))
+
+    return units
+
+
+def _first_line(node: ast.stmt) -> int:
+    """Zero-based first line of a statement, including decorators."""
+    decorators: list[ast.expr] = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [decorator.lineno for decorator in decorators]) - 1
+
+
+def _text_units(lines: list[str], max_tokens: int) -> list[str]:
+    """Split text before top-level lines that follow a blank line."""
+    blocks: list[list[str]] = []
+    for index, line in enumerate(lines):
+        starts_block = (
+            index > 0
+            and not lines[index - 1].strip()
+            and line.strip()
+            and not line[0].isspace()
+            and not line.startswith(CONTINUATION_PREFIXES)
+        )
+        if starts_block or not blocks:
+            blocks.append([])
+        blocks[-1].append(line)
+
+    units: list[str] = []
+    for block in blocks:
+        text = "".join(block)
+        if estimate_tokens(text) <= max_tokens:
+            units.append(text)
+        else:
+            units.extend(_line_units(block, max_tokens))
+    return units
+
+
+def _line_units(lines: list[str], max_tokens: int) -> list[str]:
+    """Split lines greedily, cutting single overlong lines by characters."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    units: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for line in lines:
+        pieces = [line[i : i + max_chars] for i in range(0, len(line), max_chars)]
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                units.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+
+    if current:
+        units.append("".join(current))
+    return units
+
+
+def _pack(units: list[str], max_tokens: int) -> list[str]:
+    """Pack consecutive units into chunks with content-defined boundaries."""
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        if current and (
+            current_tokens + unit_tokens > max_tokens
+            or (current_tokens >= max_tokens // 2 and _is_cut_point(unit))
+        ):
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+
+        current.append(unit)
+        current_tokens += unit_tokens
+
+    if current:
+        chunks.append("".join(current))
+    return [chunk for chunk in chunks if chunk]
+
+
+def _is_cut_point(unit: str) -> bool:
+    """
+    Decide whether a chunk may start at this unit.
+
+    Only the unit's leading line, such as a signature after any decorators,
+    is hashed, so editing a body never moves the cut points around it.
+    """
+    leading = ""
+    for line in unit.splitlines():
+        leading = line.strip()
+        if leading and not leading.startswith("@"):
+            break
+    return int(content_hash(leading)[:8], 16) % CHUNK_BOUNDARY_MODULUS == 0
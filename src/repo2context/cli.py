@@ -3,36 +3,41 @@
 import argparse
 import sys
 from pathlib import Path
-from typing import TypedDict
 
 from . import __version__
-from .core import generate_context
+from .cache import default_cache_dir
+from .core import (
+    DEFAULT_MAX_REPOSITORIES,
+    DEFAULT_OPENAI_MODEL,
+    DEFAULT_SUMMARY_BATCH_TOKENS,
+    MAX_TOKENS,
+    MIN_TOKENS,
+    PROFILES,
+    SUMMARY_BACKEND_OPENAI,
+    SUMMARY_BACKENDS,
+    SummaryConfig,
+    estimate_context,
+    generate_context,
+)
+from .defaults import (
+    DEFAULT_BACKEND_TIMEOUT,
+    DEFAULT_PROFILE_TOP,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_SUMMARY_CONCURRENCY,
+    DEFAULT_TOKENS_PER_MINUTE,
+    DEFAULT_WATCH_DEBOUNCE_MS,
+)
+from .optimize import OPTIMIZATION_STAGES
+from .pipeline import DEFAULT_QUEUE_SIZE
 
 # === CONSTANTS ===
 
 # Validation limits
-MIN_TOKENS = 1000
-MAX_TOKENS = 1000000
+MAX_PORT = 65535
 
-
-class ProfileConfig(TypedDict):
-    """Type definition for profile configuration."""
-
-    extensions: list[str]
-    max_readme_kb: int
-    description: str
-
-
-# Profile configurations
-PROFILE_MINIMAL: ProfileConfig = {
-    "extensions": ["py", "md", "toml", "yaml", "yml", "json", "ini", "cfg", "conf"],
-    "max_readme_kb": 8,
-    "description": "Only Python, small Markdown (≤8KB), and config files",
-}
-
-PROFILES: dict[str, ProfileConfig] = {
-    "minimal": PROFILE_MINIMAL,
-}
+# Summary cache
+DEFAULT_SUMMARY_CACHE_MB = 64
+BYTES_PER_MB = 1024 * 1024
 
 # Error messages
 ERROR_DEPENDENCY_MISSING = "Error: --summary requires OpenAI dependency. Install with: pip install 'repo2context[summary]'"
@@ -42,10 +47,30 @@ ERROR_RULES_NOT_EXISTS = "Error: Rules file '{}' does not exist"
 ERROR_TOKEN_RANGE = f"Error: --max-tokens must be between {MIN_TOKENS} and {MAX_TOKENS}"
 ERROR_UNKNOWN_PROFILE = "Error: Unknown profile '{}'. Available profiles: {}"
 ERROR_PROFILE_CONFLICTS = "Error: --profile cannot be used with --only"
+ERROR_SKELETON_MIN_TOKENS = "Error: --skeleton-min-tokens must not be negative"
+ERROR_BATCH_TOKENS = "Error: --summary-batch-tokens must not be negative"
+ERROR_NOT_POSITIVE = "Error: {} must be a positive integer"
+ERROR_TIMEOUT = "Error: --summary-timeout must be positive"
+ERROR_PORT_RANGE = f"Error: --port must be between 0 and {MAX_PORT}"
+ERROR_WATCH_CONFLICT = "Error: --watch cannot be used with {}"
+ERROR_WATCH_DEBOUNCE = "Error: --watch-debounce must not be negative"
+ERROR_BATCH_EMPTY = "Error: batch needs repository paths or --manifest"
+ERROR_SHARD_CONFLICT = "Error: --shard cannot be used with {}"
+ERROR_FOCUS_CONFLICT = "Error: --focus cannot be used with {}"
+ERROR_FOCUS_NOT_PYTHON = "Error: Focus path '{}' is not a Python file"
+ERROR_SYMBOL_CONFLICT = "Error: --symbol cannot be used with {}"
+ERROR_SINCE_CONFLICT = "Error: --since cannot be used with {}"
+ERROR_SINCE_IMPORTS = "Error: --since-imports requires --since"
+ERROR_SHARD_CONFIG_NOT_EXISTS = "Error: Shard configuration '{}' does not exist"
+ERROR_UNKNOWN_OPTIMIZATION = (
+    "Error: Unknown --optimize stage '{}'. Available stages: {}"
+)
 
 # Program metadata
 PROG_NAME = "repo2context"
 DESCRIPTION = "One-command repo → Markdown context generator for LLM workflows"
+SERVE_COMMAND = "serve"
+BATCH_COMMAND = "batch"
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -76,6 +101,42 @@ Examples:
 
   # Generate AI-powered file summaries (requires OpenAI API key)
   repo2context --summary
+
+  # Summaries from docstrings and comments, without network access
+  repo2context --summary --summary-backend extractive
+
+  # Summarise with a self-hosted llama.cpp or vLLM server
+  repo2context --summary --summary-backend local --summary-base-url http://127.0.0.1:8080/v1
+
+  # Estimate tokens and parts in well under a second, without reading files
+  repo2context --dry-run
+
+  # Fit everything into one 100k-token part, summarising the least valuable files
+  repo2context --max-tokens 100000 --token-budget 100000
+
+  # Only the Python files reachable by imports from one module, nearest first
+  repo2context --focus src/app/server.py --token-budget 50000
+
+  # The file defining a class and the files using it
+  repo2context --symbol ContextWriterServiceImpl --token-budget 50000
+
+  # Files changed on this branch, with the Python modules around them
+  repo2context --since origin/main --since-imports
+
+  # Reduce Python files over 2000 tokens to signatures and docstrings
+  repo2context --skeleton --skeleton-min-tokens 2000
+
+  # Keep the output up to date while you edit, until Ctrl+C
+  repo2context --watch
+
+  # One set of parts per package of a monorepo, in a single pass
+  repo2context --shard --output ./contexts
+
+  # Serve editors from warm in-memory state (see: repo2context serve --help)
+  repo2context serve
+
+  # Many repositories on one worker pool (see: repo2context batch --help)
+  repo2context batch --manifest repos.json --stats-json batch-stats.json
         """,
     )
 
@@ -106,6 +167,13 @@ Examples:
         help="Maximum tokens per output file (default: 85000)",
     )
 
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        help="Replace the least valuable files by their summaries until the "
+        "whole output fits this many tokens",
+    )
+
     parser.add_argument(
         "--only",
         help="Only include files with these extensions (comma-separated, e.g., 'py,js,ts')",
@@ -117,11 +185,227 @@ Examples:
         help="Generate AI-powered file summaries (requires OpenAI API key)",
     )
 
+    parser.add_argument(
+        "--summary-backend",
+        choices=SUMMARY_BACKENDS,
+        default=SUMMARY_BACKEND_OPENAI,
+        help="Summary backend: OpenAI, a local OpenAI-compatible server, or offline "
+        "extraction from docstrings and comments (default: openai)",
+    )
+
+    parser.add_argument(
+        "--summary-base-url",
+        help="Endpoint URL for summaries (default for local: http://127.0.0.1:8080/v1)",
+    )
+
+    parser.add_argument(
+        "--summary-model",
+        default=DEFAULT_OPENAI_MODEL,
+        help=f"Model used for summaries (default: {DEFAULT_OPENAI_MODEL})",
+    )
+
+    parser.add_argument(
+        "--summary-timeout",
+        type=float,
+        default=DEFAULT_BACKEND_TIMEOUT,
+        help=f"Seconds to wait for each summary response (default: {DEFAULT_BACKEND_TIMEOUT:g})",
+    )
+
+    parser.add_argument(
+        "--summary-concurrency",
+        type=int,
+        default=DEFAULT_SUMMARY_CONCURRENCY,
+        help=f"Maximum concurrent summary requests (default: {DEFAULT_SUMMARY_CONCURRENCY})",
+    )
+
+    parser.add_argument(
+        "--summary-rpm",
+        type=int,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help=f"Summary requests per minute limit (default: {DEFAULT_REQUESTS_PER_MINUTE})",
+    )
+
+    parser.add_argument(
+        "--summary-tpm",
+        type=int,
+        default=DEFAULT_TOKENS_PER_MINUTE,
+        help=f"Summary tokens per minute limit (default: {DEFAULT_TOKENS_PER_MINUTE})",
+    )
+
+    parser.add_argument(
+        "--summary-batch-tokens",
+        type=int,
+        default=DEFAULT_SUMMARY_BATCH_TOKENS,
+        help="Token budget for packing small files into one summary request "
+        f"(default: {DEFAULT_SUMMARY_BATCH_TOKENS}, 0 disables batching)",
+    )
+
+    parser.add_argument(
+        "--summary-cache-mb",
+        type=int,
+        default=DEFAULT_SUMMARY_CACHE_MB,
+        help=f"Size limit of the persistent summary cache in MB (default: {DEFAULT_SUMMARY_CACHE_MB})",
+    )
+
     parser.add_argument(
         "--profile",
         help="Use predefined profile (minimal: py,md≤8KB,configs)",
     )
 
+    parser.add_argument(
+        "--skeleton",
+        action="store_true",
+        help="Render Python files as signatures and docstrings only",
+    )
+
+    parser.add_argument(
+        "--skeleton-min-tokens",
+        type=int,
+        default=0,
+        help="Only use skeletons for Python files above this token count (default: 0)",
+    )
+
+    parser.add_argument(
+        "--optimize",
+        help="Extra optimisation stages for all text files (comma-separated: "
+        "trailing-whitespace,blank-lines,horizontal-rules)",
+    )
+
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Capacity of the queues between pipeline stages (default: {DEFAULT_QUEUE_SIZE})",
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate tokens and parts from file sizes and cached token counts, "
+        "without reading or writing files",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep the output up to date as files change, re-rendering only "
+        "changed files and parts (inotify on Linux, polling elsewhere)",
+    )
+
+    parser.add_argument(
+        "--watch-debounce",
+        type=int,
+        default=DEFAULT_WATCH_DEBOUNCE_MS,
+        metavar="MS",
+        help="Quiet time that ends a burst of saves before updating "
+        f"(default: {DEFAULT_WATCH_DEBOUNCE_MS})",
+    )
+
+    parser.add_argument(
+        "--watch-polling",
+        action="store_true",
+        help="Poll for changes even where inotify is available "
+        "(e.g. on network file systems)",
+    )
+
+    parser.add_argument(
+        "--focus",
+        type=Path,
+        metavar="PATH",
+        help="Only include the Python files this module imports, directly or not, "
+        "nearest first (relative to the repository)",
+    )
+
+    parser.add_argument(
+        "--symbol",
+        metavar="NAME",
+        help="Only include the files defining this class, function or variable "
+        "(plainly named or as Class.method), then the files using it",
+    )
+
+    parser.add_argument(
+        "--since",
+        metavar="REF",
+        help="Only include files changed since this git revision, committed or not, "
+        "without walking the repository",
+    )
+
+    parser.add_argument(
+        "--since-imports",
+        action="store_true",
+        help="With --since, also include the Python files importing or imported by "
+        "the changed files",
+    )
+
+    parser.add_argument(
+        "--shard",
+        action="store_true",
+        help="Write one set of parts per package (directories with a pyproject.toml, "
+        "package.json, go.mod or Cargo.toml) to subdirectories of the output",
+    )
+
+    parser.add_argument(
+        "--shard-config",
+        type=Path,
+        metavar="PATH",
+        help="JSON list of package roots to shard by instead of detecting them "
+        "(implies --shard)",
+    )
+
+    parser.add_argument(
+        "--stats-json",
+        type=Path,
+        help="Write stage timings, item counts and skipped files as JSON to this path",
+    )
+
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        help="Write per-file stage spans as Chrome trace-event JSON to this path "
+        "(open in Perfetto or chrome://tracing)",
+    )
+
+    parser.add_argument(
+        "--profile-run",
+        type=Path,
+        metavar="PATH",
+        help="Profile the run and write the profile to this path "
+        "(.prof, or folded stacks with --profile-sampling)",
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_PROFILE_TOP,
+        help=f"Number of functions to print when profiling (default: {DEFAULT_PROFILE_TOP})",
+    )
+
+    parser.add_argument(
+        "--profile-sampling",
+        action="store_true",
+        help="Profile by sampling stacks, with low enough overhead for CI",
+    )
+
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Trace allocations and report peak memory by stage, top allocation "
+        "sites and the largest files held (slows the run)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for persistent caches (default: ~/.cache/repo2context)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable persistent caches",
+    )
+
     parser.add_argument(
         "--version",
         action="version",
@@ -131,6 +415,337 @@ Examples:
     return parser
 
 
+def create_serve_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the serve command."""
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG_NAME} {SERVE_COMMAND}",
+        description="Serve context requests as JSON over HTTP, keeping modules, "
+        "ignore rules, directory listings and processed files warm per repository",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Serve on a Unix socket in the cache directory
+  repo2context serve
+
+  # Request context for a repository
+  curl --unix-socket ~/.cache/repo2context/serve.sock http://localhost/context \\
+       -d '{"repo_path": "/path/to/repo", "only_extensions": ["py"]}'
+
+  # Serve on a localhost port instead
+  repo2context serve --port 8765
+        """,
+    )
+
+    listen = parser.add_mutually_exclusive_group()
+    listen.add_argument(
+        "--socket",
+        type=Path,
+        help="Unix socket path (default: ~/.cache/repo2context/serve.sock)",
+    )
+    listen.add_argument(
+        "--port",
+        type=int,
+        help="Serve HTTP on this localhost port instead of a Unix socket",
+    )
+
+    parser.add_argument(
+        "--max-repositories",
+        type=int,
+        default=DEFAULT_MAX_REPOSITORIES,
+        help="Repositories kept warm; the least recently used is dropped "
+        f"(default: {DEFAULT_MAX_REPOSITORIES})",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for persistent caches (default: ~/.cache/repo2context)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable persistent caches",
+    )
+
+    return parser
+
+
+def create_batch_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the batch command."""
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG_NAME} {BATCH_COMMAND}",
+        description="Generate context for many repositories concurrently on one "
+        "pool of worker processes, with an aggregate report",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Several repositories, output in each one's .repo2context directory
+  repo2context batch ~/src/api ~/src/web ~/src/worker
+
+  # Repositories and per-repository options from a manifest
+  repo2context batch --manifest repos.json --output-root ./contexts
+
+Manifest format (options override the command line for that repository):
+  {"repositories": [
+      "services/api",
+      {"repo_path": "services/web", "max_tokens": 50000,
+       "only_extensions": ["ts", "tsx"], "output_path": "/tmp/web-context"}
+  ]}
+        """,
+    )
+
+    parser.add_argument(
+        "repo_paths",
+        nargs="*",
+        metavar="REPO_PATH",
+        help="Repositories to process, in addition to those in the manifest",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="JSON list of repositories, each a path or an object of options "
+        "(repo_path, output_path, rules_file, max_tokens, only_extensions, "
+        "profile, skeleton_min_tokens, optimize_stages, token_budget, "
+        "enable_summary)",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Worker processes (default: number of CPUs)",
+    )
+
+    parser.add_argument(
+        "--output-root",
+        type=Path,
+        help="Write each repository's parts to a directory named after it here "
+        "(default: .repo2context inside each repository)",
+    )
+
+    parser.add_argument(
+        "--stats-json",
+        type=Path,
+        help="Write totals, summed stage timings and per-repository results "
+        "as JSON to this path",
+    )
+
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        help="Ignore rules file for every repository "
+        "(defaults to each repository's .repo2contextignore)",
+    )
+
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=85000,
+        help="Maximum tokens per output file (default: 85000)",
+    )
+
+    parser.add_argument(
+        "--only",
+        help="Only include files with these extensions (comma-separated)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        help="Use predefined profile (minimal: py,md≤8KB,configs)",
+    )
+
+    parser.add_argument(
+        "--skeleton",
+        action="store_true",
+        help="Render Python files as signatures and docstrings only",
+    )
+
+    parser.add_argument(
+        "--skeleton-min-tokens",
+        type=int,
+        default=0,
+        help="Only use skeletons for Python files above this token count (default: 0)",
+    )
+
+    parser.add_argument(
+        "--optimize",
+        help="Extra optimisation stages for all text files (comma-separated)",
+    )
+
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        help="Replace the least valuable files by their summaries until each "
+        "repository's output fits this many tokens",
+    )
+
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Generate file summaries; rate limits are shared out between workers",
+    )
+
+    parser.add_argument(
+        "--summary-backend",
+        choices=SUMMARY_BACKENDS,
+        default=SUMMARY_BACKEND_OPENAI,
+        help="Summary backend (default: openai)",
+    )
+
+    parser.add_argument(
+        "--summary-base-url",
+        help="Endpoint URL for summaries (default for local: http://127.0.0.1:8080/v1)",
+    )
+
+    parser.add_argument(
+        "--summary-model",
+        default=DEFAULT_OPENAI_MODEL,
+        help=f"Model used for summaries (default: {DEFAULT_OPENAI_MODEL})",
+    )
+
+    parser.add_argument(
+        "--summary-rpm",
+        type=int,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help="Summary requests per minute limit, for all workers together "
+        f"(default: {DEFAULT_REQUESTS_PER_MINUTE})",
+    )
+
+    parser.add_argument(
+        "--summary-tpm",
+        type=int,
+        default=DEFAULT_TOKENS_PER_MINUTE,
+        help="Summary tokens per minute limit, for all workers together "
+        f"(default: {DEFAULT_TOKENS_PER_MINUTE})",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for persistent caches (default: ~/.cache/repo2context)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable persistent caches",
+    )
+
+    return parser
+
+
+def batch_main(argv: list[str]) -> None:
+    """Entry point of the batch command."""
+    args = create_batch_parser().parse_args(argv)
+
+    if not args.repo_paths and not args.manifest:
+        print(ERROR_BATCH_EMPTY, file=sys.stderr)
+        sys.exit(2)
+    for option, value in [
+        ("--jobs", args.jobs),
+        ("--token-budget", args.token_budget),
+        ("--summary-rpm", args.summary_rpm),
+        ("--summary-tpm", args.summary_tpm),
+    ]:
+        if value is not None and value < 1:
+            print(ERROR_NOT_POSITIVE.format(option), file=sys.stderr)
+            sys.exit(2)
+    if args.skeleton_min_tokens < 0:
+        print(ERROR_SKELETON_MIN_TOKENS, file=sys.stderr)
+        sys.exit(2)
+    if args.rules and not args.rules.exists():
+        print(ERROR_RULES_NOT_EXISTS.format(args.rules), file=sys.stderr)
+        sys.exit(2)
+    if (
+        args.summary
+        and args.summary_backend == SUMMARY_BACKEND_OPENAI
+        and not _openai_available()
+    ):
+        print(ERROR_DEPENDENCY_MISSING, file=sys.stderr)
+        sys.exit(2)
+
+    # Imported here so plain runs do not pay for the process pool modules
+    from .batch import (
+        ManifestError,
+        create_jobs,
+        default_workers,
+        print_report,
+        read_manifest,
+        run_batch,
+        write_report,
+    )
+
+    defaults = {
+        "rules_file": args.rules,
+        "max_tokens": args.max_tokens,
+        "only_extensions": parse_extensions(args.only),
+        "profile": args.profile,
+        "skeleton_min_tokens": args.skeleton_min_tokens if args.skeleton else None,
+        "optimize_stages": parse_optimize_stages(args.optimize),
+        "token_budget": args.token_budget,
+        "enable_summary": args.summary,
+    }
+    try:
+        entries = list(args.repo_paths)
+        if args.manifest:
+            entries.extend(read_manifest(args.manifest))
+        jobs = create_jobs(entries, defaults, args.output_root)
+    except ManifestError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        report = run_batch(
+            jobs,
+            args.jobs or default_workers(),
+            cache_dir=None if args.no_cache else args.cache_dir,
+            summary_config=SummaryConfig(
+                model=args.summary_model,
+                backend=args.summary_backend,
+                base_url=args.summary_base_url,
+                requests_per_minute=args.summary_rpm,
+                tokens_per_minute=args.summary_tpm,
+            ),
+        )
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user", file=sys.stderr)
+        sys.exit(2)
+
+    print_report(report)
+    if args.stats_json:
+        write_report(report, args.stats_json)
+    sys.exit(report.exit_code)
+
+
+def serve_main(argv: list[str]) -> None:
+    """Entry point of the serve command."""
+    args = create_serve_parser().parse_args(argv)
+
+    if args.max_repositories < 1:
+        print(ERROR_NOT_POSITIVE.format("--max-repositories"), file=sys.stderr)
+        sys.exit(2)
+    if args.port is not None and not 0 <= args.port <= MAX_PORT:
+        print(ERROR_PORT_RANGE, file=sys.stderr)
+        sys.exit(2)
+
+    # Imported here so plain runs do not pay for the HTTP server modules
+    from .server import ContextServer, serve
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    try:
+        serve(
+            ContextServer(cache_dir, args.max_repositories),
+            socket_path=args.socket,
+            port=args.port,
+        )
+    except OSError as e:
+        print(f"Error: Could not start server: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
 def validate_arguments(args: argparse.Namespace) -> None:
     """Validate command line arguments and exit on error."""
     # Validate max_tokens range
@@ -139,12 +754,13 @@ def validate_arguments(args: argparse.Namespace) -> None:
         sys.exit(2)
 
     # Validate summary flag requirements
-    if args.summary:
-        try:
-            import openai  # noqa: F401
-        except ImportError:
-            print(ERROR_DEPENDENCY_MISSING, file=sys.stderr)
-            sys.exit(2)
+    if (
+        args.summary
+        and args.summary_backend == SUMMARY_BACKEND_OPENAI
+        and not _openai_available()
+    ):
+        print(ERROR_DEPENDENCY_MISSING, file=sys.stderr)
+        sys.exit(2)
 
     # Convert and validate repo path
     repo_path_obj = Path(args.repo_path) if args.repo_path else Path.cwd()
@@ -172,10 +788,130 @@ def validate_arguments(args: argparse.Namespace) -> None:
         print(ERROR_UNKNOWN_PROFILE.format(args.profile, available), file=sys.stderr)
         sys.exit(2)
 
+    for option, value in [
+        ("--summary-concurrency", args.summary_concurrency),
+        ("--summary-rpm", args.summary_rpm),
+        ("--summary-tpm", args.summary_tpm),
+        ("--summary-cache-mb", args.summary_cache_mb),
+        ("--queue-size", args.queue_size),
+        ("--profile-top", args.profile_top),
+    ]:
+        if value < 1:
+            print(ERROR_NOT_POSITIVE.format(option), file=sys.stderr)
+            sys.exit(2)
+
+    if args.token_budget is not None and args.token_budget < 1:
+        print(ERROR_NOT_POSITIVE.format("--token-budget"), file=sys.stderr)
+        sys.exit(2)
+
+    if args.summary_timeout <= 0:
+        print(ERROR_TIMEOUT, file=sys.stderr)
+        sys.exit(2)
+
+    if args.summary_batch_tokens < 0:
+        print(ERROR_BATCH_TOKENS, file=sys.stderr)
+        sys.exit(2)
+
+    if args.skeleton_min_tokens < 0:
+        print(ERROR_SKELETON_MIN_TOKENS, file=sys.stderr)
+        sys.exit(2)
+
+    for stage in parse_optimize_stages(args.optimize) or []:
+        if stage not in OPTIMIZATION_STAGES:
+            available = ", ".join(OPTIMIZATION_STAGES)
+            print(ERROR_UNKNOWN_OPTIMIZATION.format(stage, available), file=sys.stderr)
+            sys.exit(2)
+
+    if args.watch:
+        for option, value in [
+            ("--dry-run", args.dry_run),
+            ("--stats-json", args.stats_json),
+            ("--trace", args.trace),
+            ("--profile-run", args.profile_run),
+            ("--memory-report", args.memory_report),
+        ]:
+            if value:
+                print(ERROR_WATCH_CONFLICT.format(option), file=sys.stderr)
+                sys.exit(2)
+
+    if args.watch_debounce < 0:
+        print(ERROR_WATCH_DEBOUNCE, file=sys.stderr)
+        sys.exit(2)
+
+    if args.focus:
+        if not args.focus.is_absolute():
+            args.focus = repo_path_obj / args.focus
+        if args.focus.suffix != ".py" or not args.focus.is_file():
+            print(ERROR_FOCUS_NOT_PYTHON.format(args.focus), file=sys.stderr)
+            sys.exit(2)
+        for option, value in [
+            ("--dry-run", args.dry_run),
+            ("--watch", args.watch),
+            ("--shard", args.shard or args.shard_config),
+        ]:
+            if value:
+                print(ERROR_FOCUS_CONFLICT.format(option), file=sys.stderr)
+                sys.exit(2)
+
+    if args.symbol:
+        for option, value in [
+            ("--dry-run", args.dry_run),
+            ("--watch", args.watch),
+            ("--shard", args.shard or args.shard_config),
+            ("--focus", args.focus),
+        ]:
+            if value:
+                print(ERROR_SYMBOL_CONFLICT.format(option), file=sys.stderr)
+                sys.exit(2)
+
+    if args.since_imports and not args.since:
+        print(ERROR_SINCE_IMPORTS, file=sys.stderr)
+        sys.exit(2)
+    if args.since:
+        for option, value in [
+            ("--dry-run", args.dry_run),
+            ("--watch", args.watch),
+            ("--shard", args.shard or args.shard_config),
+            ("--focus", args.focus),
+            ("--symbol", args.symbol),
+        ]:
+            if value:
+                print(ERROR_SINCE_CONFLICT.format(option), file=sys.stderr)
+                sys.exit(2)
+
+    if args.shard_config:
+        args.shard = True
+        if not args.shard_config.exists():
+            print(
+                ERROR_SHARD_CONFIG_NOT_EXISTS.format(args.shard_config),
+                file=sys.stderr,
+            )
+            sys.exit(2)
+    if args.shard:
+        for option, value in [
+            ("--dry-run", args.dry_run),
+            ("--watch", args.watch),
+            ("--token-budget", args.token_budget),
+            ("--profile-run", args.profile_run),
+            ("--memory-report", args.memory_report),
+        ]:
+            if value:
+                print(ERROR_SHARD_CONFLICT.format(option), file=sys.stderr)
+                sys.exit(2)
+
     # Store processed repo path back for later use
     args.repo_path_obj = repo_path_obj
 
 
+def _openai_available() -> bool:
+    """Check if the OpenAI package needed for --summary can be imported."""
+    try:
+        import openai  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
 def parse_extensions(extensions_str: str | None) -> list[str] | None:
     """Parse the comma-separated extensions string."""
     if not extensions_str:
@@ -183,6 +919,13 @@ def parse_extensions(extensions_str: str | None) -> list[str] | None:
     return [ext.strip() for ext in extensions_str.split(",")]
 
 
+def parse_optimize_stages(stages_str: str | None) -> list[str] | None:
+    """Parse the comma-separated optimisation stages string."""
+    if not stages_str:
+        return None
+    return [stage.strip() for stage in stages_str.split(",") if stage.strip()]
+
+
 def resolve_extensions(args: argparse.Namespace) -> list[str] | None:
     """Resolve extensions from either --only or --profile arguments."""
     if args.only:
@@ -195,6 +938,13 @@ def resolve_extensions(args: argparse.Namespace) -> list[str] | None:
 
 def main() -> None:
     """Main CLI entry point."""
+    if sys.argv[1:2] == [SERVE_COMMAND]:
+        serve_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == [BATCH_COMMAND]:
+        batch_main(sys.argv[2:])
+        return
+
     parser = create_parser()
     args = parser.parse_args()
 
@@ -204,6 +954,109 @@ def main() -> None:
     # Parse extensions
     only_extensions = resolve_extensions(args)
 
+    # Estimate only, without reading files
+    if args.dry_run:
+        try:
+            sys.exit(
+                estimate_context(
+                    repo_path=args.repo_path_obj,
+                    rules_file=args.rules,
+                    max_tokens=args.max_tokens,
+                    only_extensions=only_extensions,
+                    profile=args.profile,
+                    cache_dir=None if args.no_cache else args.cache_dir,
+                    stats_path=args.stats_json,
+                )
+            )
+        except KeyboardInterrupt:
+            print("\nOperation cancelled by user", file=sys.stderr)
+            sys.exit(2)
+
+    summary_config = SummaryConfig(
+        model=args.summary_model,
+        backend=args.summary_backend,
+        base_url=args.summary_base_url,
+        timeout=args.summary_timeout,
+        concurrency=args.summary_concurrency,
+        requests_per_minute=args.summary_rpm,
+        tokens_per_minute=args.summary_tpm,
+        cache_max_bytes=args.summary_cache_mb * BYTES_PER_MB,
+        batch_tokens=args.summary_batch_tokens,
+    )
+
+    # Generate context, then keep it up to date
+    if args.watch:
+        # Imported here so plain runs do not load inotify and the warm state
+        from .watch import watch_context
+
+        try:
+            sys.exit(
+                watch_context(
+                    repo_path=args.repo_path_obj,
+                    rules_file=args.rules,
+                    output_path=args.output,
+                    max_tokens=args.max_tokens,
+                    only_extensions=only_extensions,
+                    enable_summary=args.summary,
+                    profile=args.profile,
+                    skeleton_min_tokens=(
+                        args.skeleton_min_tokens if args.skeleton else None
+                    ),
+                    cache_dir=None if args.no_cache else args.cache_dir,
+                    optimize_stages=parse_optimize_stages(args.optimize),
+                    summary_config=summary_config,
+                    queue_size=args.queue_size,
+                    token_budget=args.token_budget,
+                    debounce_ms=args.watch_debounce,
+                    polling=args.watch_polling,
+                )
+            )
+        except OSError as e:
+            print(f"Error: Could not watch {args.repo_path_obj}: {e}", file=sys.stderr)
+            sys.exit(2)
+
+    # Generate one set of parts per package
+    if args.shard:
+        # Imported here so plain runs do not load the sharding module
+        from .shard import shard_context
+
+        try:
+            sys.exit(
+                shard_context(
+                    repo_path=args.repo_path_obj,
+                    rules_file=args.rules,
+                    output_path=args.output,
+                    max_tokens=args.max_tokens,
+                    only_extensions=only_extensions,
+                    enable_summary=args.summary,
+                    profile=args.profile,
+                    skeleton_min_tokens=(
+                        args.skeleton_min_tokens if args.skeleton else None
+                    ),
+                    cache_dir=None if args.no_cache else args.cache_dir,
+                    optimize_stages=parse_optimize_stages(args.optimize),
+                    summary_config=summary_config,
+                    queue_size=args.queue_size,
+                    shard_config=args.shard_config,
+                    stats_path=args.stats_json,
+                    trace_path=args.trace,
+                )
+            )
+        except KeyboardInterrupt:
+            print("\nOperation cancelled by user", file=sys.stderr)
+            sys.exit(2)
+
+    profile_config = None
+    if args.profile_run:
+        # Imported here so plain runs do not load the profilers
+        from .profiling import ProfilerConfig
+
+        profile_config = ProfilerConfig(
+            output_path=args.profile_run,
+            sampling=args.profile_sampling,
+            top=args.profile_top,
+        )
+
     # Generate context
     try:
         exit_code = generate_context(
@@ -214,6 +1067,20 @@ def main() -> None:
             only_extensions=only_extensions,
             enable_summary=args.summary,
             profile=args.profile,
+            skeleton_min_tokens=args.skeleton_min_tokens if args.skeleton else None,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            optimize_stages=parse_optimize_stages(args.optimize),
+            summary_config=summary_config,
+            queue_size=args.queue_size,
+            token_budget=args.token_budget,
+            stats_path=args.stats_json,
+            trace_path=args.trace,
+            profile_config=profile_config,
+            memory_report=args.memory_report,
+            focus_path=args.focus,
+            symbol=args.symbol,
+            since=args.since,
+            since_imports=args.since_imports,
         )
 
         sys.exit(exit_code)
@@ -1,22 +1,69 @@
 """Core functionality for repo2context following Clean Architecture principles."""
 
+import json
 import os
+import re
 import sys
-from collections.abc import Generator
-from dataclasses import dataclass
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Protocol, TextIO
+from typing import TYPE_CHECKING, Any, Protocol, TextIO, TypedDict
 
 import pathspec
 
+from .budget import BudgetItem, choose_substitutions, file_weight
+from .cache import ContentCache, ContentCacheSet
+from .chunking import split_source
+from .defaults import (
+    DEFAULT_BACKEND_TIMEOUT,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_SUMMARY_CONCURRENCY,
+    DEFAULT_TOKENS_PER_MINUTE,
+)
+from .estimate import (
+    ROOT_DIRECTORY,
+    TOKEN_COUNT_NAMESPACE,
+    UNKNOWN_LANGUAGE,
+    ContextEstimate,
+    EstimateGroup,
+    TokenCountCache,
+    count_parts,
+)
+from .extractive import EXTRACTIVE_CACHE_NAMESPACE, EXTRACTIVE_VERSION, extract_summary
+from .focus import DISTANCE_DECAY, IMPORTS_CACHE_NAMESPACE, ImportGraph, ModuleIndex
+from .optimize import MARKDOWN_STAGES, TextOptimizer, is_markdown
+from .pipeline import DEFAULT_QUEUE_SIZE, Pipeline
+from .skeleton import SKELETON_CACHE_NAMESPACE, SKELETON_EXTENSIONS, SkeletonRenderer
+from .statcache import StatCache
+from .stats import RunStats, StageStats, span_args
+from .tracing import Tracer
 from .utils import (
+    LANGUAGE_EXTENSIONS,
+    content_hash,
     create_output_dir,
     detect_binary,
     estimate_tokens,
     format_bytes,
     guess_language,
+    is_binary_name,
 )
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .memory import MemoryReport, MemoryTracker
+    from .profiling import ProfilerConfig
+    from .summary import (
+        AsyncSummaryEngine,
+        ChatBackend,
+        EventLoopThread,
+        SummaryRequest,
+    )
+    from .symbols import Definition, SymbolIndex
+
 # === CONSTANTS ===
 
 # Token limits and formatting
@@ -26,6 +73,33 @@ SUMMARY_TEMPERATURE = 0.3
 DEFAULT_MAX_TOKENS = 85000
 CHARS_PER_TOKEN = 4  # Heuristic for token estimation
 
+# Validation limits for max_tokens, shared by every front end
+MIN_TOKENS = 1000
+MAX_TOKENS = 1000000
+
+# Repositories the serve command keeps warm
+DEFAULT_MAX_REPOSITORIES = 8
+
+
+class ProfileConfig(TypedDict):
+    """Type definition for profile configuration."""
+
+    extensions: list[str]
+    max_readme_kb: int
+    description: str
+
+
+# Profile configurations
+PROFILE_MINIMAL: ProfileConfig = {
+    "extensions": ["py", "md", "toml", "yaml", "yml", "json", "ini", "cfg", "conf"],
+    "max_readme_kb": 8,
+    "description": "Only Python, small Markdown (≤8KB), and config files",
+}
+
+PROFILES: dict[str, ProfileConfig] = {
+    "minimal": PROFILE_MINIMAL,
+}
+
 # File patterns
 DEFAULT_IGNORE_PATTERNS = [
     ".git/",
@@ -76,8 +150,106 @@ DEFAULT_IGNORE_PATTERNS = [
 # OpenAI configuration
 DEFAULT_OPENAI_MODEL = "gpt-3.5-turbo"
 
+# Summary backends
+SUMMARY_BACKEND_OPENAI = "openai"
+SUMMARY_BACKEND_LOCAL = "local"  # Any OpenAI-compatible endpoint, e.g. llama.cpp
+SUMMARY_BACKEND_EXTRACTIVE = "extractive"  # Offline, from docstrings and comments
+SUMMARY_BACKENDS = (
+    SUMMARY_BACKEND_OPENAI,
+    SUMMARY_BACKEND_LOCAL,
+    SUMMARY_BACKEND_EXTRACTIVE,
+)
+DEFAULT_LOCAL_BASE_URL = "http://127.0.0.1:8080/v1"
+SUMMARY_SYSTEM_PROMPT = (
+    "You are a code analysis expert. "
+    "Generate concise, informative summaries of code files."
+)
+SUMMARY_PROMPT_TEMPLATE = """Analyze this {language} file and provide a concise summary (2-3 sentences) that covers:
+1. What this file does/its purpose
+2. Key functions, classes, or components
+3. Notable patterns or architectural decisions
+
+File: {relative_path}
+Language: {language}
+Size: {byte_count} bytes
+
+Content:
+{content}
+
+Summary:"""
+SUMMARY_BATCH_PROMPT_TEMPLATE = """Analyze each of the following files and provide a concise summary (2-3 sentences) for each that covers:
+1. What the file does/its purpose
+2. Key functions, classes, or components
+3. Notable patterns or architectural decisions
+
+Respond with only a JSON object mapping each file id to its summary, e.g. {{"1": "...", "2": "..."}}.
+
+{files}"""
+SUMMARY_BATCH_FILE_TEMPLATE = """=== File id: {file_id} ===
+File: {relative_path}
+Language: {language}
+Size: {byte_count} bytes
+
+Content:
+{content}
+"""
+SUMMARY_CHUNK_PROMPT_TEMPLATE = """Summarize this part of a {language} file in 1-2 sentences, naming the functions, classes, or components it defines.
+
+File: {relative_path}
+Part: {index} of {count}
+
+Content:
+{content}
+
+Summary:"""
+SUMMARY_REDUCE_PROMPT_TEMPLATE = """The {language} file below was summarized in {count} consecutive parts. Combine the part summaries into a concise summary (2-3 sentences) of the whole file that covers:
+1. What this file does/its purpose
+2. Key functions, classes, or components
+3. Notable patterns or architectural decisions
+
+File: {relative_path}
+Language: {language}
+Size: {byte_count} bytes
+
+Part summaries:
+{summaries}
+
+Summary:"""
+# Cached summaries are only reused while the prompts are unchanged
+SUMMARY_PROMPT_VERSION = content_hash(
+    SUMMARY_SYSTEM_PROMPT
+    + SUMMARY_PROMPT_TEMPLATE
+    + SUMMARY_BATCH_PROMPT_TEMPLATE
+    + SUMMARY_BATCH_FILE_TEMPLATE
+    + SUMMARY_CHUNK_PROMPT_TEMPLATE
+    + SUMMARY_REDUCE_PROMPT_TEMPLATE
+)
+SUMMARY_CACHE_NAMESPACE = "summaries"
+DEFAULT_SUMMARY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Map-reduce summaries of files above MAX_SUMMARY_TOKENS
+SUMMARY_CHUNK_TOKENS = 2000
+MAX_MAP_REDUCE_TOKENS = 200_000  # Larger files get a placeholder instead
+
+# Batching of small files into one summary request
+DEFAULT_SUMMARY_BATCH_TOKENS = 4000  # Content token budget per batch, 0 disables
+SUMMARY_BATCH_MAX_FILE_TOKENS = 1000  # Larger files are summarised on their own
+SUMMARY_BATCH_MAX_FILES = 20
+
 # File processing
 BINARY_DETECTION_CHUNK_SIZE = 8192
+MINIMAL_PROFILE_MARKDOWN_MAX_BYTES = 8 * 1024
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+
+# Reasons for skipping files, as counted in run statistics
+SKIP_IGNORED = "ignored"
+SKIP_IGNORED_DIRECTORY = "ignored_directory"
+SKIP_BINARY = "binary"
+SKIP_EXTENSION = "extension"
+SKIP_PROFILE = "profile"
+SKIP_EMPTY = "empty"
+
+STATS_FORMAT_VERSION = 1  # Bump when the --stats-json layout changes
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -98,6 +270,8 @@ class FileInfo:
     token_count: int
     language: str
     summary: str | None = None
+    skeleton: bool = False
+    omitted_tokens: int = 0  # Content tokens replaced by the summary
 
 
 @dataclass(frozen=True)
@@ -109,6 +283,93 @@ class ProcessingResult:
     total_tokens: int
     parts_written: int
     exit_code: int
+    queue_depths: dict[str, int] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    stage_stats: dict[str, StageStats] = field(default_factory=dict)
+    skipped: dict[str, int] = field(default_factory=dict)
+    memory: "MemoryReport | None" = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the result and run statistics as JSON-serialisable data."""
+        data = {
+            "format_version": STATS_FORMAT_VERSION,
+            "exit_code": self.exit_code,
+            "files": self.total_files,
+            "bytes": self.total_bytes,
+            "tokens": self.total_tokens,
+            "parts": self.parts_written,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "stages": {
+                name: stats.to_dict() for name, stats in self.stage_stats.items()
+            },
+            "skipped": dict(self.skipped),
+            "queue_depths": dict(self.queue_depths),
+        }
+        if self.memory:
+            data["memory"] = self.memory.to_dict()
+        return data
+
+
+@dataclass(frozen=True)
+class RenderedFile:
+    """Value object describing one file of rendered context."""
+
+    path: str  # Relative to the repository, with forward slashes
+    part: int  # Part number, starting at 1
+    byte_count: int
+    token_count: int
+    language: str
+    summary: str | None = None
+    skeleton: bool = False
+    omitted_tokens: int = 0  # Content tokens replaced by the summary
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the metadata as JSON-serialisable data."""
+        # Shallow, as every field is a plain value; asdict deep-copies
+        return dict(vars(self))
+
+
+@dataclass(frozen=True)
+class RenderedSection:
+    """Value object holding the Markdown section of one file."""
+
+    file: RenderedFile
+    text: str
+
+
+@dataclass(frozen=True)
+class RenderedContext:
+    """Value object holding rendered parts, per-file metadata and run stats."""
+
+    parts: list[str]
+    files: list[RenderedFile]
+    result: ProcessingResult
+
+    @property
+    def exit_code(self) -> int:
+        """Exit code of the run: 0 for success, 1 if split, 2 for fatal error."""
+        return self.result.exit_code
+
+    def encoded_parts(self, encoding: str = "utf-8") -> list[bytes]:
+        """Return the parts as bytes, as they would be written to disk."""
+        return [part.encode(encoding) for part in self.parts]
+
+
+@dataclass(frozen=True)
+class SummaryConfig:
+    """Value object for summary generation settings."""
+
+    model: str = DEFAULT_OPENAI_MODEL
+    concurrency: int = DEFAULT_SUMMARY_CONCURRENCY
+    requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE
+    tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE
+    base_url: str | None = None
+    cache_max_bytes: int = DEFAULT_SUMMARY_CACHE_MAX_BYTES
+    batch_tokens: int = DEFAULT_SUMMARY_BATCH_TOKENS
+    backend: str = SUMMARY_BACKEND_OPENAI
+    timeout: float = DEFAULT_BACKEND_TIMEOUT
 
 
 @dataclass(frozen=True)
@@ -117,11 +378,22 @@ class ProcessingConfig:
 
     repo_path: Path
     rules_file: Path | None
-    output_path: Path
+    output_path: Path | None  # None when output is kept in memory
     max_tokens: int
     only_extensions: set[str] | None
     enable_summary: bool = False
     profile: str | None = None
+    skeleton_min_tokens: int | None = None
+    cache_dir: Path | None = None
+    optimize_stages: frozenset[str] = frozenset()
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    token_budget: int | None = None
+    trace_path: Path | None = None
+    memory_report: bool = False
+    focus_path: Path | None = None  # Python file whose import closure is written
+    symbol: str | None = None  # Name whose definitions and references are written
+    since: str | None = None  # Git revision whose changed files are written
+    since_imports: bool = False  # Add import neighbours of the changed files
 
 
 # === DOMAIN LAYER: Repository Interfaces ===
@@ -136,6 +408,12 @@ class FileSystemRepository(Protocol):
         """Walk directory structure."""
         ...
 
+    def scan_files(
+        self, root: Path, is_ignored: Callable[[str, str, bool], bool]
+    ) -> Iterator[tuple[str, str, int, int]]:
+        """Yield relative path, name, size and mtime of files without reading them."""
+        ...
+
     def read_file(self, path: Path) -> str:
         """Read file content."""
         ...
@@ -155,6 +433,10 @@ class IgnorePatternService(Protocol):
         """Check if a file should be ignored."""
         ...
 
+    def should_ignore_entry(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        """Check an entry of a walk that does not enter ignored directories."""
+        ...
+
 
 class FileFilterService(Protocol):
     """Protocol for filtering files."""
@@ -163,6 +445,14 @@ class FileFilterService(Protocol):
         """Check if a file should be processed."""
         ...
 
+    def skip_reason(self, file_path: Path, repo_root: Path) -> str | None:
+        """Return why a file should be skipped, or None to process it."""
+        ...
+
+    def skip_reason_by_name(self, name: str, size: int) -> str | None:
+        """Return why a file would be skipped, judging binaries by name only."""
+        ...
+
 
 class FileProcessorService(Protocol):
     """Protocol for processing individual files."""
@@ -179,6 +469,14 @@ class SummaryService(Protocol):
         """Generate a summary for the given file."""
         ...
 
+    def generate_summaries(self, file_infos: Sequence[FileInfo]) -> dict[Path, str]:
+        """Generate summaries for many files, keyed by file path."""
+        ...
+
+    def summarize_stream(self, file_infos: Iterable[FileInfo]) -> Iterator[FileInfo]:
+        """Yield file infos with summaries attached, preserving input order."""
+        ...
+
 
 class ContextWriterService(Protocol):
     """Protocol for writing context files."""
@@ -206,6 +504,13 @@ class GenerateContextUseCase:
         processor_service: FileProcessorService,
         writer_service: ContextWriterService,
         summary_service: SummaryService | None = None,
+        budget_summary_service: SummaryService | None = None,
+        stats: RunStats | None = None,
+        memory: "MemoryTracker | None" = None,
+        token_cache: TokenCountCache | None = None,
+        import_graph: ImportGraph | None = None,
+        symbol_index: "SymbolIndex | None" = None,
+        verbose: bool = True,
     ):
         """Initialize use case with dependencies."""
         self.file_system_repo = file_system_repo
@@ -214,23 +519,98 @@ class GenerateContextUseCase:
         self.processor_service = processor_service
         self.writer_service = writer_service
         self.summary_service = summary_service
+        self.budget_summary_service = budget_summary_service
+        self.stats = stats or RunStats()
+        self.memory = memory
+        self.token_cache = token_cache
+        self.import_graph = import_graph
+        self.symbol_index = symbol_index
+        self.verbose = verbose  # Print progress and the run summary
+        self.result: ProcessingResult | None = None
+        # Imports between each file and the focus file, when focused; 0 for
+        # files defining the symbol or changed and 1 for files using it or
+        # import neighbours
+        self.focus_distances: dict[Path, int] = {}
+        self.symbol_definitions: list[tuple[str, Definition]] = []
+        self.changed_paths: list[str] = []
 
     def execute(self, config: ProcessingConfig) -> ProcessingResult:
         """Execute the context generation use case."""
+        for _ in self.stream(config):
+            pass
+        assert self.result is not None  # For mypy
+        return self.result
+
+    def stream(self, config: ProcessingConfig) -> Generator[FileInfo, None, None]:
+        """
+        Execute the use case, yielding each file after it is written.
+
+        The result is available as result once the iterator is exhausted.
+        Closing it early stops the pipeline and releases its resources.
+        """
+        self.result = yield from self._run(config)
+
+    def _run(
+        self, config: ProcessingConfig
+    ) -> Generator[FileInfo, None, ProcessingResult]:
+        """Run the use case, yielding written files and returning the result."""
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+        if self.memory:
+            self.memory.start()
         try:
             if not self._validate_inputs(config):
                 return ProcessingResult(0, 0, 0, 0, EXIT_ERROR)
 
-            self.file_system_repo.create_directory(config.output_path)
+            if config.output_path is not None:
+                self.file_system_repo.create_directory(config.output_path)
 
-            total_files, total_bytes, total_tokens = self._process_files(config)
+            (
+                total_files,
+                total_bytes,
+                total_tokens,
+                queue_depths,
+            ) = yield from self._process_files(config)
             parts_written = self.writer_service.finalize()
-
-            self._print_summary(total_files, total_bytes, total_tokens, parts_written)
+            memory_report = None
+            if self.memory:
+                self.memory.checkpoint("finalize")
+                memory_report = self.memory.report()
+
+            wall_seconds = time.perf_counter() - started_wall
+            cpu_seconds = time.process_time() - started_cpu
+            if self.verbose:
+                self._print_summary(
+                    total_files, total_bytes, total_tokens, parts_written
+                )
+                if config.symbol is not None:
+                    self._print_symbol(config.symbol)
+                elif config.since is not None:
+                    self._print_changes(config.since)
+                elif self.focus_distances:
+                    print(
+                        f"  Import closure: {len(self.focus_distances)} files "
+                        f"within {max(self.focus_distances.values())} import(s) "
+                        f"of {config.focus_path}"
+                    )
+                print(f"  Elapsed: {wall_seconds:.2f}s (CPU {cpu_seconds:.2f}s)")
+                self._print_queue_depths(queue_depths, config.queue_size)
+                if memory_report:
+                    self._print_memory_report(memory_report)
 
             exit_code = EXIT_SPLIT_FILES if parts_written > 1 else EXIT_SUCCESS
             return ProcessingResult(
-                total_files, total_bytes, total_tokens, parts_written, exit_code
+                total_files,
+                total_bytes,
+                total_tokens,
+                parts_written,
+                exit_code,
+                queue_depths,
+                wall_seconds,
+                cpu_seconds,
+                dict(self.stats.stages),
+                dict(self.stats.skipped),
+                memory_report,
             )
 
         except KeyboardInterrupt:
@@ -239,75 +619,241 @@ class GenerateContextUseCase:
         except Exception as e:
             print(f"Fatal error: {e}", file=sys.stderr)
             return ProcessingResult(0, 0, 0, 0, EXIT_ERROR)
+        finally:
+            if self.memory:
+                self.memory.stop()
+            if self.token_cache:
+                self.token_cache.flush()
+            if config.trace_path and self.stats.tracer:
+                self._write_trace(config.trace_path)
+
+    def _write_trace(self, trace_path: Path) -> None:
+        """Write recorded spans, warning if the file cannot be written."""
+        try:
+            assert self.stats.tracer is not None  # For mypy
+            self.stats.tracer.write(trace_path)
+            print(f"Trace written to {trace_path}")
+        except OSError as e:
+            print(
+                f"Warning: Could not write trace to {trace_path}: {e}", file=sys.stderr
+            )
 
     def _validate_inputs(self, config: ProcessingConfig) -> bool:
         """Validate input configuration."""
-        if not config.repo_path.exists():
+        if not _validate_repo_path(config.repo_path):
+            return False
+        if config.focus_path is not None:
+            return self._validate_focus_path(config.focus_path, config.repo_path)
+        if config.since is not None:
+            return self._load_changes(config.since, config.repo_path)
+        return True
+
+    def _load_changes(self, ref: str, repo_root: Path) -> bool:
+        """List the files changed since a git revision, checking it exists."""
+        # Imported here so runs without --since do not load subprocess
+        from .changes import GitError, changed_files
+
+        try:
+            self.changed_paths = changed_files(repo_root, ref)
+        except GitError as e:
+            print(f"Error: Could not list changes since '{ref}': {e}", file=sys.stderr)
+            return False
+        return True
+
+    def _validate_focus_path(self, focus_path: Path, repo_root: Path) -> bool:
+        """Check that the focus file is a Python file in the repository."""
+        if focus_path.suffix != ".py" or not focus_path.is_file():
             print(
-                f"Error: Repository path '{config.repo_path}' does not exist",
+                f"Error: Focus path '{focus_path}' is not a Python file",
                 file=sys.stderr,
             )
             return False
-
-        if not config.repo_path.is_dir():
+        try:
+            focus_path.resolve().relative_to(repo_root.resolve())
+        except ValueError:
             print(
-                f"Error: Repository path '{config.repo_path}' is not a directory",
+                f"Error: Focus path '{focus_path}' is outside the repository",
+                file=sys.stderr,
+            )
+            return False
+        if self.ignore_service.should_ignore(focus_path.resolve(), repo_root.resolve()):
+            print(
+                f"Error: Focus path '{focus_path}' is excluded by the ignore rules",
                 file=sys.stderr,
             )
             return False
-
         return True
 
-    def _process_files(self, config: ProcessingConfig) -> tuple[int, int, int]:
-        """Process all files and return counts."""
+    def _process_files(
+        self, config: ProcessingConfig
+    ) -> Generator[FileInfo, None, tuple[int, int, int, dict[str, int]]]:
+        """
+        Process all files, yielding each once written, and return counts.
+
+        Returns the file, byte and token totals and peak queue depths.
+
+        Walking, reading, summarising and writing run as concurrent pipeline
+        stages, so disk and network work overlap. Bounded queues between the
+        stages cap memory, and files are written in walk order. With a
+        focus file, the walk is replaced by its import closure, nearest
+        files first; with a symbol, by the files defining it and then the
+        files using it; with a git revision, by the files changed since.
+
+        With a token budget, all files are collected before writing so the
+        ones to replace by their summaries can be chosen across the whole
+        repository.
+        """
         total_files = 0
         total_bytes = 0
         total_tokens = 0
 
-        print(f"Scanning repository: {config.repo_path}")
-
-        for file_path in self._find_repository_files(config.repo_path):
-            if not self.filter_service.should_process(file_path, config.repo_path):
-                continue
+        if self.verbose:
+            print(f"Scanning repository: {config.repo_path}")
+
+        pipeline = Pipeline(config.queue_size)
+        if config.focus_path is not None:
+            pipeline.source("walk", self._find_focus_files(config))
+        elif config.symbol is not None:
+            pipeline.source("walk", self._find_symbol_files(config))
+        elif config.since is not None:
+            pipeline.source("walk", self._find_changed_files(config))
+        else:
+            pipeline.source("walk", self._find_repository_files(config.repo_path))
+        pipeline.stage("read", lambda paths: self._read_files(paths, config.repo_path))
+        if config.enable_summary and self.summary_service:
+            pipeline.stage(
+                "summarise",
+                self.stats.timed_stage(
+                    "summarise",
+                    self.summary_service.summarize_stream,
+                    lambda file_info: span_args(
+                        file_info.relative_path, file_info.byte_count
+                    ),
+                ),
+            )
 
-            file_info = self.processor_service.process_file(file_path, config.repo_path)
-            if file_info and file_info.content:
-                file_info = self._add_summary_if_enabled(file_info, config)
-                self.writer_service.write_file_section(file_info)
+        try:
+            file_infos: Iterable[FileInfo] = pipeline
+            if config.token_budget is not None:
+                file_infos = list(pipeline)
+                self._memory_checkpoint("collect")
+                with self.stats.measure("budget"):
+                    file_infos = self._fit_to_budget(file_infos, config.token_budget)
+                self._memory_checkpoint("budget")
+
+            for file_info in file_infos:
+                if self.memory:
+                    self.memory.observe(
+                        file_info.relative_path, self._held_bytes(file_info)
+                    )
+                with self.stats.measure(
+                    "write", file_info.relative_path, file_info.byte_count
+                ):
+                    self.writer_service.write_file_section(file_info)
 
                 total_files += 1
                 total_bytes += file_info.byte_count
                 total_tokens += file_info.token_count
+                yield file_info
+        finally:
+            pipeline.close()
 
-        return total_files, total_bytes, total_tokens
+        self._memory_checkpoint("write")
+        return total_files, total_bytes, total_tokens, pipeline.queue_depths
 
-    def _add_summary_if_enabled(
-        self, file_info: FileInfo, config: ProcessingConfig
-    ) -> FileInfo:
-        """Add summary to file info if summary is enabled."""
-        if not config.enable_summary or not self.summary_service:
-            return file_info
+    def _memory_checkpoint(self, stage: str) -> None:
+        """Record memory at a stage boundary when the memory report is on."""
+        if self.memory:
+            self.memory.checkpoint(stage)
 
-        try:
-            summary = self.summary_service.generate_summary(file_info)
-            if summary:
-                file_info = FileInfo(
-                    path=file_info.path,
-                    relative_path=file_info.relative_path,
-                    content=file_info.content,
-                    byte_count=file_info.byte_count,
-                    token_count=file_info.token_count,
-                    language=file_info.language,
-                    summary=summary,
+    @staticmethod
+    def _held_bytes(file_info: FileInfo) -> int:
+        """Memory held by the text of a file: its content and summary."""
+        held = sys.getsizeof(file_info.content)
+        if file_info.summary:
+            held += sys.getsizeof(file_info.summary)
+        return held
+
+    def _fit_to_budget(
+        self, file_infos: list[FileInfo], token_budget: int
+    ) -> list[FileInfo]:
+        """
+        Replace the content of some files by their summaries to fit the budget.
+
+        Summaries from the summary stage, cached or remote, are used where
+        present; other files get an offline summary. Files without any
+        summary can still be dropped to their path if nothing else fits.
+        """
+        total_tokens = sum(file_info.token_count for file_info in file_infos)
+        if total_tokens <= token_budget:
+            return file_infos
+
+        summaries = {
+            file_info.path: file_info.summary
+            for file_info in file_infos
+            if file_info.summary
+        }
+        if self.budget_summary_service:
+            missing = [file_info for file_info in file_infos if not file_info.summary]
+            summaries.update(self.budget_summary_service.generate_summaries(missing))
+
+        items = [
+            BudgetItem(
+                full_tokens=file_info.token_count,
+                summary_tokens=estimate_tokens(summaries.get(file_info.path, "")),
+                weight=file_weight(file_info.relative_path, file_info.language)
+                * DISTANCE_DECAY
+                ** self.focus_distances.get(file_info.relative_path, 0),
+            )
+            for file_info in file_infos
+        ]
+        chosen = choose_substitutions(items, token_budget)
+
+        fitted = [
+            (
+                replace(
+                    file_info,
+                    content="",
+                    token_count=items[index].summary_tokens,
+                    summary=summaries.get(file_info.path),
+                    omitted_tokens=file_info.token_count,
                 )
-                print(f"Added summary for file {file_info.relative_path}")
-        except Exception as e:
+                if index in chosen
+                else file_info
+            )
+            for index, file_info in enumerate(file_infos)
+        ]
+
+        saved = sum(items[index].savings for index in chosen)
+        if self.verbose:
             print(
-                f"Warning: Failed to generate summary for {file_info.relative_path}: {e}",
+                f"Token budget {token_budget:,}: {len(chosen)} of {len(file_infos)} "
+                f"files replaced by summaries ({saved:,} tokens saved)"
+            )
+        if total_tokens - saved > token_budget:
+            print(
+                f"Warning: Output still exceeds the token budget "
+                f"({total_tokens - saved:,} tokens) with every file summarised",
                 file=sys.stderr,
             )
+        return fitted
+
+    def _read_files(
+        self, file_paths: Iterable[Path], repo_root: Path
+    ) -> Generator[FileInfo, None, None]:
+        """Yield processed information for every non-empty file."""
+        for file_path in file_paths:
+            with self.stats.measure("filter"):
+                reason = self.filter_service.skip_reason(file_path, repo_root)
+            if reason:
+                self.stats.skip(reason)
+                continue
 
-        return file_info
+            file_info = self.processor_service.process_file(file_path, repo_root)
+            if file_info and file_info.content:
+                yield file_info
+            else:
+                self.stats.skip(SKIP_EMPTY)
 
     def _print_summary(
         self, total_files: int, total_bytes: int, total_tokens: int, parts_written: int
@@ -322,20 +868,325 @@ class GenerateContextUseCase:
         if parts_written > 1:
             print(f"  Output split into {parts_written} parts due to token limit")
 
+    def _print_symbol(self, symbol: str) -> None:
+        """Print where the symbol is defined and how many files use it."""
+        defining = {path for path, _ in self.symbol_definitions}
+        print(
+            f"  Symbol {symbol}: {len(self.symbol_definitions)} definition(s), "
+            f"{len(self.focus_distances) - len(defining)} file(s) using it"
+        )
+        for relative_path, definition in self.symbol_definitions:
+            print(
+                f"    {definition.kind} {definition.name} at {relative_path}:"
+                f"{definition.start_line}-{definition.end_line}"
+            )
+
+    def _print_changes(self, ref: str) -> None:
+        """Print how many files changed since ref and how many neighbour them."""
+        changed = sum(1 for distance in self.focus_distances.values() if not distance)
+        print(
+            f"  Changed since {ref}: {changed} file(s), "
+            f"{len(self.focus_distances) - changed} import neighbour(s)"
+        )
+
+    def _print_queue_depths(
+        self, queue_depths: dict[str, int], queue_size: int
+    ) -> None:
+        """Print peak stage queue depths; a full queue means a slow consumer."""
+        depths = ", ".join(
+            f"{stage} {depth}/{queue_size}" for stage, depth in queue_depths.items()
+        )
+        print(f"  Peak queue depths: {depths}")
+
+    def _print_memory_report(self, report: "MemoryReport") -> None:
+        """Print peak memory, memory by stage, allocation sites and large files."""
+        print("\nMemory report:")
+        if report.peak_rss_bytes is not None:
+            print(f"  Peak RSS: {format_bytes(report.peak_rss_bytes)}")
+        print(f"  Traced peak: {format_bytes(report.traced_peak_bytes)}")
+        for checkpoint in report.checkpoints:
+            print(
+                f"    {checkpoint.stage}: peak {format_bytes(checkpoint.peak_bytes)}, "
+                f"held after {format_bytes(checkpoint.current_bytes)}"
+            )
+        if report.top_sites:
+            print("  Top allocation sites at peak:")
+            for site in report.top_sites:
+                print(
+                    f"    {format_bytes(site.size_bytes):>10}  {site.location} "
+                    f"({site.blocks:,} blocks)"
+                )
+        if report.largest_files:
+            print("  Largest files held:")
+            for held in report.largest_files:
+                print(f"    {format_bytes(held.size_bytes):>10}  {held.path}")
+
     def _find_repository_files(self, repo_root: Path) -> Generator[Path, None, None]:
         """Find all files in repository that should be processed."""
-        for root, dirs, files in self.file_system_repo.walk_directory(repo_root):
+        walk = self.file_system_repo.walk_directory(repo_root)
+        for root, dirs, files in self.stats.timed("walk", walk):
             # Filter directories
-            dirs[:] = [
-                d
-                for d in dirs
-                if not self.ignore_service.should_ignore(root / d, repo_root)
-            ]
+            kept_dirs = []
+            for d in dirs:
+                if self._is_ignored(root / d, repo_root):
+                    self.stats.skip(SKIP_IGNORED_DIRECTORY)
+                else:
+                    kept_dirs.append(d)
+            dirs[:] = kept_dirs
 
             for file in files:
                 file_path = root / file
-                if not self.ignore_service.should_ignore(file_path, repo_root):
+                if self._is_ignored(file_path, repo_root):
+                    self.stats.skip(SKIP_IGNORED)
+                else:
+                    yield file_path
+
+    def _find_focus_files(self, config: ProcessingConfig) -> Iterator[Path]:
+        """Find the Python files the focus file imports, directly or not."""
+        focus_path, import_graph = config.focus_path, self.import_graph
+        assert focus_path is not None and import_graph is not None  # For mypy
+        repo_root = config.repo_path
+
+        def find() -> Generator[Path, None, None]:
+            index = ModuleIndex(
+                relative_path
+                for relative_path, name, _, _ in self.file_system_repo.scan_files(
+                    repo_root, self._is_ignored_entry
+                )
+                if name.endswith(".py")
+            )
+            entry = focus_path.resolve().relative_to(repo_root.resolve())
+            for relative_path, distance in import_graph.closure(
+                index, entry.as_posix()
+            ):
+                self.focus_distances[Path(relative_path)] = distance
+                yield repo_root / relative_path
+
+        return self.stats.timed("focus", find())
+
+    def _find_symbol_files(self, config: ProcessingConfig) -> Iterator[Path]:
+        """Find the files defining the symbol, then the files using it."""
+        from .symbols import symbol_language
+
+        symbol, symbol_index = config.symbol, self.symbol_index
+        assert symbol is not None and symbol_index is not None  # For mypy
+        repo_root = config.repo_path
+
+        def find() -> Generator[Path, None, None]:
+            symbol_index.update(
+                (relative_path, language, size, mtime_ns)
+                for relative_path, name, size, mtime_ns in (
+                    self.file_system_repo.scan_files(repo_root, self._is_ignored_entry)
+                )
+                if (language := symbol_language(name))
+            )
+            self.symbol_definitions = symbol_index.definitions(symbol)
+            if not self.symbol_definitions:
+                print(
+                    f"Warning: No definition of '{symbol}' found, "
+                    "writing the files using it",
+                    file=sys.stderr,
+                )
+            for relative_path, _ in self.symbol_definitions:
+                if Path(relative_path) not in self.focus_distances:
+                    self.focus_distances[Path(relative_path)] = 0
+                    yield repo_root / relative_path
+            for relative_path in symbol_index.references(symbol):
+                if Path(relative_path) not in self.focus_distances:
+                    self.focus_distances[Path(relative_path)] = 1
+                    yield repo_root / relative_path
+
+        return self.stats.timed("symbols", find())
+
+    def _find_changed_files(self, config: ProcessingConfig) -> Iterator[Path]:
+        """
+        Yield the changed files, then their import neighbours if asked for.
+
+        Changed files go straight to the readers without a walk. Only
+        finding import neighbours scans the repository.
+        """
+        from .changes import import_neighbours
+
+        repo_root = config.repo_path
+
+        def find() -> Generator[Path, None, None]:
+            for relative_path in self.changed_paths:
+                file_path = repo_root / relative_path
+                if self._is_ignored(file_path, repo_root):
+                    self.stats.skip(SKIP_IGNORED)
+                elif file_path.is_file():
+                    self.focus_distances[Path(relative_path)] = 0
                     yield file_path
+            if not config.since_imports:
+                return
+
+            assert self.import_graph is not None  # For mypy
+            python_files = [
+                relative_path
+                for relative_path, name, _, _ in self.file_system_repo.scan_files(
+                    repo_root, self._is_ignored_entry
+                )
+                if name.endswith(".py")
+            ]
+            changed = [path.as_posix() for path in self.focus_distances]
+            for relative_path in import_neighbours(
+                self.import_graph, python_files, changed
+            ):
+                self.focus_distances[Path(relative_path)] = 1
+                yield repo_root / relative_path
+
+        return self.stats.timed("changes", find())
+
+    def _is_ignored_entry(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        """Check a scanned entry against the ignore rules, counting skips."""
+        if not self.ignore_service.should_ignore_entry(relative_path, name, is_dir):
+            return False
+        self.stats.skip(SKIP_IGNORED_DIRECTORY if is_dir else SKIP_IGNORED)
+        return True
+
+    def _is_ignored(self, path: Path, repo_root: Path) -> bool:
+        """Check a path against the ignore rules, timing the match."""
+        with self.stats.measure("ignore"):
+            return self.ignore_service.should_ignore(path, repo_root)
+
+
+class EstimateContextUseCase:
+    """Use case for estimating a run from file sizes, without reading files."""
+
+    def __init__(
+        self,
+        file_system_repo: FileSystemRepository,
+        ignore_service: IgnorePatternService,
+        filter_service: FileFilterService,
+        token_cache: TokenCountCache | None = None,
+    ):
+        """Initialize use case with dependencies."""
+        self.file_system_repo = file_system_repo
+        self.ignore_service = ignore_service
+        self.filter_service = filter_service
+        self.token_cache = token_cache
+
+    def execute(self, config: ProcessingConfig) -> ContextEstimate | None:
+        """
+        Estimate tokens and parts of a run, or None if the input is invalid.
+
+        Only the walk, the ignore rules and file metadata are used. Token
+        counts recorded by earlier runs are reused for unchanged files;
+        other files are estimated from their size. Binary files are
+        recognised by name only, and skeletons, optimisations and
+        summaries are not accounted for.
+        """
+        started = time.perf_counter()
+        if not _validate_repo_path(config.repo_path):
+            return None
+
+        cached = self.token_cache.load() if self.token_cache else {}
+        skipped: dict[str, int] = defaultdict(int)
+
+        def is_ignored(relative_path: str, name: str, is_dir: bool) -> bool:
+            if not self.ignore_service.should_ignore_entry(relative_path, name, is_dir):
+                return False
+            skipped[SKIP_IGNORED_DIRECTORY if is_dir else SKIP_IGNORED] += 1
+            return True
+
+        token_counts = []
+        cached_files = 0
+        # Totals by extension and top-level directory, split into the two
+        # breakdowns afterwards to keep the work per file small
+        totals: dict[tuple[str, str], EstimateGroup] = defaultdict(EstimateGroup)
+        for relative_path, name, size, mtime_ns in self.file_system_repo.scan_files(
+            config.repo_path, is_ignored
+        ):
+            reason = self.filter_service.skip_reason_by_name(name, size)
+            if reason or not size:
+                skipped[reason or SKIP_EMPTY] += 1
+                continue
+
+            entry = cached.get(relative_path)
+            if entry and entry[0] == size and entry[1] == mtime_ns:
+                tokens = entry[2]
+                cached_files += 1
+            else:
+                tokens = size // CHARS_PER_TOKEN
+            token_counts.append(tokens)
+
+            dot = name.rfind(".")
+            slash = relative_path.find("/")
+            totals[
+                name[dot:].lower() if dot > 0 else "",
+                relative_path[:slash] if slash > 0 else ROOT_DIRECTORY,
+            ].add(size, tokens)
+
+        by_language: dict[str, EstimateGroup] = defaultdict(EstimateGroup)
+        by_directory: dict[str, EstimateGroup] = defaultdict(EstimateGroup)
+        for (extension, directory), group in totals.items():
+            language = LANGUAGE_EXTENSIONS.get(extension, UNKNOWN_LANGUAGE)
+            by_language[language].merge(group)
+            by_directory[directory].merge(group)
+
+        estimate = ContextEstimate(
+            total_files=len(token_counts),
+            total_bytes=sum(group.bytes for group in by_language.values()),
+            total_tokens=sum(token_counts),
+            cached_files=cached_files,
+            parts=count_parts(token_counts, config.max_tokens),
+            max_tokens=config.max_tokens,
+            wall_seconds=time.perf_counter() - started,
+            by_language=_by_tokens(by_language),
+            by_directory=_by_tokens(by_directory),
+            skipped=dict(skipped),
+        )
+        self._print_estimate(config.repo_path, estimate)
+        return estimate
+
+    def _print_estimate(self, repo_path: Path, estimate: ContextEstimate) -> None:
+        """Print totals and the breakdowns by language and directory."""
+        print(f"Dry run for {repo_path} (sizes only, no files read):")
+        print(
+            f"  Files: {estimate.total_files:,} "
+            f"({estimate.cached_files:,} with cached token counts)"
+        )
+        print(f"  Total size: {format_bytes(estimate.total_bytes)}")
+        print(f"  Estimated tokens: {estimate.total_tokens:,}")
+        print(
+            f"  Estimated parts: {estimate.parts} "
+            f"at {estimate.max_tokens:,} tokens per part"
+        )
+        print(f"  Elapsed: {estimate.wall_seconds:.2f}s")
+        for title, groups in (
+            ("By language", estimate.by_language),
+            ("By top-level directory", estimate.by_directory),
+        ):
+            print(f"\n{title}:")
+            for name, group in groups.items():
+                print(
+                    f"  {name:<24} {group.files:>8,} files "
+                    f"{format_bytes(group.bytes):>10} {group.tokens:>12,} tokens"
+                )
+
+
+def _validate_repo_path(repo_path: Path) -> bool:
+    """Check that the repository path is an existing directory."""
+    if not repo_path.exists():
+        print(
+            f"Error: Repository path '{repo_path}' does not exist",
+            file=sys.stderr,
+        )
+        return False
+
+    if not repo_path.is_dir():
+        print(
+            f"Error: Repository path '{repo_path}' is not a directory",
+            file=sys.stderr,
+        )
+        return False
+
+    return True
+
+
+def _by_tokens(groups: dict[str, EstimateGroup]) -> dict[str, EstimateGroup]:
+    """Order groups by estimated tokens, largest first."""
+    return dict(sorted(groups.items(), key=lambda item: -item[1].tokens))
 
 
 # === INFRASTRUCTURE LAYER: Concrete Implementations ===
@@ -351,6 +1202,45 @@ class FileSystemRepositoryImpl:
         for root, dirs, files in os.walk(path):
             yield Path(root), dirs, files
 
+    def scan_files(
+        self, root: Path, is_ignored: Callable[[str, str, bool], bool]
+    ) -> Generator[tuple[str, str, int, int], None, None]:
+        """
+        Yield relative path, name, size and mtime of files without reading them.
+
+        Files come in the same order as from walk_directory, and symlinked
+        directories are not followed either. Directories for which
+        is_ignored returns True are not entered. Relative paths use
+        forward slashes.
+        """
+        pending = [(str(root), "")]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                relative_path = prefix + entry.name
+                try:
+                    if entry.is_dir():
+                        if not is_ignored(relative_path, entry.name, True) and not (
+                            entry.is_symlink()
+                        ):
+                            subdirectories.append((entry.path, relative_path + "/"))
+                        continue
+                    if is_ignored(relative_path, entry.name, False):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield relative_path, entry.name, stat.st_size, stat.st_mtime_ns
+
+            # Depth first, visiting subdirectories in listing order
+            pending.extend(reversed(subdirectories))
+
     def read_file(self, path: Path) -> str:
         """Read file content."""
         try:
@@ -402,6 +1292,27 @@ class IgnorePatternServiceImpl:
         """Compile patterns into a PathSpec for efficient matching."""
         self.spec = pathspec.PathSpec.from_lines("gitwildmatch", self.patterns)
 
+        # Patterns without a slash match a name at any depth, so during a walk
+        # that skips ignored directories they only need the entry's own name.
+        # That avoids scanning every directory prefix of deep paths.
+        name_regexes = []
+        path_regexes = []
+        for line, pattern in zip(self.patterns, self.spec.patterns, strict=True):
+            if (
+                not isinstance(pattern, pathspec.RegexPattern)
+                or pattern.include is None
+                or pattern.regex is None
+            ):
+                continue
+            regex = _NAMED_GROUP.sub("(?:", pattern.regex.pattern)
+            if "/" in line.rstrip("/"):
+                path_regexes.append(regex)
+            else:
+                name_regexes.append(regex)
+        self._negated = any(pattern.include is False for pattern in self.spec.patterns)
+        self._name_regex = _combine_regexes(name_regexes, names_only=True)
+        self._path_regex = _combine_regexes(path_regexes)
+
     def should_ignore(self, file_path: Path, relative_to: Path) -> bool:
         """Check if a file should be ignored."""
         if not self.spec:
@@ -414,88 +1325,243 @@ class IgnorePatternServiceImpl:
             # File is not relative to the base path
             return True
 
+    def should_ignore_entry(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        """
+        Check an entry of a walk that does not enter ignored directories.
+
+        Anything under an ignored directory is ignored too, so names only
+        need checking at their own level. Negated patterns can re-include
+        paths, and fall back to matching the whole path.
+        """
+        suffix = "/" if is_dir else ""
+        if self._negated:
+            return bool(self.spec and self.spec.match_file(relative_path + suffix))
+
+        return bool(
+            (self._name_regex and self._name_regex.match(name + suffix))
+            or (self._path_regex and self._path_regex.match(relative_path + suffix))
+        )
+
+
+_NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+_ANY_DEPTH = "^(?:.+/)?"  # How pathspec regexes start for patterns at any depth
+
+
+def _combine_regexes(
+    regexes: list[str], names_only: bool = False
+) -> re.Pattern[str] | None:
+    """
+    Combine regexes into one, or None if there are none.
+
+    Patterns matching at any depth share one leading directory match, so
+    a path is scanned for directory prefixes once instead of per pattern.
+    Names contain no slash, so for them that prefix is dropped entirely.
+    """
+    anchored = [regex for regex in regexes if not regex.startswith(_ANY_DEPTH)]
+    deep = [regex[len(_ANY_DEPTH) :] for regex in regexes if regex not in anchored]
+
+    alternatives = [f"(?:{regex})" for regex in anchored]
+    if deep:
+        prefix = "^" if names_only else _ANY_DEPTH
+        alternatives.append(f"{prefix}(?:{'|'.join(deep)})")
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives))
+
 
 class FileFilterServiceImpl:
     """Concrete implementation of file filter service."""
 
     def __init__(
-        self, only_extensions: set[str] | None = None, profile: str | None = None
+        self,
+        only_extensions: set[str] | None = None,
+        profile: str | None = None,
+        binary_cache: StatCache[bool] | None = None,
     ):
         """Initialize file filter service."""
         self.only_extensions = only_extensions
         self.profile = profile
+        self.binary_cache = binary_cache
+        # Extensions without dots, as compared with file suffixes
+        self._allowed_extensions = (
+            {ext.lstrip(".") for ext in only_extensions} if only_extensions else None
+        )
 
     def should_process(self, file_path: Path, repo_root: Path) -> bool:
         """Check if a file should be processed."""
+        return self.skip_reason(file_path, repo_root) is None
+
+    def skip_reason(self, file_path: Path, repo_root: Path) -> str | None:
+        """Return why a file should be skipped, or None to process it."""
         # Check if file is binary
-        if detect_binary(file_path):
-            return False
+        if self._is_binary(file_path):
+            return SKIP_BINARY
 
         # Check extension filter
-        if self.only_extensions:
-            extension = file_path.suffix.lstrip(".").lower()
-            # Convert extensions set to same format (without dots) for comparison
-            allowed_extensions = {ext.lstrip(".") for ext in self.only_extensions}
-            if extension not in allowed_extensions:
-                return False
+        if self._excluded_extension(file_path.name):
+            return SKIP_EXTENSION
 
         # Apply profile-specific filters
-        if self.profile == "minimal":
-            # For minimal profile, limit markdown files to 8KB
-            if file_path.suffix.lower() in [".md", ".markdown"]:
-                try:
-                    file_size = file_path.stat().st_size
-                    if file_size > 8 * 1024:  # 8KB limit
-                        return False
-                except OSError:
-                    return False
+        if self._size_limited(file_path.name):
+            try:
+                if file_path.stat().st_size > MINIMAL_PROFILE_MARKDOWN_MAX_BYTES:
+                    return SKIP_PROFILE
+            except OSError:
+                return SKIP_PROFILE
 
-        return True
+        return None
+
+    def skip_reason_by_name(self, name: str, size: int) -> str | None:
+        """Return why a file would be skipped, judging binaries by name only."""
+        if is_binary_name(name):
+            return SKIP_BINARY
+
+        if self._excluded_extension(name):
+            return SKIP_EXTENSION
+
+        if self._size_limited(name) and size > MINIMAL_PROFILE_MARKDOWN_MAX_BYTES:
+            return SKIP_PROFILE
+
+        return None
+
+    def _is_binary(self, file_path: Path) -> bool:
+        """Detect binary files, reusing earlier answers for unchanged files."""
+        if self.binary_cache is None or is_binary_name(file_path.name):
+            return detect_binary(file_path)
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return True
+
+        key = str(file_path)
+        binary = self.binary_cache.get(key, stat)
+        if binary is None:
+            binary = detect_binary(file_path)
+            self.binary_cache.put(key, stat, binary)
+        return binary
+
+    def _excluded_extension(self, name: str) -> bool:
+        """Check if the extension filter excludes a file name."""
+        if self._allowed_extensions is None:
+            return False
+        extension = os.path.splitext(name)[1].lstrip(".").lower()
+        return extension not in self._allowed_extensions
+
+    def _size_limited(self, name: str) -> bool:
+        """Check if the profile limits the size of a file, as minimal does markdown."""
+        return (
+            self.profile == "minimal"
+            and os.path.splitext(name)[1].lower() in MARKDOWN_EXTENSIONS
+        )
 
 
 class FileProcessorServiceImpl:
     """Concrete implementation of file processor service."""
 
-    def __init__(self, file_system_repo: FileSystemRepository):
+    def __init__(
+        self,
+        file_system_repo: FileSystemRepository,
+        skeleton_renderer: SkeletonRenderer | None = None,
+        skeleton_min_tokens: int = 0,
+        stats: RunStats | None = None,
+        token_cache: TokenCountCache | None = None,
+        file_cache: StatCache[FileInfo] | None = None,
+    ):
         """Initialize file processor service."""
         self.file_system_repo = file_system_repo
+        self.skeleton_renderer = skeleton_renderer
+        self.skeleton_min_tokens = skeleton_min_tokens
+        self.stats = stats or RunStats()
+        self.token_cache = token_cache
+        self.file_cache = file_cache  # Processed files kept by a long-lived process
 
     def process_file(self, file_path: Path, repo_root: Path) -> FileInfo | None:
         """Process a file and return file information."""
-        content = self.file_system_repo.read_file(file_path)
-        if not content:
-            return None
-
         try:
             relative_path = file_path.relative_to(repo_root)
         except ValueError:
             relative_path = file_path
 
-        byte_count = len(content.encode("utf-8"))
-        token_count = estimate_tokens(content)
+        # Stat before reading, so a file changed meanwhile gets a fresh count
+        stat = self._stat_for_caches(file_path)
+        if self.file_cache is not None and stat:
+            cached = self.file_cache.get(str(file_path), stat)
+            if cached is not None:
+                return cached
+
+        with self.stats.measure("read", relative_path):
+            content = self.file_system_repo.read_file(file_path)
+        if not content:
+            return None
+
+        with self.stats.measure("tokenize", relative_path, len(content)):
+            token_count = estimate_tokens(content)
         language = guess_language(file_path)
+        if self.token_cache and stat:
+            self.token_cache.record(
+                relative_path.as_posix(), stat.st_size, stat.st_mtime_ns, token_count
+            )
 
-        return FileInfo(
+        skeleton = self._render_skeleton(file_path, content, token_count)
+        if skeleton is not None:
+            content = skeleton
+            with self.stats.measure("tokenize"):
+                token_count = estimate_tokens(content)
+
+        file_info = FileInfo(
             path=file_path,
             relative_path=relative_path,
             content=content,
-            byte_count=byte_count,
+            byte_count=len(content.encode("utf-8")),
             token_count=token_count,
             language=language,
+            skeleton=skeleton is not None,
         )
+        if self.file_cache is not None and stat:
+            self.file_cache.put(str(file_path), stat, file_info)
+        return file_info
 
+    def _stat_for_caches(self, file_path: Path) -> os.stat_result | None:
+        """Stat a file whose results will be cached, if caching is on."""
+        if not self.token_cache and self.file_cache is None:
+            return None
+        try:
+            return file_path.stat()
+        except OSError:
+            return None
 
-class ContextWriterServiceImpl:
-    """Concrete implementation of context writer service."""
+    def _render_skeleton(
+        self, file_path: Path, content: str, token_count: int
+    ) -> str | None:
+        """Render a skeleton if skeleton mode applies to this file."""
+        if not self.skeleton_renderer:
+            return None
 
-    def __init__(self, output_dir: Path, max_tokens: int):
-        """Initialize context writer service."""
-        self.output_dir = output_dir
-        self.max_tokens = max_tokens
-        self.current_part = 1
-        self.current_tokens = 0
-        self.current_file: TextIO | None = None
-        self.files_written = 0
+        if file_path.suffix.lower() not in SKELETON_EXTENSIONS:
+            return None
+
+        if token_count <= self.skeleton_min_tokens:
+            return None
+
+        with self.stats.measure("skeleton"):
+            return self.skeleton_renderer.render(content)
+
+
+class _ContextWriterBase(ABC):
+    """Splitting of file sections into parts and rendering, shared by writers."""
+
+    def __init__(
+        self,
+        max_tokens: int,
+        optimize_stages: frozenset[str] = frozenset(),
+    ):
+        """Initialize part splitting and the content optimizers."""
+        self.max_tokens = max_tokens
+        self.markdown_optimizer = TextOptimizer(MARKDOWN_STAGES | optimize_stages)
+        self.text_optimizer = TextOptimizer(optimize_stages)
+        self.current_part = 1
+        self.current_tokens = 0
+        self.files_written = 0  # Parts started so far
 
     def write_file_section(self, file_info: FileInfo) -> None:
         """Write a file section to the current part."""
@@ -503,7 +1569,7 @@ class ContextWriterServiceImpl:
         if self._should_start_new_part(file_info):
             self.current_part += 1
             self._start_new_part()
-        elif self.current_file is None:
+        elif self.files_written == 0:
             self._start_new_part()
 
         self._write_file_content(file_info)
@@ -511,102 +1577,107 @@ class ContextWriterServiceImpl:
 
     def finalize(self) -> int:
         """Finalize writing and return number of parts written."""
-        if self.current_file:
-            self.current_file.close()
-            self.current_file = None
-
         return self.files_written
 
     def _should_start_new_part(self, file_info: FileInfo) -> bool:
         """Check if we should start a new part for this file."""
         return (
-            self.current_file is not None
+            self.files_written > 0
             and self.current_tokens + file_info.token_count > self.max_tokens
             and self.current_tokens > 0
         )
 
+    def _start_new_part(self) -> None:
+        """Start counting tokens of a new part."""
+        self.current_tokens = 0
+        self.files_written += 1
+
+    @abstractmethod
+    def _write_file_content(self, file_info: FileInfo) -> None:
+        """Emit the rendered section of a file."""
+
+    def _optimize_content(self, content: str, file_path: Path) -> str:
+        """Optimize content to reduce token usage."""
+        if is_markdown(file_path):
+            return self._optimize_markdown_content(content, file_path)
+
+        return self.text_optimizer.optimize(content)
+
     def _optimize_markdown_content(self, content: str, file_path: Path) -> str:
         """Optimize markdown content to reduce token usage."""
         # Only optimize markdown and README files
-        if not (
-            file_path.suffix.lower() in [".md", ".markdown"]
-            or file_path.name.lower().startswith("readme")
-        ):
+        if not is_markdown(file_path):
             return content
 
-        lines = content.split("\n")
-        optimized_lines = []
-        i = 0
-
-        while i < len(lines):
-            line = lines[i]
-
-            # Collapse multiple consecutive badge lines (starting with [![)
-            if line.strip().startswith("[!["):
-                badge_lines = [line]
-                j = i + 1
-                while j < len(lines) and lines[j].strip().startswith("[!["):
-                    badge_lines.append(lines[j])
-                    j += 1
-
-                # If we found multiple badge lines, collapse them
-                if len(badge_lines) > 3:
-                    # Keep first 2 badges and add a collapsed indicator
-                    optimized_lines.extend(badge_lines[:2])
-                    optimized_lines.append(
-                        f"<!-- {len(badge_lines) - 2} more badges -->"
-                    )
-                else:
-                    optimized_lines.extend(badge_lines)
+        return self.markdown_optimizer.optimize(content)
 
-                i = j
-                continue
+    def _render_section(self, file_info: FileInfo) -> str:
+        """Render the Markdown section of a file."""
+        lines = [f"{file_info.relative_path}\n"]
+        if file_info.summary:
+            lines.append(f"**Summary:** {file_info.summary}\n\n")
+        if file_info.omitted_tokens:
+            lines.append(
+                f"*Summary only: {file_info.omitted_tokens:,} tokens of content "
+                "omitted to fit the token budget*\n"
+            )
+            lines.append("---\n\n")
+            return "".join(lines)
 
-            # Skip excessive blank lines (more than 2 consecutive)
-            if line.strip() == "":
-                blank_count = 1
-                j = i + 1
-                while j < len(lines) and lines[j].strip() == "":
-                    blank_count += 1
-                    j += 1
-
-                # Keep at most 1 blank line
-                if blank_count > 1:
-                    optimized_lines.append("")
-                else:
-                    optimized_lines.append(line)
+        optimized_content = self._optimize_content(file_info.content, file_info.path)
 
-                i = j
-                continue
+        lines.append(f"```{file_info.language}\n")
+        lines.append(f"# byte_count: {file_info.byte_count}\n")
+        lines.append(f"# est_tokens: {file_info.token_count}\n")
+        if file_info.skeleton:
+            lines.append("# skeleton: signatures only\n")
+        lines.append(optimized_content)
 
-            optimized_lines.append(line)
-            i += 1
+        if not optimized_content.endswith("\n"):
+            lines.append("\n")
 
-        return "\n".join(optimized_lines)
+        lines.append("```\n")
+        lines.append("---\n\n")
+        return "".join(lines)
 
-    def _write_file_content(self, file_info: FileInfo) -> None:
-        """Write the actual file content to the output."""
-        assert self.current_file is not None  # For mypy
 
-        self.current_file.write(f"{file_info.relative_path}\n")
-        if file_info.summary:
-            self.current_file.write(f"**Summary:** {file_info.summary}\n\n")
+class ContextWriterServiceImpl(_ContextWriterBase):
+    """Concrete implementation of context writer service."""
 
-        # Optimize content if it's markdown
-        optimized_content = self._optimize_markdown_content(
-            file_info.content, file_info.path
-        )
+    def __init__(
+        self,
+        output_dir: Path,
+        max_tokens: int,
+        optimize_stages: frozenset[str] = frozenset(),
+        verbose: bool = True,
+    ):
+        """Initialize context writer service."""
+        super().__init__(max_tokens, optimize_stages)
+        self.output_dir = output_dir
+        self.verbose = verbose  # Print the path of every part started
+        self.current_file: TextIO | None = None
 
-        self.current_file.write(f"```{file_info.language}\n")
-        self.current_file.write(f"# byte_count: {file_info.byte_count}\n")
-        self.current_file.write(f"# est_tokens: {file_info.token_count}\n")
-        self.current_file.write(optimized_content)
+    def finalize(self) -> int:
+        """Finalize writing and return number of parts written."""
+        if self.current_file:
+            self.current_file.close()
+            self.current_file = None
 
-        if not optimized_content.endswith("\n"):
-            self.current_file.write("\n")
+        return super().finalize()
 
-        self.current_file.write("```\n")
-        self.current_file.write("---\n\n")
+    def suspend(self) -> None:
+        """Close the current part file until the next section is written to it."""
+        if self.current_file:
+            self.current_file.close()
+            self.current_file = None
+
+    def _write_file_content(self, file_info: FileInfo) -> None:
+        """Write the actual file content to the output."""
+        if self.current_file is None:
+            # Reopen a part closed by suspend()
+            part_path = self.output_dir / self._get_part_filename()
+            self.current_file = open(part_path, "a", encoding="utf-8")
+        self.current_file.write(self._render_section(file_info))
 
     def _get_part_filename(self) -> str:
         """Get filename for current part."""
@@ -619,16 +1690,463 @@ class ContextWriterServiceImpl:
 
         part_path = self.output_dir / self._get_part_filename()
         self.current_file = open(part_path, "w", encoding="utf-8")
-        self.current_tokens = 0
-        self.files_written += 1
+        super()._start_new_part()
+
+        if self.verbose:
+            print(f"Writing part {self.current_part}: {part_path}")
+
+
+class InMemoryContextWriterServiceImpl(_ContextWriterBase):
+    """
+    Context writer handing rendered sections to the caller instead of files.
+
+    Sections queue up as they are rendered and are taken with drain(), so
+    a streaming caller holds one section at a time. Parts are split exactly
+    as on disk.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        optimize_stages: frozenset[str] = frozenset(),
+    ):
+        """Initialize in-memory writer."""
+        super().__init__(max_tokens, optimize_stages)
+        self._sections: deque[RenderedSection] = deque()
+
+    def drain(self) -> Iterator[RenderedSection]:
+        """Yield and forget the sections rendered since the last drain."""
+        while self._sections:
+            yield self._sections.popleft()
+
+    def render(self, file_info: FileInfo, part: int) -> RenderedSection:
+        """Render the section of a file as it would appear in part."""
+        return RenderedSection(
+            RenderedFile(
+                path=file_info.relative_path.as_posix(),
+                part=part,
+                byte_count=file_info.byte_count,
+                token_count=file_info.token_count,
+                language=file_info.language,
+                summary=file_info.summary,
+                skeleton=file_info.skeleton,
+                omitted_tokens=file_info.omitted_tokens,
+            ),
+            self._render_section(file_info),
+        )
+
+    def _write_file_content(self, file_info: FileInfo) -> None:
+        """Queue the rendered section of a file."""
+        self._sections.append(self.render(file_info, self.current_part))
+
+
+class ChatSummaryServiceImpl(ABC):
+    """
+    Summary service driving a chat completion backend concurrently.
+
+    Subclasses choose the backend; batching, caching and rate limiting are
+    shared by all of them.
+    """
+
+    def __init__(
+        self,
+        config: SummaryConfig,
+        cache: ContentCache | None = None,
+        tracer: Tracer | None = None,
+        verbose: bool = True,
+    ):
+        """Initialize summary service, optionally tracing requests."""
+        self.config = config
+        self.cache = cache
+        self.tracer = tracer
+        self.verbose = verbose  # Print each summary added and cache statistics
+        self.model = config.model
+        # Identifies who generates summaries, so backends never share entries
+        self.cache_scope = config.model
+
+    def generate_summary(self, file_info: FileInfo) -> str | None:
+        """Generate a summary for the given file."""
+        return self.generate_summaries([file_info]).get(file_info.path)
+
+    def generate_summaries(self, file_infos: Sequence[FileInfo]) -> dict[Path, str]:
+        """Generate summaries concurrently under the configured rate limits."""
+        return {
+            file_info.path: file_info.summary
+            for file_info in self.summarize_stream(file_infos)
+            if file_info.summary
+        }
+
+    def summarize_stream(self, file_infos: Iterable[FileInfo]) -> Iterator[FileInfo]:
+        """
+        Yield file infos with summaries attached, in input order.
+
+        Requests run on a background event loop while further files are read
+        from the input, so a slow request only delays its own file. At most
+        a window of files is held in flight; small files accumulate into
+        batches until a batch is full or its first file is next to be yielded.
+        """
+        # Imported here so runs without summaries do not load asyncio and HTTP
+        from concurrent.futures import Future
+
+        from .summary import AsyncSummaryEngine, EventLoopThread
+
+        # Enough lookahead to keep every request slot busy with full batches
+        window_size = self.config.concurrency * SUMMARY_BATCH_MAX_FILES
+        window: deque[tuple[FileInfo, Future[str | None]]] = deque()
+        batch: list[tuple[FileInfo, Future[str | None]]] = []
+
+        with EventLoopThread() as loop_thread:
+            backend = self._create_backend()
+            engine = AsyncSummaryEngine(
+                backend,
+                SUMMARY_MAX_RESPONSE_TOKENS,
+                concurrency=self.config.concurrency,
+                requests_per_minute=self.config.requests_per_minute,
+                tokens_per_minute=self.config.tokens_per_minute,
+                tracer=self.tracer,
+            )
+
+            try:
+                for file_info in file_infos:
+                    future = self._resolve_locally(file_info)
+                    if future is None and self._is_batchable(file_info):
+                        if self._batch_is_full(batch, file_info):
+                            self._submit_batch(loop_thread, engine, batch)
+                            batch = []
+                        future = Future()
+                        batch.append((file_info, future))
+                    elif future is None and file_info.token_count > MAX_SUMMARY_TOKENS:
+                        future = loop_thread.submit(
+                            self._summarize_large_file(engine, file_info)
+                        )
+                    elif future is None:
+                        future = loop_thread.submit(
+                            self._summarize_file(engine, file_info)
+                        )
+                    window.append((file_info, future))
+
+                    while window and (len(window) > window_size or window[0][1].done()):
+                        if batch and not window[0][1].done():
+                            self._submit_batch(loop_thread, engine, batch)
+                            batch = []
+                        yield self._with_summary(*window.popleft())
+
+                if batch:
+                    self._submit_batch(loop_thread, engine, batch)
+                while window:
+                    yield self._with_summary(*window.popleft())
+            finally:
+                loop_thread.submit(backend.aclose()).result()
+
+        if self.cache:
+            self.cache.prune()
+            stats = self.cache.stats
+            if self.verbose:
+                print(f"Summary cache: {stats.hits} hits, {stats.misses} misses")
+
+    @abstractmethod
+    def _create_backend(self) -> "ChatBackend":
+        """Create the backend used for one stream of requests."""
+
+    def _resolve_locally(self, file_info: FileInfo) -> "Future[str | None] | None":
+        """Return a completed future for files that need no request."""
+        from concurrent.futures import Future
+
+        if not file_info.content.strip():
+            summary = None
+        elif file_info.token_count > MAX_MAP_REDUCE_TOKENS:
+            summary = self._too_large_message(file_info)
+        else:
+            summary = self._get_cached_summary(file_info)
+            if not summary:
+                return None
+
+        future: Future[str | None] = Future()
+        future.set_result(summary)
+        return future
+
+    def _is_batchable(self, file_info: FileInfo) -> bool:
+        """Check whether a file is small enough to share a request."""
+        return (
+            self.config.batch_tokens > 0
+            and file_info.token_count <= SUMMARY_BATCH_MAX_FILE_TOKENS
+        )
+
+    def _batch_is_full(
+        self, batch: "list[tuple[FileInfo, Future[str | None]]]", file_info: FileInfo
+    ) -> bool:
+        """Check whether adding a file would exceed the batch limits."""
+        batch_tokens = sum(member.token_count for member, _ in batch)
+        return bool(batch) and (
+            batch_tokens + file_info.token_count > self.config.batch_tokens
+            or len(batch) >= SUMMARY_BATCH_MAX_FILES
+        )
+
+    def _submit_batch(
+        self,
+        loop_thread: "EventLoopThread",
+        engine: "AsyncSummaryEngine",
+        batch: "list[tuple[FileInfo, Future[str | None]]]",
+    ) -> None:
+        """Schedule a batch; its coroutine resolves each member's future."""
+        loop_thread.submit(self._summarize_batch(engine, batch))
+
+    def _with_summary(
+        self, file_info: FileInfo, future: "Future[str | None]"
+    ) -> FileInfo:
+        """Wait for a file's summary and attach it."""
+        summary = future.result()
+        return replace(file_info, summary=summary) if summary else file_info
+
+    async def _summarize_file(
+        self, engine: "AsyncSummaryEngine", file_info: FileInfo
+    ) -> str | None:
+        """Summarise a single file, warning instead of raising on failure."""
+        try:
+            summary = await engine.summarize(self._create_summary_request(file_info))
+        except Exception as e:
+            print(
+                f"Warning: Failed to generate summary for {file_info.relative_path}: {e}",
+                file=sys.stderr,
+            )
+            return None
+
+        if not summary.strip():
+            return None
+        return self._add_generated_summary(file_info, summary)
+
+    async def _summarize_large_file(
+        self, engine: "AsyncSummaryEngine", file_info: FileInfo
+    ) -> str | None:
+        """Summarise chunks of a large file concurrently, then combine them."""
+        import asyncio
+
+        chunks = split_source(
+            file_info.content, file_info.language, SUMMARY_CHUNK_TOKENS
+        )
+        chunk_summaries = await asyncio.gather(
+            *(
+                self._summarize_chunk(engine, file_info, index, len(chunks), chunk)
+                for index, chunk in enumerate(chunks, start=1)
+            )
+        )
+        if not all(chunk_summaries):
+            return None
+
+        prompt = SUMMARY_REDUCE_PROMPT_TEMPLATE.format(
+            language=file_info.language,
+            count=len(chunks),
+            relative_path=file_info.relative_path,
+            byte_count=file_info.byte_count,
+            summaries="\n".join(
+                f"Part {index}: {summary}"
+                for index, summary in enumerate(chunk_summaries, start=1)
+            ),
+        )
+        try:
+            summary = await engine.summarize(self._create_request(file_info, prompt))
+        except Exception as e:
+            print(
+                f"Warning: Failed to combine summaries for {file_info.relative_path}: {e}",
+                file=sys.stderr,
+            )
+            return None
+
+        if not summary.strip():
+            return None
+        return self._add_generated_summary(file_info, summary)
+
+    async def _summarize_chunk(
+        self,
+        engine: "AsyncSummaryEngine",
+        file_info: FileInfo,
+        index: int,
+        count: int,
+        chunk: str,
+    ) -> str | None:
+        """Summarise one chunk, reusing cached summaries of identical chunks."""
+        cache_key = (
+            f"{self.cache_scope}:{SUMMARY_PROMPT_VERSION}:chunk:{content_hash(chunk)}"
+        )
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached:
+            return str(cached)
+
+        prompt = SUMMARY_CHUNK_PROMPT_TEMPLATE.format(
+            language=file_info.language,
+            relative_path=file_info.relative_path,
+            index=index,
+            count=count,
+            content=chunk,
+        )
+        try:
+            summary = await engine.summarize(self._create_request(file_info, prompt))
+        except Exception as e:
+            print(
+                f"Warning: Failed to summarize part {index} of "
+                f"{file_info.relative_path}: {e}",
+                file=sys.stderr,
+            )
+            return None
+
+        summary = summary.strip()
+        if summary and self.cache:
+            self.cache.set(cache_key, summary)
+        return summary or None
 
-        print(f"Writing part {self.current_part}: {part_path}")
+    async def _summarize_batch(
+        self,
+        engine: "AsyncSummaryEngine",
+        batch: "list[tuple[FileInfo, Future[str | None]]]",
+    ) -> None:
+        """Summarise a batch and resolve the future of every member."""
+        file_infos = [file_info for file_info, _ in batch]
+        try:
+            summaries = await self._batch_summaries(engine, file_infos)
+        except Exception as e:
+            print(f"Warning: Failed to generate summaries: {e}", file=sys.stderr)
+            summaries = {}
+
+        for file_info, future in batch:
+            future.set_result(summaries.get(file_info.path))
+
+    async def _batch_summaries(
+        self, engine: "AsyncSummaryEngine", batch: list[FileInfo]
+    ) -> dict[Path, str]:
+        """Summarise files in one request, retrying missing files alone."""
+        import asyncio
+
+        from .summary import parse_batch_response
+
+        summaries: dict[Path, str] = {}
+        missing = batch
+
+        if len(batch) > 1:
+            try:
+                response = await engine.summarize(self._create_batch_request(batch))
+            except Exception as e:
+                print(
+                    f"Warning: Batched summary of {len(batch)} files failed, "
+                    f"retrying individually: {e}",
+                    file=sys.stderr,
+                )
+            else:
+                parsed = parse_batch_response(response)
+                missing = []
+                for file_id, file_info in enumerate(batch, start=1):
+                    summary = parsed.get(str(file_id))
+                    if summary:
+                        summaries[file_info.path] = self._add_generated_summary(
+                            file_info, summary
+                        )
+                    else:
+                        missing.append(file_info)
+
+        results = await asyncio.gather(
+            *(self._summarize_file(engine, file_info) for file_info in missing)
+        )
+        for file_info, result in zip(missing, results, strict=True):
+            if result:
+                summaries[file_info.path] = result
+
+        return summaries
+
+    def _add_generated_summary(self, file_info: FileInfo, summary: str) -> str:
+        """Cache and report a freshly generated summary."""
+        summary = summary.strip()
+        self._cache_summary(file_info, summary)
+        if self.verbose:
+            print(f"Added summary for file {file_info.relative_path}")
+        return summary
+
+    def _create_summary_request(self, file_info: FileInfo) -> "SummaryRequest":
+        """Create an engine request summarising a single file."""
+        return self._create_request(file_info, self._create_summary_prompt(file_info))
+
+    def _create_request(self, file_info: FileInfo, prompt: str) -> "SummaryRequest":
+        """Create an engine request for a prompt about a file."""
+        from .summary import SummaryRequest
+
+        return SummaryRequest(
+            key=str(file_info.path),
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+            prompt=prompt,
+            estimated_tokens=estimate_tokens(prompt) + SUMMARY_MAX_RESPONSE_TOKENS,
+        )
+
+    def _create_batch_request(self, batch: list[FileInfo]) -> "SummaryRequest":
+        """Create an engine request summarising several small files at once."""
+        from .summary import SummaryRequest
+
+        prompt = self._create_batch_prompt(batch)
+        max_response_tokens = SUMMARY_MAX_RESPONSE_TOKENS * len(batch)
+        return SummaryRequest(
+            key=f"batch:{batch[0].path}",
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+            prompt=prompt,
+            estimated_tokens=estimate_tokens(prompt) + max_response_tokens,
+            max_response_tokens=max_response_tokens,
+        )
+
+    def _summary_cache_key(self, file_info: FileInfo) -> str:
+        """Cache key covering file content, model and prompt version."""
+        return f"{self.cache_scope}:{SUMMARY_PROMPT_VERSION}:{content_hash(file_info.content)}"
+
+    def _get_cached_summary(self, file_info: FileInfo) -> str | None:
+        """Return a previously generated summary for identical content."""
+        if not self.cache:
+            return None
 
+        cached = self.cache.get(self._summary_cache_key(file_info))
+        return str(cached) if cached else None
 
-class OpenAISummaryServiceImpl:
+    def _cache_summary(self, file_info: FileInfo, summary: str) -> None:
+        """Store a generated summary for reuse on later runs."""
+        if self.cache:
+            self.cache.set(self._summary_cache_key(file_info), summary)
+
+    def _too_large_message(self, file_info: FileInfo) -> str:
+        """Placeholder summary for files too large to summarise."""
+        return (
+            f"File too large for summary generation ({file_info.token_count:,} tokens)"
+        )
+
+    def _create_summary_prompt(self, file_info: FileInfo) -> str:
+        """Create a prompt for summarizing the file."""
+        return SUMMARY_PROMPT_TEMPLATE.format(
+            language=file_info.language,
+            relative_path=file_info.relative_path,
+            byte_count=file_info.byte_count,
+            content=file_info.content,
+        )
+
+    def _create_batch_prompt(self, batch: list[FileInfo]) -> str:
+        """Create a prompt summarizing several files, identified by 1-based ids."""
+        files = "\n".join(
+            SUMMARY_BATCH_FILE_TEMPLATE.format(
+                file_id=file_id,
+                relative_path=file_info.relative_path,
+                language=file_info.language,
+                byte_count=file_info.byte_count,
+                content=file_info.content,
+            )
+            for file_id, file_info in enumerate(batch, start=1)
+        )
+        return SUMMARY_BATCH_PROMPT_TEMPLATE.format(files=files)
+
+
+class OpenAISummaryServiceImpl(ChatSummaryServiceImpl):
     """Concrete implementation of summary service using OpenAI."""
 
-    def __init__(self, api_key: str | None = None, model: str = DEFAULT_OPENAI_MODEL):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = DEFAULT_OPENAI_MODEL,
+        config: SummaryConfig | None = None,
+        cache: ContentCache | None = None,
+        tracer: Tracer | None = None,
+        verbose: bool = True,
+    ):
         """Initialize OpenAI summary service."""
         try:
             import openai
@@ -644,9 +2162,15 @@ class OpenAISummaryServiceImpl:
                 "OpenAI API key required. Set OPENAI_API_KEY environment variable."
             )
 
+        super().__init__(config or SummaryConfig(model=model), cache, tracer, verbose)
+
         try:
-            self.client = openai.OpenAI(api_key=api_key)
-            self.model = model
+            self.client = openai.OpenAI(
+                api_key=api_key,
+                base_url=self.config.base_url,
+                timeout=self.config.timeout,
+            )
+            self.api_key = api_key
         except Exception as e:
             raise RuntimeError(f"Failed to initialize OpenAI client: {e}") from e
 
@@ -655,19 +2179,20 @@ class OpenAISummaryServiceImpl:
         if not file_info.content.strip():
             return None
 
-        # Skip very large files to avoid token limits
+        # Large files are summarised in chunks by the concurrent engine
         if file_info.token_count > MAX_SUMMARY_TOKENS:
-            return f"File too large for summary generation ({file_info.token_count:,} tokens)"
+            return super().generate_summary(file_info)
+
+        cached = self._get_cached_summary(file_info)
+        if cached:
+            return cached
 
         try:
             prompt = self._create_summary_prompt(file_info)
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a code analysis expert. Generate concise, informative summaries of code files.",
-                    },
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 max_tokens=SUMMARY_MAX_RESPONSE_TOKENS,
@@ -675,26 +2200,108 @@ class OpenAISummaryServiceImpl:
             )
 
             summary = response.choices[0].message.content
-            return summary.strip() if summary else None
-
         except Exception as e:
             raise RuntimeError(f"OpenAI API error: {e}") from e
 
-    def _create_summary_prompt(self, file_info: FileInfo) -> str:
-        """Create a prompt for summarizing the file."""
-        return f"""Analyze this {file_info.language} file and provide a concise summary (2-3 sentences) that covers:
-1. What this file does/its purpose
-2. Key functions, classes, or components
-3. Notable patterns or architectural decisions
+        if not summary or not summary.strip():
+            return None
 
-File: {file_info.relative_path}
-Language: {file_info.language}
-Size: {file_info.byte_count} bytes
+        self._cache_summary(file_info, summary.strip())
+        return summary.strip()
 
-Content:
-{file_info.content}
+    def _create_backend(self) -> "ChatBackend":
+        """Create an asynchronous OpenAI backend."""
+        from .summary import OpenAIChatBackend
 
-Summary:"""
+        return OpenAIChatBackend(
+            self.api_key,
+            self.model,
+            self.config.base_url,
+            SUMMARY_TEMPERATURE,
+            self.config.timeout,
+        )
+
+
+class LocalSummaryServiceImpl(ChatSummaryServiceImpl):
+    """Summary service for self-hosted OpenAI-compatible endpoints."""
+
+    def __init__(
+        self,
+        config: SummaryConfig | None = None,
+        cache: ContentCache | None = None,
+        api_key: str | None = None,
+        tracer: Tracer | None = None,
+        verbose: bool = True,
+    ):
+        """Initialize service; needs no extra packages or API key."""
+        super().__init__(
+            config or SummaryConfig(backend=SUMMARY_BACKEND_LOCAL),
+            cache,
+            tracer,
+            verbose,
+        )
+        self.base_url = self.config.base_url or DEFAULT_LOCAL_BASE_URL
+        self.api_key = api_key
+        self.cache_scope = f"{self.base_url}|{self.model}"
+
+        # Fail early on malformed endpoint URLs
+        self._create_backend()
+
+    def _create_backend(self) -> "ChatBackend":
+        """Create a pooled HTTP backend for the endpoint."""
+        from .summary import HTTPChatBackend
+
+        return HTTPChatBackend(
+            self.base_url,
+            self.model,
+            self.api_key,
+            SUMMARY_TEMPERATURE,
+            self.config.timeout,
+            self.config.concurrency,
+        )
+
+
+class ExtractiveSummaryServiceImpl:
+    """
+    Offline summary service built from docstrings, comments and exported names.
+
+    Needs no network or model, so it works in air-gapped environments and
+    is cheap enough to run on every file.
+    """
+
+    def __init__(self, cache: ContentCache | None = None):
+        """Initialize service with an optional persistent cache."""
+        self.cache = cache
+
+    def generate_summary(self, file_info: FileInfo) -> str | None:
+        """Extract a summary for the given file."""
+        if file_info.language != "python" or not self.cache:
+            return extract_summary(file_info.content, file_info.language)
+
+        # Parsing dominates for Python, so reuse results for unchanged files
+        key = f"{EXTRACTIVE_VERSION}:{content_hash(file_info.content)}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return str(cached["summary"]) if cached["summary"] else None
+
+        summary = extract_summary(file_info.content, file_info.language)
+        self.cache.set(key, {"summary": summary})
+        return summary
+
+    def generate_summaries(self, file_infos: Sequence[FileInfo]) -> dict[Path, str]:
+        """Extract summaries for many files, keyed by file path."""
+        summaries: dict[Path, str] = {}
+        for file_info in file_infos:
+            summary = self.generate_summary(file_info)
+            if summary:
+                summaries[file_info.path] = summary
+        return summaries
+
+    def summarize_stream(self, file_infos: Iterable[FileInfo]) -> Iterator[FileInfo]:
+        """Yield file infos with extracted summaries attached."""
+        for file_info in file_infos:
+            summary = self.generate_summary(file_info)
+            yield replace(file_info, summary=summary) if summary else file_info
 
 
 class NoOpSummaryServiceImpl:
@@ -704,6 +2311,14 @@ class NoOpSummaryServiceImpl:
         """Return None as no summary is generated."""
         return None
 
+    def generate_summaries(self, file_infos: Sequence[FileInfo]) -> dict[Path, str]:
+        """Return no summaries."""
+        return {}
+
+    def summarize_stream(self, file_infos: Iterable[FileInfo]) -> Iterator[FileInfo]:
+        """Pass file infos through unchanged."""
+        return iter(file_infos)
+
 
 # === APPLICATION LAYER: Service Factory ===
 
@@ -720,18 +2335,49 @@ class ContextGenerationServiceFactory:
         only_extensions: list[str] | None = None,
         enable_summary: bool = False,
         profile: str | None = None,
+        skeleton_min_tokens: int | None = None,
+        cache_dir: Path | None = None,
+        optimize_stages: list[str] | None = None,
+        summary_config: SummaryConfig | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        token_budget: int | None = None,
+        trace_path: Path | None = None,
+        memory_report: bool = False,
+        focus_path: Path | None = None,
+        symbol: str | None = None,
+        since: str | None = None,
+        since_imports: bool = False,
+        writer_service: ContextWriterService | None = None,
+        verbose: bool = True,
+        file_system_repo: FileSystemRepository | None = None,
+        ignore_service: IgnorePatternService | None = None,
+        file_cache: StatCache[FileInfo] | None = None,
+        binary_cache: StatCache[bool] | None = None,
+        caches: ContentCacheSet | None = None,
     ) -> tuple[GenerateContextUseCase, ProcessingConfig]:
-        """Create use case with all dependencies injected."""
+        """
+        Create use case with all dependencies injected.
+
+        A given writer_service replaces the part files written to
+        output_path, which is then unused. Long-lived processes pass their
+        own file system repository, ignore service and caches to reuse
+        them across runs; persistent caches then come from caches rather
+        than being opened in cache_dir.
+        """
         # Set defaults
         repo_path = repo_path or Path.cwd()
-        output_path = output_path or repo_path / ".repo2context"
+        if caches is None and cache_dir:
+            caches = ContentCacheSet(cache_dir)
+        stages = frozenset(optimize_stages or ())
+        if writer_service is None:
+            output_path = output_path or repo_path / ".repo2context"
+            writer_service = ContextWriterServiceImpl(
+                output_path, max_tokens, stages, verbose
+            )
+        else:
+            output_path = None
 
-        # Process extensions
-        extensions_set = None
-        if only_extensions:
-            extensions_set = {
-                ext if ext.startswith(".") else f".{ext}" for ext in only_extensions
-            }
+        extensions_set = ContextGenerationServiceFactory._extension_set(only_extensions)
 
         config = ProcessingConfig(
             repo_path=repo_path,
@@ -741,18 +2387,49 @@ class ContextGenerationServiceFactory:
             only_extensions=extensions_set,
             enable_summary=enable_summary,
             profile=profile,
+            skeleton_min_tokens=skeleton_min_tokens,
+            cache_dir=cache_dir,
+            optimize_stages=stages,
+            queue_size=queue_size,
+            token_budget=token_budget,
+            trace_path=trace_path,
+            memory_report=memory_report,
+            focus_path=focus_path,
+            symbol=symbol,
+            since=since,
+            since_imports=since_imports,
         )
 
         # Create dependencies
-        file_system_repo = FileSystemRepositoryImpl()
-        ignore_service = IgnorePatternServiceImpl(rules_file, repo_path)
-        filter_service = FileFilterServiceImpl(extensions_set, profile)
-        processor_service = FileProcessorServiceImpl(file_system_repo)
-        writer_service = ContextWriterServiceImpl(output_path, max_tokens)
-
+        tracer = Tracer() if trace_path else None
+        stats = RunStats(tracer)
+        file_system_repo = file_system_repo or FileSystemRepositoryImpl()
+        ignore_service = ignore_service or IgnorePatternServiceImpl(
+            rules_file, repo_path
+        )
+        filter_service = FileFilterServiceImpl(extensions_set, profile, binary_cache)
+        skeleton_renderer = ContextGenerationServiceFactory._create_skeleton_renderer(
+            skeleton_min_tokens, caches
+        )
+        token_cache = ContextGenerationServiceFactory._create_token_cache(
+            caches, repo_path
+        )
+        processor_service = FileProcessorServiceImpl(
+            file_system_repo,
+            skeleton_renderer,
+            skeleton_min_tokens or 0,
+            stats,
+            token_cache,
+            file_cache,
+        )
         # Create summary service
         summary_service = ContextGenerationServiceFactory._create_summary_service(
-            enable_summary
+            enable_summary, summary_config, caches, tracer, verbose
+        )
+        budget_summary_service = (
+            ContextGenerationServiceFactory._create_extractive_service(caches)
+            if token_budget is not None
+            else None
         )
 
         # Create use case with injected dependencies
@@ -763,23 +2440,193 @@ class ContextGenerationServiceFactory:
             processor_service=processor_service,
             writer_service=writer_service,
             summary_service=summary_service,
+            budget_summary_service=budget_summary_service,
+            stats=stats,
+            memory=ContextGenerationServiceFactory._create_memory_tracker(
+                memory_report
+            ),
+            token_cache=token_cache,
+            import_graph=(
+                ContextGenerationServiceFactory._create_import_graph(
+                    file_system_repo, repo_path, caches
+                )
+                if focus_path is not None or since_imports
+                else None
+            ),
+            symbol_index=(
+                ContextGenerationServiceFactory._create_symbol_index(
+                    file_system_repo, repo_path, caches
+                )
+                if symbol is not None
+                else None
+            ),
+            verbose=verbose,
+        )
+
+        return use_case, config
+
+    @staticmethod
+    def create_estimate_use_case(
+        repo_path: Path | None = None,
+        rules_file: Path | None = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        only_extensions: list[str] | None = None,
+        profile: str | None = None,
+        cache_dir: Path | None = None,
+    ) -> tuple[EstimateContextUseCase, ProcessingConfig]:
+        """Create dry-run use case with all dependencies injected."""
+        repo_path = repo_path or Path.cwd()
+        extensions_set = ContextGenerationServiceFactory._extension_set(only_extensions)
+
+        config = ProcessingConfig(
+            repo_path=repo_path,
+            rules_file=rules_file,
+            output_path=repo_path / ".repo2context",
+            max_tokens=max_tokens,
+            only_extensions=extensions_set,
+            profile=profile,
+            cache_dir=cache_dir,
+        )
+
+        use_case = EstimateContextUseCase(
+            file_system_repo=FileSystemRepositoryImpl(),
+            ignore_service=IgnorePatternServiceImpl(rules_file, repo_path),
+            filter_service=FileFilterServiceImpl(extensions_set, profile),
+            token_cache=ContextGenerationServiceFactory._create_token_cache(
+                ContentCacheSet(cache_dir) if cache_dir else None, repo_path
+            ),
         )
 
         return use_case, config
 
     @staticmethod
-    def _create_summary_service(enable_summary: bool) -> SummaryService:
+    def _extension_set(only_extensions: list[str] | None) -> set[str] | None:
+        """Normalise extensions to a set with leading dots."""
+        if not only_extensions:
+            return None
+        return {ext if ext.startswith(".") else f".{ext}" for ext in only_extensions}
+
+    @staticmethod
+    def _create_token_cache(
+        caches: ContentCacheSet | None, repo_path: Path
+    ) -> TokenCountCache | None:
+        """Create token count cache if caching is enabled."""
+        if not caches:
+            return None
+        return TokenCountCache(caches.open(TOKEN_COUNT_NAMESPACE), repo_path)
+
+    @staticmethod
+    def _create_import_graph(
+        file_system_repo: FileSystemRepository,
+        repo_path: Path,
+        caches: ContentCacheSet | None,
+    ) -> ImportGraph:
+        """Create the import graph reading files from the repository."""
+        cache = caches.open(IMPORTS_CACHE_NAMESPACE) if caches else None
+        return ImportGraph(
+            lambda relative_path: file_system_repo.read_file(repo_path / relative_path),
+            cache,
+        )
+
+    @staticmethod
+    def _create_symbol_index(
+        file_system_repo: FileSystemRepository,
+        repo_path: Path,
+        caches: ContentCacheSet | None,
+    ) -> "SymbolIndex":
+        """Create the symbol index reading files from the repository."""
+        # Imported here so runs without --symbol do not compile its patterns
+        from .symbols import (
+            SYMBOL_FILES_NAMESPACE,
+            SYMBOLS_CACHE_NAMESPACE,
+            SymbolIndex,
+        )
+
+        return SymbolIndex(
+            lambda relative_path: file_system_repo.read_file(repo_path / relative_path),
+            repo_path,
+            caches.open(SYMBOLS_CACHE_NAMESPACE) if caches else None,
+            caches.open(SYMBOL_FILES_NAMESPACE) if caches else None,
+        )
+
+    @staticmethod
+    def _create_memory_tracker(memory_report: bool) -> "MemoryTracker | None":
+        """Create memory tracker if a memory report was asked for."""
+        if not memory_report:
+            return None
+
+        # Imported here so runs without a memory report do not load tracemalloc
+        from .memory import MemoryTracker
+
+        return MemoryTracker()
+
+    @staticmethod
+    def _create_skeleton_renderer(
+        skeleton_min_tokens: int | None, caches: ContentCacheSet | None
+    ) -> SkeletonRenderer | None:
+        """Create skeleton renderer if skeleton mode is enabled."""
+        if skeleton_min_tokens is None:
+            return None
+
+        cache = caches.open(SKELETON_CACHE_NAMESPACE) if caches else None
+        return SkeletonRenderer(cache)
+
+    @staticmethod
+    def _create_summary_service(
+        enable_summary: bool,
+        summary_config: SummaryConfig | None = None,
+        caches: ContentCacheSet | None = None,
+        tracer: Tracer | None = None,
+        verbose: bool = True,
+    ) -> SummaryService:
         """Create appropriate summary service based on configuration."""
         if not enable_summary:
             return NoOpSummaryServiceImpl()
 
+        summary_config = summary_config or SummaryConfig()
+        if summary_config.backend == SUMMARY_BACKEND_EXTRACTIVE:
+            if verbose:
+                print("Offline extractive summaries enabled")
+            return ContextGenerationServiceFactory._create_extractive_service(caches)
+
+        cache = (
+            caches.open(SUMMARY_CACHE_NAMESPACE, summary_config.cache_max_bytes)
+            if caches
+            else None
+        )
+
         try:
-            service = OpenAISummaryServiceImpl()
-            print("AI-powered summaries enabled (OpenAI)")
+            if summary_config.backend == SUMMARY_BACKEND_LOCAL:
+                local_service = LocalSummaryServiceImpl(
+                    summary_config, cache, tracer=tracer, verbose=verbose
+                )
+                if verbose:
+                    print(
+                        "AI-powered summaries enabled "
+                        f"(local endpoint {local_service.base_url})"
+                    )
+                return local_service
+
+            service = OpenAISummaryServiceImpl(
+                config=summary_config, cache=cache, tracer=tracer, verbose=verbose
+            )
+            if verbose:
+                print("AI-powered summaries enabled (OpenAI)")
             return service
         except RuntimeError as e:
-            print(f"Warning: {e}. Proceeding without summaries.", file=sys.stderr)
-            return NoOpSummaryServiceImpl()
+            print(
+                f"Warning: {e}. Falling back to offline extractive summaries.",
+                file=sys.stderr,
+            )
+            return ContextGenerationServiceFactory._create_extractive_service(caches)
+
+    @staticmethod
+    def _create_extractive_service(
+        caches: ContentCacheSet | None,
+    ) -> ExtractiveSummaryServiceImpl:
+        """Create the offline extractive summary service."""
+        cache = caches.open(EXTRACTIVE_CACHE_NAMESPACE) if caches else None
+        return ExtractiveSummaryServiceImpl(cache)
 
 
 # === PUBLIC API: Facade for backward compatibility ===
@@ -793,6 +2640,20 @@ def generate_context(
     only_extensions: list[str] | None = None,
     enable_summary: bool = False,
     profile: str | None = None,
+    skeleton_min_tokens: int | None = None,
+    cache_dir: Path | None = None,
+    optimize_stages: list[str] | None = None,
+    summary_config: SummaryConfig | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    token_budget: int | None = None,
+    stats_path: Path | None = None,
+    trace_path: Path | None = None,
+    profile_config: "ProfilerConfig | None" = None,
+    memory_report: bool = False,
+    focus_path: Path | None = None,
+    symbol: str | None = None,
+    since: str | None = None,
+    since_imports: bool = False,
 ) -> int:
     """
     Generate context files from a repository.
@@ -808,6 +2669,37 @@ def generate_context(
         only_extensions: List of file extensions to include
         enable_summary: Whether to generate AI-powered file summaries
         profile: Predefined profile for processing (e.g., 'minimal')
+        skeleton_min_tokens: Render Python files above this token count as
+            signature-only skeletons (disabled when None, 0 for all files)
+        cache_dir: Directory for persistent caches (disabled when None)
+        optimize_stages: Extra optimisation stages applied to all text files
+            (e.g., 'trailing-whitespace', 'blank-lines', 'horizontal-rules')
+        summary_config: Model, concurrency and rate limits for summaries
+        queue_size: Capacity of the queues between pipeline stages
+        token_budget: Replace the content of the least valuable files by
+            their summaries until the output fits this many tokens
+            (disabled when None)
+        stats_path: Write stage timings, item counts and skipped files
+            as JSON to this file
+        trace_path: Write per-file stage spans and summary requests as
+            Chrome trace-event JSON to this file
+        profile_config: Profile the run (not argument parsing or setup)
+            and print the slowest functions
+        memory_report: Trace allocations and report peak memory by stage,
+            the top allocation sites and the largest files held
+        focus_path: Only write the Python files this file imports, directly
+            or not, nearest first; with a token budget, summaries replace
+            the most distant files first
+        symbol: Only write the files defining this class, function or
+            variable, plainly named or qualified ("Class.method"), then the
+            files using it; with a token budget, summaries replace the
+            files using it first
+        since: Only write the files changed since this git revision,
+            committed or not, untracked files included, without walking
+            the repository
+        since_imports: With since, also write the Python files importing
+            or imported by the changed files; with a token budget,
+            summaries replace these first
 
     Returns:
         Exit code: 0 for success, 1 if files were split, 2 for fatal error
@@ -820,7 +2712,207 @@ def generate_context(
         only_extensions=only_extensions,
         enable_summary=enable_summary,
         profile=profile,
+        skeleton_min_tokens=skeleton_min_tokens,
+        cache_dir=cache_dir,
+        optimize_stages=optimize_stages,
+        summary_config=summary_config,
+        queue_size=queue_size,
+        token_budget=token_budget,
+        trace_path=trace_path,
+        memory_report=memory_report,
+        focus_path=focus_path,
+        symbol=symbol,
+        since=since,
+        since_imports=since_imports,
     )
 
-    result = use_case.execute(config)
+    if profile_config:
+        # Imported here so runs without profiling do not load the profilers
+        from .profiling import run_profiled
+
+        result = run_profiled(lambda: use_case.execute(config), profile_config)
+    else:
+        result = use_case.execute(config)
+    if stats_path:
+        _write_stats(result.to_dict(), stats_path)
     return result.exit_code
+
+
+def render_context(
+    repo_path: Path | None = None,
+    rules_file: Path | None = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    only_extensions: list[str] | None = None,
+    enable_summary: bool = False,
+    profile: str | None = None,
+    skeleton_min_tokens: int | None = None,
+    cache_dir: Path | None = None,
+    optimize_stages: list[str] | None = None,
+    summary_config: SummaryConfig | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    token_budget: int | None = None,
+) -> RenderedContext:
+    """
+    Render context parts in memory, without writing any file.
+
+    Takes the options of generate_context that do not concern output
+    files. Parts are split and rendered exactly as generate_context would
+    write them, and nothing is printed apart from warnings and errors.
+
+    Returns:
+        Rendered parts, per-file metadata and the run result; a fatal error
+        gives no parts and exit code 2
+    """
+    return collect_context(
+        iter_context(
+            repo_path=repo_path,
+            rules_file=rules_file,
+            max_tokens=max_tokens,
+            only_extensions=only_extensions,
+            enable_summary=enable_summary,
+            profile=profile,
+            skeleton_min_tokens=skeleton_min_tokens,
+            cache_dir=cache_dir,
+            optimize_stages=optimize_stages,
+            summary_config=summary_config,
+            queue_size=queue_size,
+            token_budget=token_budget,
+        )
+    )
+
+
+def iter_context(
+    repo_path: Path | None = None,
+    rules_file: Path | None = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    only_extensions: list[str] | None = None,
+    enable_summary: bool = False,
+    profile: str | None = None,
+    skeleton_min_tokens: int | None = None,
+    cache_dir: Path | None = None,
+    optimize_stages: list[str] | None = None,
+    summary_config: SummaryConfig | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    token_budget: int | None = None,
+) -> Generator[RenderedSection, None, ProcessingResult]:
+    """
+    Render context section by section, without writing any file.
+
+    Takes the same options as render_context. Each file's section is
+    yielded as soon as it is rendered, in output order, and its metadata
+    tells which part it belongs to. Reading ahead stops when the consumer
+    falls behind, and closing the generator early stops the run.
+
+    Returns:
+        The run result, as the generator's return value (e.g. from
+        ``result = yield from iter_context(...)``)
+    """
+    writer = InMemoryContextWriterServiceImpl(
+        max_tokens, frozenset(optimize_stages or ())
+    )
+    use_case, config = ContextGenerationServiceFactory.create_use_case(
+        repo_path=repo_path,
+        rules_file=rules_file,
+        max_tokens=max_tokens,
+        only_extensions=only_extensions,
+        enable_summary=enable_summary,
+        profile=profile,
+        skeleton_min_tokens=skeleton_min_tokens,
+        cache_dir=cache_dir,
+        optimize_stages=optimize_stages,
+        summary_config=summary_config,
+        queue_size=queue_size,
+        token_budget=token_budget,
+        writer_service=writer,
+        verbose=False,
+    )
+
+    return (yield from stream_context(use_case, config, writer))
+
+
+def stream_context(
+    use_case: GenerateContextUseCase,
+    config: ProcessingConfig,
+    writer: InMemoryContextWriterServiceImpl,
+) -> Generator[RenderedSection, None, ProcessingResult]:
+    """Run a use case writing to writer, yielding sections as they are rendered."""
+    stream = use_case.stream(config)
+    try:
+        for _ in stream:
+            yield from writer.drain()
+    finally:
+        stream.close()
+
+    assert use_case.result is not None  # For mypy
+    return use_case.result
+
+
+def collect_context(
+    sections: Generator[RenderedSection, None, ProcessingResult],
+) -> RenderedContext:
+    """Join streamed sections into parts, keeping the run result."""
+    parts: list[list[str]] = []
+    files: list[RenderedFile] = []
+    try:
+        while True:
+            section = next(sections)
+            if section.file.part > len(parts):
+                parts.append([])
+            parts[-1].append(section.text)
+            files.append(section.file)
+    except StopIteration as done:
+        result: ProcessingResult = done.value
+
+    return RenderedContext(["".join(part) for part in parts], files, result)
+
+
+def estimate_context(
+    repo_path: Path | None = None,
+    rules_file: Path | None = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    only_extensions: list[str] | None = None,
+    profile: str | None = None,
+    cache_dir: Path | None = None,
+    stats_path: Path | None = None,
+) -> int:
+    """
+    Estimate tokens and parts of a run without reading any file.
+
+    Args:
+        repo_path: Repository path (defaults to current directory)
+        rules_file: Custom ignore rules file
+        max_tokens: Maximum tokens per output file
+        only_extensions: List of file extensions to include
+        profile: Predefined profile for processing (e.g., 'minimal')
+        cache_dir: Directory with token counts recorded by earlier runs
+            (sizes only when None)
+        stats_path: Write the estimate as JSON to this file
+
+    Returns:
+        Exit code: 0 for success, 2 for fatal error
+    """
+    use_case, config = ContextGenerationServiceFactory.create_estimate_use_case(
+        repo_path=repo_path,
+        rules_file=rules_file,
+        max_tokens=max_tokens,
+        only_extensions=only_extensions,
+        profile=profile,
+        cache_dir=cache_dir,
+    )
+
+    estimate = use_case.execute(config)
+    if estimate is None:
+        return EXIT_ERROR
+    if stats_path:
+        _write_stats(estimate.to_dict(), stats_path)
+    return EXIT_SUCCESS
+
+
+def _write_stats(data: dict[str, Any], stats_path: Path) -> None:
+    """Write run statistics as JSON, warning if the file cannot be written."""
+    try:
+        stats_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    except OSError as e:
+        print(
+            f"Warning: Could not write statistics to {stats_path}: {e}", file=sys.stderr
+        )
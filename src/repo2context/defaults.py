@@ -0,0 +1,15 @@
+"""Defaults of opt-in features, importable without loading the features."""
+
+# === CONSTANTS ===
+
+# Summary concurrency and rate limits
+DEFAULT_SUMMARY_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+DEFAULT_BACKEND_TIMEOUT = 120.0  # Seconds per request, local models can be slow
+
+# Profiling
+DEFAULT_PROFILE_TOP = 20
+
+# Watch mode
+DEFAULT_WATCH_DEBOUNCE_MS = 50  # Quiet time that ends a burst of saves
@@ -0,0 +1,119 @@
+"""Sizing a repository from file metadata, without reading file contents."""
+
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .cache import ContentCache
+from .utils import TIKTOKEN_AVAILABLE
+
+# === CONSTANTS ===
+
+TOKEN_COUNT_NAMESPACE = "token-counts"
+TOKEN_COUNT_VERSION = 1
+TOKEN_COUNT_BATCH_SIZE = 1000  # Recorded counts written per transaction
+UNKNOWN_LANGUAGE = "(unknown)"
+ROOT_DIRECTORY = "."
+
+
+class TokenCountCache:
+    """
+    Token counts of files keyed by path, valid while size and mtime match.
+
+    Full runs record the count of every file they read; dry runs load all
+    counts for a repository in one query and use them for files whose
+    size and modification time are unchanged. Entries are replaced when a
+    file is read again, so the cache holds one count per path.
+    """
+
+    def __init__(self, cache: ContentCache, repo_root: Path):
+        """Initialize cache for files under repo_root."""
+        self.cache = cache
+        tokenizer = "tiktoken" if TIKTOKEN_AVAILABLE else "chars"
+        self.prefix = f"v{TOKEN_COUNT_VERSION}:{tokenizer}:{repo_root.resolve()}/"
+        self._pending: list[tuple[str, list[int]]] = []
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, list[int]]:
+        """Return [size, mtime_ns, tokens] by relative path for the repository."""
+        return self.cache.get_prefix(self.prefix)
+
+    def record(self, relative_path: str, size: int, mtime_ns: int, tokens: int) -> None:
+        """Remember the token count of a file, writing in batches."""
+        with self._lock:
+            self._pending.append(
+                (self.prefix + relative_path, [size, mtime_ns, tokens])
+            )
+            if len(self._pending) < TOKEN_COUNT_BATCH_SIZE:
+                return
+            pending, self._pending = self._pending, []
+        self.cache.set_many(pending)
+
+    def flush(self) -> None:
+        """Write counts recorded since the last batch."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self.cache.set_many(pending)
+
+
+@dataclass
+class EstimateGroup:
+    """Files, bytes and estimated tokens of one language or directory."""
+
+    files: int = 0
+    bytes: int = 0
+    tokens: int = 0
+
+    def add(self, size: int, tokens: int) -> None:
+        """Add one file."""
+        self.files += 1
+        self.bytes += size
+        self.tokens += tokens
+
+    def merge(self, other: "EstimateGroup") -> None:
+        """Add the totals of another group."""
+        self.files += other.files
+        self.bytes += other.bytes
+        self.tokens += other.tokens
+
+
+@dataclass(frozen=True)
+class ContextEstimate:
+    """Value object describing the estimated size of a run."""
+
+    total_files: int
+    total_bytes: int
+    total_tokens: int
+    cached_files: int  # Files whose token count came from the cache
+    parts: int
+    max_tokens: int
+    wall_seconds: float
+    by_language: dict[str, EstimateGroup] = field(default_factory=dict)
+    by_directory: dict[str, EstimateGroup] = field(default_factory=dict)
+    skipped: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the estimate as JSON-serialisable data."""
+        return asdict(self)
+
+
+def count_parts(token_counts: Iterable[int], max_tokens: int) -> int:
+    """
+    Count the parts the writer would produce for files of these sizes.
+
+    Mirrors ContextWriterServiceImpl: a file starts a new part when it
+    would overflow a part that already has content.
+    """
+    parts = 0
+    current = 0
+    for tokens in token_counts:
+        if parts == 0:
+            parts = 1
+        elif current + tokens > max_tokens and current > 0:
+            parts += 1
+            current = 0
+        current += tokens
+    return parts
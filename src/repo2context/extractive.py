@@ -0,0 +1,271 @@
+"""Offline extractive summaries built from docstrings, comments and names."""
+
+import ast
+import re
+
+# === CONSTANTS ===
+
+MAX_LISTED_NAMES = 8  # Further names are counted, not listed
+MAX_DESCRIPTION_CHARS = 200
+MAX_DOCSTRING_CHARS = 80
+
+EXTRACTIVE_VERSION = "1"  # Bump when summaries change for the same content
+EXTRACTIVE_CACHE_NAMESPACE = "extractive"
+
+# Line comment markers by language, longest first; C-style for the rest
+C_STYLE_COMMENT_PREFIXES = ("///", "//!", "//")
+HASH_COMMENT_PREFIXES = ("#",)
+LINE_COMMENT_PREFIXES: dict[str, tuple[str, ...]] = {
+    "python": HASH_COMMENT_PREFIXES,
+    "bash": HASH_COMMENT_PREFIXES,
+    "zsh": HASH_COMMENT_PREFIXES,
+    "fish": HASH_COMMENT_PREFIXES,
+    "powershell": HASH_COMMENT_PREFIXES,
+    "ruby": HASH_COMMENT_PREFIXES,
+    "perl": HASH_COMMENT_PREFIXES,
+    "r": HASH_COMMENT_PREFIXES,
+    "yaml": HASH_COMMENT_PREFIXES,
+    "toml": HASH_COMMENT_PREFIXES,
+    "conf": HASH_COMMENT_PREFIXES,
+    "makefile": HASH_COMMENT_PREFIXES,
+    "cmake": HASH_COMMENT_PREFIXES,
+    "dockerfile": HASH_COMMENT_PREFIXES,
+    "ini": ("#", ";"),
+    "sql": ("--",),
+    "lua": ("--",),
+    "matlab": ("%",),
+    "": ("#", "//"),
+}
+LICENSE_MARKERS = ("copyright", "license", "spdx-license-identifier")
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s")
+CODE_FENCE_PATTERN = re.compile(r"^```.*?^```", re.MULTILINE | re.DOTALL)
+
+_JS_EXPORTS = re.compile(
+    r"^export\s+(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(?:function\*?|class|const|let|var|interface|type|enum)\s+([A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+_PUBLIC_TYPES = re.compile(
+    r"^\s*public\s+(?:(?:static|final|abstract|sealed|partial|open|data)\s+)*"
+    r"(?:class|interface|enum|record|struct|object|fun|func)\s+(\w+)",
+    re.MULTILINE,
+)
+
+# Language -> (label, pattern capturing one name per match)
+NAME_PATTERNS: dict[str, tuple[str, re.Pattern[str]]] = {
+    "javascript": ("Exports", _JS_EXPORTS),
+    "typescript": ("Exports", _JS_EXPORTS),
+    "jsx": ("Exports", _JS_EXPORTS),
+    "tsx": ("Exports", _JS_EXPORTS),
+    "go": ("Exports", re.compile(r"^(?:func|type)\s+([A-Z]\w*)", re.MULTILINE)),
+    "rust": (
+        "Exports",
+        re.compile(
+            r"^pub(?:\([^)]*\))?\s+(?:async\s+)?"
+            r"(?:fn|struct|enum|trait|mod|const|static|type|union)\s+(\w+)",
+            re.MULTILINE,
+        ),
+    ),
+    "java": ("Exports", _PUBLIC_TYPES),
+    "kotlin": ("Exports", _PUBLIC_TYPES),
+    "csharp": ("Exports", _PUBLIC_TYPES),
+    "scala": ("Exports", _PUBLIC_TYPES),
+    "swift": ("Exports", _PUBLIC_TYPES),
+    "php": (
+        "Defines",
+        re.compile(
+            r"^\s*(?:final\s+|abstract\s+)?(?:class|interface|trait|function)\s+(\w+)",
+            re.MULTILINE,
+        ),
+    ),
+    "ruby": ("Defines", re.compile(r"^\s*(?:class|module)\s+([\w:]+)", re.MULTILINE)),
+    "bash": (
+        "Functions",
+        re.compile(r"^(?:function\s+)?([A-Za-z_][\w-]*)\s*\(\)\s*\{", re.MULTILINE),
+    ),
+    "protobuf": (
+        "Defines",
+        re.compile(r"^(?:message|service|enum)\s+(\w+)", re.MULTILINE),
+    ),
+    "graphql": (
+        "Defines",
+        re.compile(
+            r"^(?:type|input|interface|enum|union|scalar)\s+(\w+)", re.MULTILINE
+        ),
+    ),
+    "sql": (
+        "Defines",
+        re.compile(
+            r"^\s*create\s+(?:or\s+replace\s+)?"
+            r"(?:table|view|function|procedure|index)\s+"
+            r"(?:if\s+not\s+exists\s+)?([\w.\"]+)",
+            re.MULTILINE | re.IGNORECASE,
+        ),
+    ),
+    "markdown": ("Sections", re.compile(r"^#{1,2}\s+(.+?)\s*#*$", re.MULTILINE)),
+    "toml": ("Sections", re.compile(r"^\[+([^\]]+)\]+", re.MULTILINE)),
+    "ini": ("Sections", re.compile(r"^\[([^\]]+)\]", re.MULTILINE)),
+    "yaml": ("Keys", re.compile(r"^([A-Za-z_][\w.-]*):", re.MULTILINE)),
+    "json": ("Keys", re.compile(r'^\s{0,4}"([^"]+)"\s*:\s*[\[{]', re.MULTILINE)),
+}
+
+
+def extract_summary(content: str, language: str) -> str | None:
+    """
+    Summarise a file from its own documentation, without any model.
+
+    Python files are parsed with ``ast`` for the module docstring and the
+    public classes and functions with their docstrings (``__all__`` wins
+    when defined). Other languages use the top-of-file comment and names
+    matched by a per-language pattern, such as exported symbols.
+
+    Args:
+        content: File content
+        language: Language name as returned by guess_language
+
+    Returns:
+        Summary text, or None if the file documents nothing usable
+    """
+    if language == "python":
+        summary = _python_summary(content)
+        if summary is not None:
+            return summary
+
+    parts = []
+    description = _leading_comment(content, language)
+    if description:
+        parts.append(_end_sentence(description))
+
+    label, pattern = NAME_PATTERNS.get(language, ("", None))
+    if pattern is not None:
+        if language == "markdown":
+            # Comments in code blocks look like headings
+            content = CODE_FENCE_PATTERN.sub("", content)
+        names = list(dict.fromkeys(pattern.findall(content)))
+        if names:
+            parts.append(f"{label}: {_join_names(names)}.")
+
+    return " ".join(parts) or None
+
+
+def _python_summary(content: str) -> str | None:
+    """Summarise Python source; None if it does not parse."""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    parts = []
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        parts.append(_end_sentence(_first_sentence(docstring, MAX_DESCRIPTION_CHARS)))
+
+    exported = _dunder_all(tree)
+    classes: list[str] = []
+    functions: list[str] = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef):
+            continue
+        if node.name.startswith("_") if exported is None else node.name not in exported:
+            continue
+
+        entry = node.name
+        node_doc = ast.get_docstring(node)
+        if node_doc:
+            sentence = _first_sentence(node_doc, MAX_DOCSTRING_CHARS)
+            if sentence.endswith(".") and not sentence.endswith("..."):
+                sentence = sentence[:-1]
+            entry += f" ({sentence})"
+        (classes if isinstance(node, ast.ClassDef) else functions).append(entry)
+
+    if classes:
+        parts.append(f"Classes: {_join_names(classes)}.")
+    if functions:
+        parts.append(f"Functions: {_join_names(functions)}.")
+
+    return " ".join(parts) or None
+
+
+def _dunder_all(tree: ast.Module) -> set[str] | None:
+    """Names listed in a literal module-level __all__, if any."""
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(
+                isinstance(target, ast.Name) and target.id == "__all__"
+                for target in node.targets
+            )
+            and isinstance(node.value, ast.List | ast.Tuple)
+        ):
+            return {
+                element.value
+                for element in node.value.elts
+                if isinstance(element, ast.Constant) and isinstance(element.value, str)
+            }
+    return None
+
+
+def _leading_comment(content: str, language: str) -> str | None:
+    """First sentence of the comment block at the top of the file."""
+    if language == "markdown":
+        return _first_paragraph(content)
+
+    prefixes = LINE_COMMENT_PREFIXES.get(language, C_STYLE_COMMENT_PREFIXES)
+    lines: list[str] = []
+    in_block = False
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not lines and (not line or line.startswith("#!")):
+            continue
+
+        if line.startswith(("/*", "<!--")):
+            in_block = True
+            line = line.lstrip("/*<!-").strip()
+        if in_block:
+            if line.endswith(("*/", "-->")):
+                in_block = False
+                line = line.rstrip("*/->").strip()
+            lines.append(line.lstrip("*").strip())
+            if not in_block:
+                break
+            continue
+
+        prefix = next((p for p in prefixes if line.startswith(p)), None)
+        if prefix is None:
+            break
+        lines.append(line[len(prefix) :].strip())
+
+    text = " ".join(line for line in lines if line)
+    if not text or any(marker in text.lower() for marker in LICENSE_MARKERS):
+        return None
+    return _first_sentence(text, MAX_DESCRIPTION_CHARS)
+
+
+def _first_paragraph(content: str) -> str | None:
+    """First prose line of a Markdown document, skipping headings and badges."""
+    for raw_line in content.splitlines():
+        line = raw_line.strip().lstrip(">").strip()
+        if line and not line.startswith(("#", "[", "!", "<", "```", "---", "|")):
+            return _first_sentence(line, MAX_DESCRIPTION_CHARS)
+    return None
+
+
+def _first_sentence(text: str, max_chars: int) -> str:
+    """First sentence of text, truncated to max_chars."""
+    sentence = SENTENCE_END_PATTERN.split(" ".join(text.split()), maxsplit=1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[: max_chars - 3].rstrip() + "..."
+    return sentence
+
+
+def _end_sentence(text: str) -> str:
+    """Terminate text with a full stop unless it already ends a sentence."""
+    return text if text.endswith((".", "!", "?")) else f"{text}."
+
+
+def _join_names(names: list[str]) -> str:
+    """Comma-separated names, counting those beyond MAX_LISTED_NAMES."""
+    listed = ", ".join(names[:MAX_LISTED_NAMES])
+    if len(names) > MAX_LISTED_NAMES:
+        listed += f" and {len(names) - MAX_LISTED_NAMES} more"
+    return listed
@@ -0,0 +1,171 @@
+"""Python import graphs: the files reachable from one entry point."""
+
+import ast
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+
+from .cache import ContentCache
+from .utils import content_hash
+
+# === CONSTANTS ===
+
+# Bump when parsed imports change so stale cache entries are not reused
+IMPORTS_VERSION = "1"
+IMPORTS_CACHE_NAMESPACE = "imports"
+# Token budget weight kept per import between a file and the focus file
+DISTANCE_DECAY = 0.5
+
+ImportRecord = tuple[int, str, list[str]]  # Level, module and imported names
+
+
+def parse_imports(source: str) -> list[ImportRecord]:
+    """
+    List the import statements of a Python module.
+
+    Imports anywhere in the module count, including those inside functions
+    and ``if TYPE_CHECKING:`` blocks. Star imports keep only their module.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Level of relative imports (0 for absolute), module and imported
+        names per statement; nothing if the source cannot be parsed
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    records: list[ImportRecord] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            records.extend((0, alias.name, []) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names = [alias.name for alias in node.names if alias.name != "*"]
+            records.append((node.level, node.module or "", names))
+    return records
+
+
+class ModuleIndex:
+    """
+    Map dotted module names to the Python files of a repository.
+
+    A file is importable from the topmost directory of the chain of
+    packages (directories with ``__init__.py``) holding it, which covers
+    flat and ``src/`` layouts alike. Every file can also be imported by
+    its dotted path from the repository root.
+    """
+
+    def __init__(self, relative_paths: Iterable[str]):
+        """Index Python files given by relative paths with forward slashes."""
+        paths = list(relative_paths)
+        packages = {
+            path.rpartition("/")[0] for path in paths if path.endswith("__init__.py")
+        }
+        self.modules: dict[str, str] = {}
+        self._names: dict[str, tuple[list[str], bool]] = {}
+
+        aliases = []
+        for path in paths:
+            directories = path.split("/")
+            stem = directories.pop().removesuffix(".py")
+            is_package = stem == "__init__"
+            start = len(directories)
+            while start and "/".join(directories[:start]) in packages:
+                start -= 1
+            parts = directories[start:] + ([] if is_package else [stem])
+            self._names[path] = (parts, is_package)
+            if parts:
+                self.modules.setdefault(".".join(parts), path)
+            if start:
+                aliases.append((".".join(directories[:start] + parts), path))
+
+        # Import roots take precedence over paths from the repository root
+        for name, path in aliases:
+            self.modules.setdefault(name, path)
+
+    def resolve(self, relative_path: str, record: ImportRecord) -> list[str]:
+        """
+        Return the files an import statement of a file refers to.
+
+        These are imported names that are submodules, and otherwise the
+        module named. Parent packages are left out, although Python runs
+        them too, as their ``__init__.py`` often imports the whole
+        package. So are modules outside the repository.
+        """
+        level, module, names = record
+        if level:
+            parts, is_package = self._names.get(relative_path, ([], False))
+            package = parts if is_package else parts[:-1]
+            if level - 1 > len(package):
+                return []
+            base_parts = package[: len(package) - level + 1]
+            base = ".".join(base_parts + ([module] if module else []))
+        else:
+            base = module
+
+        targets = []
+        for name in names:
+            path = self.modules.get(f"{base}.{name}" if base else name)
+            if path:
+                targets.append(path)
+        if len(targets) < len(names) or not names:
+            # Some names are defined in the module itself
+            path = self.modules.get(base)
+            if path:
+                targets.append(path)
+        return targets
+
+
+class ImportGraph:
+    """Imports of Python files, parsed with ast and cached by content hash."""
+
+    def __init__(
+        self,
+        read_source: Callable[[str], str],
+        cache: ContentCache | None = None,
+    ):
+        """Initialize with a reader of files by relative path and a cache."""
+        self.read_source = read_source
+        self.cache = cache
+        self._memo: dict[str, list[ImportRecord]] = {}
+
+    def imports(self, relative_path: str) -> list[ImportRecord]:
+        """Return the import statements of a file, reusing cached results."""
+        source = self.read_source(relative_path)
+        key = f"{IMPORTS_VERSION}:{content_hash(source)}"
+        if key in self._memo:
+            return self._memo[key]
+
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            # JSON turns the tuples into lists
+            records = [(record[0], record[1], record[2]) for record in cached]
+        else:
+            records = parse_imports(source)
+            if self.cache:
+                self.cache.set(key, records)
+
+        self._memo[key] = records
+        return records
+
+    def closure(self, index: ModuleIndex, entry: str) -> Iterator[tuple[str, int]]:
+        """
+        Yield the files reachable from entry by imports, nearest first.
+
+        Each file comes with its distance in imports from entry, and is
+        yielded before its own imports are read, so callers can start on
+        it while the rest of the graph is explored.
+        """
+        distances = {entry: 0}
+        pending = deque([entry])
+        while pending:
+            path = pending.popleft()
+            distance = distances[path]
+            yield path, distance
+            for record in self.imports(path):
+                for target in index.resolve(path, record):
+                    if target not in distances:
+                        distances[target] = distance + 1
+                        pending.append(target)
@@ -0,0 +1,159 @@
+"""Peak memory accounting for a context generation run."""
+
+import heapq
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+# === CONSTANTS ===
+
+DEFAULT_MEMORY_TOP = 10
+# A new high-water mark is snapshotted once traced memory grows by this share,
+# so snapshots cost a small multiple of the last one
+SNAPSHOT_GROWTH = 0.25
+# ru_maxrss is in kilobytes everywhere but macOS, which reports bytes
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclass(frozen=True)
+class MemoryCheckpoint:
+    """Traced memory at a stage boundary and its peak since the last one."""
+
+    stage: str
+    current_bytes: int
+    peak_bytes: int
+
+
+@dataclass(frozen=True)
+class AllocationSite:
+    """Memory held by allocations from one source line."""
+
+    location: str
+    size_bytes: int
+    blocks: int
+
+
+@dataclass(frozen=True)
+class HeldFile:
+    """Memory held by the content of one file."""
+
+    path: str
+    size_bytes: int
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """Value object summarising memory use of a run."""
+
+    peak_rss_bytes: int | None
+    traced_peak_bytes: int
+    checkpoints: list[MemoryCheckpoint] = field(default_factory=list)
+    top_sites: list[AllocationSite] = field(default_factory=list)
+    largest_files: list[HeldFile] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the report as JSON-serialisable data."""
+        return asdict(self)
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process, or None where unsupported."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+class MemoryTracker:
+    """
+    Traces allocations during a run with tracemalloc.
+
+    Stages of the streaming pipeline overlap, so checkpoints mark the
+    points where one phase hands over to the next, and each records the
+    traced peak since the previous one. Call sites are taken from a
+    snapshot at the highest traced memory seen between files, which is
+    close to the true peak without snapshotting on every allocation.
+    Tracing slows allocation-heavy code several times, so it is opt-in.
+    """
+
+    def __init__(self, top: int = DEFAULT_MEMORY_TOP):
+        """Initialize tracker reporting the top entries of each list."""
+        self.top = top
+        self.checkpoints: list[MemoryCheckpoint] = []
+        self._files: list[tuple[int, str]] = []  # Min-heap of the largest files
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._snapshot_bytes = 0
+        self._traced_peak = 0
+        self._started = False
+
+    def start(self) -> None:
+        """Start tracing, unless something else already traces allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        """Stop tracing if this tracker started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def checkpoint(self, stage: str) -> None:
+        """Record memory at the end of stage and start measuring the next."""
+        current, peak = tracemalloc.get_traced_memory()
+        self.checkpoints.append(MemoryCheckpoint(stage, current, peak))
+        self._traced_peak = max(self._traced_peak, peak)
+        self._maybe_snapshot(current)
+        tracemalloc.reset_peak()
+
+    def observe(self, path: Path, size: int) -> None:
+        """Note a file held in memory and snapshot if memory hit a new high."""
+        entry = (size, str(path))
+        if len(self._files) < self.top:
+            heapq.heappush(self._files, entry)
+        elif entry > self._files[0]:
+            heapq.heapreplace(self._files, entry)
+        self._maybe_snapshot(tracemalloc.get_traced_memory()[0])
+
+    def report(self) -> MemoryReport:
+        """Build the report from the checkpoints and the peak snapshot."""
+        top_sites = []
+        if self._snapshot is not None:
+            for stat in self._snapshot.statistics("lineno")[: self.top]:
+                frame = stat.traceback[0]
+                top_sites.append(
+                    AllocationSite(
+                        f"{Path(frame.filename).name}:{frame.lineno}",
+                        stat.size,
+                        stat.count,
+                    )
+                )
+        return MemoryReport(
+            peak_rss_bytes=peak_rss_bytes(),
+            traced_peak_bytes=self._traced_peak,
+            checkpoints=list(self.checkpoints),
+            top_sites=top_sites,
+            largest_files=[
+                HeldFile(path, size) for size, path in sorted(self._files, reverse=True)
+            ],
+        )
+
+    def _maybe_snapshot(self, current: int) -> None:
+        """Snapshot traces if current memory is well above the last snapshot."""
+        if self._snapshot is not None and current < self._snapshot_bytes * (
+            1 + SNAPSHOT_GROWTH
+        ):
+            return
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        self._snapshot_bytes = current
@@ -0,0 +1,129 @@
+"""Single-pass text optimisations that reduce token usage."""
+
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+# === CONSTANTS ===
+
+# Optimisation stages
+STAGE_BADGES = "badges"
+STAGE_BLANK_LINES = "blank-lines"
+STAGE_HORIZONTAL_RULES = "horizontal-rules"
+STAGE_TRAILING_WHITESPACE = "trailing-whitespace"
+
+# Alternation order matters: earlier stages win when several could match
+OPTIMIZATION_STAGES = (
+    STAGE_BADGES,
+    STAGE_BLANK_LINES,
+    STAGE_HORIZONTAL_RULES,
+    STAGE_TRAILING_WHITESPACE,
+)
+
+# Stages always applied to markdown and README files
+MARKDOWN_STAGES = frozenset({STAGE_BADGES, STAGE_BLANK_LINES})
+MARKDOWN_EXTENSIONS = {".md", ".markdown"}
+
+# Badge collapsing
+BADGE_RUN_COLLAPSE_THRESHOLD = 3  # Collapse runs longer than this
+BADGES_KEPT = 2
+
+# Horizontal rule shortening
+HORIZONTAL_RULE_MIN_LENGTH = 8
+HORIZONTAL_RULE_LENGTH = 3
+
+# Every stage matches a whole line (or run of lines) and is anchored on the
+# newline preceding it, so the regex engine can skip between newlines with a
+# fast literal search instead of attempting a match at every character.
+# "[^\S\n]" is any whitespace except a newline, matching str.strip() per line,
+# and "(?![^\n])" asserts the end of a line.
+_STAGE_PATTERNS = {
+    STAGE_BADGES: r"(?P<badges>[^\S\n]*\[!\[[^\n]*(?:\n[^\S\n]*\[!\[[^\n]*)*)",
+    STAGE_BLANK_LINES: r"(?P<blanks>[^\S\n]*(?:\n[^\S\n]*)+)(?![^\n])",
+    STAGE_HORIZONTAL_RULES: (
+        r"(?P<rule>(?P<rule_prefix>[^\S\n]*(?:(?:#|//|--|;)[^\S\n]+)?)"
+        r"(?P<rule_char>[-=*_~+#])(?P=rule_char)"
+        rf"{{{HORIZONTAL_RULE_MIN_LENGTH - 1},}}[^\S\n]*)(?![^\n])"
+    ),
+    STAGE_TRAILING_WHITESPACE: r"(?P<trailing>(?:[^\n]*\S)?)[^\S\n]+(?![^\n])",
+}
+_TRAILING_WHITESPACE = re.compile(r"[^\S\n]+$", re.M)
+
+
+def is_markdown(file_path: Path) -> bool:
+    """
+    Check whether a file should get markdown optimisations.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        True for markdown files and README files of any extension
+    """
+    return (
+        file_path.suffix.lower() in MARKDOWN_EXTENSIONS
+        or file_path.name.lower().startswith("readme")
+    )
+
+
+class TextOptimizer:
+    """
+    Apply a set of optimisation stages in a single regex pass.
+
+    All enabled stages are compiled into one alternation, so the content is
+    scanned once regardless of how many stages are configured.
+    """
+
+    def __init__(self, stages: Iterable[str]):
+        """Initialize optimizer with the given stages."""
+        self.stages = frozenset(stages)
+
+        unknown = self.stages.difference(OPTIMIZATION_STAGES)
+        if unknown:
+            raise ValueError(
+                f"Unknown optimisation stage(s): {', '.join(sorted(unknown))}"
+            )
+
+        patterns = [
+            _STAGE_PATTERNS[stage]
+            for stage in OPTIMIZATION_STAGES
+            if stage in self.stages
+        ]
+        self._pattern = (
+            re.compile(r"\n(?:" + "|".join(patterns) + ")") if patterns else None
+        )
+
+    def optimize(self, content: str) -> str:
+        """Return content with all enabled stages applied."""
+        if self._pattern is None:
+            return content
+
+        # Prefix a newline so the first line is anchored like every other
+        return self._pattern.sub(self._replace, "\n" + content)[1:]
+
+    def _replace(self, match: re.Match[str]) -> str:
+        """Compute the replacement for a single stage match."""
+        kind = match.lastgroup
+
+        if kind == "badges":
+            badges = match["badges"]
+            if STAGE_TRAILING_WHITESPACE in self.stages:
+                badges = _TRAILING_WHITESPACE.sub("", badges)
+
+            lines = badges.split("\n")
+            if len(lines) <= BADGE_RUN_COLLAPSE_THRESHOLD:
+                return "\n" + badges
+
+            collapsed = lines[:BADGES_KEPT]
+            collapsed.append(f"<!-- {len(lines) - BADGES_KEPT} more badges -->")
+            return "\n" + "\n".join(collapsed)
+
+        if kind == "rule":
+            rule = match["rule_char"] * HORIZONTAL_RULE_LENGTH
+            return "\n" + match["rule_prefix"] + rule
+
+        if kind == "trailing":
+            return "\n" + match["trailing"]
+
+        # Runs of blank lines collapse to one empty line
+        return "\n"
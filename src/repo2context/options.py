@@ -0,0 +1,134 @@
+"""Validation of the generation options taken by the server and batch runs."""
+
+from collections.abc import Collection
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .core import DEFAULT_MAX_TOKENS, MAX_TOKENS, MIN_TOKENS, PROFILES, SUMMARY_BACKENDS
+from .optimize import OPTIMIZATION_STAGES
+
+
+class OptionError(ValueError):
+    """Raised for generation options that cannot be used."""
+
+
+@dataclass(frozen=True)
+class GenerationOptions:
+    """Value object with validated generation options."""
+
+    repo_path: Path
+    rules_file: Path | None = None
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    only_extensions: list[str] | None = None  # From the profile when one is set
+    profile: str | None = None
+    skeleton_min_tokens: int | None = None
+    optimize_stages: list[str] | None = None
+    token_budget: int | None = None
+    enable_summary: bool = False
+    summary_backend: str | None = None
+
+
+def read_options(
+    options: dict[str, Any], allowed: Collection[str], absolute_paths: bool = False
+) -> GenerationOptions:
+    """
+    Validate a dict of generation options, as decoded from JSON.
+
+    Options outside allowed are rejected. Missing or null options take
+    their defaults, and with absolute_paths relative paths are rejected.
+    """
+    unknown = set(options) - set(allowed)
+    if unknown:
+        raise OptionError(f"Unknown options: {', '.join(sorted(unknown))}")
+
+    repo_path = path_option(options, "repo_path", absolute_paths)
+    if repo_path is None:
+        raise OptionError("repo_path is required")
+
+    max_tokens = _int_option(options, "max_tokens")
+    if max_tokens is None:
+        max_tokens = DEFAULT_MAX_TOKENS
+    if not MIN_TOKENS <= max_tokens <= MAX_TOKENS:
+        raise OptionError(f"max_tokens must be between {MIN_TOKENS} and {MAX_TOKENS}")
+
+    profile = _str_option(options, "profile")
+    only_extensions = _list_option(options, "only_extensions")
+    if profile is not None:
+        if profile not in PROFILES:
+            raise OptionError(f"Unknown profile '{profile}'")
+        if only_extensions is not None:
+            raise OptionError("profile cannot be used with only_extensions")
+        only_extensions = PROFILES[profile]["extensions"]
+
+    optimize_stages = _list_option(options, "optimize_stages")
+    for stage in optimize_stages or []:
+        if stage not in OPTIMIZATION_STAGES:
+            raise OptionError(f"Unknown optimize stage '{stage}'")
+
+    enable_summary = options.get("enable_summary")
+    if enable_summary is None:
+        enable_summary = False
+    if not isinstance(enable_summary, bool):
+        raise OptionError("enable_summary must be true or false")
+    summary_backend = _str_option(options, "summary_backend")
+    if summary_backend is not None and summary_backend not in SUMMARY_BACKENDS:
+        raise OptionError(f"Unknown summary backend '{summary_backend}'")
+
+    return GenerationOptions(
+        repo_path=repo_path,
+        rules_file=path_option(options, "rules_file", absolute_paths),
+        max_tokens=max_tokens,
+        only_extensions=only_extensions,
+        profile=profile,
+        skeleton_min_tokens=_int_option(options, "skeleton_min_tokens"),
+        optimize_stages=optimize_stages,
+        token_budget=_int_option(options, "token_budget"),
+        enable_summary=enable_summary,
+        summary_backend=summary_backend,
+    )
+
+
+def path_option(
+    options: dict[str, Any], name: str, absolute: bool = False
+) -> Path | None:
+    """Read an optional path option, given as a string or a Path."""
+    value = options.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, str | Path):
+        raise OptionError(f"{name} must be a path")
+    path = Path(value)
+    if absolute and not path.is_absolute():
+        raise OptionError(f"{name} must be an absolute path")
+    return path
+
+
+def _str_option(options: dict[str, Any], name: str) -> str | None:
+    """Read an optional string option."""
+    value = options.get(name)
+    if value is not None and not isinstance(value, str):
+        raise OptionError(f"{name} must be a string")
+    return value
+
+
+def _int_option(options: dict[str, Any], name: str) -> int | None:
+    """Read an optional non-negative integer option."""
+    value = options.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise OptionError(f"{name} must be a non-negative integer")
+    return value
+
+
+def _list_option(options: dict[str, Any], name: str) -> list[str] | None:
+    """Read an optional list of strings, also accepted comma-separated."""
+    value = options.get(name)
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise OptionError(f"{name} must be a list of strings")
+    return [item.strip() for item in value]
@@ -0,0 +1,148 @@
+"""Threaded pipeline stages connected by bounded queues."""
+
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+# === CONSTANTS ===
+
+DEFAULT_QUEUE_SIZE = 64
+QUEUE_POLL_SECONDS = 0.1  # How often blocked stages check for cancellation
+
+
+class _Done:
+    """Sentinel marking the end of a stage's output."""
+
+
+class _Failure:
+    """Wrapper carrying an upstream exception to downstream stages."""
+
+    def __init__(self, error: BaseException):
+        """Store the exception to re-raise downstream."""
+        self.error = error
+
+
+class PipelineCancelled(Exception):
+    """Raised inside stage threads when the pipeline is closed early."""
+
+
+class _StageQueue:
+    """Bounded queue that records its high-water mark."""
+
+    def __init__(self, name: str, maxsize: int, cancelled: threading.Event):
+        """Initialize an empty queue."""
+        self.name = name
+        self.high_water = 0
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize)
+        self._cancelled = cancelled
+
+    def put(self, item: Any) -> None:
+        """Put an item, blocking while the queue is full (backpressure)."""
+        while True:
+            if self._cancelled.is_set():
+                raise PipelineCancelled()
+            try:
+                self._queue.put(item, timeout=QUEUE_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+
+        self.high_water = max(self.high_water, self._queue.qsize())
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield items until the producing stage finishes."""
+        while True:
+            try:
+                item = self._queue.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                if self._cancelled.is_set():
+                    raise PipelineCancelled() from None
+                continue
+
+            if isinstance(item, _Done):
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+
+class Pipeline:
+    """
+    Run a source and a chain of stages concurrently.
+
+    Each stage is a function from an iterable of inputs to an iterable of
+    outputs and runs in its own thread, reading from the previous stage's
+    bounded queue. Full queues block producers, which caps memory; single
+    threads per stage keep the output order identical to the source order.
+    Exceptions raised in any stage are re-raised to the consumer.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """Initialize an empty pipeline."""
+        self.queue_size = queue_size
+        self._cancelled = threading.Event()
+        self._queues: list[_StageQueue] = []
+        self._threads: list[threading.Thread] = []
+        self._upstream: Iterable[Any] | None = None
+
+    def source(self, name: str, items: Iterable[Any]) -> "Pipeline":
+        """Set the iterable feeding the first queue."""
+        self._upstream = items
+        return self._start(name, items)
+
+    def stage(
+        self, name: str, func: Callable[[Iterable[Any]], Iterable[Any]]
+    ) -> "Pipeline":
+        """Append a stage consuming the previous stage's output."""
+        if self._upstream is None:
+            raise RuntimeError("Pipeline.source must be called before stage")
+        return self._start(name, func(self._upstream))
+
+    @property
+    def queue_depths(self) -> dict[str, int]:
+        """High-water mark of each stage's output queue."""
+        return {
+            stage_queue.name: stage_queue.high_water for stage_queue in self._queues
+        }
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield the final stage's output."""
+        if self._upstream is None:
+            return iter(())
+        return iter(self._upstream)
+
+    def close(self) -> None:
+        """Stop all stage threads and wait for them to exit."""
+        self._cancelled.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _start(self, name: str, items: Iterable[Any]) -> "Pipeline":
+        """Pump items into a new queue from a dedicated thread."""
+        stage_queue = _StageQueue(name, self.queue_size, self._cancelled)
+        thread = threading.Thread(
+            target=self._pump,
+            args=(items, stage_queue),
+            name=f"repo2context-{name}",
+            daemon=True,
+        )
+        self._queues.append(stage_queue)
+        self._threads.append(thread)
+        self._upstream = stage_queue
+        thread.start()
+        return self
+
+    def _pump(self, items: Iterable[Any], stage_queue: _StageQueue) -> None:
+        """Move items into the queue, forwarding completion or failure."""
+        try:
+            for item in items:
+                stage_queue.put(item)
+            stage_queue.put(_Done())
+        except PipelineCancelled:
+            return
+        except BaseException as e:
+            try:
+                stage_queue.put(_Failure(e))
+            except PipelineCancelled:
+                return
@@ -0,0 +1,227 @@
+"""Profiling of a context generation run, deterministic or by sampling."""
+
+import cProfile
+import functools
+import pstats
+import sys
+import threading
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, FrameType, TracebackType
+from typing import Any, TypeVar
+
+from .defaults import DEFAULT_PROFILE_TOP
+
+T = TypeVar("T")
+
+# === CONSTANTS ===
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+SAMPLER_THREAD_NAME = "repo2context-sampler"
+# From 3.12 cProfile is built on sys.monitoring: one profiler sees every
+# thread, and a second one cannot be enabled while it runs
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+# Innermost frames of threads blocked on locks, queues or sockets
+IDLE_FUNCTIONS = frozenset(
+    {
+        "threading.py:Condition.wait",
+        "threading.py:Event.wait",
+        "threading.py:Thread._wait_for_tstate_lock",
+        "selectors.py:EpollSelector.select",
+        "selectors.py:KqueueSelector.select",
+        "selectors.py:PollSelector.select",
+        "selectors.py:SelectSelector.select",
+    }
+)
+
+
+@dataclass(frozen=True)
+class ProfilerConfig:
+    """Value object for profiling a run."""
+
+    output_path: Path
+    sampling: bool = False
+    top: int = DEFAULT_PROFILE_TOP
+    interval: float = DEFAULT_SAMPLE_INTERVAL
+
+
+def run_profiled(func: Callable[[], T], config: ProfilerConfig) -> T:
+    """
+    Run func under a profiler, write the profile and print the top functions.
+
+    The deterministic profiler records every call on every thread started
+    while it runs and writes a ``.prof`` file for pstats or snakeviz. The
+    sampling profiler only looks at thread stacks every few milliseconds,
+    which keeps overhead low enough to leave on in CI, and writes folded
+    stacks for flamegraph.pl or speedscope.
+
+    Args:
+        func: Function to profile
+        config: Output path, mode and number of functions to print
+
+    Returns:
+        Result of func
+    """
+    profiler: DeterministicProfiler | SamplingProfiler = (
+        SamplingProfiler(config.interval)
+        if config.sampling
+        else DeterministicProfiler()
+    )
+    with profiler:
+        result = func()
+
+    profiler.write(config.output_path)
+    print(f"\nProfile written to {config.output_path}")
+    profiler.print_top(config.top)
+    return result
+
+
+class DeterministicProfiler:
+    """
+    cProfile across the current thread and all threads it starts.
+
+    Before Python 3.12 a profiler only sees the thread that enabled it, so
+    each new thread gets its own and their statistics are merged.
+    """
+
+    def __init__(self) -> None:
+        """Initialize profiler."""
+        self.profiles: list[cProfile.Profile] = []
+        self._main = cProfile.Profile()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DeterministicProfiler":
+        """Start profiling this thread and threads started from now on."""
+        if PER_THREAD_PROFILES:
+            # Runs as the profile hook of each new thread, then replaces itself
+            threading.setprofile(self._profile_new_thread)
+        self.profiles.append(self._main)
+        self._main.enable()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop profiling."""
+        self._main.disable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+
+    def _profile_new_thread(self, frame: FrameType, event: str, arg: Any) -> None:
+        """Give a newly started thread its own profiler."""
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def stats(self) -> pstats.Stats:
+        """Merge the profiles of all threads."""
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def write(self, path: Path) -> None:
+        """Write merged statistics in pstats format."""
+        self.stats().dump_stats(path)
+
+    def print_top(self, top: int) -> None:
+        """Print the functions with the highest cumulative time."""
+        stats = self.stats()
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads at a fixed interval."""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """Initialize profiler sampling every interval seconds."""
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=SAMPLER_THREAD_NAME, daemon=True
+        )
+
+    def __enter__(self) -> "SamplingProfiler":
+        """Start sampling."""
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Take samples until stopped."""
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stack = (names.get(thread_id, str(thread_id)),) + _stack(frame)
+                    self.stacks[stack] += 1
+            self.samples += 1
+
+    def write(self, path: Path) -> None:
+        """Write samples as folded stacks, one ``frame;frame;... count`` per line."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def print_top(self, top: int) -> None:
+        """
+        Print the functions running in the most samples.
+
+        Samples of threads blocked in a wait are counted as idle, so the
+        percentages show where threads did work.
+        """
+        inclusive: Counter[str] = Counter()
+        exclusive: Counter[str] = Counter()
+        idle = 0
+        for stack, count in self.stacks.items():
+            if len(stack) < 2 or stack[-1] in IDLE_FUNCTIONS:
+                idle += count
+                continue
+            for function in set(stack[1:]):
+                inclusive[function] += count
+            exclusive[stack[-1]] += count
+
+        busy = sum(exclusive.values()) or 1
+        print(
+            f"{self.samples} samples every {self.interval * 1000:g} ms, "
+            f"{idle} idle thread samples excluded"
+        )
+        print(f"{'self%':>7} {'cum%':>7}  function")
+        for function, count in exclusive.most_common(top):
+            print(
+                f"{100 * count / busy:7.1f} "
+                f"{100 * inclusive[function] / busy:7.1f}  {function}"
+            )
+
+
+def _stack(frame: FrameType | None) -> tuple[str, ...]:
+    """Function labels of a stack, outermost first."""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+@functools.lru_cache(maxsize=4096)
+def _label(code: CodeType) -> str:
+    """Label of a function as ``file.py:Class.method``."""
+    return f"{Path(code.co_filename).name}:{code.co_qualname}"
@@ -0,0 +1,361 @@
+"""Daemon serving context generation from warm per-repository state.
+
+Requests are JSON over HTTP, on a Unix domain socket or a localhost port:
+
+    GET  /health   Server version and the repositories held warm
+    POST /context  Render context for {"repo_path": "/abs/path", ...}
+
+A context request takes the options of render_context (repo_path,
+rules_file, max_tokens, only_extensions, profile, skeleton_min_tokens,
+optimize_stages, token_budget, enable_summary, summary_backend) and
+returns the rendered parts, per-file metadata and run statistics.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from . import __version__
+from .cache import default_cache_dir
+from .core import (
+    DEFAULT_MAX_REPOSITORIES,
+    EXIT_ERROR,
+    ContextGenerationServiceFactory,
+    InMemoryContextWriterServiceImpl,
+    SummaryConfig,
+    collect_context,
+    stream_context,
+)
+from .options import OptionError, read_options
+from .warm import RepositoryState
+
+# === CONSTANTS ===
+
+MAX_REQUEST_BYTES = 1024 * 1024
+LOCALHOST = "127.0.0.1"  # TCP is only ever served to this machine
+SOCKET_NAME = "serve.sock"
+SOCKET_UMASK = 0o177  # The socket is only usable by its owner
+
+HTTP_OK = 200
+HTTP_BAD_REQUEST = 400
+HTTP_NOT_FOUND = 404
+HTTP_TOO_LARGE = 413
+HTTP_SERVER_ERROR = 500
+
+REQUEST_OPTIONS = {
+    "repo_path",
+    "rules_file",
+    "max_tokens",
+    "only_extensions",
+    "profile",
+    "skeleton_min_tokens",
+    "optimize_stages",
+    "token_budget",
+    "enable_summary",
+    "summary_backend",
+}
+
+
+class RequestError(ValueError):
+    """Raised for requests that cannot be served as given."""
+
+
+def default_socket_path() -> Path:
+    """Return the default socket path, inside the cache directory."""
+    return default_cache_dir() / SOCKET_NAME
+
+
+class ContextServer:
+    """
+    Serves context requests, keeping state warm per repository.
+
+    Modules, the tokenizer and persistent caches load once per process.
+    Each repository gets a RepositoryState, so repeated requests reuse its
+    compiled ignore rules, directory listings and processed files for
+    everything unchanged since the last request. Requests for the same
+    repository run one at a time; different repositories run in parallel.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_repositories: int = DEFAULT_MAX_REPOSITORIES,
+    ):
+        """Initialize server with persistent caches in cache_dir, if given."""
+        self.cache_dir = cache_dir
+        self.max_repositories = max_repositories
+        self._states: OrderedDict[
+            tuple[Path, Path | None], RepositoryState
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        """Route a request, returning the HTTP status and JSON payload."""
+        try:
+            if method == "GET" and path == "/health":
+                return HTTP_OK, self.health()
+            if method == "POST" and path == "/context":
+                try:
+                    options = json.loads(body or b"{}")
+                except ValueError as e:
+                    raise RequestError(f"Request body is not valid JSON: {e}") from e
+                return HTTP_OK, self.render(options)
+            return HTTP_NOT_FOUND, {"error": f"No such endpoint: {method} {path}"}
+        except RequestError as e:
+            return HTTP_BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            return HTTP_SERVER_ERROR, {"error": f"Context generation failed: {e}"}
+
+    def health(self) -> dict[str, Any]:
+        """Return the server version and the repositories held warm."""
+        with self._lock:
+            states = list(self._states.values())
+        return {
+            "status": "ok",
+            "version": __version__,
+            "repositories": [
+                {
+                    "repo_path": str(state.repo_path),
+                    "cached_files": state.cached_files(),
+                    "cached_directories": len(state.file_system_repo.listings),
+                }
+                for state in states
+            ],
+        }
+
+    def render(self, options: Any) -> dict[str, Any]:
+        """Render context for a request's options."""
+        if not isinstance(options, dict):
+            raise RequestError("Request body must be a JSON object")
+        try:
+            request = read_options(options, REQUEST_OPTIONS, absolute_paths=True)
+        except OptionError as e:
+            raise RequestError(str(e)) from e
+        if not request.repo_path.is_dir():
+            raise RequestError(
+                f"Repository path '{request.repo_path}' is not a directory"
+            )
+        if request.rules_file is not None and not request.rules_file.exists():
+            raise RequestError(f"Rules file '{request.rules_file}' does not exist")
+
+        state = self._state(request.repo_path, request.rules_file)
+        with state.lock:
+            writer = InMemoryContextWriterServiceImpl(
+                request.max_tokens, frozenset(request.optimize_stages or ())
+            )
+            use_case, config = ContextGenerationServiceFactory.create_use_case(
+                repo_path=request.repo_path,
+                rules_file=request.rules_file,
+                max_tokens=request.max_tokens,
+                only_extensions=request.only_extensions,
+                enable_summary=request.enable_summary,
+                profile=request.profile,
+                skeleton_min_tokens=request.skeleton_min_tokens,
+                cache_dir=self.cache_dir,
+                optimize_stages=request.optimize_stages,
+                summary_config=(
+                    SummaryConfig(backend=request.summary_backend)
+                    if request.summary_backend
+                    else None
+                ),
+                token_budget=request.token_budget,
+                writer_service=writer,
+                verbose=False,
+                file_system_repo=state.file_system_repo,
+                ignore_service=state.ignore_service,
+                file_cache=state.file_cache(request.skeleton_min_tokens),
+                binary_cache=state.binary_cache,
+                caches=state.caches,
+            )
+            context = collect_context(stream_context(use_case, config, writer))
+
+        if context.exit_code == EXIT_ERROR:
+            raise RuntimeError(f"could not process {request.repo_path}")
+        return {
+            "exit_code": context.exit_code,
+            "parts": context.parts,
+            "files": [file.to_dict() for file in context.files],
+            "stats": context.result.to_dict(),
+        }
+
+    def _state(self, repo_path: Path, rules_file: Path | None) -> RepositoryState:
+        """Warm state for a repository, dropping the least recent beyond the limit."""
+        key = (repo_path.resolve(), rules_file.resolve() if rules_file else None)
+        evicted = []
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = RepositoryState(*key, self.cache_dir)
+                while len(self._states) > self.max_repositories:
+                    evicted.append(self._states.popitem(last=False)[1])
+            self._states.move_to_end(key)
+
+        for old_state in evicted:
+            # A request may still be running against it
+            with old_state.lock:
+                old_state.close()
+        return state
+
+    def close(self) -> None:
+        """Drop the state of every repository, closing its caches."""
+        with self._lock:
+            states = list(self._states.values())
+            self._states.clear()
+        for state in states:
+            with state.lock:
+                state.close()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler passing requests to the server's ContextServer."""
+
+    server_version = f"repo2context/{__version__}"
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse connections
+
+    def do_GET(self) -> None:
+        """Handle a GET request."""
+        self._dispatch(b"")
+
+    def do_POST(self) -> None:
+        """Handle a POST request."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send(HTTP_BAD_REQUEST, {"error": "Invalid Content-Length"})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._send(HTTP_TOO_LARGE, {"error": "Request body too large"})
+            self.close_connection = True
+            return
+        self._dispatch(self.rfile.read(length))
+
+    def address_string(self) -> str:
+        """Client address for logs; Unix socket clients have none."""
+        # Typed as a tuple, but a plain string for Unix socket clients
+        address: object = self.client_address
+        if isinstance(address, tuple):
+            return str(address[0])
+        return "local"
+
+    def _dispatch(self, body: bytes) -> None:
+        """Answer a request from the ContextServer."""
+        assert isinstance(self.server, _TCPHTTPServer | _UnixHTTPServer)  # For mypy
+        status, payload = self.server.context_server.handle(
+            self.command, urlsplit(self.path).path, body
+        )
+        self._send(status, payload)
+
+    def _send(self, status: int, payload: Any) -> None:
+        """Send a JSON response."""
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server on a localhost port."""
+
+    context_server: ContextServer
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket."""
+
+    daemon_threads = True
+    context_server: ContextServer
+
+
+def create_http_server(
+    context_server: ContextServer,
+    socket_path: Path | None = None,
+    port: int | None = None,
+) -> _TCPHTTPServer | _UnixHTTPServer:
+    """
+    Bind an HTTP server for context_server.
+
+    Listens on the localhost port if one is given, otherwise on the Unix
+    socket at socket_path (default: inside the cache directory). A stale
+    socket left by a server that is no longer running is replaced.
+    """
+    httpd: _TCPHTTPServer | _UnixHTTPServer
+    if port is not None:
+        httpd = _TCPHTTPServer((LOCALHOST, port), _RequestHandler)
+    else:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not supported here; use --port")
+        socket_path = socket_path or default_socket_path()
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        _remove_stale_socket(socket_path)
+        old_umask = os.umask(SOCKET_UMASK)
+        try:
+            httpd = _UnixHTTPServer(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+    httpd.context_server = context_server
+    return httpd
+
+
+def serve(
+    context_server: ContextServer,
+    socket_path: Path | None = None,
+    port: int | None = None,
+) -> None:
+    """Serve requests until interrupted."""
+    if port is None:
+        socket_path = socket_path or default_socket_path()
+    httpd = create_http_server(context_server, socket_path, port)
+    if isinstance(httpd, _TCPHTTPServer):
+        host, bound_port = httpd.server_address[:2]
+        where = f"http://{host!s}:{bound_port}"
+    else:
+        where = f"unix socket {socket_path}"
+    print(f"repo2context {__version__} serving on {where}", flush=True)
+    if threading.current_thread() is threading.main_thread():
+        # Service managers stop daemons with SIGTERM; shut down as on Ctrl-C.
+        # shutdown() waits for serve_forever, so it cannot run in the handler
+        signal.signal(
+            signal.SIGTERM,
+            lambda *_: threading.Thread(target=httpd.shutdown).start(),
+        )
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down", file=sys.stderr)
+    finally:
+        httpd.server_close()
+        context_server.close()
+        if socket_path and isinstance(httpd, _UnixHTTPServer):
+            socket_path.unlink(missing_ok=True)
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Remove a socket nobody listens on; refuse to touch anything else."""
+    try:
+        mode = socket_path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(f"{socket_path} exists and is not a socket")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except OSError:
+        socket_path.unlink()
+        return
+    finally:
+        probe.close()
+    raise OSError(f"A server is already listening on {socket_path}")
@@ -0,0 +1,314 @@
+"""Per-package context sets for monorepos, written in one pass."""
+
+import json
+import os
+import sys
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Generator, Iterable
+from dataclasses import dataclass, replace
+from pathlib import Path, PurePosixPath
+
+from .core import (
+    DEFAULT_MAX_TOKENS,
+    EXIT_ERROR,
+    EXIT_SPLIT_FILES,
+    EXIT_SUCCESS,
+    ContextGenerationServiceFactory,
+    ContextWriterServiceImpl,
+    FileInfo,
+    FileSystemRepository,
+    FileSystemRepositoryImpl,
+    ProcessingResult,
+    SummaryConfig,
+    _write_stats,
+)
+from .pipeline import DEFAULT_QUEUE_SIZE
+from .utils import create_output_dir, format_bytes
+
+# === CONSTANTS ===
+
+# A directory holding any of these files is the root of a package
+PACKAGE_MARKERS = frozenset({"pyproject.toml", "package.json", "go.mod", "Cargo.toml"})
+# Output directory for files outside every package, and for the repository
+# root when it is a package itself
+ROOT_SHARD = "_root"
+# Part files kept open at once; sections for other shards reopen their part
+MAX_OPEN_SHARDS = 64
+
+
+class ShardConfigError(ValueError):
+    """Raised for shard configuration files that cannot be used."""
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    """Value object with what was written for one shard."""
+
+    name: str
+    parts: int
+    files: int
+    tokens: int
+
+
+class ShardRouter:
+    """Map files to the innermost package root containing them."""
+
+    def __init__(self, roots: Iterable[str] = ()):
+        """Initialize with package roots relative to the repository."""
+        self.roots: set[str] = set()
+        for root in roots:
+            self.add(root)
+
+    def add(self, root: str) -> None:
+        """Add a package root, a relative path with forward slashes."""
+        self.roots.add("" if root == "." else root)
+
+    def route(self, relative_path: str) -> str:
+        """Return the name of the shard a file belongs to."""
+        directory = relative_path
+        while directory:
+            directory = directory.rpartition("/")[0]
+            if directory and directory in self.roots:
+                return directory
+        return ROOT_SHARD
+
+
+class PackageDetectingFileSystem:
+    """
+    File system repository registering package roots as the walk lists them.
+
+    The walk goes top-down, so every directory above a file is listed, and
+    its package marker seen, before the file reaches the writer.
+    """
+
+    def __init__(self, router: ShardRouter, inner: FileSystemRepository | None = None):
+        """Initialize with the router to register roots with."""
+        self.router = router
+        self.inner = inner or FileSystemRepositoryImpl()
+
+    def walk_directory(
+        self, path: Path
+    ) -> Generator[tuple[Path, list[str], list[str]], None, None]:
+        """Walk directory structure, registering directories with markers."""
+        prefix_length = len(str(path)) + 1
+        for root, dirs, files in self.inner.walk_directory(path):
+            if not PACKAGE_MARKERS.isdisjoint(files):
+                self.router.add(str(root)[prefix_length:].replace(os.sep, "/"))
+            yield root, dirs, files
+
+    def scan_files(
+        self, root: Path, is_ignored: Callable[[str, str, bool], bool]
+    ) -> Generator[tuple[str, str, int, int], None, None]:
+        """Yield relative path, name, size and mtime of files without reading them."""
+        yield from self.inner.scan_files(root, is_ignored)
+
+    def read_file(self, path: Path) -> str:
+        """Read file content."""
+        return self.inner.read_file(path)
+
+    def create_directory(self, path: Path) -> None:
+        """Create directory if it doesn't exist."""
+        self.inner.create_directory(path)
+
+
+class ShardedContextWriterServiceImpl:
+    """
+    Context writer routing each file to the parts of its shard.
+
+    Every shard has its own writer in a directory named after the package
+    root, so parts are split per shard exactly as a run on the package
+    alone would split them. Shards without files get no directory.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        router: ShardRouter,
+        max_tokens: int,
+        optimize_stages: frozenset[str] = frozenset(),
+        verbose: bool = True,
+    ):
+        """Initialize sharded writer."""
+        self.output_dir = output_dir
+        self.router = router
+        self.max_tokens = max_tokens
+        self.optimize_stages = optimize_stages
+        self.verbose = verbose  # Print the path of every part started
+        self.writers: dict[str, ContextWriterServiceImpl] = {}
+        self.open_shards: OrderedDict[str, None] = OrderedDict()
+        self.files: Counter[str] = Counter()
+        self.tokens: Counter[str] = Counter()
+        self.results: list[ShardResult] = []
+
+    def write_file_section(self, file_info: FileInfo) -> None:
+        """Write a file section to the current part of its shard."""
+        name = self.router.route(file_info.relative_path.as_posix())
+        writer = self.writers.get(name)
+        if writer is None:
+            shard_dir = self.output_dir / name
+            create_output_dir(shard_dir)
+            writer = ContextWriterServiceImpl(
+                shard_dir, self.max_tokens, self.optimize_stages, self.verbose
+            )
+            self.writers[name] = writer
+
+        self.open_shards[name] = None
+        self.open_shards.move_to_end(name)
+        if len(self.open_shards) > MAX_OPEN_SHARDS:
+            least_recent, _ = self.open_shards.popitem(last=False)
+            self.writers[least_recent].suspend()
+
+        writer.write_file_section(file_info)
+        self.files[name] += 1
+        self.tokens[name] += file_info.token_count
+
+    def finalize(self) -> int:
+        """Finalize every shard and return the number of parts written."""
+        self.results = [
+            ShardResult(name, writer.finalize(), self.files[name], self.tokens[name])
+            for name, writer in sorted(self.writers.items())
+        ]
+        self.open_shards.clear()
+        return sum(result.parts for result in self.results)
+
+
+def read_shard_config(config_path: Path) -> list[str]:
+    """
+    Read the package roots of a JSON shard configuration.
+
+    The configuration is a list, or an object with a "packages" list, of
+    package root paths relative to the repository.
+    """
+    try:
+        data = json.loads(config_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ShardConfigError(
+            f"Could not read shard configuration {config_path}: {e}"
+        ) from e
+
+    entries = data.get("packages") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ShardConfigError(
+            f"Shard configuration {config_path} must be a list or have a "
+            "'packages' list"
+        )
+
+    roots = []
+    for entry in entries:
+        if not isinstance(entry, str):
+            raise ShardConfigError(f"Package root {entry!r} must be a string")
+        path = PurePosixPath(entry.replace("\\", "/"))
+        if path.is_absolute() or ".." in path.parts:
+            raise ShardConfigError(
+                f"Package root '{entry}' must be a path inside the repository"
+            )
+        roots.append(path.as_posix())
+    return roots
+
+
+def shard_context(
+    repo_path: Path | None = None,
+    rules_file: Path | None = None,
+    output_path: Path | None = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    only_extensions: list[str] | None = None,
+    enable_summary: bool = False,
+    profile: str | None = None,
+    skeleton_min_tokens: int | None = None,
+    cache_dir: Path | None = None,
+    optimize_stages: list[str] | None = None,
+    summary_config: SummaryConfig | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    shard_config: Path | None = None,
+    stats_path: Path | None = None,
+    trace_path: Path | None = None,
+    verbose: bool = True,
+) -> int:
+    """
+    Generate one set of context parts per package in a single pass.
+
+    Takes the options of generate_context apart from the token budget,
+    which weighs files across the whole repository. The tree is walked
+    and read once, and each file is written to the parts of the
+    innermost package holding it, in a directory of output_path named
+    after the package root.
+
+    Args:
+        shard_config: JSON list of package roots to use instead of
+            detecting directories with a pyproject.toml, package.json,
+            go.mod or Cargo.toml
+        verbose: Print progress and a summary per shard
+
+    Returns:
+        Exit code: 0 for success, 1 if any shard was split, 2 for fatal error
+    """
+    repo_path = repo_path or Path.cwd()
+    output_path = output_path or repo_path / ".repo2context"
+
+    file_system_repo: FileSystemRepository
+    if shard_config:
+        try:
+            router = ShardRouter(read_shard_config(shard_config))
+        except ShardConfigError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_ERROR
+        file_system_repo = FileSystemRepositoryImpl()
+    else:
+        router = ShardRouter()
+        file_system_repo = PackageDetectingFileSystem(router)
+
+    stages = frozenset(optimize_stages or ())
+    writer = ShardedContextWriterServiceImpl(
+        output_path, router, max_tokens, stages, verbose
+    )
+    use_case, config = ContextGenerationServiceFactory.create_use_case(
+        repo_path=repo_path,
+        rules_file=rules_file,
+        max_tokens=max_tokens,
+        only_extensions=only_extensions,
+        enable_summary=enable_summary,
+        profile=profile,
+        skeleton_min_tokens=skeleton_min_tokens,
+        cache_dir=cache_dir,
+        optimize_stages=optimize_stages,
+        summary_config=summary_config,
+        queue_size=queue_size,
+        trace_path=trace_path,
+        writer_service=writer,
+        verbose=False,
+        file_system_repo=file_system_repo,
+    )
+
+    if verbose:
+        print(f"Scanning repository: {repo_path}")
+    result = use_case.execute(config)
+    if result.exit_code == EXIT_ERROR:
+        return EXIT_ERROR
+
+    split = any(shard.parts > 1 for shard in writer.results)
+    result = replace(result, exit_code=EXIT_SPLIT_FILES if split else EXIT_SUCCESS)
+    if verbose:
+        _print_shards(result, writer.results, output_path)
+    if stats_path:
+        data = result.to_dict()
+        data["shards"] = [vars(shard) for shard in writer.results]
+        _write_stats(data, stats_path)
+    return result.exit_code
+
+
+def _print_shards(
+    result: ProcessingResult, shards: list[ShardResult], output_path: Path
+) -> None:
+    """Print totals and the parts, files and tokens of every shard."""
+    print("\nSharded context generation complete:")
+    print(f"  Files processed: {result.total_files}")
+    print(f"  Total size: {format_bytes(result.total_bytes)}")
+    print(f"  Estimated tokens: {result.total_tokens:,}")
+    print(f"  Shards written: {len(shards)} ({result.parts_written} parts)")
+    for shard in shards:
+        print(
+            f"    {shard.name}: {shard.parts} part(s), {shard.files} files, "
+            f"{shard.tokens:,} tokens"
+        )
+    print(f"  Output: {output_path}")
+    print(f"  Elapsed: {result.wall_seconds:.2f}s (CPU {result.cpu_seconds:.2f}s)")
@@ -0,0 +1,120 @@
+"""Python skeleton rendering: keep the API surface, drop the bodies."""
+
+import ast
+
+from .cache import ContentCache
+from .utils import content_hash
+
+# === CONSTANTS ===
+
+# Bump when the rendered output changes so stale cache entries are not reused
+SKELETON_VERSION = "1"
+SKELETON_CACHE_NAMESPACE = "skeleton"
+SKELETON_EXTENSIONS = {".py", ".pyi"}
+
+_FunctionNode = ast.FunctionDef | ast.AsyncFunctionDef
+
+
+def render_skeleton(source: str) -> str | None:
+    """
+    Render the skeleton of a Python module.
+
+    Keeps imports, ``__all__``, class and function signatures (including
+    decorators), annotated class attributes and the first line of each
+    docstring. Function bodies are replaced with ``...``.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Skeleton source, or None if the source cannot be parsed
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    tree.body = _skeleton_body(tree, in_class=False)
+    return ast.unparse(tree) + "\n"
+
+
+def _skeleton_body(node: ast.Module | ast.ClassDef, in_class: bool) -> list[ast.stmt]:
+    """Build the reduced statement list for a module or class body."""
+    body: list[ast.stmt] = []
+    docstring = _docstring_stmt(node)
+    if docstring:
+        body.append(docstring)
+
+    for stmt in node.body:
+        if isinstance(stmt, ast.Import | ast.ImportFrom):
+            body.append(stmt)
+        elif isinstance(stmt, ast.FunctionDef | ast.AsyncFunctionDef):
+            body.append(_skeleton_function(stmt))
+        elif isinstance(stmt, ast.ClassDef):
+            stmt.body = _skeleton_body(stmt, in_class=True) or [_ellipsis()]
+            body.append(stmt)
+        elif isinstance(stmt, ast.AnnAssign) and in_class:
+            body.append(stmt)
+        elif isinstance(stmt, ast.Assign) and _assigns_all(stmt):
+            body.append(stmt)
+
+    return body
+
+
+def _skeleton_function(node: _FunctionNode) -> _FunctionNode:
+    """Replace a function body with its docstring summary and ``...``."""
+    docstring = _docstring_stmt(node)
+    node.body = [docstring, _ellipsis()] if docstring else [_ellipsis()]
+    return node
+
+
+def _docstring_stmt(
+    node: ast.Module | ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef,
+) -> ast.Expr | None:
+    """Return a statement holding the first docstring line, if any."""
+    docstring = ast.get_docstring(node)
+    if not docstring:
+        return None
+
+    first_line = docstring.strip().splitlines()[0]
+    return ast.Expr(value=ast.Constant(value=first_line))
+
+
+def _assigns_all(node: ast.Assign) -> bool:
+    """Check whether an assignment defines ``__all__``."""
+    return any(
+        isinstance(target, ast.Name) and target.id == "__all__"
+        for target in node.targets
+    )
+
+
+def _ellipsis() -> ast.Expr:
+    """Create an ``...`` expression statement."""
+    return ast.Expr(value=ast.Constant(value=Ellipsis))
+
+
+class SkeletonRenderer:
+    """Skeleton renderer with results cached by content hash."""
+
+    def __init__(self, cache: ContentCache | None = None):
+        """Initialize renderer with an optional persistent cache."""
+        self.cache = cache
+        self._memo: dict[str, str | None] = {}
+
+    def render(self, source: str) -> str | None:
+        """Render a skeleton, reusing cached results when available."""
+        key = f"{SKELETON_VERSION}:{content_hash(source)}"
+        if key in self._memo:
+            return self._memo[key]
+
+        skeleton: str | None
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            skeleton = cached["skeleton"]
+        else:
+            skeleton = render_skeleton(source)
+            if self.cache:
+                self.cache.set(key, {"skeleton": skeleton})
+
+        self._memo[key] = skeleton
+        return skeleton
@@ -0,0 +1,64 @@
+"""In-memory values derived from files, valid while the files are unchanged."""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+# === CONSTANTS ===
+
+# A file can change again within the timestamp granularity of its file
+# system, so values are only stored once the file is older than this
+RACY_NANOSECONDS = 2_000_000_000
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class _Entry(Generic[T]):
+    """A value and the version of the file it was derived from."""
+
+    size: int
+    mtime_ns: int
+    value: T
+
+
+class StatCache(Generic[T]):
+    """
+    Values keyed by path, dropped as soon as the file's stat changes.
+
+    Size and modification time identify a version of a file, as in the
+    token count cache. A file modified moments ago might change again
+    without its mtime moving, so such versions are never stored and are
+    simply recomputed on the next lookup.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: dict[str, _Entry[T]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored values."""
+        return len(self._entries)
+
+    def get(self, path: str, stat: os.stat_result) -> T | None:
+        """Return the value stored for this version of path, or None."""
+        entry = self._entries.get(path)
+        if (
+            entry is None
+            or entry.size != stat.st_size
+            or entry.mtime_ns != stat.st_mtime_ns
+        ):
+            return None
+        return entry.value
+
+    def put(self, path: str, stat: os.stat_result, value: T) -> None:
+        """Store value for this version of path, unless it is too recent."""
+        if time.time_ns() - stat.st_mtime_ns < RACY_NANOSECONDS:
+            self._entries.pop(path, None)
+            return
+        self._entries[path] = _Entry(stat.st_size, stat.st_mtime_ns, value)
+
+    def clear(self) -> None:
+        """Forget every stored value."""
+        self._entries.clear()
@@ -0,0 +1,207 @@
+"""Per-stage timings and counters for a context generation run."""
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any, TypeVar
+
+from .tracing import Tracer
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+_END = object()  # Marks an exhausted iterator
+
+
+@dataclass
+class StageStats:
+    """Wall time, CPU time and item count accumulated by one stage."""
+
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    items: int = 0
+
+    def add(self, wall_seconds: float, cpu_seconds: float, items: int = 1) -> None:
+        """Add one measurement."""
+        self.wall_seconds += wall_seconds
+        self.cpu_seconds += cpu_seconds
+        self.items += items
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the statistics as JSON-serialisable data."""
+        return asdict(self)
+
+
+class _Measurement:
+    """Context manager adding the wall and thread CPU time of a block to a stage."""
+
+    __slots__ = ("stage", "wall", "cpu")
+
+    def __init__(self, stage: StageStats):
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stage.add(time.perf_counter() - self.wall, time.thread_time() - self.cpu)
+
+
+class _TracedMeasurement(_Measurement):
+    """Measurement that also records a trace span for one file."""
+
+    __slots__ = ("tracer", "name", "args")
+
+    def __init__(
+        self, stage: StageStats, tracer: Tracer, name: str, args: dict[str, Any]
+    ):
+        super().__init__(stage)
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        end = time.perf_counter()
+        self.stage.add(end - self.wall, time.thread_time() - self.cpu)
+        self.tracer.complete(self.name, self.wall, end, self.args)
+
+
+class RunStats:
+    """
+    Collects stage timings and skip counts from concurrent pipeline stages.
+
+    CPU time is that of the thread doing the measured work, so stages
+    running in parallel threads do not count each other's time. Each stage
+    must be measured from one thread at a time.
+    """
+
+    def __init__(self, tracer: Tracer | None = None) -> None:
+        """Initialize empty statistics, optionally tracing per-file spans."""
+        self.tracer = tracer
+        self.stages: dict[str, StageStats] = {}
+        self.skipped: dict[str, int] = {}
+        self._measurements: dict[str, _Measurement] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> StageStats:
+        """Return the statistics of a stage, created on first use."""
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats())
+        return stats
+
+    def measure(
+        self, name: str, path: Path | None = None, size: int | None = None
+    ) -> _Measurement:
+        """
+        Measure a block of work as one item of a stage.
+
+        With a tracer, work on a file given by path is also recorded as a
+        span tagged with the path and size.
+        """
+        if self.tracer is not None and path is not None:
+            return _TracedMeasurement(
+                self.stage(name), self.tracer, name, span_args(path, size)
+            )
+
+        # One reusable measurement per stage keeps per-file overhead low
+        measurement = self._measurements.get(name)
+        if measurement is None:
+            measurement = _Measurement(self.stage(name))
+            with self._lock:
+                measurement = self._measurements.setdefault(name, measurement)
+        return measurement
+
+    def skip(self, reason: str) -> None:
+        """Count a file skipped for the given reason."""
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield items, measuring the time taken to produce each one."""
+        stage = self.stage(name)
+        iterator = iter(items)
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            item = next(iterator, _END)
+            stage.add(
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+                items=0 if item is _END else 1,
+            )
+            if item is _END:
+                return
+            yield item  # type: ignore[misc]
+
+    def timed_stage(
+        self,
+        name: str,
+        func: Callable[[Iterable[T]], Iterable[U]],
+        describe: Callable[[U], dict[str, Any]] | None = None,
+    ) -> Callable[[Iterable[T]], Iterator[U]]:
+        """
+        Wrap a pipeline stage function so only its own work is measured.
+
+        Time spent waiting for input from the previous stage is excluded.
+        With a tracer and describe, producing each output is also recorded
+        as a span with the details describe returns for it.
+        """
+        stage = self.stage(name)
+        tracer = self.tracer if describe is not None else None
+
+        def run(items: Iterable[T]) -> Iterator[U]:
+            waited = [0.0, 0.0]
+            outputs = iter(func(self._waiting(items, waited)))
+            while True:
+                waited[:] = [0.0, 0.0]
+                wall, cpu = time.perf_counter(), time.thread_time()
+                output = next(outputs, _END)
+                end = time.perf_counter()
+                stage.add(
+                    end - wall - waited[0],
+                    time.thread_time() - cpu - waited[1],
+                    items=0 if output is _END else 1,
+                )
+                if output is _END:
+                    return
+                if tracer is not None and describe is not None:
+                    tracer.complete(name, wall, end, describe(output))  # type: ignore[arg-type]
+                yield output  # type: ignore[misc]
+
+        return run
+
+    @staticmethod
+    def _waiting(items: Iterable[T], waited: list[float]) -> Iterator[T]:
+        """Yield items, adding the wall and CPU time spent waiting to waited."""
+        iterator = iter(items)
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            item = next(iterator, _END)
+            waited[0] += time.perf_counter() - wall
+            waited[1] += time.thread_time() - cpu
+            if item is _END:
+                return
+            yield item  # type: ignore[misc]
+
+
+def span_args(path: Path, size: int | None = None) -> dict[str, Any]:
+    """Trace span details for a file."""
+    args: dict[str, Any] = {"path": str(path)}
+    if size is not None:
+        args["size"] = size
+    return args
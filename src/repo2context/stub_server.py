@@ -0,0 +1,182 @@
+"""In-process OpenAI-compatible chat server for tests and benchmarks."""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+
+# === CONSTANTS ===
+
+STUB_HOST = "127.0.0.1"
+BATCH_MARKER = "File id:"  # Present in batched summary prompts
+FILE_NAME_PATTERN = re.compile(r"^File: (.+)$", re.MULTILINE)
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Threading server that ignores clients disconnecting mid-response."""
+
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        """Report unexpected errors only."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubChatServer:
+    """
+    Local chat completions server answering with deterministic summaries.
+
+    Single-file prompts are answered with ``Summary of <file>.``; batched
+    prompts get a JSON object with one such summary per file id. The server
+    speaks HTTP/1.1 with keep-alive and counts requests, connections and
+    peak concurrency, so it can stand in for both OpenAI and self-hosted
+    endpoints.
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        rate_limited_requests: int = 0,
+        batch_json: bool = True,
+        port: int = 0,
+    ):
+        """
+        Start the server in a background thread.
+
+        Args:
+            delay: Seconds to wait before answering each request
+            rate_limited_requests: Number of initial requests answered with 429
+            batch_json: Whether batched prompts get a JSON answer
+            port: Port to listen on (0 picks a free port)
+        """
+        self.delay = delay
+        self.rate_limited_requests = rate_limited_requests
+        self.batch_json = batch_json
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        self.server = _QuietHTTPServer((STUB_HOST, port), self._handler_class())
+        self.base_url = f"http://{STUB_HOST}:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __enter__(self) -> "StubChatServer":
+        """Return the running server."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the server."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop the server and release its port."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, prompt: str) -> str:
+        """Build the completion text for a prompt."""
+        names = FILE_NAME_PATTERN.findall(prompt)
+        if BATCH_MARKER in prompt and self.batch_json:
+            return json.dumps(
+                {str(i): f"Summary of {name}." for i, name in enumerate(names, 1)}
+            )
+        return f"Summary of {names[0] if names else 'prompt'}."
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Create a request handler bound to this server's state."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                with stub.lock:
+                    stub.requests += 1
+                    limited = stub.rate_limited_requests > 0
+                    stub.rate_limited_requests -= 1 if limited else 0
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+
+                if limited:
+                    self._send(429, {"error": {"message": "slow down"}}, retry=True)
+                    return
+
+                content = stub.answer(body["messages"][-1]["content"])
+                self._send(200, _completion(body.get("model", "stub"), content))
+
+            def _send(self, status: int, payload: Any, retry: bool = False) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if retry:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _completion(model: str, content: str) -> dict[str, Any]:
+    """Build a chat completion response body."""
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def main() -> None:
+    """Run the stub server in the foreground, e.g. for benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds per response")
+    args = parser.parse_args()
+
+    server = StubChatServer(delay=args.delay, port=args.port)
+    print(f"Stub chat server listening on {server.base_url}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""Concurrent, rate-limited summary generation."""
+
+import asyncio
+import concurrent.futures
+import http.client
+import json
+import queue
+import random
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Protocol, TypeVar
+from urllib.parse import urlsplit
+
+from .defaults import (
+    DEFAULT_BACKEND_TIMEOUT,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_SUMMARY_CONCURRENCY,
+    DEFAULT_TOKENS_PER_MINUTE,
+)
+from .tracing import Tracer
+
+# === CONSTANTS ===
+
+# Rate limiting
+RATE_LIMIT_BURST_SECONDS = 5.0  # Bucket capacity, in seconds of refill
+
+# Retries on rate limiting (HTTP 429)
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# HTTP backend
+CHAT_COMPLETIONS_PATH = "/chat/completions"
+
+SECONDS_PER_MINUTE = 60.0
+
+_T = TypeVar("_T")
+
+
+class RateLimitError(RuntimeError):
+    """Raised by a backend when the endpoint answers with HTTP 429."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        """Initialize with an optional server-provided retry delay."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ChatBackend(Protocol):
+    """Protocol for asynchronous chat completion backends."""
+
+    async def complete(self, system_prompt: str, prompt: str, max_tokens: int) -> str:
+        """Return the completion text for a single prompt."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release network resources."""
+        ...
+
+
+@dataclass(frozen=True)
+class SummaryRequest:
+    """A single prompt to summarise, identified by key."""
+
+    key: str
+    system_prompt: str
+    prompt: str
+    estimated_tokens: int
+    max_response_tokens: int | None = None
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket.
+
+    Refills continuously at ``rate_per_minute`` up to ``capacity``. A request
+    larger than the capacity waits for a full bucket and then leaves the
+    bucket in debt, so oversized requests are throttled rather than stuck.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a full bucket."""
+        self.rate = rate_per_minute / SECONDS_PER_MINUTE
+        self.capacity = capacity or max(1.0, self.rate * RATE_LIMIT_BURST_SECONDS)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until amount tokens are available and take them."""
+        async with self._lock:
+            needed = min(amount, self.capacity)
+            while True:
+                self._refill()
+                if self.tokens >= needed:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last refill."""
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class AsyncSummaryEngine:
+    """
+    Run summary requests concurrently under rate limits.
+
+    Concurrency is capped by a semaphore, while request and token budgets are
+    enforced by separate token buckets. Rate-limited requests are retried with
+    exponential backoff and jitter, honouring any server-provided delay.
+    """
+
+    def __init__(
+        self,
+        backend: ChatBackend,
+        max_response_tokens: int,
+        concurrency: int = DEFAULT_SUMMARY_CONCURRENCY,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        tracer: Tracer | None = None,
+    ):
+        """Initialize engine; an engine must only be used from one event loop."""
+        self.backend = backend
+        self.tracer = tracer
+        self.max_response_tokens = max_response_tokens
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+
+    async def summarize(self, request: SummaryRequest) -> str:
+        """Summarise one request, retrying when rate limited."""
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    # Take rate budget only once a slot is free, so queued
+                    # requests cannot bank budget and burst later
+                    await self._request_bucket.acquire()
+                    await self._token_bucket.acquire(request.estimated_tokens)
+                    return await self._complete(request, attempt)
+            except RateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff_delay(attempt, e.retry_after))
+                attempt += 1
+
+    async def _complete(self, request: SummaryRequest, attempt: int) -> str:
+        """Send one request to the backend, tracing it if enabled."""
+        span_id = None
+        if self.tracer is not None:
+            span_id = self.tracer.begin_async(
+                "request",
+                {
+                    "key": request.key,
+                    "tokens": request.estimated_tokens,
+                    "attempt": attempt,
+                },
+            )
+        try:
+            return await self.backend.complete(
+                request.system_prompt,
+                request.prompt,
+                request.max_response_tokens or self.max_response_tokens,
+            )
+        finally:
+            if self.tracer is not None and span_id is not None:
+                self.tracer.end_async("request", span_id)
+
+    def _backoff_delay(self, attempt: int, retry_after: float | None) -> float:
+        """Compute the delay before retrying a rate-limited request."""
+        if retry_after is not None:
+            return retry_after
+
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2.0**attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+
+class EventLoopThread:
+    """
+    Event loop running in a background thread.
+
+    Lets synchronous code, such as a pipeline stage, submit coroutines and
+    keep working while they run. Pending tasks are cancelled on exit.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the loop; it starts running on entering the context."""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="repo2context-event-loop", daemon=True
+        )
+
+    def __enter__(self) -> "EventLoopThread":
+        """Start the loop thread."""
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Cancel pending tasks, then stop and close the loop."""
+        self.submit(self._cancel_pending()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def submit(
+        self, coroutine: Coroutine[Any, Any, _T]
+    ) -> "concurrent.futures.Future[_T]":
+        """Schedule a coroutine on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def _cancel_pending(self) -> None:
+        """Cancel and await every task except the current one."""
+        tasks = [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class OpenAIChatBackend:
+    """Chat backend using the asynchronous OpenAI client."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str | None = None,
+        temperature: float = 0.3,
+        timeout: float | None = None,
+    ):
+        """Initialize backend; retries are left to the engine."""
+        try:
+            import openai
+        except ImportError as e:
+            raise RuntimeError(
+                "OpenAI package not available. Install with: pip install 'repo2context[summary]'"
+            ) from e
+
+        self._openai = openai
+        self.client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            timeout=timeout or DEFAULT_BACKEND_TIMEOUT,
+        )
+        self.model = model
+        self.temperature = temperature
+
+    async def complete(self, system_prompt: str, prompt: str, max_tokens: int) -> str:
+        """Return the completion text for a single prompt."""
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+            )
+        except self._openai.RateLimitError as e:
+            raise RateLimitError(
+                f"OpenAI rate limit: {e}", _retry_after(e.response.headers)
+            ) from e
+
+        return response.choices[0].message.content or ""
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.close()
+
+
+class HTTPChatBackend:
+    """
+    Chat backend for OpenAI-compatible endpoints using only the standard library.
+
+    Suited to self-hosted servers such as llama.cpp or vLLM. Connections are
+    kept alive and reused from a pool, so each request skips the TCP (and
+    TLS) handshake. Blocking requests run in worker threads; the engine's
+    semaphore bounds how many run at once.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: str | None = None,
+        temperature: float = 0.3,
+        timeout: float = DEFAULT_BACKEND_TIMEOUT,
+        pool_size: int = DEFAULT_SUMMARY_CONCURRENCY,
+    ):
+        """Initialize backend for an endpoint such as http://127.0.0.1:8080/v1."""
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise RuntimeError(f"Invalid summary endpoint URL: {base_url}")
+
+        self.model = model
+        self.temperature = temperature
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+        self._secure = url.scheme == "https"
+        self._host = url.hostname
+        self._port = url.port
+        self._path = url.path.rstrip("/") + CHAT_COMPLETIONS_PATH
+        self._headers = {"Content-Type": "application/json"}
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+        self._pool: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(
+            pool_size
+        )
+
+    async def complete(self, system_prompt: str, prompt: str, max_tokens: int) -> str:
+        """Return the completion text for a single prompt."""
+        body = json.dumps(
+            {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                "max_tokens": max_tokens,
+                "temperature": self.temperature,
+            }
+        ).encode()
+        response = await asyncio.to_thread(self._post, body)
+
+        try:
+            return response["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError) as e:
+            raise RuntimeError(f"Unexpected summary endpoint response: {e}") from e
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _post(self, body: bytes) -> Any:
+        """Send a request, retrying once if a pooled connection went stale."""
+        connection, reused = self._acquire()
+        try:
+            status, headers, data = self._send(connection, body)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            if not reused:
+                raise
+            connection, _ = self._new_connection(), False
+            status, headers, data = self._send(connection, body)
+        except Exception:
+            connection.close()
+            raise
+
+        self._release(connection, headers)
+
+        if status == 429:
+            raise RateLimitError(
+                "Summary endpoint rate limit (HTTP 429)", _retry_after(headers)
+            )
+        if status >= 400:
+            detail = data[:200].decode(errors="replace")
+            raise RuntimeError(f"Summary endpoint returned HTTP {status}: {detail}")
+
+        return json.loads(data)
+
+    def _send(
+        self, connection: http.client.HTTPConnection, body: bytes
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """Send one request and read the full response."""
+        connection.request("POST", self._path, body, self._headers)
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection from the pool or open a new one."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(
+        self, connection: http.client.HTTPConnection, headers: http.client.HTTPMessage
+    ) -> None:
+        """Return a connection to the pool unless the server is closing it."""
+        if (headers.get("connection") or "").lower() == "close":
+            connection.close()
+            return
+
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        """Open a connection to the endpoint."""
+        with self._lock:
+            self.connections_opened += 1
+        if self._secure:
+            return http.client.HTTPSConnection(
+                self._host, self._port, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+
+def parse_batch_response(text: str) -> dict[str, str]:
+    """
+    Parse a batched summary response into per-id summaries.
+
+    Tolerates Markdown code fences and prose around the JSON object.
+
+    Args:
+        text: Model response expected to contain a JSON object of id -> summary
+
+    Returns:
+        Mapping of ids to non-empty summaries; empty if the response is invalid
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+
+    try:
+        parsed = json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    if not isinstance(parsed, dict):
+        return {}
+
+    return {
+        str(key): value.strip()
+        for key, value in parsed.items()
+        if isinstance(value, str) and value.strip()
+    }
+
+
+def _retry_after(headers: Any) -> float | None:
+    """Parse a Retry-After header value in seconds, if present."""
+    value = headers.get("retry-after") if headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,284 @@
+"""Symbol index: where names are defined and referenced in a repository."""
+
+import ast
+import re
+import time
+from bisect import bisect_right
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .cache import ContentCache
+from .statcache import RACY_NANOSECONDS
+from .utils import LANGUAGE_EXTENSIONS, content_hash
+
+# === CONSTANTS ===
+
+# Bump when indexed symbols change so stale cache entries are not reused
+SYMBOLS_VERSION = "1"
+SYMBOLS_CACHE_NAMESPACE = "symbols"  # Symbols by content hash
+SYMBOL_FILES_NAMESPACE = "symbol-files"  # Symbols and stat by repository path
+
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+_JS_DEFINITION = re.compile(
+    r"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:async[ \t]+)?"
+    r"(?P<kind>function\*?|class|interface|type|enum|const|let|var)[ \t]+"
+    r"(?P<name>[A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+# Definition lines of languages without an ast available, by language
+DEFINITION_PATTERNS = {
+    "javascript": _JS_DEFINITION,
+    "typescript": _JS_DEFINITION,
+    "jsx": _JS_DEFINITION,
+    "tsx": _JS_DEFINITION,
+    "go": re.compile(
+        r"^(?P<kind>func|type)[ \t]+(?:\([^)]*\)[ \t]*)?(?P<name>[A-Za-z_]\w*)",
+        re.MULTILINE,
+    ),
+    "rust": re.compile(
+        r"^[ \t]*(?:pub(?:\([^)]*\))?[ \t]+)?(?:async[ \t]+)?(?:unsafe[ \t]+)?"
+        r"(?P<kind>fn|struct|enum|trait|type|mod|const|static)[ \t]+"
+        r"(?P<name>[A-Za-z_]\w*)",
+        re.MULTILINE,
+    ),
+    "ruby": re.compile(
+        r"^[ \t]*(?P<kind>def|class|module)[ \t]+(?:self\.)?(?P<name>[A-Za-z_]\w*[?!]?)",
+        re.MULTILINE,
+    ),
+    **dict.fromkeys(
+        ("java", "csharp", "kotlin", "scala", "swift", "php", "c", "cpp"),
+        re.compile(
+            r"^[ \t]*(?:[\w@]+[ \t]+)*?"
+            r"(?P<kind>class|interface|enum|record|struct|union|object|trait"
+            r"|namespace|fun|func|function|def)[ \t]+(?P<name>[A-Za-z_]\w*)",
+            re.MULTILINE,
+        ),
+    ),
+}
+# Languages whose definitions end where their braces close
+BRACE_LANGUAGES = frozenset(DEFINITION_PATTERNS) - {"ruby"}
+
+
+@dataclass(frozen=True)
+class Definition:
+    """Value object locating the definition of a name."""
+
+    name: str  # Qualified by enclosing classes, e.g. "Parser.parse"
+    kind: str
+    start_line: int
+    end_line: int
+
+
+@dataclass(frozen=True)
+class FileSymbols:
+    """Value object with the definitions and referenced names of a file."""
+
+    definitions: list[Definition]
+    references: frozenset[str]
+
+    def to_json(self) -> list[Any]:
+        """Return the symbols as JSON-serialisable data."""
+        return [
+            [list(vars(d).values()) for d in self.definitions],
+            sorted(self.references),
+        ]
+
+
+def symbol_language(name: str) -> str | None:
+    """Return the language of a file name if its symbols can be indexed."""
+    language = LANGUAGE_EXTENSIONS.get(Path(name).suffix.lower())
+    if language == "python" or language in DEFINITION_PATTERNS:
+        return language
+    return None
+
+
+def index_source(source: str, language: str) -> FileSymbols:
+    """
+    Index the definitions and referenced names of a file.
+
+    Python definitions come from ast, other languages' from a pattern per
+    language. References are every identifier in the file, comments and
+    strings included: a regular expression finds them several times
+    faster than walking the syntax tree, and a name mentioned in a
+    docstring is usually worth the context too.
+    """
+    references = frozenset(IDENTIFIER.findall(source))
+    if language != "python":
+        pattern = DEFINITION_PATTERNS[language]
+        return FileSymbols(_find_definitions(source, pattern, language), references)
+    try:
+        return FileSymbols(_python_definitions(ast.parse(source)), references)
+    except (SyntaxError, ValueError):
+        return FileSymbols([], references)
+
+
+def _python_definitions(tree: ast.Module) -> list[Definition]:
+    """Find the classes, functions and module-level names of a Python module."""
+    definitions: list[Definition] = []
+
+    def visit(body: list[ast.stmt], prefix: str) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef):
+                kind = "class" if isinstance(node, ast.ClassDef) else "def"
+                definitions.append(
+                    Definition(
+                        prefix + node.name,
+                        kind,
+                        node.lineno,
+                        node.end_lineno or node.lineno,
+                    )
+                )
+                visit(node.body, f"{prefix}{node.name}.")
+            elif not prefix and isinstance(node, ast.Assign | ast.AnnAssign):
+                targets = (
+                    node.targets if isinstance(node, ast.Assign) else [node.target]
+                )
+                definitions.extend(
+                    Definition(
+                        target.id,
+                        "variable",
+                        node.lineno,
+                        node.end_lineno or node.lineno,
+                    )
+                    for target in targets
+                    if isinstance(target, ast.Name)
+                )
+
+    visit(tree.body, "")
+    return definitions
+
+
+def _find_definitions(
+    source: str, pattern: re.Pattern[str], language: str
+) -> list[Definition]:
+    """Find the definitions of a file by pattern, with their line ranges."""
+    lines = source.splitlines()
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+
+    matches = list(pattern.finditer(source))
+    # 1-based line of each definition's name
+    starts = [bisect_right(line_starts, match.start("name")) for match in matches]
+    definitions = []
+    for index, match in enumerate(matches):
+        start = starts[index]
+        if language in BRACE_LANGUAGES:
+            end = _closing_brace_line(lines, start)
+        else:
+            end = starts[index + 1] - 1 if index + 1 < len(starts) else len(lines)
+        definitions.append(
+            Definition(match["name"], match["kind"], start, max(start, end))
+        )
+    return definitions
+
+
+def _closing_brace_line(lines: list[str], start: int) -> int:
+    """
+    Return the line closing the first brace opened from line start on.
+
+    Braces in strings and comments are counted too, which is close enough
+    for locating definitions. A definition without braces, such as a
+    declaration, ends on its own line.
+    """
+    depth = 0
+    opened = False
+    for number in range(start, len(lines) + 1):
+        line = lines[number - 1]
+        if not opened and number > start and "{" not in line:
+            return start  # No body found right after the definition
+        opens = line.count("{")
+        opened = opened or opens > 0
+        depth += opens - line.count("}")
+        if opened and depth <= 0:
+            return number
+        if not opened and line.rstrip().endswith(";"):
+            return number
+    return len(lines)
+
+
+class SymbolIndex:
+    """
+    Definitions and references of a repository's files, updated incrementally.
+
+    Each file's symbols are stored with its size, modification time and
+    content hash, all loaded for a repository in one query. Only files
+    whose size or modification time changed are read again, and only
+    content with a hash not seen before is parsed. Files modified too
+    recently to trust their stat are not stored by path, as StatCache
+    does. Symbols are kept in their stored form, and definitions built
+    only for names queried. References are kept per file, without lines.
+    """
+
+    def __init__(
+        self,
+        read_source: Callable[[str], str],
+        repo_root: Path,
+        cache: ContentCache | None = None,
+        files_cache: ContentCache | None = None,
+    ):
+        """Initialize with a reader of files by relative path and caches."""
+        self.read_source = read_source
+        self.cache = cache
+        self.files_cache = files_cache
+        self.prefix = f"v{SYMBOLS_VERSION}:{repo_root.resolve()}/"
+        self.files: dict[str, list[Any]] = {}  # FileSymbols.to_json data
+        self.parsed = 0  # Distinct contents parsed by the last update
+
+    def update(self, files: Iterable[tuple[str, str, int, int]]) -> None:
+        """
+        Bring the index up to date with the files of the repository.
+
+        Args:
+            files: Relative path, language, size and mtime of every file
+        """
+        known = self.files_cache.get_prefix(self.prefix) if self.files_cache else {}
+        changed = []
+        parsed: dict[str, list[Any]] = {}
+        self.files = {}
+        racy_after = time.time_ns() - RACY_NANOSECONDS
+        for relative_path, language, size, mtime_ns in files:
+            entry = known.get(relative_path)
+            if entry and entry[0] == size and entry[1] == mtime_ns:
+                self.files[relative_path] = entry[3]
+                continue
+
+            source = self.read_source(relative_path)
+            key = f"{SYMBOLS_VERSION}:{language}:{content_hash(source)}"
+            symbols = parsed.get(key)
+            if symbols is None and self.cache:
+                symbols = self.cache.get(key)
+            if symbols is None:
+                symbols = parsed[key] = index_source(source, language).to_json()
+            self.files[relative_path] = symbols
+            if mtime_ns < racy_after:
+                changed.append(
+                    (self.prefix + relative_path, [size, mtime_ns, key, symbols])
+                )
+
+        self.parsed = len(parsed)
+        if self.cache and parsed:
+            self.cache.set_many(parsed.items())
+        if self.files_cache and changed:
+            self.files_cache.set_many(changed)
+
+    def definitions(self, symbol: str) -> list[tuple[str, Definition]]:
+        """Return the files and definitions matching symbol, in file order."""
+        suffix = "." + symbol
+        return [
+            (relative_path, Definition(*entry))
+            for relative_path, (definitions, _) in self.files.items()
+            for entry in definitions
+            if entry[0] == symbol or entry[0].endswith(suffix)
+        ]
+
+    def references(self, symbol: str) -> list[str]:
+        """Return the files using the last component of symbol, in file order."""
+        name = symbol.rpartition(".")[2]
+        return [
+            relative_path
+            for relative_path, (_, references) in self.files.items()
+            if name in references
+        ]
@@ -0,0 +1,110 @@
+"""Chrome trace-event recording of per-file pipeline spans."""
+
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+# === CONSTANTS ===
+
+STAGE_CATEGORY = "stage"
+REQUEST_CATEGORY = "request"
+MICROSECONDS = 1_000_000
+
+
+class Tracer:
+    """
+    Records spans as Chrome trace events.
+
+    The output loads in Perfetto (ui.perfetto.dev) or chrome://tracing with
+    one track per thread, so a file or request holding up a run stands out.
+    Events may be recorded from any thread; list appends are atomic, so the
+    hot path takes no lock.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty trace starting now."""
+        self.events: list[dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._thread_names: dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    def complete(
+        self, name: str, start: float, end: float, args: dict[str, Any]
+    ) -> None:
+        """
+        Record a span on the current thread's track.
+
+        Args:
+            name: Span name, such as the stage
+            start: Start time from time.perf_counter()
+            end: End time from time.perf_counter()
+            args: Details shown with the span, such as the file path
+        """
+        self.events.append(
+            {
+                "name": name,
+                "cat": STAGE_CATEGORY,
+                "ph": "X",
+                "ts": (start - self._origin) * MICROSECONDS,
+                "dur": (end - start) * MICROSECONDS,
+                "pid": self._pid,
+                "tid": self._thread_id(),
+                "args": args,
+            }
+        )
+
+    def begin_async(self, name: str, args: dict[str, Any]) -> int:
+        """Start an overlapping span, such as a network request; returns its id."""
+        span_id = next(self._ids)
+        self._async_event("b", name, span_id, args)
+        return span_id
+
+    def end_async(self, name: str, span_id: int) -> None:
+        """End a span started with begin_async."""
+        self._async_event("e", name, span_id, {})
+
+    def write(self, path: Path) -> None:
+        """Write the trace as Chrome trace-event JSON."""
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self._thread_names.items()
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f
+            )
+
+    def _async_event(
+        self, phase: str, name: str, span_id: int, args: dict[str, Any]
+    ) -> None:
+        """Record one end of an async span."""
+        self.events.append(
+            {
+                "name": name,
+                "cat": REQUEST_CATEGORY,
+                "ph": phase,
+                "id": span_id,
+                "ts": (time.perf_counter() - self._origin) * MICROSECONDS,
+                "pid": self._pid,
+                "tid": self._thread_id(),
+                "args": args,
+            }
+        )
+
+    def _thread_id(self) -> int:
+        """Identify the current thread, remembering its name for the output."""
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        return tid
@@ -1,5 +1,7 @@
 """Utility functions for repo2context."""
 
+import functools
+import hashlib
 import mimetypes
 from pathlib import Path
 
@@ -121,7 +123,7 @@ def detect_binary(file_path: Path) -> bool:
     """
     try:
         # Check MIME type first
-        if _is_binary_by_mime_type(file_path):
+        if is_binary_name(file_path.name):
             return True
 
         # Check for null bytes in first chunk
@@ -132,9 +134,32 @@ def detect_binary(file_path: Path) -> bool:
         return True
 
 
-def _is_binary_by_mime_type(file_path: Path) -> bool:
-    """Check if file is binary based on MIME type."""
-    mime_type, _ = mimetypes.guess_type(str(file_path))
+def is_binary_name(file_name: str) -> bool:
+    """
+    Check if a file name implies a binary MIME type.
+
+    Cheaper than detect_binary, which also reads the file, but misses
+    binary files whose names do not give them away.
+
+    Args:
+        file_name: Name of the file
+
+    Returns:
+        True if the name maps to a non-text MIME type, False otherwise
+    """
+    # Only the last two suffixes affect the MIME type, as in ".tar.gz"
+    last_dot = file_name.rfind(".")
+    if last_dot <= 0:
+        return False
+    previous_dot = file_name.rfind(".", 0, last_dot)
+    start = previous_dot if previous_dot > 0 else last_dot
+    return _is_binary_suffix(file_name[start + 1 :])
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_binary_suffix(suffix: str) -> bool:
+    """Check if files ending in suffix have a non-text MIME type."""
+    mime_type, _ = mimetypes.guess_type(f"file.{suffix}")
     if not mime_type:
         return False
 
@@ -186,6 +211,19 @@ def estimate_tokens(text: str) -> int:
     return len(text) // CHARS_PER_TOKEN
 
 
+def content_hash(text: str) -> str:
+    """
+    Compute a stable hash of text content for cache keys.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex-encoded SHA-256 digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
 def format_bytes(bytes_count: int) -> str:
     """
     Format byte count in human-readable format.
@@ -0,0 +1,189 @@
+"""Per-repository state kept warm across runs by long-lived processes."""
+
+import os
+import threading
+from collections.abc import Generator
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import ContentCacheSet
+from .core import FileInfo, FileSystemRepositoryImpl, IgnorePatternServiceImpl
+from .statcache import StatCache
+
+# === CONSTANTS ===
+
+IGNORE_FILE_NAME = ".repo2contextignore"
+# Remembered ignore decisions are dropped beyond this many, so paths of
+# deleted files cannot accumulate without bound
+MAX_IGNORE_DECISIONS = 1_000_000
+
+
+@dataclass(frozen=True)
+class _Listing:
+    """Entries of one directory, split as os.walk splits them."""
+
+    dirs: list[str]
+    files: list[str]
+    symlinked_dirs: frozenset[str]
+
+
+class CachedFileSystemRepositoryImpl(FileSystemRepositoryImpl):
+    """
+    File system operations remembering directory listings between runs.
+
+    Adding, removing or renaming an entry updates its directory's mtime,
+    so a listing stays valid while that mtime is unchanged and a repeated
+    walk only stats directories. Edits to file contents do not show up
+    here; the file caches check those.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no listings."""
+        self.listings: StatCache[_Listing] = StatCache()
+
+    def walk_directory(
+        self, path: Path
+    ) -> Generator[tuple[Path, list[str], list[str]], None, None]:
+        """Walk top-down like os.walk, pruning directories removed from dirs."""
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            listing = self._list(directory)
+            if listing is None:
+                continue
+
+            dirs = list(listing.dirs)
+            yield directory, dirs, list(listing.files)
+
+            # Depth first in listing order; symlinked directories are not entered
+            pending.extend(
+                directory / name
+                for name in reversed(dirs)
+                if name not in listing.symlinked_dirs
+            )
+
+    def _list(self, directory: Path) -> _Listing | None:
+        """List a directory, reusing the last listing while it is unchanged."""
+        key = str(directory)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+
+        listing = self.listings.get(key, stat)
+        if listing is not None:
+            return listing
+
+        dirs: list[str] = []
+        files: list[str] = []
+        symlinked_dirs = set()
+        try:
+            with os.scandir(key) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dirs.append(entry.name)
+                        if entry.is_symlink():
+                            symlinked_dirs.add(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            return None
+
+        listing = _Listing(dirs, files, frozenset(symlinked_dirs))
+        self.listings.put(key, stat, listing)
+        return listing
+
+
+class CachedIgnorePatternServiceImpl(IgnorePatternServiceImpl):
+    """Ignore rules remembering their decision for every path checked."""
+
+    def __init__(self, rules_file: Path | None = None, repo_root: Path | None = None):
+        """Initialize ignore service with no remembered decisions."""
+        super().__init__(rules_file, repo_root)
+        self._decisions: dict[tuple[Path, Path], bool] = {}
+
+    def should_ignore(self, file_path: Path, relative_to: Path) -> bool:
+        """Check if a file should be ignored, answering repeats from memory."""
+        key = (file_path, relative_to)
+        decision = self._decisions.get(key)
+        if decision is None:
+            if len(self._decisions) >= MAX_IGNORE_DECISIONS:
+                self._decisions.clear()
+            decision = super().should_ignore(file_path, relative_to)
+            self._decisions[key] = decision
+        return decision
+
+
+class RepositoryState:
+    """
+    Warm state of one repository, shared by every run against it.
+
+    Holds the compiled ignore rules, directory listings, binary checks and
+    processed files. Each is checked against the file system on use:
+    rules are recompiled when the rules file changes, and listings and
+    files are reused only while their stat is unchanged. Persistent caches
+    in cache_dir stay open until close. Runs against the same repository
+    must hold lock.
+    """
+
+    def __init__(
+        self,
+        repo_path: Path,
+        rules_file: Path | None = None,
+        cache_dir: Path | None = None,
+    ):
+        """Initialize empty state for a repository."""
+        self.repo_path = repo_path
+        self.rules_file = rules_file
+        self.lock = threading.Lock()
+        self.file_system_repo = CachedFileSystemRepositoryImpl()
+        self.binary_cache: StatCache[bool] = StatCache()
+        self.caches = ContentCacheSet(cache_dir) if cache_dir else None
+        # Processed files depend on the skeleton threshold, so one cache each
+        self._file_caches: dict[int | None, StatCache[FileInfo]] = {}
+        self._ignore_service: CachedIgnorePatternServiceImpl | None = None
+        self._rules_version: tuple[int, int] | None = None
+
+    @property
+    def ignore_service(self) -> CachedIgnorePatternServiceImpl:
+        """Ignore rules, recompiled if the rules file changed since last use."""
+        version = self._read_rules_version()
+        if self._ignore_service is None or version != self._rules_version:
+            self._ignore_service = CachedIgnorePatternServiceImpl(
+                self.rules_file, self.repo_path
+            )
+            self._rules_version = version
+        return self._ignore_service
+
+    @property
+    def rules_path(self) -> Path:
+        """Rules file in effect, whether or not it exists."""
+        return self.rules_file or self.repo_path / IGNORE_FILE_NAME
+
+    def file_cache(self, skeleton_min_tokens: int | None) -> StatCache[FileInfo]:
+        """Processed files for runs with this skeleton threshold."""
+        cache = self._file_caches.get(skeleton_min_tokens)
+        if cache is None:
+            cache = self._file_caches[skeleton_min_tokens] = StatCache()
+        return cache
+
+    def cached_files(self) -> int:
+        """Number of processed files held across all skeleton thresholds."""
+        return sum(len(cache) for cache in self._file_caches.values())
+
+    def close(self) -> None:
+        """Close the persistent caches opened by runs."""
+        if self.caches:
+            self.caches.close()
+
+    def _read_rules_version(self) -> tuple[int, int] | None:
+        """Size and mtime of the rules file in effect, or None if there is none."""
+        try:
+            stat = self.rules_path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
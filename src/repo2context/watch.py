@@ -0,0 +1,654 @@
+"""Keeping context files up to date as the repository changes."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Protocol
+
+from .core import (
+    DEFAULT_MAX_TOKENS,
+    EXIT_ERROR,
+    EXIT_SPLIT_FILES,
+    EXIT_SUCCESS,
+    ContextGenerationServiceFactory,
+    GenerateContextUseCase,
+    IgnorePatternService,
+    InMemoryContextWriterServiceImpl,
+    ProcessingConfig,
+    RenderedSection,
+    SummaryConfig,
+    stream_context,
+)
+from .defaults import DEFAULT_WATCH_DEBOUNCE_MS
+from .pipeline import DEFAULT_QUEUE_SIZE
+from .utils import create_output_dir
+from .warm import RepositoryState
+
+# === CONSTANTS ===
+
+MAX_BATCH_SECONDS = 1.0  # Longest a burst may delay an update
+POLL_INTERVAL_SECONDS = 0.5
+
+# inotify(7) flags, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+EVENT_BUFFER_BYTES = 64 * 1024
+
+
+class Watcher(Protocol):
+    """Interface for sources of file system changes."""
+
+    name: str
+
+    def watch(self, directories: Iterable[Path]) -> list[Path]:
+        """Watch exactly these directories, returning the newly watched ones."""
+        ...
+
+    def read_changes(self, timeout: float | None) -> set[Path] | None:
+        """
+        Wait up to timeout seconds (forever if None) for changed paths.
+
+        Returns the paths of changed, created and deleted entries, an empty
+        set if nothing changed in time, or None if changes were lost.
+        """
+        ...
+
+    def close(self) -> None:
+        """Release the watches."""
+        ...
+
+
+class InotifyWatcher:
+    """Watcher notified by the Linux kernel through inotify."""
+
+    name = "inotify"
+
+    def __init__(self, libc: ctypes.CDLL):
+        """Initialize an inotify instance without watches."""
+        self._libc = libc
+        self._libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            self._raise_errno("inotify_init1")
+        self._paths: dict[int, Path] = {}
+        self._watches: dict[Path, int] = {}
+
+    def watch(self, directories: Iterable[Path]) -> list[Path]:
+        """Watch exactly these directories, returning the newly watched ones."""
+        wanted = set(directories)
+        for path in set(self._watches) - wanted:
+            descriptor = self._watches.pop(path)
+            self._paths.pop(descriptor, None)
+            self._libc.inotify_rm_watch(self._fd, descriptor)
+
+        added = []
+        for path in wanted - set(self._watches):
+            descriptor = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(path), WATCH_MASK
+            )
+            if descriptor < 0:
+                if ctypes.get_errno() == errno.ENOSPC:
+                    self._raise_errno("inotify_add_watch")
+                continue  # Removed meanwhile; its parent reports that
+            self._watches[path] = descriptor
+            self._paths[descriptor] = path
+            added.append(path)
+        return added
+
+    def read_changes(self, timeout: float | None) -> set[Path] | None:
+        """Wait up to timeout seconds for changed paths; None if events were lost."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, EVENT_BUFFER_BYTES)
+        except BlockingIOError:
+            return set()
+
+        changes: set[Path] = set()
+        lost = False
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                lost = True
+                continue
+            directory = self._paths.get(descriptor)
+            if directory is None:
+                continue
+            changes.add(directory / os.fsdecode(name) if name else directory)
+            if mask & IN_IGNORED:
+                # The kernel dropped the watch, as the directory is gone
+                del self._paths[descriptor]
+                self._watches.pop(directory, None)
+        return None if lost else changes
+
+    def close(self) -> None:
+        """Close the inotify instance, removing all watches."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    @staticmethod
+    def _raise_errno(function: str) -> None:
+        """Raise the error of a failed libc call."""
+        code = ctypes.get_errno()
+        raise OSError(code, f"{function}: {os.strerror(code)}")
+
+
+class PollingWatcher:
+    """
+    Watcher comparing directory listings at intervals.
+
+    Used where inotify is unavailable. Each poll lists the watched
+    directories and stats their entries, so it costs about as much as a
+    walk of the repository; changes show up within one interval.
+    """
+
+    name = "polling"
+
+    def __init__(self, interval: float = POLL_INTERVAL_SECONDS):
+        """Initialize watcher polling every interval seconds."""
+        self.interval = interval
+        self._listings: dict[Path, dict[str, tuple[int, int, bool]]] = {}
+
+    def watch(self, directories: Iterable[Path]) -> list[Path]:
+        """Watch exactly these directories, returning the newly watched ones."""
+        wanted = set(directories)
+        for path in set(self._listings) - wanted:
+            del self._listings[path]
+
+        added = []
+        for path in wanted - set(self._listings):
+            self._listings[path] = self._list(path)
+            added.append(path)
+        return added
+
+    def read_changes(self, timeout: float | None) -> set[Path] | None:
+        """Poll until something changed or timeout seconds have passed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = (
+                self.interval if deadline is None else deadline - time.monotonic()
+            )
+            time.sleep(max(0.0, min(self.interval, remaining)))
+            changes = self._poll()
+            if changes or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+
+    def close(self) -> None:
+        """Forget the watched directories."""
+        self._listings.clear()
+
+    def _poll(self) -> set[Path]:
+        """Compare every watched directory with its last listing."""
+        changes: set[Path] = set()
+        for directory, previous in self._listings.items():
+            current = self._list(directory)
+            if current == previous:
+                continue
+            self._listings[directory] = current
+            for name in previous.keys() | current.keys():
+                if previous.get(name) != current.get(name):
+                    changes.add(directory / name)
+        return changes
+
+    @staticmethod
+    def _list(directory: Path) -> dict[str, tuple[int, int, bool]]:
+        """Size, mtime and kind of every entry of a directory."""
+        listing = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                        listing[entry.name] = (
+                            stat.st_size,
+                            stat.st_mtime_ns,
+                            entry.is_dir(),
+                        )
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return listing
+
+
+def create_watcher(polling: bool = False) -> Watcher:
+    """Create an inotify watcher on Linux, falling back to polling elsewhere."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            return InotifyWatcher(libc)
+        except (OSError, AttributeError) as e:
+            print(
+                f"Warning: inotify unavailable ({e}), polling for changes instead",
+                file=sys.stderr,
+            )
+    return PollingWatcher()
+
+
+def debounced_changes(
+    watcher: Watcher, debounce_seconds: float
+) -> Iterator[set[Path] | None]:
+    """
+    Yield changes in batches, each ending after debounce_seconds of quiet.
+
+    Editors save with several writes and renames in quick succession, so
+    a burst becomes one update. A batch never waits for more than
+    MAX_BATCH_SECONDS, so constant writes still produce updates. None
+    means changes were lost and everything must be checked.
+    """
+    while True:
+        changes = watcher.read_changes(None)
+        if changes is not None and not changes:
+            continue
+
+        deadline = time.monotonic() + MAX_BATCH_SECONDS
+        while changes is not None and time.monotonic() < deadline:
+            more = watcher.read_changes(debounce_seconds)
+            if more is None:
+                changes = None
+            elif not more:
+                break
+            else:
+                changes |= more
+        yield changes
+
+
+class WatchedContext:
+    """
+    Context files of a repository, updated file by file as it changes.
+
+    Keeps the rendered section of every file in walk order. A change to a
+    file re-renders only its section, and only the parts whose text then
+    differs are rewritten. Files or directories being added or removed
+    re-walk the tree from warm directory listings, which stats directories
+    but reads no files. Changed ignore rules, lost events and token
+    budgets, which weigh every file against the others, rebuild
+    everything from the warm caches instead.
+    """
+
+    def __init__(
+        self,
+        state: RepositoryState,
+        output_dir: Path,
+        options: dict[str, Any],
+        watcher: Watcher,
+    ):
+        """Initialize for a repository, with options for create_use_case."""
+        self.state = state
+        self.repo_path = state.repo_path
+        self.output_dir = output_dir
+        self.options = options
+        self.watcher = watcher
+        self.writer = InMemoryContextWriterServiceImpl(
+            options["max_tokens"], frozenset(options["optimize_stages"] or ())
+        )
+        self.sections: dict[str, RenderedSection] = {}  # By relative path
+        self.order: list[str] = []  # Relative paths of all files, in walk order
+        self.walked: set[str] = set()
+        self.directories: set[str] = set()
+        # Entries of each directory and those not ignored, as of the last walk
+        self._kept: dict[
+            Path,
+            tuple[tuple[tuple[str, ...], tuple[str, ...]], tuple[list[str], list[str]]],
+        ] = {}
+        self._kept_by: IgnorePatternService | None = None
+        self.parts: list[str] = []
+        self._part_sections: list[list[RenderedSection]] = []
+        self.use_case: GenerateContextUseCase | None = None
+        self.config: ProcessingConfig | None = None
+
+    @property
+    def exit_code(self) -> int:
+        """Exit code for the parts written last."""
+        return EXIT_SPLIT_FILES if len(self.parts) > 1 else EXIT_SUCCESS
+
+    def build(self, verbose: bool = True) -> int:
+        """Render every file and write all parts, returning the exit code."""
+        # Watch before rendering, so files changed meanwhile are reported
+        self._walk()
+        writer = InMemoryContextWriterServiceImpl(
+            self.options["max_tokens"],
+            frozenset(self.options["optimize_stages"] or ()),
+        )
+        use_case, config = ContextGenerationServiceFactory.create_use_case(
+            **self.options,
+            writer_service=writer,
+            verbose=verbose,
+            file_system_repo=self.state.file_system_repo,
+            ignore_service=self.state.ignore_service,
+            file_cache=self.state.file_cache(self.options["skeleton_min_tokens"]),
+            binary_cache=self.state.binary_cache,
+            caches=self.state.caches,
+        )
+        sections = {}
+        stream = stream_context(use_case, config, writer)
+        try:
+            while True:
+                section = next(stream)
+                sections[section.file.path] = section
+        except StopIteration as done:
+            exit_code: int = done.value.exit_code
+        if exit_code == EXIT_ERROR:
+            return EXIT_ERROR
+
+        self.use_case, self.config = use_case, config
+        self.sections = sections
+        self._write_parts()
+        return self.exit_code
+
+    def update(self, changes: set[Path] | None) -> list[int]:
+        """Bring the parts up to date with changes, returning rewritten parts."""
+        if (
+            changes is None
+            or self.use_case is None
+            or self.options["token_budget"] is not None
+            or self.state.ignore_service is not self.use_case.ignore_service
+        ):
+            previous_parts = self.parts
+            self.build(verbose=False)
+            return self._changed_parts(previous_parts)
+
+        modified = set()
+        restructured = False
+        for path in changes:
+            relative = self._relative(path)
+            if relative is None:
+                continue
+            if relative in self.walked:
+                if path.is_file():
+                    modified.add(relative)
+                else:
+                    restructured = True
+            elif path.is_dir() or relative in self.directories:
+                restructured = True
+            elif path.is_file() and not self.state.ignore_service.should_ignore(
+                path, self.repo_path
+            ):
+                restructured = True
+
+        if restructured:
+            previous_files = self.walked
+            self._walk()
+            modified |= self.walked - previous_files
+            for relative in previous_files - self.walked:
+                self.sections.pop(relative, None)
+
+        for relative in modified:
+            self._render(relative)
+        return self._write_parts()
+
+    def _walk(self) -> None:
+        """List files and directories, watching every directory found."""
+        ignore = self.state.ignore_service
+        if ignore is not self._kept_by:
+            self._kept.clear()
+            self._kept_by = ignore
+        while True:
+            files: list[str] = []
+            directories = []
+            relative_directories: set[str] = set()
+            walk = self.state.file_system_repo.walk_directory(self.repo_path)
+            for root, dirs, names in walk:
+                relative_root = self._relative(root)
+                if relative_root is None:  # The output directory
+                    dirs[:] = []
+                    continue
+                directories.append(root)
+                dirs[:], kept_names = self._kept_entries(root, dirs, names, ignore)
+                relative_directories.add(relative_root)
+                prefix = "" if relative_root == "." else f"{relative_root}/"
+                files.extend(prefix + name for name in kept_names)
+            self._kept = {directory: self._kept[directory] for directory in directories}
+            self.order = files
+            self.walked = set(files)
+            self.directories = relative_directories
+
+            watched = list(directories)
+            rules_directory = self.state.rules_path.parent
+            if self._relative(rules_directory) is None:
+                watched.append(rules_directory)
+            # Files created in a new directory before its watch was added
+            # went unreported, so walk again until no directory is new
+            if not self.watcher.watch(watched) or self.use_case is None:
+                return
+
+    def _kept_entries(
+        self,
+        root: Path,
+        dirs: list[str],
+        names: list[str],
+        ignore: IgnorePatternService,
+    ) -> tuple[list[str], list[str]]:
+        """Subdirectories and files of root not ignored, reused while unchanged."""
+        entries = (tuple(dirs), tuple(names))
+        previous = self._kept.get(root)
+        if previous is not None and previous[0] == entries:
+            return previous[1]
+
+        # A full run enters ignored directories and skips their files, as
+        # the rules match those; their directories are not worth watching
+        prefix = "" if root == self.repo_path else f"{self._relative(root)}/"
+        kept = (
+            [
+                d
+                for d in dirs
+                if not ignore.should_ignore_entry(prefix + d, d, True)
+                and not ignore.should_ignore(root / d, self.repo_path)
+            ],
+            [n for n in names if not ignore.should_ignore(root / n, self.repo_path)],
+        )
+        self._kept[root] = (entries, kept)
+        return kept
+
+    def _render(self, relative: str) -> None:
+        """Render the section of one file again, or drop it if now skipped."""
+        assert self.use_case is not None and self.config is not None  # For mypy
+        path = self.repo_path / relative
+        self.sections.pop(relative, None)
+        if self.use_case.filter_service.skip_reason(path, self.repo_path):
+            return
+        file_info = self.use_case.processor_service.process_file(path, self.repo_path)
+        if not file_info or not file_info.content:
+            return
+        if self.config.enable_summary and self.use_case.summary_service:
+            file_info = next(
+                iter(self.use_case.summary_service.summarize_stream([file_info])),
+                file_info,
+            )
+        self.sections[relative] = self.writer.render(file_info, 0)
+
+    def _write_parts(self) -> list[int]:
+        """Split sections into parts as the writer does and write changed ones."""
+        max_tokens = self.options["max_tokens"]
+        parts: list[list[RenderedSection]] = []
+        current_tokens = 0
+        for relative in self.order:
+            section = self.sections.get(relative)
+            if section is None:
+                continue
+            tokens = section.file.token_count
+            if not parts or (current_tokens + tokens > max_tokens and current_tokens):
+                parts.append([])
+                current_tokens = 0
+            parts[-1].append(section)
+            current_tokens += tokens
+
+        # Only parts holding a new section need joining again
+        previous = self.parts
+        self.parts = [
+            (
+                previous[index]
+                if index < len(self._part_sections)
+                and _same_sections(self._part_sections[index], sections)
+                else "".join(section.text for section in sections)
+            )
+            for index, sections in enumerate(parts)
+        ]
+        self._part_sections = parts
+
+        changed = self._changed_parts(previous)
+        if changed:
+            create_output_dir(self.output_dir)
+        for number in changed:
+            if number <= len(self.parts):
+                self._write_part(number, self.parts[number - 1])
+            else:
+                self._part_path(number).unlink(missing_ok=True)
+        return changed
+
+    def _changed_parts(self, previous: list[str]) -> list[int]:
+        """Numbers of parts that differ from previous, including removed ones."""
+        return [
+            number
+            for number in range(1, max(len(previous), len(self.parts)) + 1)
+            if number > len(previous)
+            or number > len(self.parts)
+            or previous[number - 1] != self.parts[number - 1]
+        ]
+
+    def _write_part(self, number: int, text: str) -> None:
+        """Replace a part file, so readers never see it half written."""
+        path = self._part_path(number)
+        temporary = path.with_name(f".{path.name}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temporary, path)
+
+    def _part_path(self, number: int) -> Path:
+        """Path of a part file, named as ContextWriterServiceImpl names it."""
+        return self.output_dir / f"repocontext_part{number:02d}.md"
+
+    def _relative(self, path: Path) -> str | None:
+        """Path relative to the repository, or None if outside it or the output."""
+        # String operations, as Path.relative_to is slow for whole walks
+        name = str(path)
+        output_dir = str(self.output_dir)
+        if name == output_dir or name.startswith(output_dir + os.sep):
+            return None
+        repo_path = str(self.repo_path)
+        if name == repo_path:
+            return "."
+        if not name.startswith(repo_path + os.sep):
+            return None
+        return name[len(repo_path) + 1 :].replace(os.sep, "/")
+
+
+def _same_sections(
+    previous: list[RenderedSection], current: list[RenderedSection]
+) -> bool:
+    """Check if two parts hold the very same section objects."""
+    return len(previous) == len(current) and all(
+        a is b for a, b in zip(previous, current, strict=True)
+    )
+
+
+def watch_context(
+    repo_path: Path | None = None,
+    rules_file: Path | None = None,
+    output_path: Path | None = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    only_extensions: list[str] | None = None,
+    enable_summary: bool = False,
+    profile: str | None = None,
+    skeleton_min_tokens: int | None = None,
+    cache_dir: Path | None = None,
+    optimize_stages: list[str] | None = None,
+    summary_config: SummaryConfig | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    token_budget: int | None = None,
+    debounce_ms: int = DEFAULT_WATCH_DEBOUNCE_MS,
+    polling: bool = False,
+) -> int:
+    """
+    Generate context files, then keep them up to date until interrupted.
+
+    Takes the options of generate_context that concern the output.
+
+    Args:
+        debounce_ms: Quiet time in milliseconds that ends a burst of changes
+        polling: Poll for changes even where inotify is available
+
+    Returns:
+        Exit code for the last parts written: 0 for one part, 1 if split,
+        2 for fatal error
+    """
+    repo_path = (repo_path or Path.cwd()).resolve()
+    output_path = (output_path or repo_path / ".repo2context").resolve()
+    state = RepositoryState(
+        repo_path, rules_file.resolve() if rules_file else None, cache_dir
+    )
+    options: dict[str, Any] = {
+        "repo_path": repo_path,
+        "rules_file": state.rules_file,
+        "max_tokens": max_tokens,
+        "only_extensions": only_extensions,
+        "enable_summary": enable_summary,
+        "profile": profile,
+        "skeleton_min_tokens": skeleton_min_tokens,
+        "cache_dir": cache_dir,
+        "optimize_stages": optimize_stages,
+        "summary_config": summary_config,
+        "queue_size": queue_size,
+        "token_budget": token_budget,
+    }
+
+    watcher = create_watcher(polling)
+    context = WatchedContext(state, output_path, options, watcher)
+    try:
+        if context.build() == EXIT_ERROR:
+            return EXIT_ERROR
+        print(f"Context written to {output_path}")
+        print(f"Watching {repo_path} for changes ({watcher.name}), Ctrl+C to stop")
+
+        for changes in debounced_changes(watcher, debounce_ms / 1000):
+            started = time.perf_counter()
+            rewritten = context.update(changes)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if rewritten:
+                numbers = ", ".join(str(number) for number in rewritten)
+                print(f"Updated in {elapsed_ms:.0f} ms: rewrote part(s) {numbers}")
+    except KeyboardInterrupt:
+        print("\nStopped watching", file=sys.stderr)
+    finally:
+        watcher.close()
+        state.close()
+    return context.exit_code
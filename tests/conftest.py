@@ -0,0 +1,40 @@
+"""Shared fixtures for the repo2context tests."""
+
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def repo(request):
+    """
+    A temporary directory with the test module's FILES written under repo/.
+
+    Tests put their output, caches and configuration beside the repository.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        for relative, content in request.module.FILES.items():
+            path = root / "repo" / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        yield root
+
+
+@pytest.fixture
+def sections(repo) -> Callable[[Path], list[str]]:
+    """Reader of the relative paths of the repository's files in a part, in order."""
+    root = repo / "repo"
+
+    def read(part_path: Path) -> list[str]:
+        files = {
+            path.relative_to(root).as_posix()
+            for path in root.rglob("*")
+            if path.is_file()
+        }
+        lines = part_path.read_text(encoding="utf-8").splitlines()
+        return [line for line in lines if line in files]
+
+    return read
@@ -0,0 +1,200 @@
+"""Tests for repo2context.batch module."""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+from repo2context.batch import (
+    BatchJob,
+    ManifestError,
+    create_jobs,
+    read_manifest,
+    run_batch,
+)
+from repo2context.core import EXIT_ERROR, generate_context
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "test_repo"
+
+
+@pytest.fixture
+def repos():
+    """Two copies of the fixture repository in a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        for name in ("alpha", "beta"):
+            shutil.copytree(FIXTURE_PATH, root / name)
+        yield root
+
+
+def _parts(output_dir: Path) -> list[str]:
+    """Text of the part files in a directory, in order."""
+    return [
+        path.read_text(encoding="utf-8")
+        for path in sorted(output_dir.glob("repocontext_part*.md"))
+    ]
+
+
+class TestReadManifest:
+    """Tests for read_manifest function."""
+
+    def test_paths_are_relative_to_manifest(self, repos):
+        """Test that relative repository and output paths use the manifest's dir."""
+        manifest = repos / "repos.json"
+        manifest.write_text(
+            json.dumps(
+                {
+                    "repositories": [
+                        "alpha",
+                        {"repo_path": "beta", "output_path": "out/beta"},
+                    ]
+                }
+            )
+        )
+
+        entries = read_manifest(manifest)
+
+        assert entries == [
+            str(repos / "alpha"),
+            {"repo_path": str(repos / "beta"), "output_path": str(repos / "out/beta")},
+        ]
+
+    def test_plain_list(self, repos):
+        """Test that a manifest can be a bare list of paths."""
+        manifest = repos / "repos.json"
+        manifest.write_text(json.dumps(["alpha", "beta"]))
+
+        assert read_manifest(manifest) == [str(repos / "alpha"), str(repos / "beta")]
+
+    def test_invalid_manifest(self, repos):
+        """Test that unreadable or malformed manifests raise ManifestError."""
+        manifest = repos / "repos.json"
+        manifest.write_text('{"repositories": "alpha"}')
+
+        with pytest.raises(ManifestError):
+            read_manifest(manifest)
+        with pytest.raises(ManifestError):
+            read_manifest(repos / "missing.json")
+
+
+class TestCreateJobs:
+    """Tests for create_jobs function."""
+
+    def test_defaults_and_overrides(self, repos):
+        """Test that entries override the defaults for their repository only."""
+        jobs = create_jobs(
+            [
+                str(repos / "alpha"),
+                {"repo_path": str(repos / "beta"), "max_tokens": 5000},
+            ],
+            {"max_tokens": 20000, "only_extensions": ["py"]},
+        )
+
+        assert [job.max_tokens for job in jobs] == [20000, 5000]
+        assert jobs[1].only_extensions == ["py"]
+        assert jobs[0].output_path == repos / "alpha" / ".repo2context"
+
+    def test_entry_extensions_replace_default_profile(self, repos):
+        """Test that an entry's extensions do not clash with a default profile."""
+        jobs = create_jobs(
+            [{"repo_path": str(repos / "alpha"), "only_extensions": "md"}],
+            {"profile": "minimal"},
+        )
+
+        assert jobs[0].profile is None
+        assert jobs[0].only_extensions == ["md"]
+
+    def test_output_root(self, repos):
+        """Test that output_root gets one directory per repository."""
+        jobs = create_jobs(
+            [str(repos / "alpha"), str(repos / "beta")], output_root=repos / "out"
+        )
+
+        assert [job.output_path for job in jobs] == [
+            repos / "out" / "alpha",
+            repos / "out" / "beta",
+        ]
+
+    def test_shared_output_is_rejected(self, repos):
+        """Test that two repositories cannot write to the same directory."""
+        with pytest.raises(ManifestError, match="both write to"):
+            create_jobs([str(repos / "alpha"), str(repos / "alpha")])
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"max_tokens": 10},
+            {"profile": "unknown"},
+            {"optimize_stages": ["unknown"]},
+            {"enable_summary": "yes"},
+            {"colour": "blue"},
+        ],
+    )
+    def test_invalid_options(self, repos, options):
+        """Test that invalid options name the repository at fault."""
+        with pytest.raises(ManifestError, match="Repository 1"):
+            create_jobs([{"repo_path": str(repos / "alpha"), **options}])
+
+
+class TestRunBatch:
+    """Tests for run_batch function."""
+
+    def test_outputs_match_single_runs(self, repos):
+        """Test that each repository gets the parts a single run writes."""
+        jobs = create_jobs(
+            [str(repos / "alpha"), str(repos / "beta")],
+            {"max_tokens": 2000},
+            repos / "out",
+        )
+
+        report = run_batch(jobs, workers=1, verbose=False)
+
+        generate_context(repos / "alpha", output_path=repos / "single", max_tokens=2000)
+        assert report.exit_code == 0
+        assert _parts(repos / "out" / "alpha") == _parts(repos / "single")
+        assert _parts(repos / "out" / "beta") == _parts(repos / "single")
+
+    def test_worker_pool(self, repos):
+        """Test that several worker processes produce the same report."""
+        jobs = create_jobs([str(repos / "alpha"), str(repos / "beta")])
+
+        report = run_batch(jobs, workers=2, verbose=False)
+
+        assert report.jobs == 2
+        assert [result.repo_path for result in report.results] == [
+            str(repos / "alpha"),
+            str(repos / "beta"),
+        ]
+        assert all(result.stats for result in report.results)
+
+    def test_failures_are_reported(self, repos):
+        """Test that a failing repository does not stop the others."""
+        jobs = [
+            BatchJob(repos / "missing", repos / "out-missing"),
+            BatchJob(repos / "alpha", repos / "out-alpha"),
+        ]
+
+        report = run_batch(jobs, workers=1, verbose=False)
+
+        assert report.exit_code == EXIT_ERROR
+        assert [result.repo_path for result in report.failed] == [
+            str(repos / "missing")
+        ]
+        assert "not a directory" in (report.failed[0].error or "")
+        assert _parts(repos / "out-alpha")
+
+    def test_report_aggregates(self, repos):
+        """Test that the report sums files, tokens and stage timings."""
+        jobs = create_jobs([str(repos / "alpha"), str(repos / "beta")])
+
+        data = run_batch(jobs, workers=1, verbose=False).to_dict()
+
+        first = data["results"][0]["stats"]
+        assert data["repositories"] == 2
+        assert data["failed"] == 0
+        assert data["files"] == 2 * first["files"]
+        assert data["tokens"] == 2 * first["tokens"]
+        assert data["stages"]["read"]["items"] == 2 * first["stages"]["read"]["items"]
+        assert len(data["slowest"]) == 2
+        json.dumps(data)  # Serialisable as written by --stats-json
@@ -0,0 +1,68 @@
+"""Tests for repo2context.budget module."""
+
+from pathlib import Path
+
+from repo2context.budget import (
+    DATA_WEIGHT,
+    DEFAULT_WEIGHT,
+    README_WEIGHT,
+    TEST_WEIGHT,
+    BudgetItem,
+    choose_substitutions,
+    file_weight,
+)
+
+
+class TestFileWeight:
+    """Tests for file_weight function."""
+
+    def test_weights_by_kind(self):
+        """Test that READMEs rank above code, and tests and data below it."""
+        assert file_weight(Path("README.md"), "markdown") == README_WEIGHT
+        assert file_weight(Path("src/app/core.py"), "python") == DEFAULT_WEIGHT
+        assert file_weight(Path("tests/test_core.py"), "python") == TEST_WEIGHT
+        assert file_weight(Path("src/core_test.go"), "go") == TEST_WEIGHT
+        assert file_weight(Path("web/app.spec.ts"), "typescript") == TEST_WEIGHT
+        assert file_weight(Path("data/fixtures.json"), "json") == DATA_WEIGHT
+
+
+class TestChooseSubstitutions:
+    """Tests for choose_substitutions function."""
+
+    def test_nothing_chosen_within_budget(self):
+        """Test that output already within the budget is left alone."""
+        items = [BudgetItem(1000, 50), BudgetItem(2000, 50)]
+
+        assert choose_substitutions(items, 3000) == set()
+
+    def test_prefers_large_low_value_files(self):
+        """Test that big data files are summarised before small code files."""
+        items = [
+            BudgetItem(500, 40),
+            BudgetItem(20000, 30, DATA_WEIGHT),
+            BudgetItem(3000, 60),
+            BudgetItem(800, 40, README_WEIGHT),
+        ]
+
+        assert choose_substitutions(items, 10000) == {1}
+
+    def test_restores_files_not_needed(self):
+        """Test that an early pick is dropped when a later one covers the excess."""
+        items = [
+            BudgetItem(3000, 0, DATA_WEIGHT),
+            BudgetItem(9000, 0),
+            BudgetItem(100, 0),
+        ]
+
+        # The data file goes first but the code file alone covers the excess
+        chosen = choose_substitutions(items, 3200)
+
+        assert chosen == {1}
+        kept = sum(item.full_tokens for i, item in enumerate(items) if i not in chosen)
+        assert kept <= 3200
+
+    def test_summarises_everything_when_budget_too_small(self):
+        """Test that every file that saves tokens is chosen if nothing fits."""
+        items = [BudgetItem(1000, 100), BudgetItem(2000, 100), BudgetItem(10, 20)]
+
+        assert choose_substitutions(items, 50) == {0, 1}
@@ -0,0 +1,106 @@
+"""Tests for repo2context.cache module."""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from repo2context.cache import ContentCache, ContentCacheSet, default_cache_dir
+
+
+class TestContentCache:
+    """Tests for ContentCache class."""
+
+    def test_round_trip_and_counters(self):
+        """Test storing values and counting hits and misses."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ContentCache(Path(temp_dir), "test")
+
+            assert cache.get("missing") is None
+            cache.set("key", {"value": [1, 2, 3]})
+            assert cache.get("key") == {"value": [1, 2, 3]}
+
+            assert cache.stats.hits == 1
+            assert cache.stats.misses == 1
+            assert cache.stats.writes == 1
+            cache.close()
+
+    def test_persists_across_instances(self):
+        """Test that values survive reopening the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = ContentCache(Path(temp_dir), "test")
+            first.set("key", "value")
+            first.close()
+
+            second = ContentCache(Path(temp_dir), "test")
+            assert second.get("key") == "value"
+            second.close()
+
+    def test_namespaces_are_isolated(self):
+        """Test that namespaces do not see each other's entries."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = ContentCache(Path(temp_dir), "first")
+            second = ContentCache(Path(temp_dir), "second")
+
+            first.set("key", "value")
+            assert second.get("key") is None
+
+    def test_set_many_and_get_prefix(self):
+        """Test batched writes and reading every key under a prefix."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ContentCache(Path(temp_dir), "test")
+            cache.set_many([("repo/a.py", 1), ("repo/b/c.py", 2), ("repo2/a.py", 3)])
+
+            assert cache.get_prefix("repo/") == {"a.py": 1, "b/c.py": 2}
+            assert cache.stats.writes == 3
+            cache.close()
+
+    def test_prune_evicts_least_recently_used(self):
+        """Test size-bounded eviction keeps recently used entries."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Each stored value is 12 bytes of JSON
+            cache = ContentCache(Path(temp_dir), "test", max_bytes=30)
+            for key in ["a", "b", "c"]:
+                cache.set(key, "x" * 10)
+                time.sleep(0.01)
+            cache.get("a")
+
+            assert cache.prune() == 1
+            assert cache.stats.evictions == 1
+            assert cache.get("b") is None
+            assert cache.get("a") is not None
+            assert cache.get("c") is not None
+
+    def test_prune_without_budget(self):
+        """Test that unbounded caches never evict."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ContentCache(Path(temp_dir), "test")
+            cache.set("key", "x" * 1000)
+            assert cache.prune() == 0
+
+
+class TestContentCacheSet:
+    """Tests for ContentCacheSet class."""
+
+    def test_namespaces_open_once(self):
+        """Test that each namespace and budget gets one cache, closed together."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            caches = ContentCacheSet(Path(temp_dir))
+            tokens = caches.open("tokens")
+
+            assert caches.open("tokens") is tokens
+            assert caches.open("tokens", max_bytes=100) is not tokens
+
+            caches.close()
+            with pytest.raises(sqlite3.ProgrammingError):
+                tokens.get("key")
+
+
+class TestDefaultCacheDir:
+    """Tests for default_cache_dir function."""
+
+    def test_honours_xdg_cache_home(self, monkeypatch):
+        """Test that XDG_CACHE_HOME is used when set."""
+        monkeypatch.setenv("XDG_CACHE_HOME", "/tmp/xdg")
+        assert default_cache_dir() == Path("/tmp/xdg/repo2context")
@@ -0,0 +1,139 @@
+"""Tests for repo2context.changes module."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from repo2context.changes import GitError, changed_files, import_neighbours
+from repo2context.core import EXIT_ERROR, EXIT_SUCCESS, generate_context
+from repo2context.focus import ImportGraph
+
+FILES = {
+    "app/__init__.py": "",
+    "app/models.py": "class User:\n    pass\n",
+    "app/views.py": "from app.models import User\n\ndef show():\n    return User()\n",
+    "app/util.py": "def helper():\n    return 1\n",
+    "app/old.py": "OLD = 1\n",
+    "docs/guide.md": "# Guide\n",
+    ".gitignore": "*.log\n",
+}
+
+
+def _git(root: Path, *args: str) -> None:
+    """Run a git command in root."""
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "-C",
+            str(root),
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(repo):
+    """The repository as a git repository with one commit, then changes."""
+    _git(repo / "repo", "init", "-q")
+    _git(repo / "repo", "add", ".")
+    _git(repo / "repo", "commit", "-q", "-m", "base")
+    _git(repo / "repo", "tag", "base")
+
+    (repo / "repo/app/util.py").write_text("def helper():\n    return 2\n")
+    _git(repo / "repo", "commit", "-q", "-am", "committed change")
+    (repo / "repo/app/models.py").write_text("class User:\n    name = ''\n")
+    (repo / "repo/app/old.py").unlink()
+    (repo / "repo/docs/new.md").write_text("# New\n")
+    (repo / "repo/debug.log").write_text("ignored\n")
+    return repo
+
+
+class TestChangedFiles:
+    """Tests for changed_files function."""
+
+    def test_committed_local_and_untracked(self, repo):
+        """Test that changes since the ref count, deletions and ignores do not."""
+        assert changed_files(repo / "repo", "base") == [
+            "app/models.py",
+            "app/util.py",
+            "docs/new.md",
+        ]
+
+    def test_subdirectory(self, repo):
+        """Test that a subdirectory lists only its own changes, relative to it."""
+        assert changed_files(repo / "repo/docs", "base") == ["new.md"]
+
+    def test_unknown_revision(self, repo):
+        """Test that a revision git does not know fails with its name."""
+        with pytest.raises(GitError, match="Unknown revision 'nope'"):
+            changed_files(repo / "repo", "nope")
+
+    def test_not_a_repository(self, repo):
+        """Test that directories outside git fail."""
+        outside = repo / "outside"
+        outside.mkdir()
+
+        with pytest.raises(GitError):
+            changed_files(outside, "HEAD")
+
+
+class TestImportNeighbours:
+    """Tests for import_neighbours function."""
+
+    def test_importers_and_imported(self, repo):
+        """Test that neighbours in both directions are found, without changed files."""
+        root = repo / "repo"
+        graph = ImportGraph(lambda path: (root / path).read_text())
+        python_files = ["app/__init__.py", "app/models.py", "app/views.py"]
+
+        assert import_neighbours(graph, python_files, ["app/models.py"]) == [
+            "app/views.py"
+        ]
+        assert import_neighbours(graph, python_files, ["app/views.py"]) == [
+            "app/models.py"
+        ]
+
+
+class TestChangedGeneration:
+    """Tests for generate_context with a git revision."""
+
+    def test_only_changed_files(self, repo, sections):
+        """Test that only files changed since the revision are written."""
+        exit_code = generate_context(
+            repo / "repo", output_path=repo / "out", since="base"
+        )
+
+        assert exit_code == EXIT_SUCCESS
+        assert sections(repo / "out" / "repocontext_part01.md") == [
+            "app/models.py",
+            "app/util.py",
+            "docs/new.md",
+        ]
+
+    def test_import_neighbours_follow(self, repo, sections):
+        """Test that import neighbours come after the changed files."""
+        generate_context(
+            repo / "repo", output_path=repo / "out", since="base", since_imports=True
+        )
+
+        assert sections(repo / "out" / "repocontext_part01.md") == [
+            "app/models.py",
+            "app/util.py",
+            "docs/new.md",
+            "app/views.py",
+        ]
+
+    def test_unknown_revision(self, repo, capsys):
+        """Test that an unknown revision is a fatal error."""
+        exit_code = generate_context(
+            repo / "repo", output_path=repo / "out", since="nope"
+        )
+
+        assert exit_code == EXIT_ERROR
+        assert "Unknown revision 'nope'" in capsys.readouterr().err
@@ -0,0 +1,84 @@
+"""Tests for repo2context.chunking module."""
+
+from pathlib import Path
+
+from repo2context.chunking import split_source
+from repo2context.utils import estimate_tokens
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "test_repo"
+
+
+def _python_source(functions: int) -> str:
+    """Build a module with many similar functions."""
+    return "import os\n\n" + "".join(
+        f"\n@decorator\ndef function_{i}(value):\n"
+        f'    """Handle case {i}."""\n'
+        + "    value = value + 1\n" * 20
+        + "    return value\n"
+        for i in range(functions)
+    )
+
+
+class TestSplitSource:
+    """Tests for split_source function."""
+
+    def test_chunks_join_to_original(self):
+        """Test that chunks cover the content exactly once."""
+        content = (FIXTURE_PATH / "very_large_file.py").read_text()
+        chunks = split_source(content, "python", 2000)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == content
+
+    def test_python_splits_between_definitions(self):
+        """Test that Python chunks start at decorators, not mid-function."""
+        chunks = split_source(_python_source(40), "python", 600)
+
+        assert len(chunks) > 1
+        assert all(chunk.startswith("@decorator") for chunk in chunks[1:])
+        assert all(estimate_tokens(chunk) <= 600 for chunk in chunks)
+
+    def test_descends_into_large_classes(self):
+        """Test that oversized classes are split between their methods."""
+        content = (FIXTURE_PATH / "very_large_file.py").read_text()
+        chunks = split_source(content, "python", 2000)
+
+        assert all(estimate_tokens(chunk) <= 2000 for chunk in chunks)
+        assert any(chunk.lstrip().startswith("def method_") for chunk in chunks)
+
+    def test_edit_changes_few_chunks(self):
+        """Test that editing one function leaves other chunks unchanged."""
+        content = _python_source(60)
+        edited = content.replace("Handle case 30.", "Handle case thirty.")
+
+        before = split_source(content, "python", 600)
+        after = split_source(edited, "python", 600)
+
+        assert len(set(after) - set(before)) == 1
+        assert len(after) == len(before)
+
+    def test_text_splits_before_top_level_blocks(self):
+        """Test that non-Python files split at blank-line separated blocks."""
+        block = "function handler() {\n" + "  call();\n" * 30 + "}\n\n"
+        content = block * 20
+        chunks = split_source(content, "javascript", 300)
+
+        assert len(chunks) > 1
+        assert all(chunk.startswith("function handler") for chunk in chunks)
+        assert "".join(chunks) == content
+
+    def test_syntax_errors_fall_back_to_text(self):
+        """Test that unparsable Python is still chunked."""
+        content = "def broken(:\n" + "    pass\n" * 2000
+        chunks = split_source(content, "python", 500)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == content
+
+    def test_long_lines_are_cut(self):
+        """Test that a single overlong line is split by characters."""
+        content = "x" * 10000
+        chunks = split_source(content, "", 500)
+
+        assert all(len(chunk) <= 2000 for chunk in chunks)
+        assert "".join(chunks) == content
@@ -1,13 +1,26 @@
 """Tests for repo2context.core module."""
 
+import json
+import os
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 
+import repo2context
 from repo2context.core import (
     FileFilterServiceImpl,
     IgnorePatternServiceImpl,
+    SummaryConfig,
+    estimate_context,
     generate_context,
+    iter_context,
+    render_context,
 )
+from repo2context.stub_server import StubChatServer
+
+# Source tree of the package under test, for child interpreters
+SRC_PATH = Path(repo2context.__file__).resolve().parent.parent
 
 
 class TestIgnorePatternService:
@@ -55,6 +68,44 @@ class TestIgnorePatternService:
         repo_root = Path("/fake/repo")
         assert ignore_service.should_ignore(repo_root / ".git" / "config", repo_root)
 
+    def test_should_ignore_entry_matches_should_ignore(self):
+        """Test that checking walk entries agrees with checking full paths."""
+        with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
+            f.write("*.log\nbuild/\ndocs/*.txt\n")
+            f.flush()
+            ignore_service = IgnorePatternServiceImpl(rules_file=Path(f.name))
+
+        repo_root = Path("/fake/repo")
+        entries = [
+            ("app.log", "app.log", False),
+            ("src/deep/app.log", "app.log", False),
+            ("docs/notes.txt", "notes.txt", False),
+            ("src/docs/notes.txt", "notes.txt", False),
+            ("src/main.py", "main.py", False),
+        ]
+        for relative_path, name, is_dir in entries:
+            assert ignore_service.should_ignore_entry(
+                relative_path, name, is_dir
+            ) == ignore_service.should_ignore(repo_root / relative_path, repo_root)
+
+        # Directories are pruned, which should_ignore sees on the files inside
+        assert ignore_service.should_ignore_entry("src/build", "build", True)
+        assert ignore_service.should_ignore(repo_root / "src/build/app.py", repo_root)
+
+        Path(f.name).unlink()
+
+    def test_should_ignore_entry_with_negation(self):
+        """Test that negated patterns re-include entries."""
+        with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
+            f.write("*.log\n!keep.log\n")
+            f.flush()
+            ignore_service = IgnorePatternServiceImpl(rules_file=Path(f.name))
+
+        assert ignore_service.should_ignore_entry("src/app.log", "app.log", False)
+        assert not ignore_service.should_ignore_entry("src/keep.log", "keep.log", False)
+
+        Path(f.name).unlink()
+
 
 class TestFileFilterService:
     """Tests for FileFilterServiceImpl class."""
@@ -92,6 +143,14 @@ class TestFileFilterService:
 
         Path(f.name).unlink()
 
+    def test_skip_reason_by_name(self):
+        """Test skip reasons judged from name and size alone."""
+        filter_service = FileFilterServiceImpl(only_extensions={".py", ".png"})
+
+        assert filter_service.skip_reason_by_name("main.py", 100) is None
+        assert filter_service.skip_reason_by_name("notes.txt", 100) == "extension"
+        assert filter_service.skip_reason_by_name("logo.png", 100) == "binary"
+
 
 class TestGenerateContext:
     """Tests for generate_context function."""
@@ -159,6 +218,173 @@ class TestGenerateContext:
             assert "config.json" not in content
             assert "README.md" not in content
 
+    def test_generate_context_with_token_budget(self):
+        """Test that the largest file is replaced by its summary to fit a budget."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir)
+
+            exit_code = generate_context(
+                repo_path=fixture_path,
+                output_path=output_path,
+                max_tokens=5000,
+                token_budget=5000,
+            )
+
+            # Without the budget the output needs several parts
+            assert exit_code == 0
+
+            output_files = list(output_path.glob("repocontext_part*.md"))
+            assert len(output_files) == 1
+
+            content = output_files[0].read_text()
+            section = content.split("very_large_file.py\n", 1)[1].split("---", 1)[0]
+            assert "**Summary:** A very large test file" in section
+            assert "Summary only: 9,773 tokens of content omitted" in section
+            assert "class VeryLargeClass" not in section
+
+            # Smaller files keep their full content
+            assert "def hello_world" in content
+
+    def test_generate_context_writes_stats_json(self):
+        """Test that stage timings and skip counts are written as JSON."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats_path = Path(temp_dir) / "stats.json"
+
+            exit_code = generate_context(
+                repo_path=fixture_path,
+                output_path=Path(temp_dir) / "out",
+                only_extensions=["py"],
+                stats_path=stats_path,
+            )
+
+            assert exit_code == 0
+            stats = json.loads(stats_path.read_text())
+
+            assert stats["files"] == 3
+            for stage in ("walk", "ignore", "filter", "read", "tokenize", "write"):
+                assert stats["stages"][stage]["wall_seconds"] >= 0
+                assert stats["stages"][stage]["cpu_seconds"] >= 0
+            assert stats["stages"]["write"]["items"] == 3
+
+            # README.md, config.json and .repo2contextignore are not Python
+            assert stats["skipped"]["extension"] == 3
+            assert stats["skipped"]["ignored"] > 0
+
+    def test_generate_context_reports_memory(self, capsys):
+        """Test that the memory report is printed and written with the stats."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats_path = Path(temp_dir) / "stats.json"
+
+            exit_code = generate_context(
+                repo_path=fixture_path,
+                output_path=Path(temp_dir) / "out",
+                only_extensions=["py"],
+                stats_path=stats_path,
+                memory_report=True,
+            )
+
+            assert exit_code == 0
+            memory = json.loads(stats_path.read_text())["memory"]
+
+        assert [checkpoint["stage"] for checkpoint in memory["checkpoints"]] == [
+            "write",
+            "finalize",
+        ]
+        assert memory["traced_peak_bytes"] > 0
+        assert memory["top_sites"]
+        assert memory["largest_files"][0]["path"] == "very_large_file.py"
+        assert "Memory report:" in capsys.readouterr().out
+
+    def test_estimate_context_uses_cached_token_counts(self):
+        """Test that a dry run after a cached run predicts its totals."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir) / "cache"
+            run_path = Path(temp_dir) / "run.json"
+            estimate_path = Path(temp_dir) / "estimate.json"
+
+            generate_context(
+                repo_path=fixture_path,
+                output_path=Path(temp_dir) / "out",
+                max_tokens=5000,
+                cache_dir=cache_dir,
+                stats_path=run_path,
+            )
+            exit_code = estimate_context(
+                repo_path=fixture_path,
+                max_tokens=5000,
+                cache_dir=cache_dir,
+                stats_path=estimate_path,
+            )
+
+            assert exit_code == 0
+            run = json.loads(run_path.read_text())
+            estimate = json.loads(estimate_path.read_text())
+
+        assert estimate["total_files"] == run["files"]
+        assert estimate["cached_files"] == run["files"]
+        assert estimate["total_bytes"] == run["bytes"]
+        assert estimate["total_tokens"] == run["tokens"]
+        assert estimate["parts"] == run["parts"] == 2
+
+    def test_estimate_context_breakdowns(self):
+        """Test the language and directory breakdowns of a dry run."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            estimate_path = Path(temp_dir) / "estimate.json"
+
+            exit_code = estimate_context(
+                repo_path=fixture_path,
+                only_extensions=["py", "md"],
+                stats_path=estimate_path,
+            )
+
+            assert exit_code == 0
+            estimate = json.loads(estimate_path.read_text())
+
+        assert estimate["cached_files"] == 0
+        assert set(estimate["by_language"]) == {"python", "markdown"}
+        assert estimate["by_language"]["python"]["files"] == 3
+        assert estimate["by_directory"]["."]["tokens"] == estimate["total_tokens"]
+        assert estimate["skipped"]["extension"] == 2
+
+    def test_estimate_context_nonexistent_repo(self):
+        """Test that a dry run of a missing repository fails."""
+        assert estimate_context(repo_path=Path("/nonexistent/repo")) == 2
+
+    def test_generate_context_writes_trace(self):
+        """Test that every file gets a span per stage in the trace."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = Path(temp_dir) / "trace.json"
+
+            generate_context(
+                repo_path=fixture_path,
+                output_path=Path(temp_dir) / "out",
+                only_extensions=["py"],
+                trace_path=trace_path,
+            )
+
+            events = json.loads(trace_path.read_text())["traceEvents"]
+
+        spans = {
+            (event["name"], event["args"]["path"])
+            for event in events
+            if event["ph"] == "X"
+        }
+        for stage in ("read", "tokenize", "write"):
+            assert (stage, "main.py") in spans
+            assert (stage, "large_file.py") in spans
+
     def test_nonexistent_repo(self):
         """Test handling of nonexistent repository."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -172,3 +398,126 @@ class TestGenerateContext:
 
             # Should fail with error code 2
             assert exit_code == 2
+
+
+class TestRenderContext:
+    """Tests for render_context and iter_context functions."""
+
+    def test_render_context_matches_written_parts(self):
+        """Test that rendered parts equal the files generate_context writes."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir)
+            generate_context(
+                repo_path=fixture_path, output_path=output_path, max_tokens=5000
+            )
+            written = [
+                path.read_bytes()
+                for path in sorted(output_path.glob("repocontext_part*.md"))
+            ]
+
+        rendered = render_context(repo_path=fixture_path, max_tokens=5000)
+
+        assert rendered.exit_code == 1
+        assert len(rendered.parts) == 2
+        assert rendered.encoded_parts() == written
+        assert [file.part for file in rendered.files] == sorted(
+            file.part for file in rendered.files
+        )
+        assert rendered.result.total_files == len(rendered.files) == 6
+        assert not (fixture_path / ".repo2context").exists()
+
+    def test_render_context_is_quiet(self, capsys):
+        """Test that rendering in memory prints nothing."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        render_context(repo_path=fixture_path, only_extensions=["py"])
+
+        assert capsys.readouterr().out == ""
+
+    def test_render_context_with_summaries_is_quiet(self, capsys):
+        """Test that summaries and their cache report stay off stdout."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir, StubChatServer() as server:
+            rendered = render_context(
+                repo_path=fixture_path,
+                only_extensions=["py"],
+                enable_summary=True,
+                cache_dir=Path(temp_dir),
+                summary_config=SummaryConfig(backend="local", base_url=server.base_url),
+            )
+
+        assert any(file.summary for file in rendered.files)
+        assert capsys.readouterr().out == ""
+
+    def test_iter_context_streams_sections(self):
+        """Test that sections are yielded in order and the result returned."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+        results = []
+
+        def collect():
+            result = yield from iter_context(
+                repo_path=fixture_path, only_extensions=["py"]
+            )
+            results.append(result)
+
+        paths = [section.file.path for section in collect()]
+        result = results[0]
+
+        assert len(paths) == result.total_files == 3
+        assert all(path.endswith(".py") for path in paths)
+        assert result.parts_written == 1
+
+    def test_iter_context_closed_early(self):
+        """Test that closing the generator early stops the run cleanly."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        sections = iter_context(repo_path=fixture_path)
+        first = next(sections)
+        sections.close()
+
+        assert first.file.part == 1
+        assert first.text.startswith(first.file.path + "\n")
+
+    def test_render_context_nonexistent_repo(self):
+        """Test that a missing repository gives no parts and exit code 2."""
+        rendered = render_context(repo_path=Path("/nonexistent/repo"))
+
+        assert rendered.exit_code == 2
+        assert rendered.parts == []
+        assert rendered.files == []
+
+
+class TestImports:
+    """Tests for the modules loaded by importing the package."""
+
+    def test_opt_in_features_load_lazily(self):
+        """Test that a plain CLI import loads no opt-in feature modules."""
+        lazy = [
+            "asyncio",
+            "http.client",
+            "tracemalloc",
+            "cProfile",
+            "repo2context.changes",
+            "repo2context.memory",
+            "repo2context.profiling",
+            "repo2context.summary",
+            "repo2context.symbols",
+            "repo2context.watch",
+        ]
+        code = (
+            "import sys, repo2context.cli; "
+            f"print([name for name in {lazy!r} if name in sys.modules])"
+        )
+
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": str(SRC_PATH)},
+        ).stdout
+
+        assert output.strip() == "[]"
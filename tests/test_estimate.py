@@ -0,0 +1,58 @@
+"""Tests for repo2context.estimate module."""
+
+import tempfile
+from pathlib import Path
+
+from repo2context.cache import ContentCache
+from repo2context.estimate import (
+    TOKEN_COUNT_NAMESPACE,
+    TokenCountCache,
+    count_parts,
+)
+
+
+class TestCountParts:
+    """Tests for count_parts function."""
+
+    def test_no_files(self):
+        """Test that an empty run has no parts."""
+        assert count_parts([], 100) == 0
+
+    def test_files_fill_parts_in_order(self):
+        """Test that a file overflowing a part starts the next one."""
+        assert count_parts([60, 30, 20, 100], 100) == 3
+
+    def test_oversized_file_gets_own_part(self):
+        """Test that a file larger than a part never leaves an empty part."""
+        assert count_parts([500], 100) == 1
+        assert count_parts([500, 500], 100) == 2
+
+
+class TestTokenCountCache:
+    """Tests for TokenCountCache class."""
+
+    def test_record_flush_and_load(self):
+        """Test that recorded counts are loaded by relative path."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ContentCache(Path(temp_dir) / "cache", TOKEN_COUNT_NAMESPACE)
+            counts = TokenCountCache(cache, Path(temp_dir))
+
+            counts.record("src/main.py", 400, 123, 100)
+            assert counts.load() == {}
+            counts.flush()
+
+            assert counts.load() == {"src/main.py": [400, 123, 100]}
+            cache.close()
+
+    def test_repositories_are_isolated(self):
+        """Test that counts of one repository are not loaded for another."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ContentCache(Path(temp_dir) / "cache", TOKEN_COUNT_NAMESPACE)
+            first = TokenCountCache(cache, Path(temp_dir) / "first")
+            second = TokenCountCache(cache, Path(temp_dir) / "first-copy")
+
+            first.record("main.py", 400, 123, 100)
+            first.flush()
+
+            assert second.load() == {}
+            cache.close()
@@ -0,0 +1,158 @@
+"""Tests for repo2context.extractive module."""
+
+import tempfile
+from pathlib import Path
+
+from repo2context.cache import ContentCache
+from repo2context.core import (
+    SUMMARY_BACKEND_EXTRACTIVE,
+    ContextGenerationServiceFactory,
+    ExtractiveSummaryServiceImpl,
+    FileProcessorServiceImpl,
+    FileSystemRepositoryImpl,
+    SummaryConfig,
+)
+from repo2context.extractive import extract_summary
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "test_repo"
+
+PYTHON_MODULE = '''"""Tools for parsing configuration files. More details follow."""
+
+import os
+
+
+class Parser:
+    """Parse configuration text into dictionaries."""
+
+
+def load(path):
+    """Load a configuration file."""
+
+
+def _helper():
+    """Private helper."""
+'''
+
+
+class TestExtractSummary:
+    """Tests for extract_summary function."""
+
+    def test_python_docstrings_and_public_names(self):
+        """Test that Python summaries use docstrings of public definitions."""
+        summary = extract_summary(PYTHON_MODULE, "python")
+
+        assert summary == (
+            "Tools for parsing configuration files. "
+            "Classes: Parser (Parse configuration text into dictionaries). "
+            "Functions: load (Load a configuration file)."
+        )
+
+    def test_python_dunder_all(self):
+        """Test that __all__ decides which names are public."""
+        content = '__all__ = ["_private"]\n\ndef _private():\n    pass\n\ndef public():\n    pass\n'
+        assert extract_summary(content, "python") == "Functions: _private."
+
+    def test_python_syntax_error_falls_back_to_comments(self):
+        """Test that unparsable Python still yields its header comment."""
+        content = "# Legacy script for exports.\nprint 'hello'\n"
+        assert extract_summary(content, "python") == "Legacy script for exports."
+
+    def test_javascript_header_comment_and_exports(self):
+        """Test block comments and exported symbols."""
+        content = (
+            "/**\n * Utilities for parsing dates. More text.\n */\n"
+            "export function parseDate(s) {}\n"
+            "export default class Parser {}\n"
+            "function internal() {}\n"
+        )
+        assert extract_summary(content, "javascript") == (
+            "Utilities for parsing dates. Exports: parseDate, Parser."
+        )
+
+    def test_go_exported_names(self):
+        """Test that only capitalised Go names are exported."""
+        content = "// Package server serves HTTP.\npackage server\n\nfunc New() {}\nfunc helper() {}\n"
+        assert extract_summary(content, "go") == (
+            "Package server serves HTTP. Exports: New."
+        )
+
+    def test_license_headers_are_skipped(self):
+        """Test that license comments are not used as descriptions."""
+        content = "// Copyright 2024 Example\n// Licensed under MIT\npub fn run() {}\n"
+        assert extract_summary(content, "rust") == "Exports: run."
+
+    def test_c_preprocessor_is_not_a_comment(self):
+        """Test that #include lines are not mistaken for comments."""
+        assert extract_summary("#include <stdio.h>\nint main() {}\n", "c") is None
+
+    def test_markdown_ignores_code_blocks(self):
+        """Test that comments inside code fences are not headings."""
+        content = (
+            "# Title\n\n> Short description\n\n```bash\n# comment\n```\n\n## Usage\n"
+        )
+        assert extract_summary(content, "markdown") == (
+            "Short description. Sections: Title, Usage."
+        )
+
+    def test_long_name_lists_are_counted(self):
+        """Test that only the first names are listed."""
+        content = "".join(f"def function_{i}():\n    pass\n" for i in range(12))
+        summary = extract_summary(content, "python")
+
+        assert summary is not None
+        assert summary.endswith("function_7 and 4 more.")
+
+    def test_undocumented_file(self):
+        """Test that files without usable documentation get no summary."""
+        assert extract_summary("x = 1\n", "python") is None
+        assert extract_summary("plain text", "text") is None
+
+
+class TestExtractiveSummaryService:
+    """Tests for ExtractiveSummaryServiceImpl class."""
+
+    def test_summarize_stream(self):
+        """Test that summaries are attached to every documented file."""
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "config.json", "very_large_file.py"]
+        ]
+
+        streamed = list(ExtractiveSummaryServiceImpl().summarize_stream(file_infos))
+
+        assert [file_info.path for file_info in streamed] == [
+            file_info.path for file_info in file_infos
+        ]
+        assert streamed[0].summary.startswith("A simple test script")
+        assert streamed[1].summary == "Keys: settings, features."
+        assert streamed[2].summary is not None
+
+    def test_python_results_are_cached(self):
+        """Test that Python summaries are reused for unchanged content."""
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_info = processor.process_file(FIXTURE_PATH / "main.py", FIXTURE_PATH)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ContentCache(Path(temp_dir), "extractive")
+            service = ExtractiveSummaryServiceImpl(cache)
+            first = service.generate_summary(file_info)
+            second = service.generate_summary(file_info)
+
+        assert first == second
+        assert cache.stats.hits == 1
+
+    def test_factory_creates_extractive_service(self):
+        """Test selecting the extractive backend."""
+        service = ContextGenerationServiceFactory._create_summary_service(
+            True, SummaryConfig(backend=SUMMARY_BACKEND_EXTRACTIVE)
+        )
+        assert isinstance(service, ExtractiveSummaryServiceImpl)
+
+    def test_factory_falls_back_without_api_key(self, monkeypatch):
+        """Test that unusable OpenAI settings fall back to extraction."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        service = ContextGenerationServiceFactory._create_summary_service(
+            True, SummaryConfig()
+        )
+        assert isinstance(service, ExtractiveSummaryServiceImpl)
@@ -0,0 +1,190 @@
+"""Tests for repo2context.focus module."""
+
+
+from repo2context import focus
+from repo2context.cache import ContentCache
+from repo2context.core import EXIT_ERROR, EXIT_SUCCESS, generate_context
+from repo2context.focus import (
+    IMPORTS_CACHE_NAMESPACE,
+    ImportGraph,
+    ModuleIndex,
+    parse_imports,
+)
+
+FILES = {
+    "src/app/__init__.py": "from app.core import run\n",
+    "src/app/main.py": (
+        "import os\n"
+        "from app import core\n"
+        "from .util import helper\n"
+        "\n"
+        "def main():\n"
+        "    from app.plugins import extra\n"
+        "    return core.run(helper, extra)\n"
+    ),
+    "src/app/core.py": "from . import util\n\ndef run(*args):\n    return args\n",
+    "src/app/util.py": "import app.models.user\n\ndef helper():\n    return 1\n",
+    "src/app/models/__init__.py": "",
+    "src/app/models/user.py": "class User:\n    pass\n",
+    "src/app/plugins.py": "extra = 1\n",
+    "src/app/unused.py": "import app.core\n",
+    "scripts/tool.py": "from app.main import main\n",
+    "README.md": "# App\n",
+}
+
+
+class TestParseImports:
+    """Tests for parse_imports function."""
+
+    def test_all_import_forms(self):
+        """Test absolute, relative, nested and star imports."""
+        source = (
+            "import a.b, c\n"
+            "from .d import e as f\n"
+            "from .. import g\n"
+            "from h import *\n"
+            "def inner():\n"
+            "    import i\n"
+        )
+
+        assert parse_imports(source) == [
+            (0, "a.b", []),
+            (0, "c", []),
+            (1, "d", ["e"]),
+            (2, "", ["g"]),
+            (0, "h", []),
+            (0, "i", []),
+        ]
+
+    def test_invalid_source(self):
+        """Test that unparsable source has no imports."""
+        assert parse_imports("def broken(:\n") == []
+
+
+class TestModuleIndex:
+    """Tests for ModuleIndex class."""
+
+    def test_src_layout_and_relative_imports(self):
+        """Test that package roots and relative imports resolve to files."""
+        index = ModuleIndex(path for path in FILES if path.endswith(".py"))
+
+        assert index.modules["app.core"] == "src/app/core.py"
+        assert index.modules["src.app.core"] == "src/app/core.py"
+        assert index.resolve("src/app/main.py", (1, "util", ["helper"])) == [
+            "src/app/util.py"
+        ]
+        assert index.resolve("src/app/core.py", (1, "", ["util"])) == [
+            "src/app/util.py"
+        ]
+
+    def test_submodules_and_names(self):
+        """Test that imported names resolve to submodules or their module."""
+        index = ModuleIndex(path for path in FILES if path.endswith(".py"))
+
+        assert index.resolve("src/app/main.py", (0, "app", ["core"])) == [
+            "src/app/core.py"
+        ]
+        assert index.resolve("src/app/main.py", (0, "app.plugins", ["extra"])) == [
+            "src/app/plugins.py"
+        ]
+        assert index.resolve("src/app/main.py", (0, "os", [])) == []
+        assert index.resolve("src/app/main.py", (3, "", ["x"])) == []
+
+
+class TestImportGraph:
+    """Tests for ImportGraph class."""
+
+    def test_closure_is_nearest_first(self, repo):
+        """Test that files come in order of distance from the entry point."""
+        root = repo / "repo"
+        index = ModuleIndex(path for path in FILES if path.endswith(".py"))
+        graph = ImportGraph(lambda path: (root / path).read_text())
+
+        closure = list(graph.closure(index, "src/app/main.py"))
+
+        assert closure == [
+            ("src/app/main.py", 0),
+            ("src/app/core.py", 1),
+            ("src/app/util.py", 1),
+            ("src/app/plugins.py", 1),
+            ("src/app/models/user.py", 2),
+        ]
+
+    def test_imports_are_cached_by_content(self, repo, monkeypatch):
+        """Test that a second graph reuses the parsed imports."""
+        root = repo / "repo"
+        cache_dir = repo / "cache"
+        first = ImportGraph(
+            lambda path: (root / path).read_text(),
+            ContentCache(cache_dir, IMPORTS_CACHE_NAMESPACE),
+        )
+        expected = first.imports("src/app/main.py")
+
+        def fail(source: str) -> None:
+            raise AssertionError("parsed again")
+
+        monkeypatch.setattr(focus, "parse_imports", fail)
+        second = ImportGraph(
+            lambda path: (root / path).read_text(),
+            ContentCache(cache_dir, IMPORTS_CACHE_NAMESPACE),
+        )
+
+        assert second.imports("src/app/main.py") == expected
+
+
+class TestFocusedGeneration:
+    """Tests for generate_context with a focus path."""
+
+    def test_only_the_closure_is_written(self, repo, sections):
+        """Test that the output holds the import closure, nearest first."""
+        root = repo / "repo"
+
+        exit_code = generate_context(
+            root, output_path=repo / "out", focus_path=root / "src/app/main.py"
+        )
+
+        assert exit_code == EXIT_SUCCESS
+        assert sections(repo / "out" / "repocontext_part01.md") == [
+            "src/app/main.py",
+            "src/app/core.py",
+            "src/app/util.py",
+            "src/app/plugins.py",
+            "src/app/models/user.py",
+        ]
+
+    def test_budget_summarises_distant_files_first(self, repo):
+        """Test that the token budget keeps the nearest files in full."""
+        root = repo / "repo"
+        for name in ("src/app/util.py", "src/app/models/user.py"):
+            (root / name).write_text(
+                (root / name).read_text()
+                + "".join(
+                    f'\ndef f{i}(x):\n    """Add {i}."""\n    return x + {i}\n'
+                    for i in range(100)
+                )
+            )
+
+        generate_context(
+            root,
+            output_path=repo / "out",
+            focus_path=root / "src/app/main.py",
+            token_budget=2500,
+        )
+
+        text = (repo / "out" / "repocontext_part01.md").read_text()
+        user_section = text.split("src/app/models/user.py\n", 1)[1]
+        util_section = text.split("src/app/util.py\n", 1)[1]
+        assert user_section.startswith("**Summary:**")
+        assert not util_section.startswith("**Summary:**")
+
+    def test_invalid_focus_paths(self, repo):
+        """Test that focus paths outside the repository or not Python fail."""
+        root = repo / "repo"
+        outside = repo / "outside.py"
+        outside.write_text("import os\n")
+
+        for focus_path in (outside, root / "README.md", root / "missing.py"):
+            assert (
+                generate_context(root, output_path=repo / "out", focus_path=focus_path)
+                == EXIT_ERROR
+            )
@@ -0,0 +1,73 @@
+"""Tests for repo2context.memory module."""
+
+import tracemalloc
+from pathlib import Path
+
+from repo2context.memory import MemoryTracker
+
+
+class TestMemoryTracker:
+    """Tests for MemoryTracker class."""
+
+    def test_checkpoints_record_peak_per_stage(self):
+        """Test that each checkpoint records the peak since the previous one."""
+        tracker = MemoryTracker()
+        tracker.start()
+        try:
+            data = bytearray(4 * 1024 * 1024)
+            del data
+            tracker.checkpoint("read")
+            tracker.checkpoint("write")
+            report = tracker.report()
+        finally:
+            tracker.stop()
+
+        read, write = report.checkpoints
+        assert read.stage == "read"
+        assert read.peak_bytes >= 4 * 1024 * 1024
+        assert write.peak_bytes < read.peak_bytes
+        assert report.traced_peak_bytes == read.peak_bytes
+        assert not tracemalloc.is_tracing()
+
+    def test_snapshot_attributes_held_memory_to_call_site(self):
+        """Test that the top allocation site is where held memory came from."""
+        tracker = MemoryTracker(top=3)
+        tracker.start()
+        try:
+            held = [bytearray(1024 * 1024) for _ in range(4)]
+            tracker.observe(Path("big.bin"), 4 * 1024 * 1024)
+            report = tracker.report()
+        finally:
+            tracker.stop()
+        del held
+
+        assert report.top_sites[0].location.startswith("test_memory.py:")
+        assert report.top_sites[0].size_bytes >= 4 * 1024 * 1024
+        assert len(report.top_sites) <= 3
+
+    def test_largest_files_keeps_top_entries(self):
+        """Test that only the largest observed files are kept, largest first."""
+        tracker = MemoryTracker(top=2)
+        tracker.start()
+        try:
+            for size in (10, 300, 20, 200):
+                tracker.observe(Path(f"file{size}.py"), size)
+            report = tracker.report()
+        finally:
+            tracker.stop()
+
+        assert [(held.path, held.size_bytes) for held in report.largest_files] == [
+            ("file300.py", 300),
+            ("file200.py", 200),
+        ]
+
+    def test_leaves_existing_tracing_running(self):
+        """Test that tracing started by someone else is not stopped."""
+        tracemalloc.start()
+        try:
+            tracker = MemoryTracker()
+            tracker.start()
+            tracker.stop()
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
@@ -0,0 +1,115 @@
+"""Tests for repo2context.optimize module."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from repo2context.core import generate_context
+from repo2context.optimize import (
+    MARKDOWN_STAGES,
+    OPTIMIZATION_STAGES,
+    TextOptimizer,
+    is_markdown,
+)
+
+BADGE = "[![CI](https://example.com/badge.svg)](https://example.com)"
+
+
+class TestMarkdownOptimizer:
+    """Tests for the default markdown stages."""
+
+    def setup_method(self):
+        """Create a markdown optimizer."""
+        self.optimizer = TextOptimizer(MARKDOWN_STAGES)
+
+    def test_collapses_long_badge_runs(self):
+        """Test that more than three consecutive badges are collapsed."""
+        content = "# Title\n" + "\n".join([BADGE] * 5) + "\ntext"
+
+        result = self.optimizer.optimize(content)
+
+        assert result == f"# Title\n{BADGE}\n{BADGE}\n<!-- 3 more badges -->\ntext"
+
+    def test_keeps_short_badge_runs(self):
+        """Test that up to three badges are left alone."""
+        content = "\n".join([BADGE] * 3)
+        assert self.optimizer.optimize(content) == content
+
+    def test_collapses_blank_runs(self):
+        """Test that runs of blank lines become a single empty line."""
+        content = "\n\n  \na\n\n\t\n\nb\n \nc\n\n"
+
+        result = self.optimizer.optimize(content)
+
+        assert result == "\na\n\nb\n \nc\n"
+
+    def test_leaves_content_without_matches(self):
+        """Test that ordinary text is returned unchanged."""
+        content = "line one\nline two  \n---\n"
+        assert self.optimizer.optimize(content) == content
+
+
+class TestTextOptimizer:
+    """Tests for configurable optimisation stages."""
+
+    def test_trailing_whitespace(self):
+        """Test trailing whitespace removal on every line."""
+        optimizer = TextOptimizer(["trailing-whitespace"])
+        assert optimizer.optimize("a  \n\t\nb\t") == "a\n\nb"
+
+    def test_horizontal_rules(self):
+        """Test that long rules, including comment banners, are shortened."""
+        optimizer = TextOptimizer(["horizontal-rules"])
+        content = "# " + "=" * 40 + "\n" + "-" * 20 + "\n    // " + "*" * 10 + "\n--"
+
+        result = optimizer.optimize(content)
+
+        assert result == "# ===\n---\n    // ***\n--"
+
+    def test_all_stages(self):
+        """Test that all stages combine in a single pass."""
+        optimizer = TextOptimizer(OPTIMIZATION_STAGES)
+        content = "x = 1  \n\n\n" + "#" * 30 + "\ny = 2\n"
+
+        assert optimizer.optimize(content) == "x = 1\n\n###\ny = 2\n"
+
+    def test_no_stages(self):
+        """Test that an empty optimizer is a no-op."""
+        assert TextOptimizer([]).optimize("a  \n\n\n") == "a  \n\n\n"
+
+    def test_unknown_stage(self):
+        """Test that unknown stages are rejected."""
+        with pytest.raises(ValueError, match="Unknown optimisation stage"):
+            TextOptimizer(["minify"])
+
+
+class TestIsMarkdown:
+    """Tests for is_markdown function."""
+
+    def test_markdown_files(self):
+        """Test markdown and README detection."""
+        assert is_markdown(Path("docs/guide.md"))
+        assert is_markdown(Path("README.rst"))
+        assert not is_markdown(Path("main.py"))
+
+
+class TestOptimizeStagesInOutput:
+    """Tests for optimisation stages applied during context generation."""
+
+    def test_stages_apply_to_other_text_files(self):
+        """Test that configured stages are applied to non-markdown files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = Path(temp_dir) / "repo"
+            repo.mkdir()
+            (repo / "notes.txt").write_text("keep   \n\n\n\nend\n")
+            output_path = Path(temp_dir) / "out"
+
+            exit_code = generate_context(
+                repo_path=repo,
+                output_path=output_path,
+                optimize_stages=["trailing-whitespace", "blank-lines"],
+            )
+
+            assert exit_code == 0
+            content = (output_path / "repocontext_part01.md").read_text()
+            assert "keep\n\nend\n" in content
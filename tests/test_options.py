@@ -0,0 +1,72 @@
+"""Tests for repo2context.options module."""
+
+from pathlib import Path
+
+import pytest
+from repo2context.core import DEFAULT_MAX_TOKENS, PROFILES
+from repo2context.options import OptionError, read_options
+
+ALLOWED = {
+    "repo_path",
+    "rules_file",
+    "max_tokens",
+    "only_extensions",
+    "profile",
+    "optimize_stages",
+    "enable_summary",
+    "summary_backend",
+}
+
+
+class TestReadOptions:
+    """Tests for read_options function."""
+
+    def test_defaults(self):
+        """Test that missing and null options take their defaults."""
+        options = read_options(
+            {"repo_path": "repo", "max_tokens": None, "enable_summary": None}, ALLOWED
+        )
+
+        assert options.repo_path == Path("repo")
+        assert options.max_tokens == DEFAULT_MAX_TOKENS
+        assert options.enable_summary is False
+        assert options.only_extensions is None
+
+    def test_profile_sets_extensions(self):
+        """Test that a profile brings its extensions."""
+        options = read_options({"repo_path": "repo", "profile": "minimal"}, ALLOWED)
+
+        assert options.only_extensions == PROFILES["minimal"]["extensions"]
+
+    def test_comma_separated_lists(self):
+        """Test that lists are also accepted as comma-separated strings."""
+        options = read_options(
+            {"repo_path": "repo", "only_extensions": "py, md"}, ALLOWED
+        )
+
+        assert options.only_extensions == ["py", "md"]
+
+    def test_absolute_paths(self):
+        """Test that absolute_paths rejects relative paths."""
+        with pytest.raises(OptionError, match="absolute"):
+            read_options({"repo_path": "repo"}, ALLOWED, absolute_paths=True)
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"repo_path": None},
+            {"repo_path": 1},
+            {"max_tokens": 10},
+            {"max_tokens": True},
+            {"profile": "unknown"},
+            {"profile": "minimal", "only_extensions": ["py"]},
+            {"optimize_stages": ["unknown"]},
+            {"enable_summary": "yes"},
+            {"summary_backend": "unknown"},
+            {"token_budget": 1000},
+        ],
+    )
+    def test_invalid_options(self, options):
+        """Test that invalid or disallowed options raise OptionError."""
+        with pytest.raises(OptionError):
+            read_options({"repo_path": "repo", **options}, ALLOWED)
@@ -0,0 +1,101 @@
+"""Tests for repo2context.pipeline module."""
+
+import threading
+import time
+
+import pytest
+from repo2context.pipeline import Pipeline
+
+
+class TestPipeline:
+    """Tests for Pipeline class."""
+
+    def test_preserves_order_through_stages(self):
+        """Test that output order matches the source order."""
+        pipeline = Pipeline(queue_size=4)
+        pipeline.source("numbers", range(100))
+        pipeline.stage("double", lambda items: (item * 2 for item in items))
+        pipeline.stage("odd", lambda items: (item + 1 for item in items))
+
+        try:
+            assert list(pipeline) == [item * 2 + 1 for item in range(100)]
+        finally:
+            pipeline.close()
+
+    def test_backpressure_bounds_queue_depth(self):
+        """Test that a slow consumer blocks the producer at the queue size."""
+        produced = []
+
+        def source():
+            for item in range(50):
+                produced.append(item)
+                yield item
+
+        pipeline = Pipeline(queue_size=3)
+        pipeline.source("source", source())
+
+        try:
+            iterator = iter(pipeline)
+            assert next(iterator) == 0
+            time.sleep(0.2)
+            # One item consumed, three queued, one blocked in put
+            assert len(produced) <= 5
+            assert list(iterator) == list(range(1, 50))
+        finally:
+            pipeline.close()
+
+        assert pipeline.queue_depths == {"source": 3}
+
+    def test_stages_run_concurrently(self):
+        """Test that a stage keeps working while the next one is busy."""
+        started = threading.Event()
+
+        def slow(items):
+            for item in items:
+                started.wait(timeout=5)
+                yield item
+
+        def producer(items):
+            for item in items:
+                yield item
+                started.set()
+
+        pipeline = Pipeline(queue_size=8)
+        pipeline.source("source", range(5))
+        pipeline.stage("producer", producer)
+        pipeline.stage("slow", slow)
+
+        try:
+            assert list(pipeline) == list(range(5))
+        finally:
+            pipeline.close()
+
+    def test_stage_errors_propagate(self):
+        """Test that an exception in a stage reaches the consumer."""
+
+        def failing(items):
+            for item in items:
+                if item == 3:
+                    raise ValueError("bad item")
+                yield item
+
+        pipeline = Pipeline(queue_size=2)
+        pipeline.source("source", range(10))
+        pipeline.stage("failing", failing)
+
+        try:
+            with pytest.raises(ValueError, match="bad item"):
+                list(pipeline)
+        finally:
+            pipeline.close()
+
+    def test_close_stops_blocked_stages(self):
+        """Test that closing early releases producers blocked on full queues."""
+        pipeline = Pipeline(queue_size=1)
+        pipeline.source("source", iter(range(1000)))
+        pipeline.stage("identity", lambda items: items)
+
+        assert next(iter(pipeline)) == 0
+        pipeline.close()
+
+        assert all(not thread.is_alive() for thread in pipeline._threads)
@@ -0,0 +1,105 @@
+"""Tests for repo2context.profiling module."""
+
+import pstats
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from repo2context.core import generate_context
+from repo2context.pipeline import Pipeline
+from repo2context.profiling import ProfilerConfig, run_profiled
+
+
+def _busy_worker():
+    """Spin for a while so samplers and profilers see this function."""
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _run_in_thread():
+    """Run the busy worker on a separate thread, like a pipeline stage."""
+    thread = threading.Thread(target=_busy_worker)
+    thread.start()
+    thread.join()
+    return "done"
+
+
+def _run_pipeline():
+    """Run items through a pipeline stage thread and return the results."""
+    pipeline = Pipeline(queue_size=4)
+    pipeline.source("numbers", range(10))
+    pipeline.stage("double", lambda items: (item * 2 for item in items))
+    try:
+        return list(pipeline)
+    finally:
+        pipeline.close()
+
+
+class TestRunProfiled:
+    """Tests for run_profiled function."""
+
+    def test_deterministic_profile_covers_threads(self):
+        """Test that calls on threads started during the run are profiled."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "run.prof"
+
+            result = run_profiled(_run_in_thread, ProfilerConfig(output_path, top=5))
+
+            assert result == "done"
+            stats = pstats.Stats(str(output_path))
+            functions = {function for _, _, function in stats.stats}
+            assert "_busy_worker" in functions
+            assert "_run_in_thread" in functions
+
+    def test_deterministic_profile_runs_pipeline_stages(self):
+        """Test that stage threads still run their work while profiled."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "run.prof"
+
+            result = run_profiled(_run_pipeline, ProfilerConfig(output_path, top=5))
+
+            assert result == [item * 2 for item in range(10)]
+            stats = pstats.Stats(str(output_path))
+            functions = {function for _, _, function in stats.stats}
+            assert "<genexpr>" in functions
+
+    def test_sampling_profile_writes_folded_stacks(self):
+        """Test that sampled stacks are written one per line with counts."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "run.folded"
+
+            run_profiled(
+                _run_in_thread,
+                ProfilerConfig(output_path, sampling=True, interval=0.001),
+            )
+
+            lines = output_path.read_text().splitlines()
+
+        assert lines
+        busy = [line for line in lines if "test_profiling.py:_busy_worker" in line]
+        assert busy
+        stack, count = busy[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.split(";")[-1] == "test_profiling.py:_busy_worker"
+
+    def test_generate_context_profiles_run(self, capsys):
+        """Test that the facade profiles the run and prints the top functions."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile_path = Path(temp_dir) / "run.prof"
+
+            exit_code = generate_context(
+                repo_path=fixture_path,
+                output_path=Path(temp_dir) / "out",
+                profile_config=ProfilerConfig(profile_path, top=3),
+            )
+
+            assert exit_code == 0
+            assert profile_path.exists()
+
+        output = capsys.readouterr().out
+        assert "Ordered by: cumulative time" in output
+        assert "execute" in output
@@ -0,0 +1,154 @@
+"""Tests for repo2context.server module."""
+
+import http.client
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from repo2context.core import render_context
+from repo2context.estimate import TOKEN_COUNT_NAMESPACE
+from repo2context.server import ContextServer, create_http_server
+from repo2context.statcache import RACY_NANOSECONDS
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "test_repo"
+
+
+def _context(server: ContextServer, **options) -> tuple[int, dict]:
+    """Send a context request straight to the server."""
+    return server.handle("POST", "/context", json.dumps(options).encode())
+
+
+class TestContextServer:
+    """Tests for ContextServer class."""
+
+    def test_context_matches_render_context(self):
+        """Test that served parts equal those of render_context."""
+        server = ContextServer()
+
+        status, payload = _context(
+            server, repo_path=str(FIXTURE_PATH.resolve()), max_tokens=5000
+        )
+        expected = render_context(repo_path=FIXTURE_PATH.resolve(), max_tokens=5000)
+
+        assert status == 200
+        assert payload["parts"] == expected.parts
+        assert [file["path"] for file in payload["files"]] == [
+            file.path for file in expected.files
+        ]
+        assert payload["stats"]["files"] == 6
+
+    def test_repeated_requests_reuse_processed_files(self):
+        """Test that a second request answers unchanged files from memory."""
+        server = ContextServer()
+        _context(server, repo_path=str(FIXTURE_PATH.resolve()))
+
+        status, payload = _context(server, repo_path=str(FIXTURE_PATH.resolve()))
+
+        assert status == 200
+        # Cached files skip the read stage entirely
+        assert "read" not in payload["stats"]["stages"]
+        repositories = server.health()["repositories"]
+        assert repositories[0]["cached_files"] == 6
+
+    def test_changed_files_are_served_fresh(self):
+        """Test that edits since the last request are picked up."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = Path(temp_dir) / "repo"
+            shutil.copytree(FIXTURE_PATH, repo)
+            past = time.time_ns() - 2 * RACY_NANOSECONDS
+            for path in [repo, *repo.rglob("*")]:
+                os.utime(path, ns=(past, past))
+            server = ContextServer()
+            _context(server, repo_path=str(repo))
+
+            (repo / "main.py").write_text("print('edited')\n")
+            (repo / "added.py").write_text("print('added')\n")
+            status, payload = _context(server, repo_path=str(repo))
+
+            assert status == 200
+            content = "".join(payload["parts"])
+            assert "print('edited')" in content
+            assert "added.py" in content
+
+    def test_bad_requests(self):
+        """Test that invalid requests get 400 or 404 with an error message."""
+        server = ContextServer()
+
+        for options in [
+            {},
+            {"repo_path": "relative/path"},
+            {"repo_path": "/nonexistent/repo"},
+            {"repo_path": str(FIXTURE_PATH.resolve()), "max_tokens": 10},
+            {"repo_path": str(FIXTURE_PATH.resolve()), "profile": "unknown"},
+            {"repo_path": str(FIXTURE_PATH.resolve()), "unknown": True},
+        ]:
+            status, payload = _context(server, **options)
+            assert status == 400
+            assert payload["error"]
+
+        assert server.handle("POST", "/context", b"not json")[0] == 400
+        assert server.handle("GET", "/missing", b"")[0] == 404
+
+    def test_least_recent_repository_dropped(self):
+        """Test that warm state is bounded by max_repositories."""
+        server = ContextServer(max_repositories=1)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _context(server, repo_path=str(FIXTURE_PATH.resolve()))
+            _context(server, repo_path=temp_dir)
+
+            repositories = server.health()["repositories"]
+
+        assert [state["repo_path"] for state in repositories] == [
+            str(Path(temp_dir).resolve())
+        ]
+
+    def test_caches_kept_per_repository(self):
+        """Test that requests reuse a repository's caches until it is dropped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            server = ContextServer(Path(temp_dir) / "cache", max_repositories=1)
+            _context(server, repo_path=str(FIXTURE_PATH.resolve()))
+            state = server._state(FIXTURE_PATH, None)
+            tokens = state.caches.open(TOKEN_COUNT_NAMESPACE)
+
+            _context(server, repo_path=str(FIXTURE_PATH.resolve()))
+            assert state.caches.open(TOKEN_COUNT_NAMESPACE) is tokens
+
+            _context(server, repo_path=temp_dir)
+            with pytest.raises(sqlite3.ProgrammingError):
+                tokens.get("key")
+            server.close()
+
+
+class TestHTTPServer:
+    """Tests for serving over HTTP."""
+
+    def test_round_trip_over_localhost(self):
+        """Test a health check and a context request over a real connection."""
+        httpd = create_http_server(ContextServer(), port=0)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection(*httpd.server_address[:2])
+            connection.request("GET", "/health")
+            health = json.loads(connection.getresponse().read())
+
+            body = json.dumps(
+                {"repo_path": str(FIXTURE_PATH.resolve()), "only_extensions": ["py"]}
+            )
+            connection.request("POST", "/context", body)
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+            connection.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+        assert health["status"] == "ok"
+        assert response.status == 200
+        assert len(payload["files"]) == 3
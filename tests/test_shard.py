@@ -0,0 +1,173 @@
+"""Tests for repo2context.shard module."""
+
+import json
+
+import pytest
+from repo2context import shard
+from repo2context.core import EXIT_ERROR, EXIT_SPLIT_FILES, EXIT_SUCCESS
+from repo2context.shard import (
+    ROOT_SHARD,
+    ShardConfigError,
+    ShardRouter,
+    read_shard_config,
+    shard_context,
+)
+
+FILES = {
+    "README.md": "# Monorepo\n",
+    "scripts/release.sh": "echo release\n",
+    "services/api/pyproject.toml": "[project]\nname = 'api'\n",
+    "services/api/api/app.py": "def handler():\n    return 'ok'\n",
+    "services/web/package.json": '{"name": "web"}\n',
+    "services/web/src/index.js": "console.log('web');\n",
+    "services/web/plugins/chart/package.json": '{"name": "chart"}\n',
+    "services/web/plugins/chart/chart.js": "export const chart = 1;\n",
+}
+
+
+class TestShardRouter:
+    """Tests for ShardRouter class."""
+
+    def test_innermost_root_wins(self):
+        """Test that nested packages take their own files."""
+        router = ShardRouter(["services/web", "services/web/plugins/chart"])
+
+        assert router.route("services/web/src/index.js") == "services/web"
+        assert router.route("services/web/plugins/chart/a.js") == (
+            "services/web/plugins/chart"
+        )
+
+    def test_files_outside_packages(self):
+        """Test that other files, and those of a root package, go to the root."""
+        router = ShardRouter([".", "services/api"])
+
+        assert router.route("README.md") == ROOT_SHARD
+        assert router.route("scripts/release.sh") == ROOT_SHARD
+        assert router.route("services/apiary/a.py") == ROOT_SHARD
+
+
+class TestReadShardConfig:
+    """Tests for read_shard_config function."""
+
+    def test_list_and_object(self, repo):
+        """Test that both configuration forms give normalised roots."""
+        config = repo / "shards.json"
+        config.write_text(json.dumps(["./services/api/", "libs/core"]))
+        assert read_shard_config(config) == ["services/api", "libs/core"]
+
+        config.write_text(json.dumps({"packages": ["services/web"]}))
+        assert read_shard_config(config) == ["services/web"]
+
+    @pytest.mark.parametrize("roots", [["../other"], ["/abs"], [1], "services"])
+    def test_invalid_roots(self, repo, roots):
+        """Test that roots outside the repository or of the wrong type fail."""
+        config = repo / "shards.json"
+        config.write_text(json.dumps(roots))
+
+        with pytest.raises(ShardConfigError):
+            read_shard_config(config)
+
+
+class TestShardContext:
+    """Tests for shard_context function."""
+
+    def test_detected_packages(self, repo, sections):
+        """Test that every file lands in the parts of its innermost package."""
+        exit_code = shard_context(
+            repo / "repo", output_path=repo / "out", verbose=False
+        )
+
+        out = repo / "out"
+        assert exit_code == EXIT_SUCCESS
+        assert sections(out / ROOT_SHARD / "repocontext_part01.md") == [
+            "README.md",
+            "scripts/release.sh",
+        ]
+        assert sections(out / "services/api/repocontext_part01.md") == [
+            "services/api/pyproject.toml",
+            "services/api/api/app.py",
+        ]
+        assert set(
+            sections(out / "services/web/plugins/chart/repocontext_part01.md")
+        ) == {
+            "services/web/plugins/chart/package.json",
+            "services/web/plugins/chart/chart.js",
+        }
+        assert set(sections(out / "services/web/repocontext_part01.md")) == {
+            "services/web/package.json",
+            "services/web/src/index.js",
+        }
+
+    def test_configured_packages(self, repo, sections):
+        """Test that configured roots replace detection."""
+        config = repo / "shards.json"
+        config.write_text(json.dumps({"packages": ["services"]}))
+
+        shard_context(
+            repo / "repo",
+            output_path=repo / "out",
+            shard_config=config,
+            verbose=False,
+        )
+
+        shards = sorted(path.name for path in (repo / "out").iterdir())
+        assert shards == [ROOT_SHARD, "services"]
+        assert len(sections(repo / "out/services/repocontext_part01.md")) == 6
+
+    def test_shards_split_independently(self, repo):
+        """Test that each shard counts its own tokens against the part limit."""
+        big = repo / "repo" / "services/api/api/big.py"
+        big.write_text("value = 1\n" * 400)
+
+        exit_code = shard_context(
+            repo / "repo",
+            output_path=repo / "out",
+            max_tokens=1000,
+            verbose=False,
+        )
+
+        assert exit_code == EXIT_SPLIT_FILES
+        assert len(list((repo / "out/services/api").glob("*.md"))) > 1
+        assert len(list((repo / "out/services/web").glob("*.md"))) == 1
+
+    def test_stats_list_shards(self, repo):
+        """Test that the statistics include parts, files and tokens per shard."""
+        stats_path = repo / "stats.json"
+
+        shard_context(
+            repo / "repo",
+            output_path=repo / "out",
+            stats_path=stats_path,
+            verbose=False,
+        )
+
+        data = json.loads(stats_path.read_text())
+        assert [entry["name"] for entry in data["shards"]] == [
+            ROOT_SHARD,
+            "services/api",
+            "services/web",
+            "services/web/plugins/chart",
+        ]
+        assert sum(entry["files"] for entry in data["shards"]) == data["files"]
+
+    def test_suspended_parts_are_appended(self, repo, monkeypatch):
+        """Test that shards beyond the open file limit keep all their sections."""
+        monkeypatch.setattr(shard, "MAX_OPEN_SHARDS", 1)
+
+        shard_context(repo / "repo", output_path=repo / "open-1", verbose=False)
+        monkeypatch.undo()
+        shard_context(repo / "repo", output_path=repo / "open-all", verbose=False)
+
+        for part in (repo / "open-all").rglob("*.md"):
+            relative = part.relative_to(repo / "open-all")
+            assert (repo / "open-1" / relative).read_text() == part.read_text()
+
+    def test_invalid_config(self, repo):
+        """Test that an unusable configuration is a fatal error."""
+        config = repo / "shards.json"
+        config.write_text("{")
+
+        assert (
+            shard_context(repo / "repo", shard_config=config, verbose=False)
+            == EXIT_ERROR
+        )
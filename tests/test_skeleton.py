@@ -0,0 +1,130 @@
+"""Tests for repo2context.skeleton module."""
+
+import tempfile
+from pathlib import Path
+
+from repo2context.cache import ContentCache
+from repo2context.core import FileProcessorServiceImpl, FileSystemRepositoryImpl
+from repo2context.skeleton import SkeletonRenderer, render_skeleton
+from repo2context.utils import estimate_tokens
+
+SOURCE = '''"""Module docstring.
+
+More details that should be dropped.
+"""
+
+import os
+from typing import Any
+
+__all__ = ["Widget", "build"]
+
+CONSTANT = 42
+
+
+class Widget:
+    """A widget.
+
+    Long description.
+    """
+
+    name: str
+
+    @property
+    def size(self) -> int:
+        """Return the size."""
+        return len(self.name) * CONSTANT
+
+
+async def build(config: dict[str, Any], *, strict: bool = False) -> Widget:
+    value = os.getenv("WIDGET")
+    return Widget()
+'''
+
+
+class TestRenderSkeleton:
+    """Tests for render_skeleton function."""
+
+    def test_keeps_api_surface(self):
+        """Test that imports, signatures and decorators are kept."""
+        skeleton = render_skeleton(SOURCE)
+
+        assert skeleton is not None
+        assert "import os" in skeleton
+        assert "from typing import Any" in skeleton
+        assert "__all__ = ['Widget', 'build']" in skeleton
+        assert "class Widget:" in skeleton
+        assert "name: str" in skeleton
+        assert "@property" in skeleton
+        assert "def size(self) -> int:" in skeleton
+        assert (
+            "async def build(config: dict[str, Any], *, strict: bool=False) -> Widget:"
+            in skeleton
+        )
+
+    def test_drops_bodies_and_docstring_details(self):
+        """Test that bodies and docstring continuation lines are removed."""
+        skeleton = render_skeleton(SOURCE)
+
+        assert skeleton is not None
+        assert '"""Module docstring."""' in skeleton
+        assert "More details" not in skeleton
+        assert "Long description" not in skeleton
+        assert "CONSTANT = 42" not in skeleton
+        assert "os.getenv" not in skeleton
+        assert "..." in skeleton
+
+    def test_invalid_source(self):
+        """Test that unparsable source returns None."""
+        assert render_skeleton("def broken(:\n") is None
+
+    def test_large_fixture_reduction(self):
+        """Test that a large fixture shrinks by an order of magnitude."""
+        fixture = Path(__file__).parent / "fixtures" / "test_repo"
+        source = (fixture / "very_large_file.py").read_text()
+
+        skeleton = render_skeleton(source)
+
+        assert skeleton is not None
+        assert estimate_tokens(skeleton) * 10 < estimate_tokens(source)
+
+
+class TestSkeletonRenderer:
+    """Tests for SkeletonRenderer class."""
+
+    def test_persistent_cache(self):
+        """Test that warm renderers are served from the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cold = SkeletonRenderer(ContentCache(Path(temp_dir), "skeleton"))
+            expected = cold.render(SOURCE)
+            assert cold.cache is not None
+            assert cold.cache.stats.misses == 1
+
+            warm = SkeletonRenderer(ContentCache(Path(temp_dir), "skeleton"))
+            assert warm.render(SOURCE) == expected
+            assert warm.cache is not None
+            assert warm.cache.stats.hits == 1
+
+
+class TestSkeletonProcessing:
+    """Tests for skeleton mode in FileProcessorServiceImpl."""
+
+    def test_threshold(self):
+        """Test that only Python files above the threshold are reduced."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = Path(temp_dir)
+            (repo / "big.py").write_text(SOURCE)
+            (repo / "small.py").write_text("def f():\n    return 1\n")
+            (repo / "notes.txt").write_text(SOURCE)
+
+            processor = FileProcessorServiceImpl(
+                FileSystemRepositoryImpl(), SkeletonRenderer(), skeleton_min_tokens=20
+            )
+
+            big = processor.process_file(repo / "big.py", repo)
+            small = processor.process_file(repo / "small.py", repo)
+            notes = processor.process_file(repo / "notes.txt", repo)
+
+            assert big is not None and big.skeleton
+            assert "os.getenv" not in big.content
+            assert small is not None and not small.skeleton
+            assert notes is not None and not notes.skeleton
@@ -0,0 +1,56 @@
+"""Tests for repo2context.statcache module."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from repo2context.statcache import RACY_NANOSECONDS, StatCache
+
+
+def _age(path: Path) -> None:
+    """Move a file's mtime back beyond the racy window."""
+    past = time.time_ns() - 2 * RACY_NANOSECONDS
+    os.utime(path, ns=(past, past))
+
+
+class TestStatCache:
+    """Tests for StatCache class."""
+
+    def test_value_kept_while_file_unchanged(self):
+        """Test that a stored value is returned for the same file version."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "file.txt"
+            path.write_text("one")
+            _age(path)
+            cache: StatCache[str] = StatCache()
+
+            cache.put(str(path), path.stat(), "value")
+
+            assert cache.get(str(path), path.stat()) == "value"
+            assert len(cache) == 1
+
+    def test_value_dropped_when_file_changes(self):
+        """Test that a changed size or mtime misses the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "file.txt"
+            path.write_text("one")
+            _age(path)
+            cache: StatCache[str] = StatCache()
+            cache.put(str(path), path.stat(), "value")
+
+            path.write_text("two")
+
+            assert cache.get(str(path), path.stat()) is None
+
+    def test_recent_files_are_not_stored(self):
+        """Test that files modified moments ago are never trusted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "file.txt"
+            path.write_text("one")
+            cache: StatCache[str] = StatCache()
+
+            cache.put(str(path), path.stat(), "value")
+
+            assert cache.get(str(path), path.stat()) is None
+            assert len(cache) == 0
@@ -0,0 +1,61 @@
+"""Tests for repo2context.stats module."""
+
+import time
+
+from repo2context.stats import RunStats
+
+
+class TestRunStats:
+    """Tests for RunStats class."""
+
+    def test_measure_accumulates_items_and_time(self):
+        """Test that each measured block adds one item and its duration."""
+        stats = RunStats()
+
+        for _ in range(3):
+            with stats.measure("read"):
+                time.sleep(0.01)
+
+        stage = stats.stages["read"]
+        assert stage.items == 3
+        assert stage.wall_seconds >= 0.03
+        # Sleeping uses no CPU
+        assert stage.cpu_seconds < stage.wall_seconds
+
+    def test_skip_counts_reasons(self):
+        """Test that skipped files are counted per reason."""
+        stats = RunStats()
+
+        stats.skip("binary")
+        stats.skip("binary")
+        stats.skip("ignored")
+
+        assert stats.skipped == {"binary": 2, "ignored": 1}
+
+    def test_timed_counts_yielded_items(self):
+        """Test that timing an iterator passes items through and counts them."""
+        stats = RunStats()
+
+        assert list(stats.timed("walk", iter("abc"))) == ["a", "b", "c"]
+        assert stats.stages["walk"].items == 3
+
+    def test_timed_stage_excludes_input_waits(self):
+        """Test that time spent waiting for input is not charged to the stage."""
+
+        def slow_input():
+            for item in range(3):
+                time.sleep(0.05)
+                yield item
+
+        def stage(items):
+            for item in items:
+                time.sleep(0.01)
+                yield item * 2
+
+        stats = RunStats()
+        run = stats.timed_stage("double", stage)
+
+        assert list(run(slow_input())) == [0, 2, 4]
+        summary = stats.stages["double"]
+        assert summary.items == 3
+        assert 0.03 <= summary.wall_seconds < 0.1
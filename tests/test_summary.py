@@ -0,0 +1,458 @@
+"""Tests for repo2context.summary module."""
+
+import asyncio
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from repo2context.cache import ContentCache
+from repo2context.chunking import split_source
+from repo2context.core import (
+    SUMMARY_CHUNK_TOKENS,
+    ChatSummaryServiceImpl,
+    FileProcessorServiceImpl,
+    FileSystemRepositoryImpl,
+    LocalSummaryServiceImpl,
+    OpenAISummaryServiceImpl,
+    SummaryConfig,
+)
+from repo2context.stub_server import StubChatServer
+from repo2context.summary import (
+    AsyncSummaryEngine,
+    HTTPChatBackend,
+    OpenAIChatBackend,
+    RateLimitError,
+    SummaryRequest,
+    TokenBucket,
+    parse_batch_response,
+)
+from repo2context.tracing import Tracer
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "test_repo"
+
+
+def _request(key):
+    """Create a small summary request."""
+    return SummaryRequest(
+        key=key, system_prompt="system", prompt=f"File: {key}\n", estimated_tokens=10
+    )
+
+
+async def _summarize_all(engine, requests):
+    """Summarise requests concurrently, mapping keys to summaries or errors."""
+    results = await asyncio.gather(
+        *(engine.summarize(request) for request in requests),
+        return_exceptions=True,
+    )
+    return {
+        request.key: result for request, result in zip(requests, results, strict=True)
+    }
+
+
+class TestBatchHelpers:
+    """Tests for parse_batch_response function."""
+
+    def test_parse_batch_response(self):
+        """Test parsing JSON wrapped in a code fence."""
+        text = '```json\n{"1": " First. ", "2": "", "3": 4}\n```'
+        assert parse_batch_response(text) == {"1": "First."}
+
+    def test_parse_invalid_batch_response(self):
+        """Test that invalid responses yield no summaries."""
+        assert parse_batch_response("Sorry, I cannot help.") == {}
+        assert parse_batch_response("{not json}") == {}
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket class."""
+
+    def test_throttles_beyond_capacity(self):
+        """Test that acquisitions beyond the capacity wait for refill."""
+
+        async def acquire_all():
+            bucket = TokenBucket(rate_per_minute=6000, capacity=1)
+            start = time.monotonic()
+            for _ in range(5):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        # 100 tokens per second, one in the bucket: four waits of 10ms
+        assert asyncio.run(acquire_all()) >= 0.035
+
+    def test_oversized_request_goes_into_debt(self):
+        """Test that requests larger than the capacity still complete."""
+
+        async def acquire_large():
+            bucket = TokenBucket(rate_per_minute=60000, capacity=10)
+            await bucket.acquire(50)
+            return bucket.tokens
+
+        assert asyncio.run(acquire_large()) < 0
+
+
+class TestAsyncSummaryEngine:
+    """Tests for AsyncSummaryEngine against a local stub server."""
+
+    def setup_method(self):
+        """Skip when the OpenAI client is not installed."""
+        pytest.importorskip("openai")
+
+    def _run(self, server, requests, **engine_options):
+        """Summarise requests through the stub server."""
+
+        async def run():
+            backend = OpenAIChatBackend("test-key", "stub-model", server.base_url)
+            try:
+                engine = AsyncSummaryEngine(backend, 50, **engine_options)
+                return await _summarize_all(engine, requests)
+            finally:
+                await backend.aclose()
+
+        return asyncio.run(run())
+
+    def test_respects_concurrency_limit(self):
+        """Test that requests run concurrently but never above the limit."""
+        server = StubChatServer(delay=0.05)
+        try:
+            requests = [_request(f"file{i}.py") for i in range(12)]
+            outcomes = self._run(server, requests, concurrency=4)
+        finally:
+            server.close()
+
+        assert outcomes["file3.py"] == "Summary of file3.py."
+        assert all(isinstance(outcome, str) for outcome in outcomes.values())
+        assert server.max_in_flight == 4
+
+    def test_retries_rate_limited_requests(self):
+        """Test that HTTP 429 responses are retried."""
+        server = StubChatServer(rate_limited_requests=2)
+        try:
+            outcomes = self._run(server, [_request("a.py")])
+        finally:
+            server.close()
+
+        assert outcomes["a.py"] == "Summary of a.py."
+        assert server.requests == 3
+
+    def test_gives_up_after_max_retries(self):
+        """Test that persistent rate limiting is reported as an error."""
+        server = StubChatServer(rate_limited_requests=10)
+        try:
+            outcomes = self._run(server, [_request("a.py")], max_retries=1)
+        finally:
+            server.close()
+
+        assert isinstance(outcomes["a.py"], RateLimitError)
+        assert server.requests == 2
+
+
+class TestHTTPChatBackend:
+    """Tests for HTTPChatBackend against a local stub server."""
+
+    def _run(self, backend, requests, **engine_options):
+        """Summarise requests through the backend."""
+
+        async def run():
+            try:
+                engine = AsyncSummaryEngine(backend, 50, **engine_options)
+                return await _summarize_all(engine, requests)
+            finally:
+                await backend.aclose()
+
+        return asyncio.run(run())
+
+    def test_reuses_pooled_connections(self):
+        """Test that sequential requests share one keep-alive connection."""
+        with StubChatServer() as server:
+            backend = HTTPChatBackend(server.base_url, "stub-model")
+            requests = [_request(f"file{i}.py") for i in range(5)]
+            outcomes = self._run(backend, requests, concurrency=1)
+
+        assert outcomes["file4.py"] == "Summary of file4.py."
+        assert backend.connections_opened == 1
+        assert server.connections == 1
+
+    def test_pool_bounded_by_concurrency(self):
+        """Test that concurrent requests open at most one connection per slot."""
+        with StubChatServer(delay=0.02) as server:
+            backend = HTTPChatBackend(server.base_url, "stub-model", pool_size=3)
+            requests = [_request(f"file{i}.py") for i in range(12)]
+            outcomes = self._run(backend, requests, concurrency=3)
+
+        assert all(isinstance(outcome, str) for outcome in outcomes.values())
+        assert backend.connections_opened == 3
+
+    def test_rate_limited_requests_are_retried(self):
+        """Test that HTTP 429 responses surface as retryable errors."""
+        with StubChatServer(rate_limited_requests=2) as server:
+            backend = HTTPChatBackend(server.base_url, "stub-model")
+            outcomes = self._run(backend, [_request("a.py")])
+
+        assert outcomes["a.py"] == "Summary of a.py."
+        assert server.requests == 3
+
+    def test_timeout(self):
+        """Test that slow responses fail after the configured timeout."""
+        with StubChatServer(delay=0.5) as server:
+            backend = HTTPChatBackend(server.base_url, "stub-model", timeout=0.05)
+            outcomes = self._run(backend, [_request("a.py")])
+
+        assert isinstance(outcomes["a.py"], TimeoutError)
+
+    def test_invalid_url(self):
+        """Test that malformed endpoint URLs are rejected."""
+        with pytest.raises(RuntimeError, match="Invalid summary endpoint URL"):
+            HTTPChatBackend("localhost:8080", "stub-model")
+
+
+class TestLocalSummaryService:
+    """Tests for LocalSummaryServiceImpl class."""
+
+    def test_generate_summaries_without_openai(self):
+        """Test summarising through a local endpoint with the stdlib backend."""
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "config.json", "large_file.py"]
+        ]
+
+        with StubChatServer() as server:
+            service = LocalSummaryServiceImpl(
+                SummaryConfig(backend="local", base_url=server.base_url)
+            )
+            summaries = service.generate_summaries(file_infos)
+
+        assert summaries[FIXTURE_PATH / "main.py"] == "Summary of main.py."
+        assert summaries[FIXTURE_PATH / "large_file.py"] == "Summary of large_file.py."
+        assert server.connections <= 2
+
+    def test_requests_are_traced(self):
+        """Test that each backend request is recorded as an async trace span."""
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "large_file.py"]
+        ]
+        tracer = Tracer()
+
+        with StubChatServer() as server:
+            service = LocalSummaryServiceImpl(
+                SummaryConfig(
+                    backend="local", base_url=server.base_url, batch_tokens=0
+                ),
+                tracer=tracer,
+            )
+            service.generate_summaries(file_infos)
+
+        begins = [event for event in tracer.events if event["ph"] == "b"]
+        ends = [event for event in tracer.events if event["ph"] == "e"]
+        assert len(begins) == len(ends) == server.requests == 2
+        assert {event["args"]["key"] for event in begins} == {
+            str(file_info.path) for file_info in file_infos
+        }
+
+    def test_quiet_service_prints_nothing(self, capsys):
+        """Test that a service built for library callers keeps stdout clean."""
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [processor.process_file(FIXTURE_PATH / "main.py", FIXTURE_PATH)]
+
+        with tempfile.TemporaryDirectory() as temp_dir, StubChatServer() as server:
+            service = LocalSummaryServiceImpl(
+                SummaryConfig(backend="local", base_url=server.base_url),
+                ContentCache(Path(temp_dir), "summaries"),
+                verbose=False,
+            )
+            summaries = service.generate_summaries(file_infos)
+
+        assert summaries[FIXTURE_PATH / "main.py"] == "Summary of main.py."
+        assert capsys.readouterr().out == ""
+
+    def test_cache_entries_are_scoped_to_endpoint(self):
+        """Test that local and OpenAI summaries never share cache entries."""
+        service = LocalSummaryServiceImpl(SummaryConfig(backend="local"))
+        assert service.cache_scope.startswith("http://127.0.0.1:8080/v1")
+        assert service.cache_scope != SummaryConfig().model
+
+    def test_service_without_backend_cannot_be_built(self):
+        """Test that a service must say which backend it drives."""
+        with pytest.raises(TypeError, match="_create_backend"):
+            ChatSummaryServiceImpl(SummaryConfig(backend="local"))
+
+
+class TestOpenAISummaryService:
+    """Tests for concurrent summaries in OpenAISummaryServiceImpl."""
+
+    def test_generate_summaries(self):
+        """Test that summaries are joined back onto the right files."""
+        pytest.importorskip("openai")
+        server = StubChatServer()
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "config.json", "very_large_file.py"]
+        ]
+
+        try:
+            service = OpenAISummaryServiceImpl(
+                api_key="test-key",
+                config=SummaryConfig(model="stub-model", base_url=server.base_url),
+            )
+            summaries = service.generate_summaries(file_infos)
+        finally:
+            server.close()
+
+        assert summaries[FIXTURE_PATH / "main.py"] == "Summary of main.py."
+        assert summaries[FIXTURE_PATH / "config.json"] == "Summary of config.json."
+        assert (
+            summaries[FIXTURE_PATH / "very_large_file.py"]
+            == "Summary of very_large_file.py."
+        )
+        # Both small files share one request; the large file is map-reduced
+        chunks = split_source(file_infos[2].content, "python", SUMMARY_CHUNK_TOKENS)
+        assert len(chunks) > 1
+        assert server.requests == 1 + len(chunks) + 1
+
+    def test_invalid_batch_response_falls_back(self):
+        """Test that files missing from a batch response are retried alone."""
+        pytest.importorskip("openai")
+        server = StubChatServer(batch_json=False)
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "config.json"]
+        ]
+
+        try:
+            service = OpenAISummaryServiceImpl(
+                api_key="test-key",
+                config=SummaryConfig(model="stub-model", base_url=server.base_url),
+            )
+            summaries = service.generate_summaries(file_infos)
+        finally:
+            server.close()
+
+        assert summaries[FIXTURE_PATH / "main.py"] == "Summary of main.py."
+        assert summaries[FIXTURE_PATH / "config.json"] == "Summary of config.json."
+        assert server.requests == 3
+
+    def test_batching_disabled(self):
+        """Test that a zero batch budget sends one request per file."""
+        pytest.importorskip("openai")
+        server = StubChatServer()
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "config.json"]
+        ]
+
+        try:
+            service = OpenAISummaryServiceImpl(
+                api_key="test-key",
+                config=SummaryConfig(
+                    model="stub-model", base_url=server.base_url, batch_tokens=0
+                ),
+            )
+            service.generate_summaries(file_infos)
+        finally:
+            server.close()
+
+        assert server.requests == 2
+
+    def test_warm_run_uses_cache(self):
+        """Test that unchanged files are served from the summary cache."""
+        pytest.importorskip("openai")
+        server = StubChatServer()
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH)
+            for name in ["main.py", "config.json"]
+        ]
+        config = SummaryConfig(model="stub-model", base_url=server.base_url)
+
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                cold = OpenAISummaryServiceImpl(
+                    api_key="test-key",
+                    config=config,
+                    cache=ContentCache(Path(temp_dir), "summaries"),
+                )
+                expected = cold.generate_summaries(file_infos)
+
+                warm = OpenAISummaryServiceImpl(
+                    api_key="test-key",
+                    config=config,
+                    cache=ContentCache(Path(temp_dir), "summaries"),
+                )
+                assert warm.generate_summaries(file_infos) == expected
+
+                # A different model must not reuse the cached summaries
+                other = OpenAISummaryServiceImpl(
+                    api_key="test-key",
+                    config=SummaryConfig(model="other", base_url=server.base_url),
+                    cache=ContentCache(Path(temp_dir), "summaries"),
+                )
+                other.generate_summaries(file_infos)
+        finally:
+            server.close()
+
+        assert warm.cache is not None
+        assert warm.cache.stats.hits == 2
+        assert warm.cache.stats.misses == 0
+        assert server.requests == 2
+
+    def test_summarize_stream_preserves_order(self):
+        """Test that streamed summaries keep input order across batches."""
+        pytest.importorskip("openai")
+        server = StubChatServer(delay=0.02)
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        names = ["main.py", "very_large_file.py", "config.json", "README.md"]
+        file_infos = [
+            processor.process_file(FIXTURE_PATH / name, FIXTURE_PATH) for name in names
+        ]
+
+        try:
+            service = OpenAISummaryServiceImpl(
+                api_key="test-key",
+                config=SummaryConfig(
+                    model="stub-model", base_url=server.base_url, concurrency=1
+                ),
+            )
+            streamed = list(service.summarize_stream(iter(file_infos)))
+        finally:
+            server.close()
+
+        assert [file_info.relative_path.name for file_info in streamed] == names
+        assert streamed[0].summary == "Summary of main.py."
+        assert streamed[1].summary == "Summary of very_large_file.py."
+        assert streamed[3].summary == "Summary of README.md."
+
+    def test_large_file_reuses_cached_chunks(self):
+        """Test that editing one method re-summarises only its chunk."""
+        pytest.importorskip("openai")
+        processor = FileProcessorServiceImpl(FileSystemRepositoryImpl())
+        original = processor.process_file(
+            FIXTURE_PATH / "very_large_file.py", FIXTURE_PATH
+        )
+        edited = replace(
+            original,
+            content=original.content.replace(
+                "Perform comprehensive network operations",
+                "Perform network operations",
+            ),
+        )
+
+        with StubChatServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+            for file_info in [original, edited]:
+                service = OpenAISummaryServiceImpl(
+                    api_key="test-key",
+                    config=SummaryConfig(model="stub-model", base_url=server.base_url),
+                    cache=ContentCache(Path(temp_dir), "summaries"),
+                )
+                service.generate_summaries([file_info])
+
+        chunks = split_source(original.content, "python", SUMMARY_CHUNK_TOKENS)
+        # Cold run: every chunk plus the reduce step; warm run: one chunk
+        # plus the reduce step
+        assert server.requests == (len(chunks) + 1) + 2
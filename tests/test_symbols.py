@@ -0,0 +1,223 @@
+"""Tests for repo2context.symbols module."""
+
+import time
+from pathlib import Path
+
+from repo2context.cache import ContentCache
+from repo2context.core import EXIT_SUCCESS, generate_context
+from repo2context.symbols import (
+    SYMBOL_FILES_NAMESPACE,
+    SYMBOLS_CACHE_NAMESPACE,
+    Definition,
+    SymbolIndex,
+    index_source,
+    symbol_language,
+)
+
+FILES = {
+    "app/models.py": (
+        "class User:\n"
+        '    """A user."""\n'
+        "\n"
+        "    def greet(self):\n"
+        "        return 'hi'\n"
+        "\n"
+        "MAX_USERS = 10\n"
+    ),
+    "app/views.py": "from app.models import User\n\ndef show():\n    return User()\n",
+    "app/admin.py": "import app.models\n\nusers = app.models.User\n",
+    "app/other.py": "def unrelated():\n    return 1\n",
+    "web/user.ts": (
+        "import { User } from './api';\n"
+        "export interface UserProps {\n"
+        "  name: string;\n"
+        "}\n"
+    ),
+    "README.md": "# User docs\n",
+}
+
+
+def _index(root: Path, cache_dir: Path | None = None) -> SymbolIndex:
+    """A symbol index of a repository, updated with all its files."""
+    index = SymbolIndex(
+        lambda path: (root / path).read_text(),
+        root,
+        ContentCache(cache_dir, SYMBOLS_CACHE_NAMESPACE) if cache_dir else None,
+        ContentCache(cache_dir, SYMBOL_FILES_NAMESPACE) if cache_dir else None,
+    )
+    index.update(
+        (relative, language, (root / relative).stat().st_size, 0)
+        for relative in sorted(FILES)
+        if (language := symbol_language(relative))
+    )
+    return index
+
+
+class TestIndexSource:
+    """Tests for index_source function."""
+
+    def test_python_definitions_and_references(self):
+        """Test that classes, methods and module names have their line ranges."""
+        symbols = index_source(FILES["app/models.py"], "python")
+
+        assert symbols.definitions == [
+            Definition("User", "class", 1, 5),
+            Definition("User.greet", "def", 4, 5),
+            Definition("MAX_USERS", "variable", 7, 7),
+        ]
+        assert "User" in index_source(FILES["app/views.py"], "python").references
+        assert "User" in index_source(FILES["app/admin.py"], "python").references
+
+    def test_unparsable_python(self):
+        """Test that broken Python still has its identifiers as references."""
+        symbols = index_source("def broken(:\n    User\n", "python")
+
+        assert symbols.definitions == []
+        assert "User" in symbols.references
+
+    def test_brace_languages(self):
+        """Test that pattern definitions end where their braces close."""
+        source = (
+            "package main\n"
+            "\n"
+            "type Server struct {\n"
+            "\tport int\n"
+            "}\n"
+            "\n"
+            "func (s *Server) Run() error {\n"
+            "\treturn nil\n"
+            "}\n"
+        )
+
+        assert index_source(source, "go").definitions == [
+            Definition("Server", "type", 3, 5),
+            Definition("Run", "func", 7, 9),
+        ]
+        assert index_source(FILES["web/user.ts"], "typescript").definitions == [
+            Definition("UserProps", "interface", 2, 4)
+        ]
+
+    def test_languages(self):
+        """Test that only languages with definition detection are indexed."""
+        assert symbol_language("a.py") == "python"
+        assert symbol_language("a.rs") == "rust"
+        assert symbol_language("README.md") is None
+
+
+class TestSymbolIndex:
+    """Tests for SymbolIndex class."""
+
+    def test_definitions_and_references(self, repo):
+        """Test that names match plainly or qualified, in file order."""
+        index = _index(repo / "repo")
+
+        assert index.definitions("User") == [
+            ("app/models.py", Definition("User", "class", 1, 5))
+        ]
+        assert index.definitions("greet") == index.definitions("User.greet")
+        assert index.references("User") == [
+            "app/admin.py",
+            "app/models.py",
+            "app/views.py",
+            "web/user.ts",
+        ]
+
+    def test_unchanged_files_are_not_read(self, repo):
+        """Test that a second index reads only files that changed."""
+        root, cache_dir = repo / "repo", repo / "cache"
+        _index(root, cache_dir)
+        (root / "app/other.py").write_text("def unrelated():\n    return User\n")
+
+        read = []
+        index = SymbolIndex(
+            lambda path: read.append(path) or (root / path).read_text(),
+            root,
+            ContentCache(cache_dir, SYMBOLS_CACHE_NAMESPACE),
+            ContentCache(cache_dir, SYMBOL_FILES_NAMESPACE),
+        )
+        index.update(
+            (relative, language, (root / relative).stat().st_size, 0)
+            for relative in sorted(FILES)
+            if (language := symbol_language(relative))
+        )
+
+        assert read == ["app/other.py"]
+        assert index.parsed == 1
+        assert "app/other.py" in index.references("User")
+
+    def test_content_seen_before_is_not_parsed(self, repo):
+        """Test that symbols are reused by content hash for new stat."""
+        root, cache_dir = repo / "repo", repo / "cache"
+        _index(root, cache_dir)
+
+        index = SymbolIndex(
+            lambda path: (root / path).read_text(),
+            root,
+            ContentCache(cache_dir, SYMBOLS_CACHE_NAMESPACE),
+            ContentCache(cache_dir, SYMBOL_FILES_NAMESPACE),
+        )
+        index.update([("app/models.py", "python", 1, 1)])
+
+        assert index.parsed == 0
+        assert index.definitions("MAX_USERS")
+
+    def test_recently_modified_files_are_read_again(self, repo):
+        """Test that a file modified within the racy window is not trusted."""
+        root, cache_dir = repo / "repo", repo / "cache"
+        mtime_ns = time.time_ns()
+
+        def index() -> list[str]:
+            read: list[str] = []
+            SymbolIndex(
+                lambda path: read.append(path) or (root / path).read_text(),
+                root,
+                ContentCache(cache_dir, SYMBOLS_CACHE_NAMESPACE),
+                ContentCache(cache_dir, SYMBOL_FILES_NAMESPACE),
+            ).update([("app/models.py", "python", 1, mtime_ns)])
+            return read
+
+        index()
+
+        assert index() == ["app/models.py"]
+
+
+class TestSymbolGeneration:
+    """Tests for generate_context with a symbol."""
+
+    def test_definition_then_references(self, repo, sections):
+        """Test that the defining file comes first, then the files using it."""
+        exit_code = generate_context(
+            repo / "repo", output_path=repo / "out", symbol="User"
+        )
+
+        written = sections(repo / "out" / "repocontext_part01.md")
+        assert exit_code == EXIT_SUCCESS
+        assert written[0] == "app/models.py"
+        assert set(written[1:]) == {"app/admin.py", "app/views.py", "web/user.ts"}
+
+    def test_budget_summarises_references_first(self, repo):
+        """Test that the token budget keeps the defining file in full."""
+        root = repo / "repo"
+        for name in ("app/models.py", "app/views.py"):
+            (root / name).write_text(
+                (root / name).read_text()
+                + "".join(
+                    f'\ndef f{i}(x):\n    """Add {i}."""\n    return x + {i}\n'
+                    for i in range(100)
+                )
+            )
+
+        generate_context(
+            root, output_path=repo / "out", symbol="User", token_budget=2000
+        )
+
+        text = (repo / "out" / "repocontext_part01.md").read_text()
+        assert text.split("app/views.py\n", 1)[1].startswith("**Summary:**")
+        assert not text.split("app/models.py\n", 1)[1].startswith("**Summary:**")
+
+    def test_undefined_symbol(self, repo, capsys, sections):
+        """Test that a name without definitions writes the files using it."""
+        generate_context(repo / "repo", output_path=repo / "out", symbol="api")
+
+        assert "No definition of 'api'" in capsys.readouterr().err
+        assert sections(repo / "out" / "repocontext_part01.md") == ["web/user.ts"]
@@ -0,0 +1,66 @@
+"""Tests for repo2context.tracing module."""
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+from repo2context.stats import RunStats
+from repo2context.tracing import Tracer
+
+
+class TestTracer:
+    """Tests for Tracer class."""
+
+    def test_write_chrome_trace_events(self):
+        """Test that spans are written as Chrome trace events with thread names."""
+        tracer = Tracer()
+        stats = RunStats(tracer)
+
+        with stats.measure("read", Path("src/app.py"), 120):
+            pass
+
+        def worker():
+            with stats.measure("write", Path("README.md")):
+                pass
+
+        thread = threading.Thread(target=worker, name="writer")
+        thread.start()
+        thread.join()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = Path(temp_dir) / "trace.json"
+            tracer.write(trace_path)
+            events = json.loads(trace_path.read_text())["traceEvents"]
+
+        spans = {event["name"]: event for event in events if event["ph"] == "X"}
+        assert spans["read"]["args"] == {"path": "src/app.py", "size": 120}
+        assert spans["write"]["args"] == {"path": "README.md"}
+        assert spans["read"]["dur"] >= 0
+        assert spans["read"]["tid"] != spans["write"]["tid"]
+
+        names = {event["args"]["name"] for event in events if event["ph"] == "M"}
+        assert "writer" in names
+
+    def test_async_spans_pair_by_id(self):
+        """Test that overlapping spans get distinct ids for begin and end."""
+        tracer = Tracer()
+
+        first = tracer.begin_async("request", {"key": "a"})
+        second = tracer.begin_async("request", {"key": "b"})
+        tracer.end_async("request", first)
+        tracer.end_async("request", second)
+
+        phases = [(event["ph"], event["id"]) for event in tracer.events]
+        assert phases == [("b", first), ("b", second), ("e", first), ("e", second)]
+        assert first != second
+
+    def test_untraced_stats_record_no_spans(self):
+        """Test that stats without a tracer only accumulate timings."""
+        stats = RunStats()
+
+        with stats.measure("read", Path("src/app.py"), 120):
+            pass
+
+        assert stats.tracer is None
+        assert stats.stages["read"].items == 1
@@ -8,6 +8,7 @@ from repo2context.utils import (
     estimate_tokens,
     format_bytes,
     guess_language,
+    is_binary_name,
 )
 
 
@@ -35,6 +36,21 @@ class TestDetectBinary:
         assert detect_binary(Path("/nonexistent/file.txt"))
 
 
+class TestIsBinaryName:
+    """Tests for is_binary_name function."""
+
+    def test_binary_names(self):
+        """Test that known binary types are recognised by name."""
+        assert is_binary_name("logo.png")
+        assert is_binary_name("archive.tar.gz")
+
+    def test_text_names(self):
+        """Test that text files and unknown names are not binary."""
+        assert not is_binary_name("main.py")
+        assert not is_binary_name("README")
+        assert not is_binary_name(".gitignore")
+
+
 class TestGuessLanguage:
     """Tests for guess_language function."""
 
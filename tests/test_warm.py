@@ -0,0 +1,99 @@
+"""Tests for repo2context.warm module."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from repo2context.statcache import RACY_NANOSECONDS
+from repo2context.warm import CachedFileSystemRepositoryImpl, RepositoryState
+
+
+def _age(*paths: Path) -> None:
+    """Move mtimes back beyond the racy window."""
+    past = time.time_ns() - 2 * RACY_NANOSECONDS
+    for path in paths:
+        os.utime(path, ns=(past, past))
+
+
+class TestCachedFileSystemRepository:
+    """Tests for CachedFileSystemRepositoryImpl class."""
+
+    def test_walk_matches_os_walk(self):
+        """Test that the walk visits the same directories in the same order."""
+        fixture_path = Path(__file__).parent / "fixtures" / "test_repo"
+        repo = CachedFileSystemRepositoryImpl()
+
+        walked = [
+            (root, sorted(dirs), sorted(files))
+            for root, dirs, files in repo.walk_directory(fixture_path)
+        ]
+        expected = [
+            (Path(root), sorted(dirs), sorted(files))
+            for root, dirs, files in os.walk(fixture_path)
+        ]
+
+        assert walked == expected
+
+    def test_pruned_directories_are_not_entered(self):
+        """Test that removing a name from dirs skips that subtree."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "keep").mkdir()
+            (root / "skip").mkdir()
+            (root / "skip" / "file.txt").write_text("x")
+            repo = CachedFileSystemRepositoryImpl()
+
+            visited = []
+            for directory, dirs, _files in repo.walk_directory(root):
+                visited.append(directory)
+                dirs[:] = [name for name in dirs if name != "skip"]
+
+            assert root / "skip" not in visited
+            assert root / "keep" in visited
+
+    def test_added_files_are_seen(self):
+        """Test that a cached listing is refreshed when its directory changes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "a.txt").write_text("a")
+            _age(root)
+            repo = CachedFileSystemRepositoryImpl()
+            list(repo.walk_directory(root))
+            assert len(repo.listings) == 1
+
+            (root / "b.txt").write_text("b")
+            files = next(iter(repo.walk_directory(root)))[2]
+
+            assert sorted(files) == ["a.txt", "b.txt"]
+
+
+class TestRepositoryState:
+    """Tests for RepositoryState class."""
+
+    def test_ignore_rules_reload_when_file_changes(self):
+        """Test that editing the ignore file recompiles the rules."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            rules = root / ".repo2contextignore"
+            rules.write_text("*.alpha\n")
+            state = RepositoryState(root)
+
+            first = state.ignore_service
+            assert state.ignore_service is first
+            assert first.should_ignore(root / "app.alpha", root)
+
+            rules.write_text("*.beta\n")
+            _age(rules)
+            second = state.ignore_service
+
+            assert second is not first
+            assert not second.should_ignore(root / "app.alpha", root)
+            assert second.should_ignore(root / "app.beta", root)
+
+    def test_file_caches_per_skeleton_threshold(self):
+        """Test that each skeleton threshold gets its own file cache."""
+        state = RepositoryState(Path("/fake/repo"))
+
+        assert state.file_cache(None) is state.file_cache(None)
+        assert state.file_cache(None) is not state.file_cache(0)
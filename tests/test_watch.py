@@ -0,0 +1,322 @@
+"""Tests for repo2context.watch module."""
+
+import shutil
+import sys
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+import pytest
+from repo2context.core import generate_context
+from repo2context.warm import RepositoryState
+from repo2context.watch import (
+    PollingWatcher,
+    WatchedContext,
+    create_watcher,
+    debounced_changes,
+)
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "test_repo"
+MAX_TOKENS = 1000  # Splits the fixture into several parts
+
+
+class FakeWatcher:
+    """Watcher replaying scripted changes and recording watched directories."""
+
+    name = "fake"
+
+    def __init__(self, batches: Iterable[set[Path] | None] = ()):
+        """Initialize with the results read_changes returns in turn."""
+        self.batches = list(batches)
+        self.watched: set[Path] = set()
+
+    def watch(self, directories: Iterable[Path]) -> list[Path]:
+        """Record the directories, returning the new ones."""
+        wanted = set(directories)
+        added = sorted(wanted - self.watched)
+        self.watched = wanted
+        return added
+
+    def read_changes(self, timeout: float | None) -> set[Path] | None:
+        """Return the next scripted batch, or nothing once exhausted."""
+        if not self.batches:
+            if timeout is None:
+                raise KeyboardInterrupt
+            return set()
+        return self.batches.pop(0)
+
+    def close(self) -> None:
+        """Do nothing."""
+
+
+def _options(repo_path: Path, **overrides) -> dict:
+    """Options for create_use_case as watch_context passes them."""
+    options = {
+        "repo_path": repo_path,
+        "rules_file": None,
+        "max_tokens": MAX_TOKENS,
+        "only_extensions": None,
+        "enable_summary": False,
+        "profile": None,
+        "skeleton_min_tokens": None,
+        "cache_dir": None,
+        "optimize_stages": None,
+        "summary_config": None,
+        "queue_size": 64,
+        "token_budget": None,
+    }
+    options.update(overrides)
+    return options
+
+
+def _parts(output_dir: Path) -> list[str]:
+    """Text of the part files in a directory, in order."""
+    return [
+        path.read_text(encoding="utf-8")
+        for path in sorted(output_dir.glob("repocontext_part*.md"))
+    ]
+
+
+def _fresh_parts(repo_path: Path, output_dir: Path) -> list[str]:
+    """Parts a full run writes for the repository as it is now."""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    generate_context(repo_path, output_path=output_dir, max_tokens=MAX_TOKENS)
+    return _parts(output_dir)
+
+
+@pytest.fixture
+def repo():
+    """A copy of the fixture repository, with output outside it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir).resolve()
+        shutil.copytree(FIXTURE_PATH, root / "repo")
+        yield root
+
+
+def _context(root: Path, watcher=None, **overrides) -> WatchedContext:
+    """A built watched context for the repository copy under root."""
+    repo_path = root / "repo"
+    context = WatchedContext(
+        RepositoryState(repo_path),
+        root / "out",
+        _options(repo_path, **overrides),
+        watcher or FakeWatcher(),
+    )
+    context.build(verbose=False)
+    return context
+
+
+class TestWatchedContext:
+    """Tests for WatchedContext class."""
+
+    def test_build_matches_full_run(self, repo):
+        """Test that the initial parts equal those of generate_context."""
+        context = _context(repo)
+
+        assert len(context.parts) > 1
+        assert _parts(repo / "out") == _fresh_parts(repo / "repo", repo / "fresh")
+
+    def test_build_watches_every_directory(self, repo):
+        """Test that all walked directories are watched."""
+        watcher = FakeWatcher()
+        _context(repo, watcher)
+
+        assert repo / "repo" in watcher.watched
+        assert repo / "repo" / "temp" not in watcher.watched  # Ignored by default
+
+    def test_edit_rewrites_only_its_part(self, repo):
+        """Test that editing a file rewrites just the part holding it."""
+        context = _context(repo)
+        first_file = repo / "repo" / context.order[0]
+        untouched = _parts(repo / "out")[1:]
+
+        first_file.write_text(first_file.read_text() + "\n# edited\n")
+        rewritten = context.update({first_file})
+
+        assert rewritten == [1]
+        assert _parts(repo / "out")[1:] == untouched
+        assert _parts(repo / "out") == _fresh_parts(repo / "repo", repo / "fresh")
+
+    def test_unchanged_content_rewrites_nothing(self, repo):
+        """Test that a save without changes leaves the parts alone."""
+        context = _context(repo)
+        path = repo / "repo" / context.order[0]
+        path.write_text(path.read_text())
+
+        assert context.update({path}) == []
+
+    def test_added_file_in_new_directory(self, repo):
+        """Test that files in a new directory are rendered and watched."""
+        watcher = FakeWatcher()
+        context = _context(repo, watcher)
+        new_dir = repo / "repo" / "pkg"
+        new_dir.mkdir()
+        (new_dir / "module.py").write_text("def added():\n    return 1\n")
+
+        context.update({new_dir})
+
+        assert new_dir in watcher.watched
+        assert "pkg/module.py" in context.sections
+        assert _parts(repo / "out") == _fresh_parts(repo / "repo", repo / "fresh")
+
+    def test_deleted_file_is_dropped(self, repo):
+        """Test that a deleted file disappears from the parts."""
+        context = _context(repo)
+        path = repo / "repo" / "main.py"
+        path.unlink()
+
+        context.update({path})
+
+        assert "main.py" not in context.sections
+        assert _parts(repo / "out") == _fresh_parts(repo / "repo", repo / "fresh")
+
+    def test_removed_parts_are_deleted(self, repo):
+        """Test that part files beyond the new count are removed."""
+        context = _context(repo)
+        parts_before = len(context.parts)
+        for relative in list(context.order):
+            if relative != "main.py":
+                (repo / "repo" / relative).unlink()
+
+        context.update({repo / "repo" / relative for relative in context.order})
+
+        assert len(context.parts) < parts_before
+        assert len(_parts(repo / "out")) == len(context.parts)
+
+    def test_ignored_new_file_is_skipped(self, repo):
+        """Test that creating an ignored file changes nothing."""
+        context = _context(repo)
+        path = repo / "repo" / "debug.log"
+        path.write_text("noise\n")
+
+        assert context.update({path}) == []
+        assert "debug.log" not in context.walked
+
+    def test_changed_rules_rebuild(self, repo):
+        """Test that editing the ignore file applies the new rules."""
+        context = _context(repo)
+        rules = repo / "repo" / ".repo2contextignore"
+        rules.write_text("*.py\n")
+
+        context.update({rules})
+
+        assert not any(relative.endswith(".py") for relative in context.sections)
+
+    def test_lost_events_rebuild(self, repo):
+        """Test that None, for lost events, checks every file again."""
+        context = _context(repo)
+        path = repo / "repo" / "config.json"
+        path.write_text('{"changed": true}\n')
+
+        context.update(None)
+
+        assert _parts(repo / "out") == _fresh_parts(repo / "repo", repo / "fresh")
+
+    def test_output_inside_repository_is_not_rendered(self, repo):
+        """Test that writing parts into the repository does not loop."""
+        repo_path = repo / "repo"
+        context = WatchedContext(
+            RepositoryState(repo_path),
+            repo_path / "context",
+            _options(repo_path),
+            FakeWatcher(),
+        )
+        context.build(verbose=False)
+
+        changes = set((repo_path / "context").iterdir())
+        assert context.update(changes) == []
+        assert not any(path.startswith("context/") for path in context.walked)
+
+
+class TestPollingWatcher:
+    """Tests for PollingWatcher class."""
+
+    def test_reports_created_modified_and_deleted(self):
+        """Test that every kind of change is reported by path."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            kept = root / "kept.txt"
+            removed = root / "removed.txt"
+            kept.write_text("a")
+            removed.write_text("b")
+            watcher = PollingWatcher(interval=0.01)
+            assert watcher.watch([root]) == [root]
+
+            kept.write_text("changed")
+            removed.unlink()
+            (root / "new.txt").write_text("c")
+
+            assert watcher.read_changes(1.0) == {kept, removed, root / "new.txt"}
+            assert watcher.read_changes(0.02) == set()
+
+    def test_unwatched_directories_are_forgotten(self):
+        """Test that watch() drops directories no longer wanted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            watcher = PollingWatcher(interval=0.01)
+            watcher.watch([root])
+            watcher.watch([])
+
+            (root / "new.txt").write_text("c")
+
+            assert watcher.read_changes(0.02) == set()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux")
+class TestInotifyWatcher:
+    """Tests for InotifyWatcher class."""
+
+    def test_reports_saved_file(self):
+        """Test that a write to a watched directory is reported."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            watcher = create_watcher()
+            if watcher.name != "inotify":
+                pytest.skip("inotify unavailable")
+            try:
+                watcher.watch([root])
+                (root / "saved.txt").write_text("content")
+
+                assert watcher.read_changes(1.0) == {root / "saved.txt"}
+            finally:
+                watcher.close()
+
+    def test_removed_directory_drops_its_watch(self):
+        """Test that deleting a watched directory reports it and stops watching."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            child = root / "child"
+            child.mkdir()
+            watcher = create_watcher()
+            if watcher.name != "inotify":
+                pytest.skip("inotify unavailable")
+            try:
+                watcher.watch([root, child])
+                child.rmdir()
+
+                changes: set[Path] = set()
+                while batch := watcher.read_changes(0.2):
+                    changes |= batch
+                assert child in changes
+                assert watcher.watch([root]) == []
+            finally:
+                watcher.close()
+
+
+class TestDebouncedChanges:
+    """Tests for debounced_changes function."""
+
+    def test_burst_becomes_one_batch(self):
+        """Test that changes arriving back to back are merged."""
+        a, b = Path("a"), Path("b")
+        watcher = FakeWatcher([{a}, {b}, set(), {a}])
+        batches = debounced_changes(watcher, 0.01)
+
+        assert next(batches) == {a, b}
+        assert next(batches) == {a}
+
+    def test_lost_events_end_the_batch(self):
+        """Test that lost events are passed on as None."""
+        watcher = FakeWatcher([{Path("a")}, None])
+
+        assert next(debounced_changes(watcher, 0.01)) is None